@@ -0,0 +1,20 @@
+"""
+ASGI config for project project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Serving via ASGI routes requests to async views, which run their DB work
+in thread pools (see server/concurrency.py). project/wsgi.py still works
+as a fallback with the sync views.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/3.1/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings.common")
+os.environ.setdefault("ASYNC_VIEWS", "true")
+
+application = get_asgi_application()
@@ -46,7 +46,10 @@ INSTALLED_APPS = [
 GRAPHENE = {"SCHEMA": "server.graphql.schema"}
 
 MIDDLEWARE = [
+    "server.middleware.ProfilingMiddleware",
+    "server.middleware.TracingMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "server.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -90,6 +93,105 @@ DATABASES = {
     }
 }
 
+# Optional hot standby that GraphQL requests & read-only commands read from
+# (see server/routers.py)
+REPLICA_DATABASE = os.getenv("DATABASE_REPLICA_ALIAS", "replica")
+
+if os.getenv("DATABASE_REPLICA_HOST"):
+    DATABASES[REPLICA_DATABASE] = {
+        **DATABASES["default"],
+        "HOST": os.getenv("DATABASE_REPLICA_HOST"),
+        "PORT": int(os.getenv("DATABASE_REPLICA_PORT", "5432")),
+    }
+
+DATABASE_ROUTERS = ["server.routers.ReplicaRouter"]
+# Seconds that the replica can fall behind the primary before reads go to the primary
+DATABASE_REPLICA_MAX_LAG = 10
+# Seconds between checks of how far the replica has fallen behind
+DATABASE_REPLICA_LAG_CHECK_INTERVAL = 1
+
+# Cache
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+
+RESOLVER_CACHE_MAX_ENTRIES = 500
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    # Results of expensive GraphQL resolvers and the current round state,
+    # keyed by the data version, so we rarely have to expire entries
+    # (see server/cache.py & server/round_state.py)
+    "graphql": {
+        "BACKEND": "server.cache.InstrumentedLocMemCache",
+        "LOCATION": "graphql",
+        "TIMEOUT": None,
+        "OPTIONS": {
+            "MAX_ENTRIES": RESOLVER_CACHE_MAX_ENTRIES,
+            # Evicts one least-recently-used entry at a time
+            "CULL_FREQUENCY": RESOLVER_CACHE_MAX_ENTRIES,
+        },
+    },
+    # Queries that clients have registered by hash
+    # (see server/graphql/persisted_queries.py)
+    "persisted_queries": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "persisted_queries",
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
+}
+
+# Persisted GraphQL queries
+# Whether clients can register queries to reference by hash
+PERSISTED_QUERY_REGISTRATION = True
+
+# Limits for GraphQL queries (see server/graphql/validation.py)
+GRAPHQL_MAX_QUERY_COST = 5000
+GRAPHQL_MAX_QUERY_DEPTH = 10
+
+# Response bodies
+JSON_RESPONSE_ENCODER = "server.encoders.OrjsonResponseEncoder"
+# Bytes below which response bodies aren't worth compressing
+COMPRESSION_MIN_SIZE = 1024
+
+# Seconds that clients can reuse GET responses from /graphql before checking
+# whether they've changed
+GRAPHQL_CACHE_MAX_AGE = 0
+
+# Request profiling (see server/profiling.py)
+# Whether to profile every request. Otherwise, only requests with an X-Profile header
+# get profiled, and only if DEBUG is on or the header's value is the token.
+REQUEST_PROFILING = os.getenv("REQUEST_PROFILING") == "true"
+REQUEST_PROFILING_TOKEN = os.getenv("REQUEST_PROFILING_TOKEN", "")
+# Milliseconds at which profiled requests get logged as slow
+SLOW_REQUEST_THRESHOLD = 500
+# Times that a query shape has to run in one request to get flagged
+# as a possible N+1 pattern
+N_PLUS_ONE_QUERY_THRESHOLD = 5
+# Seconds between samples of request threads' stacks
+REQUEST_PROFILING_SAMPLE_INTERVAL = 0.005
+
+# Where to export trace spans (see server/tracing.py)
+TRACING_JSONL_PATH = os.getenv("TRACING_JSONL_PATH", "")
+TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "")
+
+# Serving via ASGI (see project/asgi.py)
+# Whether to route requests to async views, which project/asgi.py turns on
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS") == "true"
+# Threads per pool for running DB work from async views (see server/concurrency.py).
+# Ingestion views only queue jobs, so they need just one thread,
+# which leaves the DB connections for GraphQL reads.
+ASYNC_EXECUTOR_WORKERS = {"ingestion": 1, "graphql": 4}
+
+# Background ingestion jobs (see server/jobs.py)
+# Seconds after which a running job's worker is assumed to have died,
+# so another worker can claim the job
+INGESTION_JOB_TIMEOUT = 1200
+# Times that workers try to run a job before giving up on it
+INGESTION_JOB_MAX_ATTEMPTS = 3
+# Seconds after a job succeeds during which posting the same payload
+# returns that job instead of queueing a new one
+INGESTION_JOB_DEDUPLICATION_WINDOW = 3600
+
 # Password validation
 # https://docs.djangoproject.com/en/2.1/ref/settings/#auth-password-validators
 
@@ -44,8 +44,19 @@ TEMPLATES = [
     }
 ]
 
+# dj_database_url returns TypedDicts, which mypy won't mix with the plain dicts
+# in settings/common.py
 if os.environ.get("DATABASE_URL"):
-    DATABASES["default"] = dj_database_url.config(conn_max_age=600, ssl_require=True)
+    DATABASES["default"] = dict(
+        dj_database_url.config(conn_max_age=600, ssl_require=True)
+    )
+
+if os.environ.get("DATABASE_REPLICA_URL"):
+    DATABASES[REPLICA_DATABASE] = dict(
+        dj_database_url.config(
+            env="DATABASE_REPLICA_URL", conn_max_age=600, ssl_require=True
+        )
+    )
 
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/2.1/howto/static-files/
@@ -11,3 +11,15 @@ DEBUG = True
 SECRET_KEY = "^6&#7de5dx#eqg6dm^l3#@wj6vjjn%2f=u(!&ia()h-l1ppan!"
 
 ENVIRONMENT = "test"
+
+# Test transactions roll back data changes, but not the data version sequence,
+# so cached resolver results could leak between tests. Caching tests override this.
+CACHES = {
+    **CACHES,
+    "graphql": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+}
+
+# Test data is only visible to the transaction that each test runs in,
+# so tests read from the primary, except for the ones that set up the replica
+# (see server/tests/integration/test_replica_routing.py)
+DATABASES.pop(REPLICA_DATABASE, None)
@@ -19,19 +19,41 @@ from django.urls import path, re_path
 from django.conf import settings
 from django.views.generic import TemplateView
 from django.views.decorators.csrf import csrf_exempt
-from graphene_django.views import GraphQLView
 
 from server import views
+from server.graphql.views import AsyncPersistedQueryView, PersistedQueryView
+
+
+def _async_csrf_exempt(view):
+    # Django 3.1's csrf_exempt wraps views in sync functions, which hides async ones
+    view.csrf_exempt = True
+    return view
+
+
+GRAPHIQL = os.getenv("GRAPHIQL") or False
+
+if settings.ASYNC_VIEWS:
+    graphql_view = _async_csrf_exempt(
+        AsyncPersistedQueryView.as_view(graphiql=GRAPHIQL)
+    )
+    prediction_view = _async_csrf_exempt(views.async_predictions)
+    fixture_view = _async_csrf_exempt(views.async_fixtures)
+    match_view = _async_csrf_exempt(views.async_matches)
+    job_view = views.async_job_status
+else:
+    graphql_view = csrf_exempt(PersistedQueryView.as_view(graphiql=GRAPHIQL))
+    prediction_view = csrf_exempt(views.predictions)
+    fixture_view = csrf_exempt(views.fixtures)
+    match_view = csrf_exempt(views.matches)
+    job_view = views.job_status
 
 urlpatterns = [  # pylint: disable=C0103
     path("admin/", admin.site.urls),
-    re_path(
-        "^graphql",
-        csrf_exempt(GraphQLView.as_view(graphiql=(os.getenv("GRAPHIQL") or False))),
-    ),
-    path("predictions", csrf_exempt(views.predictions), name="predictions"),
-    path("fixtures", csrf_exempt(views.fixtures), name="fixtures"),
-    path("matches", csrf_exempt(views.matches), name="matches"),
+    re_path("^graphql", graphql_view),
+    path("predictions", prediction_view, name="predictions"),
+    path("fixtures", fixture_view, name="fixtures"),
+    path("matches", match_view, name="matches"),
+    path("jobs/<int:job_id>", job_view, name="job"),
 ]
 
 if settings.ENVIRONMENT == "production":
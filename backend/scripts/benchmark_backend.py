@@ -0,0 +1,540 @@
+"""
+Script for benchmarking the backend against large synthetic histories of data.
+
+Creates a throwaway DB, bulk-inserts seasons × ML models × rounds × matches
+of records (see server/tests/fixtures/bulk_data.py), then times every GraphQL
+query, the data-ingestion endpoints (including running their jobs),
+and the seed_db & send_email commands, counting the DB queries that each one makes.
+Results are appended to a JSON history file with the current commit, and compared
+with the last results for the same amount of data, so we can see how changes
+affect performance.
+
+Run with `python3 scripts/benchmark_backend.py --seasons 10 --ml_models 6`
+from the backend directory.
+"""
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from datetime import datetime
+from functools import partial
+from unittest.mock import patch
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+import django
+import numpy as np
+
+PROJECT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../"))
+
+if PROJECT_PATH not in sys.path:
+    sys.path.append(PROJECT_PATH)
+
+django.setup()
+
+# pylint: disable=wrong-import-position
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment
+from django.utils import timezone
+from graphql import FieldNode, OperationDefinitionNode, parse
+import pandas as pd
+
+from server.cache import RESOLVER_CACHE
+from server.graphql import schema
+from server.jobs import run_next_job
+from server.management.commands import seed_db, send_email
+from server.models import Match, MLModel, TeamMatch
+from server.models.ingestion_job import JobStatus
+from server.models.ml_model import PredictionType
+from server.round_state import fetch_round_state
+from server.tests.fixtures import data_factories
+from server.tests.fixtures.bulk_data import create_synthetic_history
+
+
+DEFAULT_HISTORY_PATH = os.path.join(PROJECT_PATH, "data/benchmark_history.json")
+BENCHMARK_DB_PREFIX = "benchmark_"
+FRONTEND_QUERIES_PATH = os.path.join(PROJECT_PATH, "../frontend/src/graphql/index.js")
+# The frontend defines queries as gql-tagged template literals
+# without interpolation
+GQL_TEMPLATE_REGEX = re.compile(r"gql`(.*?)`", re.DOTALL)
+N_SEED_SEASONS = 1
+# Queries that the frontend doesn't use yet
+EXTRA_GRAPHQL_QUERIES = [
+    """
+    query fetchPaginatedPredictions($season: Int) {
+        fetchPaginatedPredictions(season: $season, first: 100) {
+            edges {
+                node {
+                    match { startDateTime roundNumber }
+                    mlModel { name }
+                    predictedWinner { name }
+                    predictedMargin
+                    predictedWinProbability
+                    isCorrect
+                }
+            }
+            pageInfo { hasNextPage endCursor }
+        }
+    }
+    """,
+    "query fetchSeasonYears { fetchSeasonYears }",
+    """
+    query fetchMlModels {
+        fetchMlModels(forCompetitionOnly: true) { name isPrincipal predictionType }
+    }
+    """,
+]
+
+
+class Benchmark(NamedTuple):
+    """
+    Operation to time, with an optional setup step that isn't timed.
+
+    Attributes:
+    -----------
+    name: Name for identifying results across runs.
+    run: Function that performs the operation.
+    setup: Function that gets the DB or cache ready before each run.
+    """
+
+    name: str
+    run: Callable[[], Any]
+    setup: Optional[Callable[[], Any]] = None
+
+
+def _frontend_queries() -> List[str]:
+    with open(FRONTEND_QUERIES_PATH, "r", encoding="utf-8") as query_file:
+        return GQL_TEMPLATE_REGEX.findall(query_file.read())
+
+
+def _graphql_queries() -> Dict[str, str]:
+    frontend_queries = _frontend_queries()
+    queries = {}
+
+    for query in frontend_queries + EXTRA_GRAPHQL_QUERIES:
+        for definition in parse(query).definitions:
+            if not isinstance(definition, OperationDefinitionNode):
+                continue
+
+            for selection in definition.selection_set.selections:
+                if isinstance(selection, FieldNode):
+                    queries[selection.name.value] = query
+
+    missing_fields = set(schema.graphql_schema.query_type.fields) - set(queries)
+    assert not missing_fields, f"Add benchmarks for GraphQL queries {missing_fields}."
+
+    return queries
+
+
+def _graphql_benchmarks(client: Client, season: int) -> List[Benchmark]:
+    variables = {"season": season, "year": season, "forCompetitionOnly": False}
+
+    def execute(query: str) -> None:
+        response = client.post(
+            "/graphql",
+            {"query": query, "variables": variables},
+            content_type="application/json",
+        )
+        body = json.loads(response.content)
+        assert "errors" not in body, body["errors"]
+
+    return [
+        Benchmark(
+            name=f"graphql:{field_name}",
+            run=partial(execute, query),
+            # Results are cached per data version, so we time uncached queries
+            setup=caches[RESOLVER_CACHE].clear,
+        )
+        for field_name, query in _graphql_queries().items()
+    ]
+
+
+def _post_and_run_job(client: Client, path: str, payload: Dict[str, Any]):
+    response = client.post(path, payload, content_type="application/json")
+    assert response.status_code == 202, response.content
+
+    job = run_next_job(verbose=0)
+    assert job is not None and job.status == JobStatus.SUCCEEDED, job and job.error
+
+
+def _team_names(match: Match) -> Dict[str, str]:
+    return {
+        f"{'home' if team_match.at_home else 'away'}_team": team_match.team.name
+        for team_match in match.teammatch_set.all()
+    }
+
+
+def _records(data_frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    # Like the tipping service, we send missing values as null rather than NaN
+    return data_frame.astype(object).where(data_frame.notna(), None).to_dict("records")
+
+
+def _prediction_payload(matches: List[Match]) -> Dict[str, Any]:
+    prediction_data = pd.concat(
+        [
+            data_factories.fake_prediction_data(
+                match_data=match,
+                ml_model_name=ml_model.name,
+                predict_margin=ml_model.prediction_type == PredictionType.MARGIN,
+            )
+            for match in matches
+            for ml_model in MLModel.objects.all()
+        ]
+    )
+
+    return {"data": _records(prediction_data)}
+
+
+def _fixture_payload(matches: List[Match]) -> Dict[str, Any]:
+    return {
+        "data": [
+            {
+                "date": match.start_date_time,
+                "year": match.season,
+                "round_number": match.round_number,
+                "venue": match.venue,
+                **_team_names(match),
+            }
+            for match in matches
+        ],
+        "upcoming_round": min(match.round_number for match in matches),
+    }
+
+
+def _match_payload(team_matches: List[TeamMatch]) -> Dict[str, Any]:
+    matches: Dict[int, Dict[str, Any]] = {}
+
+    for team_match in team_matches:
+        match = team_match.match
+        team_type = "home" if team_match.at_home else "away"
+        matches.setdefault(
+            match.id,
+            {
+                "date": match.start_date_time,
+                "year": match.season,
+                "round": f"R{match.round_number}",
+                "round_number": match.round_number,
+                "venue": match.venue,
+                "match_id": match.id,
+                "crowd": 30000,
+            },
+        ).update(
+            {
+                f"{team_type}_team": team_match.team.name,
+                f"{team_type}_score": team_match.score,
+            }
+        )
+
+    return {"data": list(matches.values())}
+
+
+def _ingestion_benchmarks(client: Client) -> List[Benchmark]:
+    next_match = fetch_round_state()["next_match"]
+    assert next_match is not None, "There are no upcoming matches."
+
+    upcoming_matches = Match.objects.filter(
+        season=next_match["season"], round_number=next_match["round_number"]
+    ).prefetch_related("teammatch_set__team")
+    future_matches = Match.objects.filter(
+        start_date_time__gt=timezone.now()
+    ).prefetch_related("teammatch_set__team")
+    last_played_team_matches = list(
+        TeamMatch.objects.filter(
+            match__season=next_match["season"],
+            match__round_number=next_match["round_number"] - 1,
+        ).select_related("match", "team")
+    )
+
+    prediction_payload = _prediction_payload(list(upcoming_matches))
+    fixture_payload = _fixture_payload(list(future_matches))
+    match_payload = _match_payload(last_played_team_matches)
+
+    def clear_last_round_results():
+        TeamMatch.objects.filter(
+            id__in=[team_match.id for team_match in last_played_team_matches]
+        ).update(score=0)
+        Match.objects.filter(
+            id__in={team_match.match_id for team_match in last_played_team_matches}
+        ).update(margin=None, winner=None)
+
+    return [
+        Benchmark(
+            name="ingestion:predictions",
+            run=lambda: _post_and_run_job(client, "/predictions", prediction_payload),
+        ),
+        Benchmark(
+            name="ingestion:fixtures",
+            run=lambda: _post_and_run_job(client, "/fixtures", fixture_payload),
+        ),
+        Benchmark(
+            name="ingestion:matches",
+            run=lambda: _post_and_run_job(client, "/matches", match_payload),
+            # Recent matches need to be missing results for there to be
+            # anything to update
+            setup=clear_last_round_results,
+        ),
+    ]
+
+
+class _SyntheticDataImporter:
+    """Stand-in for the tipping service that returns fake data for seed_db."""
+
+    def __init__(self, seasons: range):
+        match_data = data_factories.fake_match_results_data(
+            seasons=(seasons.start, seasons.stop)
+        )
+        self.match_data = match_data[match_data["year"].isin(seasons)]
+        self.prediction_data = pd.concat(
+            [
+                data_factories.fake_prediction_data(
+                    match_data=self.match_data,
+                    ml_model_name=ml_model.name,
+                    predict_margin=ml_model.prediction_type == PredictionType.MARGIN,
+                )
+                for ml_model in MLModel.objects.all()
+            ]
+        )
+
+    @staticmethod
+    def fetch_ml_models() -> List[Dict[str, Any]]:
+        """Return info for the ML models in the DB."""
+        return [
+            {"name": name, "filepath": f"models/{name}.pkl"}
+            for name in MLModel.objects.values_list("name", flat=True)
+        ]
+
+    def fetch_matches(self, start_date: str, end_date: str, **_kwargs):
+        """Return fake match results between the dates, inclusive."""
+        start_date_time = pd.to_datetime(start_date, utc=True)
+        end_date_time = pd.to_datetime(end_date, utc=True) + pd.Timedelta(days=1)
+        match_dates = self.match_data["date"]
+
+        return self.match_data[
+            (match_dates >= start_date_time) & (match_dates < end_date_time)
+        ].to_dict("records")
+
+    def fetch_match_predictions(
+        self, year_range: Union[str, Tuple[int, int]], **_kwargs
+    ):
+        """Return fake predictions for the seasons in the range."""
+        # seed_db passes year ranges as 'yyyy-yyyy' or (yyyy, yyyy)
+        min_year, max_year = (
+            (int(year) for year in year_range.split("-"))
+            if isinstance(year_range, str)
+            else year_range
+        )
+
+        prediction_years = self.prediction_data["year"]
+
+        return _records(
+            self.prediction_data[
+                (prediction_years >= min_year) & (prediction_years < max_year)
+            ]
+        )
+
+
+def _command_benchmarks(first_season: int) -> List[Benchmark]:
+    seed_seasons = range(first_season - N_SEED_SEASONS, first_season)
+    year_range = f"{seed_seasons.start}-{seed_seasons.stop}"
+    data_importer = _SyntheticDataImporter(seed_seasons)
+
+    def delete_seeded_matches():
+        Match.objects.filter(season__in=seed_seasons).delete()
+
+    def seed(bulk: bool):
+        seed_db.Command(
+            data_importer=data_importer, fetch_data=False, verbose=0
+        ).handle(year_range=year_range, bulk=bulk)
+
+    class FakeSendGridClient:  # pylint: disable=too-few-public-methods
+        """Stand-in for SendGrid's client that doesn't send anything."""
+
+        def __init__(self, _api_key):
+            pass
+
+        @staticmethod
+        def send(_mail):
+            """Pretend to send the email."""
+            return None
+
+    def send():
+        with patch.object(send_email.sendgrid, "SendGridAPIClient", FakeSendGridClient):
+            call_command("send_email")
+
+    return [
+        Benchmark(
+            name="command:seed_db", run=lambda: seed(False), setup=delete_seeded_matches
+        ),
+        Benchmark(
+            name="command:seed_db --bulk",
+            run=lambda: seed(True),
+            setup=delete_seeded_matches,
+        ),
+        Benchmark(name="command:send_email", run=send),
+    ]
+
+
+class _QueryCounter:  # pylint: disable=too-few-public-methods
+    # Django's query log only keeps the latest 9000 queries,
+    # which isn't enough for commands that seed the DB one record at a time
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _time_benchmark(benchmark: Benchmark, n_runs: int) -> Dict[str, Any]:
+    durations = []
+    query_counts = []
+
+    for _ in range(n_runs):
+        if benchmark.setup is not None:
+            benchmark.setup()
+
+        query_counter = _QueryCounter()
+
+        with connection.execute_wrapper(query_counter):
+            start_time = time.perf_counter()
+            benchmark.run()
+            durations.append(time.perf_counter() - start_time)
+
+        query_counts.append(query_counter.count)
+
+    return {
+        "min_seconds": min(durations),
+        "median_seconds": float(np.median(durations)),
+        "max_seconds": max(durations),
+        "query_count": max(query_counts),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            cwd=PROJECT_PATH,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _load_history(history_path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(history_path):
+        return []
+
+    with open(history_path, "r", encoding="utf-8") as history_file:
+        return json.load(history_file)
+
+
+def _print_results(
+    results: Dict[str, Dict[str, Any]], previous_entry: Optional[Dict[str, Any]]
+):
+    previous_results = {} if previous_entry is None else previous_entry["results"]
+    name_width = max(len(name) for name in results)
+
+    if previous_entry is not None:
+        print(f"Compared with {previous_entry['commit']} ({previous_entry['date']}):")
+
+    for name, result in results.items():
+        change = ""
+        previous_result = previous_results.get(name)
+
+        if previous_result is not None:
+            time_change = (
+                result["median_seconds"] / previous_result["median_seconds"] - 1
+            )
+            query_change = result["query_count"] - previous_result["query_count"]
+            change = f" ({time_change:+.0%}, {query_change:+d} queries)"
+
+        print(
+            f"{name.ljust(name_width)}  {result['median_seconds'] * 1000:9.1f}ms "
+            f"{result['query_count']:6d} queries{change}"
+        )
+
+
+def main():
+    """Time the backend's endpoints & commands and save the results to a history."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--seasons", type=int, default=5, help="Seasons of data")
+    parser.add_argument("--ml_models", type=int, default=4, help="ML models")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per benchmark")
+    parser.add_argument(
+        "--only", default="", help="Only run benchmarks with names that include this"
+    )
+    parser.add_argument(
+        "--history", default=DEFAULT_HISTORY_PATH, help="Path to the JSON history"
+    )
+    args = parser.parse_args()
+
+    # The test environment lets the test client through ALLOWED_HOSTS
+    setup_test_environment(debug=False)
+    old_db_name = connection.settings_dict["NAME"]
+    connection.settings_dict["TEST"]["NAME"] = BENCHMARK_DB_PREFIX + old_db_name
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+    try:
+        # Identical payloads would otherwise return the first run's job
+        with override_settings(INGESTION_JOB_DEDUPLICATION_WINDOW=0), patch.dict(
+            os.environ, {"EMAIL_RECIPIENT": "benchmark", "SENDGRID_API_KEY": "fake"}
+        ):
+            print(
+                f"Creating {args.seasons} seasons of data "
+                f"for {args.ml_models} ML models..."
+            )
+            record_counts = create_synthetic_history(args.seasons, args.ml_models)
+            first_season = timezone.now().year - args.seasons + 1
+            client = Client()
+
+            benchmarks = [
+                benchmark
+                for benchmark in (
+                    _graphql_benchmarks(client, timezone.now().year)
+                    + _ingestion_benchmarks(client)
+                    + _command_benchmarks(first_season)
+                )
+                if args.only in benchmark.name
+            ]
+            results = {
+                benchmark.name: _time_benchmark(benchmark, args.runs)
+                for benchmark in benchmarks
+            }
+    finally:
+        connection.creation.destroy_test_db(old_db_name, verbosity=0)
+
+    params = {"seasons": args.seasons, "ml_models": args.ml_models, **record_counts}
+    history = _load_history(args.history)
+    previous_entry = next(
+        (entry for entry in reversed(history) if entry["params"] == params), None
+    )
+
+    _print_results(results, previous_entry)
+
+    history.append(
+        {
+            "commit": _git_commit(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "params": params,
+            "runs": args.runs,
+            "results": results,
+        }
+    )
+
+    with open(args.history, "w", encoding="utf-8") as history_file:
+        json.dump(history, history_file, indent=2)
+
+    print(f"Saved results to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Script for benchmarking JSON encoding & compression of typical response bodies.
+
+Generates fake season-metrics and prediction payloads in memory, so it doesn't need
+a populated DB. Run with `python3 scripts/benchmark_json_encoding.py`
+from the backend directory.
+"""
+
+from typing import Any, Callable, Dict, List
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+from functools import partial
+
+import django
+import numpy as np
+import pytz
+
+PROJECT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../"))
+
+if PROJECT_PATH not in sys.path:
+    sys.path.append(PROJECT_PATH)
+
+django.setup()
+
+# pylint: disable=wrong-import-position
+from server.encoders import OrjsonResponseEncoder, StandardJSONResponseEncoder
+from server.middleware import COMPRESSORS
+
+
+N_MODELS = 20
+N_ROUNDS = 28
+N_MATCHES_PER_ROUND = 9
+N_RUNS = 50
+ENCODERS = [StandardJSONResponseEncoder(), OrjsonResponseEncoder()]
+
+
+def _fake_season_metrics() -> Dict[str, Any]:
+    """Response body for fetchSeasonModelMetrics with all rounds & models."""
+    random = np.random.default_rng(42)
+
+    return {
+        "data": {
+            "fetchSeasonModelMetrics": {
+                "season": 2020,
+                "roundModelMetrics": [
+                    {
+                        "roundNumber": round_number,
+                        "modelMetrics": [
+                            {
+                                "mlModel": {"name": f"model_{model_idx}"},
+                                "cumulativeAccuracy": random.uniform(0.5, 0.8),
+                                "cumulativeBits": random.uniform(-10, 30),
+                                "cumulativeMeanAbsoluteError": random.uniform(20, 40),
+                                "cumulativeCorrectCount": int(
+                                    random.integers(0, N_MATCHES_PER_ROUND)
+                                    * round_number
+                                ),
+                                "cumulativeMarginDifference": random.uniform(0, 2000),
+                            }
+                            for model_idx in range(N_MODELS)
+                        ],
+                    }
+                    for round_number in range(1, N_ROUNDS + 1)
+                ],
+            }
+        }
+    }
+
+
+def _fake_predictions() -> List[Dict[str, Any]]:
+    """Prediction values like the ones that /predictions returns, with numpy types."""
+    random = np.random.default_rng(42)
+    season_start = datetime(2020, 3, 19, tzinfo=pytz.UTC)
+
+    return [
+        {
+            "match__start_date_time": season_start
+            + timedelta(weeks=round_number, hours=match_idx * 3),
+            "predicted_winner__name": f"Team {match_idx}",
+            "predicted_margin": np.float64(random.uniform(1, 50)),
+            "predicted_win_probability": np.float64(random.uniform(0.5, 1)),
+            "is_correct": bool(random.integers(0, 2)),
+        }
+        for round_number in range(1, N_ROUNDS + 1)
+        for match_idx in range(N_MATCHES_PER_ROUND)
+        for _ in range(N_MODELS)
+    ]
+
+
+def _time(func: Callable[[], Any]) -> float:
+    return min(timeit.repeat(func, number=1, repeat=N_RUNS))
+
+
+def _benchmark(name: str, payload: Any):
+    print(f"{name}:")
+
+    for encoder in ENCODERS:
+        duration = _time(partial(encoder.encode, payload))
+        print(f"    {encoder.__class__.__name__}: {duration * 1000:.2f}ms")
+
+    body = OrjsonResponseEncoder().encode(payload)
+    print(f"    uncompressed: {len(body) / 1024:.1f}KB")
+
+    for encoding, compress in COMPRESSORS.items():
+        duration = _time(partial(compress, body))
+        print(
+            f"    {encoding}: {len(compress(body)) / 1024:.1f}KB "
+            f"in {duration * 1000:.2f}ms"
+        )
+
+
+def main():
+    """Print how long it takes to encode & compress typical response bodies."""
+    print(f"Fastest of {N_RUNS} runs")
+    _benchmark("Season metrics", _fake_season_metrics())
+    _benchmark("Season predictions", _fake_predictions())
+
+
+if __name__ == "__main__":
+    main()
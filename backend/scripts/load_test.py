@@ -0,0 +1,200 @@
+"""
+Script for load testing the server with a mix of GraphQL reads and data ingestion.
+
+Reader threads send GraphQL queries while writer threads re-post the next round's
+predictions to /predictions, like the tipping service does, then the script prints
+latency percentiles for each type of request. To compare serving via WSGI & ASGI,
+run the server against the same DB one way, then the other, running this script
+against each:
+
+    gunicorn -b 0.0.0.0:8000 -w 3 -t 600 project.wsgi
+    gunicorn -b 0.0.0.0:8000 -w 3 -t 600 -k uvicorn.workers.UvicornWorker project.asgi
+
+The DB needs predictions for upcoming matches (e.g. from the seed_db command).
+Run with `python3 scripts/load_test.py http://localhost:8000` from the backend
+directory.
+"""
+
+from typing import Any, Callable, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import os
+import sys
+import time
+
+import django
+import numpy as np
+import requests
+
+PROJECT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../"))
+
+if PROJECT_PATH not in sys.path:
+    sys.path.append(PROJECT_PATH)
+
+django.setup()
+
+# pylint: disable=wrong-import-position
+from server.models import Prediction
+from server.round_state import fetch_round_state
+from server.types import CleanPredictionData
+
+
+GRAPHQL_QUERIES = [
+    """
+    query {
+        fetchLatestRoundPredictions {
+            roundNumber
+            matchPredictions { startDateTime predictedWinner predictedMargin }
+        }
+    }
+    """,
+    """
+    query {
+        fetchLatestRoundMetrics {
+            season roundNumber cumulativeCorrectCount cumulativeAccuracy
+        }
+    }
+    """,
+    "query { fetchMlModels(forCompetitionOnly: true) { name predictionType } }",
+]
+
+
+def _predicted_values(value, winner_is_home: bool, opposite: Callable):
+    if value is None:
+        return None, None
+
+    return (value, opposite(value)) if winner_is_home else (opposite(value), value)
+
+
+def _prediction_payload() -> List[CleanPredictionData]:
+    next_match = fetch_round_state()["next_match"]
+    assert next_match is not None, "There are no upcoming matches in the DB."
+
+    predictions = Prediction.objects.filter(
+        match__season=next_match["season"],
+        match__round_number=next_match["round_number"],
+    ).prefetch_related("match__teammatch_set__team", "ml_model", "predicted_winner")
+    assert predictions.exists(), "There are no predictions for upcoming matches."
+
+    payload: List[CleanPredictionData] = []
+
+    for prediction in predictions:
+        team_matches = prediction.match.teammatch_set.all()
+        home_team = next(tm.team for tm in team_matches if tm.at_home)
+        away_team = next(tm.team for tm in team_matches if not tm.at_home)
+        winner_is_home = prediction.predicted_winner == home_team
+        home_margin, away_margin = _predicted_values(
+            prediction.predicted_margin, winner_is_home, lambda margin: -margin
+        )
+        home_probability, away_probability = _predicted_values(
+            prediction.predicted_win_probability,
+            winner_is_home,
+            lambda probability: 1 - probability,
+        )
+
+        payload.append(
+            {
+                "home_team": home_team.name,
+                "away_team": away_team.name,
+                "year": prediction.match.season,
+                "round_number": prediction.match.round_number,
+                "ml_model": prediction.ml_model.name,
+                "home_predicted_margin": home_margin,
+                "away_predicted_margin": away_margin,
+                "home_predicted_win_probability": home_probability,
+                "away_predicted_win_probability": away_probability,
+            }
+        )
+
+    return payload
+
+
+RequestSender = Callable[[requests.Session, int], requests.Response]
+
+
+def _run_requests(send_request: RequestSender, deadline: float) -> Dict[str, List[Any]]:
+    results: Dict[str, List[Any]] = {"latencies": [], "errors": []}
+    request_count = 0
+
+    with requests.Session() as session:
+        while time.monotonic() < deadline:
+            start_time = time.monotonic()
+
+            try:
+                response = send_request(session, request_count)
+                response.raise_for_status()
+            except requests.RequestException as err:
+                results["errors"].append(err)
+            else:
+                results["latencies"].append(time.monotonic() - start_time)
+
+            request_count += 1
+
+    return results
+
+
+def _print_results(name: str, results: List[Dict[str, List[Any]]], duration: float):
+    latencies = np.array([latency for r in results for latency in r["latencies"]])
+    error_count = sum(len(r["errors"]) for r in results)
+
+    if not latencies.size:
+        print(f"{name}: no successful requests ({error_count} errors)")
+        return
+
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(
+        f"{name}: {latencies.size / duration:.1f} req/s, "
+        f"p50 {p50:.0f}ms, p99 {p99:.0f}ms, {error_count} errors"
+    )
+
+
+def main():
+    """Run mixed GraphQL & ingestion traffic against a server and print latencies."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("url", help="Base URL, e.g. http://localhost:8000")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run")
+    parser.add_argument("--readers", type=int, default=16, help="GraphQL clients")
+    parser.add_argument("--writers", type=int, default=2, help="Ingestion clients")
+    parser.add_argument("--token", default="", help="API token for /predictions")
+    args = parser.parse_args()
+
+    prediction_payload = {"data": _prediction_payload()}
+    headers = {"Authorization": f"Bearer {args.token}"}
+
+    def read(session, request_count):
+        query = GRAPHQL_QUERIES[request_count % len(GRAPHQL_QUERIES)]
+        return session.post(f"{args.url}/graphql", json={"query": query})
+
+    def write(session, _request_count):
+        return session.post(
+            f"{args.url}/predictions", json=prediction_payload, headers=headers
+        )
+
+    print(
+        f"Running {args.readers} GraphQL clients and {args.writers} ingestion clients "
+        f"for {args.duration:.0f}s..."
+    )
+    deadline = time.monotonic() + args.duration
+
+    with ThreadPoolExecutor(max_workers=args.readers + args.writers) as executor:
+        read_futures = [
+            executor.submit(_run_requests, read, deadline)
+            for _ in range(args.readers)
+        ]
+        write_futures = [
+            executor.submit(_run_requests, write, deadline)
+            for _ in range(args.writers)
+        ]
+
+        _print_results(
+            "GraphQL", [future.result() for future in read_futures], args.duration
+        )
+        _print_results(
+            "/predictions",
+            [future.result() for future in write_futures],
+            args.duration,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,9 @@ from mypy_extensions import TypedDict
 import pandas as pd
 
 from server.models import Match, TeamMatch, Prediction
+from server.cache import bumps_data_version
+from server.round_predictions import fetch_round_predictions
+from server.round_state import fetch_round_state
 from server.types import FixtureData, CleanPredictionData, MatchData
 
 
@@ -17,8 +20,8 @@ PredictionValues = TypedDict(
     "PredictionValues",
     {
         "predicted_winner__name": str,
-        "predicted_margin": float,
-        "predicted_win_probability": float,
+        "predicted_margin": Optional[float],
+        "predicted_win_probability": Optional[float],
     },
 )
 
@@ -32,6 +35,7 @@ def _build_match(match_data: FixtureData) -> Tuple[TeamMatch, TeamMatch]:
     return TeamMatch.get_or_create_from_raw_data(match, match_data)
 
 
+@bumps_data_version
 def update_fixture_data(
     fixture_data: List[FixtureData], upcoming_round: int, verbose=1
 ) -> None:
@@ -75,19 +79,14 @@ def update_fixture_data(
     round_number = {match_data["round_number"] for match_data in fixture_data}.pop()
     year = {match_data["year"] for match_data in fixture_data}.pop()
 
-    past_matches = Match.objects.filter(start_date_time__lt=right_now)
-    prev_match = (
-        max(past_matches, key=lambda match: match.start_date_time)
-        if any(past_matches)
-        else None
-    )
+    prev_round = fetch_round_state()["latest_played_round"]
 
-    if prev_match is not None:
-        assert round_number in (prev_match.round_number + 1, FIRST_ROUND), (
+    if prev_round is not None:
+        assert round_number in (prev_round["round_number"] + 1, FIRST_ROUND), (
             "Expected upcoming round number to be 1 greater than previous round "
             f"or 1, but upcoming round is {round_number} in {year}, "
-            f" and previous round was {prev_match.round_number} "
-            f"in {prev_match.start_date_time.year}"
+            f" and previous round was {prev_round['round_number']} "
+            f"in {prev_round['season']}"
         )
 
     for fixture_datum in fixture_data:
@@ -99,6 +98,7 @@ def update_fixture_data(
     return None
 
 
+@bumps_data_version
 def backfill_recent_match_results(match_results: List[MatchData], verbose=1) -> None:
     """
     Updates scores for all played matches without score data.
@@ -146,19 +146,18 @@ def backfill_recent_match_results(match_results: List[MatchData], verbose=1) ->
 
 def fetch_next_match() -> Optional[MatchDict]:
     """Get the record for the next match to be played."""
-    future_matches = Match.objects.filter(start_date_time__gt=timezone.now())
+    next_match = fetch_round_state()["next_match"]
 
-    if not any(future_matches):
+    if next_match is None:
         return None
 
-    next_match = min(future_matches, key=lambda match: match.start_date_time)
-
     return {
-        "round_number": next_match.round_number,
-        "season": next_match.start_date_time.year,
+        "round_number": next_match["round_number"],
+        "season": next_match["season"],
     }
 
 
+@bumps_data_version
 def update_future_match_predictions(predictions: List[CleanPredictionData]) -> None:
     """Update or create prediction records for upcoming matches."""
     future_match_count = Match.objects.filter(
@@ -183,23 +182,21 @@ def fetch_latest_round_predictions(verbose=1) -> List[PredictionValues]:
     verbose: Whether to print info messages.
     """
     latest_match = Match.objects.latest("start_date_time")
-    latest_year = latest_match.start_date_time.year
+    latest_year = latest_match.season
     latest_round = latest_match.round_number
 
-    latest_round_predictions = (
-        Prediction.objects.filter(
-            ml_model__used_in_competitions=True,
-            match__start_date_time__year=latest_year,
-            match__round_number=latest_round,
-        )
-        .select_related("match")
-        .prefetch_related("match__teammatch_set__team")
-        .values(
-            "predicted_winner__name",
-            "predicted_margin",
-            "predicted_win_probability",
-        )
-    )
+    # The tipping service submits each competition model's own predictions
+    # to the competition that uses its prediction type.
+    latest_round_predictions: List[PredictionValues] = [
+        {
+            "predicted_winner__name": prediction["predicted_winner__name"],
+            "predicted_margin": prediction["predicted_margin"],
+            "predicted_win_probability": prediction["predicted_win_probability"],
+        }
+        for prediction in fetch_round_predictions(latest_year, latest_round)[
+            "model_predictions"
+        ]
+    ]
 
     if not any(latest_round_predictions) and verbose == 1:
         print(f"No predictions found for round {latest_round}.")
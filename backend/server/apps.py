@@ -7,3 +7,8 @@ class ServerConfig(AppConfig):
     """Config for the server app."""
 
     name = "server"
+
+    def ready(self):
+        """Connect signal receivers once all models are loaded."""
+        # pylint: disable=import-outside-toplevel,unused-import
+        from server import signals  # noqa: F401
@@ -0,0 +1,161 @@
+"""
+Caching of expensive GraphQL resolvers that only change when DB data changes.
+
+Cache keys include a global data version, which is a Postgres sequence that
+gets incremented whenever server.api or a model save changes the data.
+Old entries are never deleted explicitly: once the version changes, nobody asks
+for them again, and they fall off the end of the cache's LRU queue.
+"""
+
+from typing import Callable, Dict, Any, TypeVar, cast
+from functools import wraps
+from threading import Lock
+import hashlib
+import json
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection, transaction
+
+from server.routers import require_wal_position
+
+
+RESOLVER_CACHE = "graphql"
+DATA_VERSION_SEQUENCE = "server_data_version"
+DATA_VERSION_SQL = f"""
+    SELECT last_value, pg_wal_lsn_diff(pg_current_wal_flush_lsn(), '0/0')::bigint
+    FROM {DATA_VERSION_SEQUENCE}
+"""
+
+_MISSING = object()
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class InstrumentedLocMemCache(LocMemCache):
+    """
+    Local-memory cache that counts hits & misses for monitoring.
+
+    LocMemCache already evicts the least-recently-used entries when it's full,
+    so setting CULL_FREQUENCY equal to MAX_ENTRIES evicts one entry at a time.
+    Like the cached data, counters are shared by all threads in a process.
+    """
+
+    _counters: Dict[str, Dict[str, int]] = {}
+    _counter_lock = Lock()
+
+    def __init__(self, name, params):
+        super().__init__(name, params)
+
+        with self._counter_lock:
+            self._counts = self._counters.setdefault(name, {"hits": 0, "misses": 0})
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, default=_MISSING, version=version)
+
+        with self._counter_lock:
+            self._counts["misses" if value is _MISSING else "hits"] += 1
+
+        return default if value is _MISSING else value
+
+    def clear(self):
+        super().clear()
+
+        with self._counter_lock:
+            self._counts.update(hits=0, misses=0)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit & miss counts and the current size of the cache."""
+        with self._counter_lock:
+            return {
+                **self._counts,
+                "entries": len(self._cache),
+                "max_entries": self._max_entries,
+            }
+
+
+def data_version() -> int:
+    """
+    Return the current version of the DB data for use in cache keys.
+
+    Replicas only see sequence values as of the primary's last WAL record for them,
+    which can be ahead of the actual value, so this always reads from the primary.
+    Data for the version can't be read from the replica until it catches up with
+    the primary's WAL as of now (see server/routers.py).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(DATA_VERSION_SQL)
+        version, wal_position = cursor.fetchone()
+
+    require_wal_position(wal_position)
+
+    return version
+
+
+def _increment_data_version() -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT nextval('{DATA_VERSION_SEQUENCE}')")
+
+
+def bump_data_version() -> None:
+    """
+    Increment the data version, invalidating all cached resolver results.
+
+    Sequences ignore transactions, so a concurrent request could cache
+    data from before an uncommitted change under the new version. To avoid
+    keeping stale results, we increment the version again after the commit.
+    """
+    _increment_data_version()
+
+    if connection.in_atomic_block:
+        transaction.on_commit(_increment_data_version)
+
+
+def bumps_data_version(func: F) -> F:
+    """Decorate a function that changes DB data to increment the data version."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            bump_data_version()
+
+    return cast(F, wrapper)
+
+
+def versioned_key(name: str) -> str:
+    """Return a cache key that's only valid for the current data version."""
+    return f"{name}:{data_version()}"
+
+
+def _cache_key(field_name: str, arguments: Dict[str, Any]) -> str:
+    arguments_hash = hashlib.sha256(
+        json.dumps(arguments, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+    return f"{versioned_key(field_name)}:{arguments_hash}"
+
+
+def cache_resolver(resolver: F) -> F:
+    """
+    Cache the return value of a GraphQL resolver for the current data version.
+
+    Cached values are pickled, so the resolver has to return fully-evaluated data
+    (e.g. lists rather than querysets) that its type's fields can resolve
+    without querying the DB.
+    """
+
+    @wraps(resolver)
+    def wrapper(root, info, **kwargs):
+        cache = caches[RESOLVER_CACHE]
+        key = _cache_key(info.field_name, kwargs)
+        value = cache.get(key, _MISSING)
+
+        if value is _MISSING:
+            value = resolver(root, info, **kwargs)
+            cache.set(key, value)
+
+        return value
+
+    return cast(F, wrapper)
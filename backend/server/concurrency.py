@@ -0,0 +1,83 @@
+"""
+Thread pools for running blocking ORM work from async views.
+
+Django's ORM is synchronous, so async views hand their DB work to a thread pool
+rather than blocking the event loop. Each pool has a fixed number of threads
+(set by ASYNC_EXECUTOR_WORKERS), which limits how many DB connections it can use
+at once. Separate pools keep slow data ingestion from holding up GraphQL reads:
+once a pool's threads are busy, its jobs queue without affecting the other pools.
+"""
+
+from typing import Any, Callable, Dict, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+import asyncio
+import contextvars
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from server.profiling import profile_thread
+
+
+INGESTION_EXECUTOR = "ingestion"
+GRAPHQL_EXECUTOR = "graphql"
+
+T = TypeVar("T")
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executor_lock = Lock()
+
+
+def _get_executor(name: str) -> ThreadPoolExecutor:
+    with _executor_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_EXECUTOR_WORKERS[name],
+                thread_name_prefix=f"{name}-executor",
+            )
+
+        return _executors[name]
+
+
+def _run_with_connection(func: Callable[..., T], *args, **kwargs) -> T:
+    # Pool threads keep their DB connections between jobs, so we apply
+    # the same connection lifetime rules as Django does between requests
+    close_old_connections()
+
+    try:
+        with profile_thread():
+            return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_in_executor(
+    executor_name: str, func: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """
+    Run a blocking function in a thread pool without blocking the event loop.
+
+    Params:
+    -------
+    executor_name: Name of the thread pool, which must be a key
+        in settings.ASYNC_EXECUTOR_WORKERS.
+    func: Blocking function to run, usually one that queries the DB.
+    args: Positional arguments for the function.
+    kwargs: Keyword arguments for the function.
+
+    Returns:
+    --------
+    The function's return value.
+    """
+    loop = asyncio.get_running_loop()
+    # Unlike asyncio.to_thread, run_in_executor doesn't pass on context variables
+    # (e.g. the request's profile), so we run the function in a copy of the context
+    context = contextvars.copy_context()
+
+    return await loop.run_in_executor(
+        _get_executor(executor_name),
+        context.run,
+        partial(_run_with_connection, func, *args, **kwargs),
+    )
@@ -0,0 +1,117 @@
+"""
+JSON encoders for HTTP response bodies.
+
+The JSON_RESPONSE_ENCODER setting picks the encoder class. Both encoders
+convert the same non-standard types, so they produce equivalent JSON:
+Decimals become numbers, dates & datetimes become ISO 8601 strings,
+numpy values become the equivalent Python values, and NaN & Infinity
+become null, because JSON has no representation for them.
+"""
+
+from typing import Any
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+import json
+import math
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+import numpy as np
+import orjson
+
+
+def _convert_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+
+    if isinstance(value, date):
+        return value.isoformat()
+
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+
+    if isinstance(value, np.generic):
+        return value.item()
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _replace_non_finite(value: Any) -> Any:
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+
+    if isinstance(value, dict):
+        return {key: _replace_non_finite(item) for key, item in value.items()}
+
+    if isinstance(value, (list, tuple)):
+        return [_replace_non_finite(item) for item in value]
+
+    return value
+
+
+def _convert_finite_value(value: Any) -> Any:
+    return _replace_non_finite(_convert_value(value))
+
+
+class JSONResponseEncoder:
+    """Base class for encoders of JSON response bodies."""
+
+    def encode(self, data: Any) -> bytes:
+        """Encode data as UTF-8 JSON."""
+        raise NotImplementedError()
+
+
+class StandardJSONResponseEncoder(JSONResponseEncoder):
+    """
+    Encoder that uses Python's json module.
+
+    The json module writes NaN & Infinity as bare literals, which aren't valid JSON,
+    so they get replaced with None before encoding to match orjson's output.
+    """
+
+    def encode(self, data: Any) -> bytes:
+        """Encode data as UTF-8 JSON."""
+        return json.dumps(
+            _replace_non_finite(data),
+            default=_convert_finite_value,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+
+class OrjsonResponseEncoder(JSONResponseEncoder):
+    """
+    Encoder that uses orjson, which is several times faster than the json module.
+
+    orjson serialises datetimes & numpy arrays natively, so the Python conversion
+    only runs for Decimals and numpy types that it doesn't support. Unlike the json
+    module, orjson encodes NaN & Infinity as null, which keeps the output valid JSON.
+    """
+
+    def encode(self, data: Any) -> bytes:
+        """Encode data as UTF-8 JSON."""
+        return orjson.dumps(
+            data, default=_convert_value, option=orjson.OPT_SERIALIZE_NUMPY
+        )
+
+
+@lru_cache(maxsize=1)
+def _encoder(encoder_path: str) -> JSONResponseEncoder:
+    return import_string(encoder_path)()
+
+
+def encode_json(data: Any) -> bytes:
+    """
+    Encode data as a JSON response body with the configured encoder.
+
+    Params:
+    -------
+    data: JSON-compatible data, which can include Decimal, date, datetime
+        and numpy values.
+
+    Returns:
+    --------
+    UTF-8 JSON.
+    """
+    return _encoder(settings.JSON_RESPONSE_ENCODER).encode(data)
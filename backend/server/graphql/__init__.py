@@ -1,6 +1,6 @@
 """Module for GraphQL schema and related queries and types."""
 
-import graphene
+from .execution import Schema
 from .schema import Query
 
-schema = graphene.Schema(query=Query)
+schema = Schema(query=Query)
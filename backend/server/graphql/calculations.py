@@ -1,148 +1,202 @@
 """Module for shared logic for calculating model metrics."""
 
-from typing import Optional, List, Dict, Any
-from functools import partial
-
-import pandas as pd
-import numpy as np
-
-
-CUMULATIVE_METRICS_VALUES = [
-    "absolute_margin_diff",
-    "cumulative_accuracy",
-    "cumulative_correct_count",
-    "match__margin",
-    "match__round_number",
-    "match__start_date_time",
-    "match__winner__name",
-    "ml_model__name",
-    "ml_model__used_in_competitions",
-    "predicted_margin",
-    "predicted_winner__name",
-    "predicted_win_probability",
-]
-ROUND_NUMBER_LVL = 0
-GROUP_BY_LVL = 0
+from typing import Optional, List, Dict, Any, Iterable, cast
+from itertools import groupby
+from operator import itemgetter
+import math
+
+from django.db.models import (
+    QuerySet,
+    F,
+    Case,
+    When,
+    Value,
+    Window,
+    Func,
+    Sum,
+    Avg,
+    IntegerField,
+    FloatField,
+)
+from django.db.models.expressions import RowRange
+from django.db.models.functions import Abs, Cast, Coalesce, Greatest, Ln
+from mypy_extensions import TypedDict
+
+
 # For regressors that might try to predict negative values or 0,
 # we need a slightly positive minimum to not get errors when calculating logarithms
 MIN_LOG_VAL = 1 * 10 ** -10
 
+RoundModelMetrics = TypedDict(
+    "RoundModelMetrics",
+    {"match__round_number": int, "model_metrics": List[Dict[str, Any]]},
+)
+
+
+def group_metrics_by_round(
+    model_metrics: Iterable[Dict[str, Any]], round_number: Optional[int] = None
+) -> List[RoundModelMetrics]:
+    """
+    Group cumulative metrics records by round.
+
+    Params:
+    -------
+    model_metrics: Cumulative metrics per round & model, sorted by round number.
+    round_number: Optional round to filter by. -1 returns the last round.
+
+    Returns:
+    --------
+    Metrics for each round, with a list of metrics records for each model.
+    """
+    rounds = [
+        cast(
+            RoundModelMetrics,
+            {
+                "match__round_number": round_number_key,
+                "model_metrics": list(round_model_metrics),
+            },
+        )
+        for round_number_key, round_model_metrics in groupby(
+            model_metrics, key=itemgetter("match__round_number")
+        )
+    ]
 
-def _calculate_cumulative_accuracy(data_frame):
-    return (
-        data_frame.groupby("ml_model__name")
-        .expanding()["tip_point"]
-        .mean()
-        .reset_index(level=GROUP_BY_LVL, drop=True)
-    )
-
-
-def _calculate_cumulative_correct(data_frame):
-    return (
-        data_frame.groupby("ml_model__name")
-        .expanding()["tip_point"]
-        .sum()
-        .reset_index(level=GROUP_BY_LVL, drop=True)
-    )
+    if round_number is None or not any(rounds):
+        return rounds
 
+    if round_number == -1:
+        return rounds[-1:]
 
-def _calculate_absolute_margin_difference(data_frame):
-    return np.where(
-        data_frame["is_correct"],
-        (data_frame["match__margin"] - data_frame["predicted_margin"]).abs(),
-        data_frame["match__margin"] + data_frame["predicted_margin"],
-    )
+    return [
+        round_metrics
+        for round_metrics in rounds
+        if round_metrics["match__round_number"] == round_number
+    ]
 
 
-def _filter_by_round(data_frame: pd.DataFrame, round_number: Optional[int] = None):
-    if round_number is None:
-        return data_frame
+def _log2(expression):
+    return Ln(expression) / Value(math.log(2))
 
-    round_number_filter = (
-        data_frame.index.get_level_values(ROUND_NUMBER_LVL).max()
-        if round_number == -1
-        else round_number
-    )
 
-    return data_frame.loc[(round_number_filter, slice(None)), :]
-
-
-def _calculate_cumulative_bits(data_frame: pd.DataFrame):
-    return (
-        data_frame.groupby("ml_model__name")
-        .expanding()["bits"]
-        .sum()
-        .reset_index(level=GROUP_BY_LVL, drop=True)
-    )
+def _positive_prediction(expression):
+    return Greatest(expression, Value(MIN_LOG_VAL), output_field=FloatField())
 
 
 # Raw bits calculations per http://probabilistic-footy.monash.edu/~footy/about.shtml
-def _calculate_bits(data_frame: pd.DataFrame):
-    positive_pred = lambda y_pred: (
-        np.maximum(y_pred, np.repeat(MIN_LOG_VAL, len(y_pred)))
-    )
-    draw_bits = lambda y_pred: (
-        1 + (0.5 * np.log2(positive_pred(y_pred * (1 - y_pred))))
-    )
-    win_bits = lambda y_pred: 1 + np.log2(positive_pred(y_pred))
-    loss_bits = lambda y_pred: 1 + np.log2(positive_pred(1 - y_pred))
-
-    return np.where(
-        data_frame["match__margin"] == 0,
-        draw_bits(data_frame["predicted_win_probability"]),
-        np.where(
-            data_frame["match__winner__name"] == data_frame["predicted_winner__name"],
-            win_bits(data_frame["predicted_win_probability"]),
-            loss_bits(data_frame["predicted_win_probability"]),
+# We have to check for nulls explicitly, because Postgres's GREATEST ignores them.
+BITS_EXPRESSION = Case(
+    When(predicted_win_probability__isnull=True, then=Value(None)),
+    When(
+        match__margin=0,
+        then=(
+            Value(1.0)
+            + Value(0.5)
+            * _log2(
+                _positive_prediction(
+                    F("predicted_win_probability")
+                    * (Value(1.0) - F("predicted_win_probability"))
+                )
+            )
         ),
+    ),
+    When(
+        match__winner=F("predicted_winner"),
+        then=Value(1.0) + _log2(_positive_prediction(F("predicted_win_probability"))),
+    ),
+    default=(
+        Value(1.0)
+        + _log2(_positive_prediction(Value(1.0) - F("predicted_win_probability")))
+    ),
+    output_field=FloatField(),
+)
+
+# Incorrect tips count the predicted margin in the wrong direction
+ABSOLUTE_MARGIN_DIFF_EXPRESSION = Case(
+    When(is_correct=True, then=Abs(F("match__margin") - F("predicted_margin"))),
+    default=F("match__margin") + F("predicted_margin"),
+    output_field=FloatField(),
+)
+
+TIP_POINT_EXPRESSION = Case(
+    When(is_correct=True, then=Value(1)), default=Value(0), output_field=IntegerField()
+)
+
+
+def _cumulative(aggregate, expression: str) -> Window:
+    return Window(
+        expression=aggregate(expression),
+        partition_by=[F("ml_model_id")],
+        order_by=[F("match__start_date_time").asc(), F("match_id").asc()],
+        frame=RowRange(start=None, end=0),
     )
 
 
-# TODO: I've migrated the simple calculations over to SQL, but calculations
-# based on margin_diff are difficult, because Django doesn't allow an annotation
-# based on an aggregation (margin_diff uses Max/Min), and `Window` can't be used
-# in an `aggregate` call. I may need to resort to raw SQL, but that would probably
-# still require figuring out why the ORM doesn't like this combination.
-def _calculate_cumulative_mae(data_frame: pd.DataFrame):
-    return (
-        data_frame.groupby("ml_model__name")
-        .expanding()["absolute_margin_diff"]
-        .mean()
-        .round(2)
-        .reset_index(level=GROUP_BY_LVL, drop=True)
+def _round(expression, places: int):
+    # Postgres only supports rounding to a given precision for numeric types
+    return Cast(
+        Func(
+            expression,
+            template="ROUND((%(expressions)s)::numeric, %(places)s)",
+            places=places,
+        ),
+        FloatField(),
     )
 
 
-def _calculate_cumulative_margin_difference(data_frame: pd.DataFrame):
-    return (
-        data_frame.groupby("ml_model__name")
-        .expanding()["absolute_margin_diff"]
-        .sum()
-        .reset_index(level=GROUP_BY_LVL, drop=True)
-    )
+def cumulative_metrics_query(prediction_query_set: QuerySet) -> QuerySet:
+    """
+    Calculate cumulative model metrics per round in the DB.
 
+    Metrics are calculated with window functions, so only one row per round & model
+    leaves the DB instead of every prediction.
 
-def calculate_cumulative_metrics(
-    metric_values: List[Dict[str, Any]], round_number: Optional[int]
-) -> pd.DataFrame:
-    """Calculate cumulative methods that can't be calculated via the ORM."""
+    Params:
+    -------
+    prediction_query_set: Predictions to include in the metrics. These should be
+        for a single season and only include matches that have results.
+
+    Returns:
+    --------
+    Values query set with one row per round & ML model, ordered by round number
+        and ML model name.
+    """
     return (
-        pd.DataFrame(metric_values)
-        .sort_values("match__start_date_time")
-        .assign(
-            tip_point=lambda df: df["is_correct"].astype(int),
-            absolute_margin_diff=_calculate_absolute_margin_difference,
-            bits=_calculate_bits,
+        prediction_query_set.annotate(
+            tip_point=TIP_POINT_EXPRESSION,
+            absolute_margin_diff=ABSOLUTE_MARGIN_DIFF_EXPRESSION,
+            bits=BITS_EXPRESSION,
+        )
+        .annotate(
+            cumulative_correct_count=_cumulative(Sum, "tip_point"),
+            # Averaging integers returns a numeric type, which would come back
+            # as a Decimal instead of a float
+            cumulative_accuracy=Cast(_cumulative(Avg, "tip_point"), FloatField()),
+            cumulative_mean_absolute_error=Coalesce(
+                _round(_cumulative(Avg, "absolute_margin_diff"), 2), Value(0.0)
+            ),
+            cumulative_margin_difference=Coalesce(
+                _cumulative(Sum, "absolute_margin_diff"), Value(0.0)
+            ),
+            cumulative_bits=Coalesce(_cumulative(Sum, "bits"), Value(0.0)),
+        )
+        # Window functions are calculated before DISTINCT ON, so taking the last
+        # prediction of each round gives us cumulative metrics through that round.
+        .order_by(
+            "match__round_number",
+            "ml_model__name",
+            "-match__start_date_time",
+            "-match_id",
         )
-        .assign(
-            cumulative_correct_count=_calculate_cumulative_correct,
-            cumulative_accuracy=_calculate_cumulative_accuracy,
-            cumulative_margin_difference=_calculate_cumulative_margin_difference,
-            cumulative_bits=_calculate_cumulative_bits,
-            cumulative_mean_absolute_error=_calculate_cumulative_mae,
+        .distinct("match__round_number", "ml_model__name")
+        .values(
+            "match__round_number",
+            "ml_model_id",
+            "ml_model__name",
+            "ml_model__used_in_competitions",
+            "cumulative_correct_count",
+            "cumulative_accuracy",
+            "cumulative_mean_absolute_error",
+            "cumulative_margin_difference",
+            "cumulative_bits",
         )
-        .fillna(0)
-        .groupby(["match__round_number", "ml_model__name"])
-        .last()
-        .pipe(partial(_filter_by_round, round_number=round_number))
     )
@@ -0,0 +1,226 @@
+"""
+GraphQL execution that completes fields with deferred values in batches.
+
+graphql-core only batches loaders when executing asynchronously, but Django's ORM
+can't run inside an event loop, so we execute synchronously, leave a placeholder
+wherever a resolver returns a Deferred value, and fill the placeholders in
+after loading each round of queued keys.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from types import SimpleNamespace
+
+import graphene
+from graphql import (
+    DocumentNode,
+    ExecutionResult,
+    GraphQLError,
+    GraphQLOutputType,
+    execute_sync,
+    is_non_null_type,
+    located_error,
+)
+from graphql.execution import ExecutionContext
+from graphql.pyutils import Path
+
+from .loaders import Deferred, Loaders
+
+
+_ErrorBoundary = Tuple[Path, GraphQLOutputType]
+
+
+class _Placeholder:
+    def __init__(
+        self,
+        return_type,
+        field_nodes,
+        info,
+        path,
+        deferred: Deferred,
+        error_boundaries: List[_ErrorBoundary],
+    ):
+        self.return_type = return_type
+        self.field_nodes = field_nodes
+        self.info = info
+        self.path = path
+        self.deferred = deferred
+        # Fields & list items above this one, outermost first, which could
+        # be nullified by an error in this field
+        self.error_boundaries = error_boundaries
+        self.container: Optional[Union[Dict[str, Any], List[Any]]] = None
+        self.key: Optional[Union[str, int]] = None
+
+
+class BatchingExecutionContext(ExecutionContext):
+    """Execution context that batches loading of Deferred values."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._placeholders: List[_Placeholder] = []
+        self._error_boundaries: List[_ErrorBoundary] = []
+        self._nullified_paths: List[List[Union[str, int]]] = []
+        self._data: Optional[Dict[str, Any]] = None
+
+    def execute_operation(self, operation, root_value):
+        self._data = super().execute_operation(operation, root_value)
+
+        while self._placeholders and self._data is not None:
+            placeholders, self._placeholders = self._placeholders, []
+
+            for loader in {placeholder.deferred.loader for placeholder in placeholders}:
+                if loader.has_queued_keys:
+                    loader.dispatch()
+
+            for placeholder in placeholders:
+                if placeholder.container is None or self._is_nullified(
+                    placeholder.path
+                ):
+                    # A parent field's error nullified it, so its result isn't needed
+                    continue
+
+                completed = self._complete_placeholder(placeholder)
+                placeholder.container[placeholder.key] = completed
+                self._locate_placeholders(
+                    placeholder.container, [(placeholder.key, completed)]
+                )
+
+        return self._data
+
+    def execute_fields(self, parent_type, source_value, path, fields):
+        results = super().execute_fields(parent_type, source_value, path, fields)
+        self._locate_placeholders(results, results.items())
+        return results
+
+    def complete_list_value(self, return_type, field_nodes, info, path, result):
+        completed = super().complete_list_value(
+            return_type, field_nodes, info, path, result
+        )
+        self._locate_placeholders(completed, enumerate(completed))
+        return completed
+
+    def complete_value(self, return_type, field_nodes, info, path, result):
+        if isinstance(result, Deferred):
+            placeholder = _Placeholder(
+                return_type,
+                field_nodes,
+                info,
+                path,
+                result,
+                list(self._error_boundaries),
+            )
+            self._placeholders.append(placeholder)
+            return placeholder
+
+        # Non-null types complete their inner type with the same path,
+        # but only the outer type decides whether an error can stop there
+        if self._error_boundaries and self._error_boundaries[-1][0] is path:
+            return super().complete_value(return_type, field_nodes, info, path, result)
+
+        self._error_boundaries.append((path, return_type))
+
+        try:
+            return super().complete_value(return_type, field_nodes, info, path, result)
+        finally:
+            self._error_boundaries.pop()
+
+    def _complete_placeholder(self, placeholder: _Placeholder) -> Any:
+        self._error_boundaries = list(placeholder.error_boundaries)
+
+        try:
+            return self.complete_value(
+                placeholder.return_type,
+                placeholder.field_nodes,
+                placeholder.info,
+                placeholder.path,
+                placeholder.deferred.value,
+            )
+        except Exception as raw_error:  # pylint: disable=broad-except
+            error = located_error(
+                raw_error, placeholder.field_nodes, placeholder.path.as_list()
+            )
+            self._nullify_nearest_nullable(
+                error,
+                [
+                    *placeholder.error_boundaries,
+                    (placeholder.path, placeholder.return_type),
+                ],
+            )
+            return None
+        finally:
+            self._error_boundaries = []
+
+    def _nullify_nearest_nullable(
+        self, error: GraphQLError, error_boundaries: List[_ErrorBoundary]
+    ) -> None:
+        # Parent fields have already been completed, so instead of raising
+        # the error up to them like the standard executor, we find the field
+        # or list item that it would have stopped at and set that to null.
+        self.errors.append(error)
+
+        for path, return_type in reversed(error_boundaries):
+            if is_non_null_type(return_type):
+                continue
+
+            keys = path.as_list()
+            self._nullified_paths.append(keys)
+            container: Any = self._data
+
+            for key in keys[:-1]:
+                container = container[key]
+
+            container[keys[-1]] = None
+            return None
+
+        # Errors in non-null fields all the way up nullify the whole result
+        self._data = None
+
+    def _is_nullified(self, path: Path) -> bool:
+        keys = path.as_list()
+
+        return any(
+            keys[: len(nullified_keys)] == nullified_keys
+            for nullified_keys in self._nullified_paths
+        )
+
+    @staticmethod
+    def _locate_placeholders(
+        container: Union[Dict[str, Any], List[Any]],
+        items: Iterable[Tuple[Union[str, int], Any]],
+    ) -> None:
+        for key, value in items:
+            if isinstance(value, _Placeholder):
+                value.container = container
+                value.key = key
+
+
+class Schema(graphene.Schema):
+    """GraphQL schema that gives each execution its own set of loaders."""
+
+    @staticmethod
+    def _with_loaders(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        context_value = kwargs.get("context_value")
+
+        if context_value is None:
+            context_value = SimpleNamespace()
+
+        context_value.loaders = Loaders()
+
+        return {
+            **kwargs,
+            "context_value": context_value,
+            "execution_context_class": BatchingExecutionContext,
+        }
+
+    def execute(self, *args, **kwargs):  # pylint: disable=arguments-differ
+        """Execute a GraphQL operation, batching DB lookups with loaders."""
+        return super().execute(*args, **self._with_loaders(kwargs))
+
+    def execute_document(self, document: DocumentNode, **kwargs) -> ExecutionResult:
+        """
+        Execute an operation from a document that has already been validated.
+
+        Unlike execute, this doesn't parse or validate the query again.
+        """
+        return execute_sync(
+            self.graphql_schema, document, **self._with_loaders(kwargs)
+        )
@@ -0,0 +1,151 @@
+"""
+Per-request loaders for batching DB lookups made by GraphQL resolvers.
+
+Resolvers call `load` with a key instead of querying the DB. If the loader
+doesn't have the value yet, it returns a Deferred value and queues the key.
+The execution context (see server/graphql/execution.py) finishes the rest of
+the operation, then loads all queued keys with one query per loader
+before completing the deferred fields.
+"""
+
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple, Any
+from collections import defaultdict
+
+from server.models import MLModel, TeamMatch, Prediction
+
+
+class Deferred:
+    """A value that will be available after its loader's next batch is loaded."""
+
+    def __init__(self, loader: "DataLoader", key: Hashable):
+        self.loader = loader
+        self.key = key
+
+    @property
+    def value(self) -> Any:
+        """The loaded value for the key."""
+        return self.loader.cache[self.key]
+
+
+class DataLoader:
+    """
+    Base class for batching lookups of the same kind of record.
+
+    Subclasses implement `batch_load`, which receives all keys queued since
+    the last batch and returns a dict of values, with missing keys resolving
+    to `missing_value`.
+    """
+
+    def __init__(self):
+        self.cache: Dict[Hashable, Any] = {}
+        self._queue: Dict[Hashable, None] = {}
+
+    def load(self, key: Hashable) -> Any:
+        """
+        Return the value for the given key if it's been loaded, otherwise defer it.
+
+        Params:
+        -------
+        key: Identifier for the value to load.
+
+        Returns:
+        --------
+        The loaded value or a Deferred value for the next batch.
+        """
+        if key in self.cache:
+            return self.cache[key]
+
+        self._queue[key] = None
+        return Deferred(self, key)
+
+    @property
+    def has_queued_keys(self) -> bool:
+        """Whether any keys are waiting for the next batch."""
+        return bool(self._queue)
+
+    def dispatch(self) -> None:
+        """Load values for all queued keys."""
+        keys, self._queue = list(self._queue), {}
+        values = self.batch_load(keys)
+
+        for key in keys:
+            self.cache[key] = values[key] if key in values else self.missing_value()
+
+    def batch_load(self, keys: List[Any]) -> Dict[Any, Any]:
+        """Load values for the given keys."""
+        raise NotImplementedError
+
+    @staticmethod
+    def missing_value() -> Any:
+        """Return the value for a key that batch_load didn't find."""
+        return None
+
+
+class MLModelByNameLoader(DataLoader):
+    """Loads ML models by name."""
+
+    def batch_load(self, keys: List[Any]) -> Dict[Any, Any]:
+        return {
+            ml_model.name: ml_model
+            for ml_model in MLModel.objects.filter(name__in=keys)
+        }
+
+
+class TeamByMatchLoader(DataLoader):
+    """Loads teams by match ID and whether they're playing at home."""
+
+    def batch_load(self, keys: List[Any]) -> Dict[Any, Any]:
+        match_ids = {match_id for match_id, _at_home in keys}
+        team_matches = TeamMatch.objects.filter(match_id__in=match_ids).select_related(
+            "team"
+        )
+
+        return {
+            (team_match.match_id, team_match.at_home): team_match.team
+            for team_match in team_matches
+        }
+
+
+class PredictionsByMatchLoader(DataLoader):
+    """Loads predictions by match ID and, optionally, ML model name."""
+
+    def batch_load(self, keys: List[Any]) -> Dict[Any, Any]:
+        match_ids = {match_id for match_id, _ml_model_name in keys}
+        predictions = (
+            Prediction.objects.filter(match_id__in=match_ids)
+            .select_related("ml_model", "predicted_winner", "match")
+            .order_by("id")
+        )
+        predictions_by_key: Dict[
+            Tuple[int, Optional[str]], List[Prediction]
+        ] = defaultdict(list)
+
+        for prediction in predictions:
+            predictions_by_key[(prediction.match_id, None)].append(prediction)
+            predictions_by_key[(prediction.match_id, prediction.ml_model.name)].append(
+                prediction
+            )
+
+        return dict(predictions_by_key)
+
+    @staticmethod
+    def missing_value() -> List[Prediction]:
+        """Return a new empty list for matches without predictions."""
+        return []
+
+
+class Loaders:
+    """All loaders for a single GraphQL request."""
+
+    def __init__(self):
+        self.ml_model_by_name = MLModelByNameLoader()
+        self.team_by_match = TeamByMatchLoader()
+        self.predictions_by_match = PredictionsByMatchLoader()
+
+    def __iter__(self) -> Iterable[DataLoader]:
+        return iter(vars(self).values())
+
+
+def get_loaders(info) -> Loaders:
+    """Return the loaders for the current request from the GraphQL context."""
+    return info.context.loaders
@@ -0,0 +1,191 @@
+"""
+Projection of GraphQL selections onto Django querysets.
+
+DjangoObjectType fields resolve from model attributes, so by default
+querysets load every column and then lazily query each related record.
+The optimizer walks the operation's selection set and loads only the columns
+that the selected fields need, joining forward relations and prefetching
+reverse ones.
+"""
+
+from typing import Dict, List, Sequence, Set, Tuple, Type
+from collections import defaultdict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Prefetch, QuerySet
+from graphene.utils.str_converters import to_snake_case
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLObjectType,
+    InlineFragmentNode,
+    get_named_type,
+)
+
+
+Projection = Tuple[Set[str], Set[str], List[Prefetch]]
+
+
+def _selected_field_nodes(
+    field_nodes: Sequence[FieldNode], info
+) -> Dict[str, List[FieldNode]]:
+    """Group the sub-fields of the given fields by name, expanding fragments."""
+    selected_nodes: Dict[str, List[FieldNode]] = defaultdict(list)
+    selection_sets = [
+        field_node.selection_set
+        for field_node in field_nodes
+        if field_node.selection_set is not None
+    ]
+
+    while selection_sets:
+        for selection in selection_sets.pop().selections:
+            if isinstance(selection, FieldNode):
+                selected_nodes[selection.name.value].append(selection)
+            elif isinstance(selection, FragmentSpreadNode):
+                selection_sets.append(
+                    info.fragments[selection.name.value].selection_set
+                )
+            elif isinstance(selection, InlineFragmentNode):
+                selection_sets.append(selection.selection_set)
+
+    return selected_nodes
+
+
+def _reverse_relations(model: Type[models.Model]) -> Dict[str, models.ForeignObjectRel]:
+    return {
+        relation.get_accessor_name(): relation
+        for relation in model._meta.related_objects  # pylint: disable=protected-access
+    }
+
+
+def _projection(
+    model: Type[models.Model],
+    graphql_type: GraphQLObjectType,
+    field_nodes: Sequence[FieldNode],
+    info,
+    prefix: str = "",
+) -> Projection:
+    only_fields = {f"{prefix}{model._meta.pk.name}"}  # pylint: disable=protected-access
+    select_related: Set[str] = set()
+    prefetches: List[Prefetch] = []
+    # Graphene adds the type class to the GraphQL types that it builds
+    graphene_type = getattr(graphql_type, "graphene_type", None)
+    field_dependencies = getattr(graphene_type, "field_dependencies", {})
+    reverse_relations = _reverse_relations(model)
+
+    for graphql_name, sub_nodes in _selected_field_nodes(field_nodes, info).items():
+        if graphql_name.startswith("__"):
+            continue
+
+        field_name = to_snake_case(graphql_name)
+
+        if field_name in field_dependencies:
+            only_fields.update(
+                f"{prefix}{dependency}" for dependency in field_dependencies[field_name]
+            )
+            continue
+
+        sub_type = get_named_type(graphql_type.fields[graphql_name].type)
+
+        if field_name in reverse_relations:
+            relation = reverse_relations[field_name]
+            related_queryset = _optimize(
+                relation.related_model.objects.all(),
+                sub_type,
+                sub_nodes,
+                info,
+                # Django needs the foreign key to match prefetched records to
+                # their parents.
+                required_fields=[relation.field.name],
+            )
+            prefetches.append(Prefetch(f"{prefix}{field_name}", related_queryset))
+            continue
+
+        try:
+            model_field = model._meta.get_field(  # pylint: disable=protected-access
+                field_name
+            )
+        except FieldDoesNotExist:
+            # Without knowing what the resolver needs, we have to load everything
+            only_fields.update(
+                f"{prefix}{field.name}"
+                for field in model._meta.concrete_fields  # pylint: disable=protected-access
+            )
+            continue
+
+        if model_field.many_to_one or model_field.one_to_one:
+            lookup = f"{prefix}{field_name}"
+            related_only, related_select, related_prefetches = _projection(
+                model_field.related_model,
+                sub_type,
+                sub_nodes,
+                info,
+                prefix=f"{lookup}__",
+            )
+            only_fields.add(lookup)
+            only_fields.update(related_only)
+            select_related.add(lookup)
+            select_related.update(related_select)
+            prefetches.extend(related_prefetches)
+            continue
+
+        if model_field.concrete:
+            only_fields.add(f"{prefix}{field_name}")
+
+    return only_fields, select_related, prefetches
+
+
+def _optimize(
+    queryset: QuerySet,
+    graphql_type: GraphQLObjectType,
+    field_nodes: Sequence[FieldNode],
+    info,
+    required_fields: Sequence[str] = (),
+) -> QuerySet:
+    only_fields, select_related, prefetches = _projection(
+        queryset.model, graphql_type, field_nodes, info
+    )
+    queryset = queryset.only(*only_fields, *required_fields)
+
+    if any(select_related):
+        queryset = queryset.select_related(*select_related)
+
+    if any(prefetches):
+        queryset = queryset.prefetch_related(*prefetches)
+
+    return queryset
+
+
+def optimize_queryset(
+    queryset: QuerySet,
+    info,
+    path: Sequence[str] = (),
+    required_fields: Sequence[str] = (),
+) -> QuerySet:
+    """
+    Limit a resolver's queryset to the columns and relations that are selected.
+
+    Params:
+    -------
+    queryset: Records that the resolver returns.
+    info: GraphQL resolve info for the resolver's field.
+    path: GraphQL field names from the resolver's field to the field whose type
+        represents the queryset's model (e.g. ["edges", "node"] for connections).
+    required_fields: Model field lookups that the resolver needs loaded,
+        in addition to the selected fields.
+
+    Returns:
+    --------
+    Queryset with deferred columns and related records loaded in bulk.
+    """
+    field_nodes: Sequence[FieldNode] = info.field_nodes
+    graphql_type = get_named_type(info.return_type)
+
+    for field_name in path:
+        field_nodes = _selected_field_nodes(field_nodes, info).get(field_name, [])
+        graphql_type = get_named_type(graphql_type.fields[field_name].type)
+
+    return _optimize(
+        queryset, graphql_type, field_nodes, info, required_fields=required_fields
+    )
@@ -0,0 +1,110 @@
+"""Keyset pagination of predictions for Relay-style connections."""
+
+from typing import Optional, Tuple
+from datetime import datetime
+import binascii
+
+from django.db.models import Q, QuerySet
+from graphql import GraphQLError
+from graphql_relay.utils import base64, unbase64
+import graphene
+
+from server.models import Prediction
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+CURSOR_SEPARATOR = "|"
+
+
+def encode_cursor(prediction: Prediction) -> str:
+    """
+    Encode a prediction's position in the pagination order as an opaque cursor.
+
+    Params:
+    -------
+    prediction: Prediction with its match already loaded.
+
+    Returns:
+    --------
+    Base64-encoded match start time and prediction ID.
+    """
+    return base64(
+        f"{prediction.match.start_date_time.isoformat()}{CURSOR_SEPARATOR}"
+        f"{prediction.id}"
+    )
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor into the match start time and prediction ID it points to.
+
+    Params:
+    -------
+    cursor: Cursor created by encode_cursor.
+
+    Returns:
+    --------
+    Match start time and prediction ID.
+    """
+    try:
+        start_date_time, prediction_id = unbase64(cursor).split(CURSOR_SEPARATOR)
+        return datetime.fromisoformat(start_date_time), int(prediction_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as err:
+        raise GraphQLError(f"Invalid cursor: {cursor}") from err
+
+
+def paginate_predictions(
+    predictions: QuerySet,
+    connection_type,
+    first: int = DEFAULT_PAGE_SIZE,
+    after: Optional[str] = None,
+) -> graphene.relay.Connection:
+    """
+    Return one page of predictions, ordered by match start time and ID.
+
+    Pages start after the given cursor rather than at an offset, so the DB
+    doesn't have to read all the skipped rows, and predictions saved while
+    a client pages through results don't shift later pages.
+
+    Params:
+    -------
+    predictions: Filtered predictions to paginate.
+    connection_type: Relay connection type for predictions.
+    first: Number of predictions to return.
+    after: Cursor of the last prediction from the previous page.
+
+    Returns:
+    --------
+    Connection with a page of prediction edges.
+    """
+    if not 0 < first <= MAX_PAGE_SIZE:
+        raise GraphQLError(f"first must be between 1 and {MAX_PAGE_SIZE}.")
+
+    ordered_predictions = predictions.select_related("match").order_by(
+        "match__start_date_time", "id"
+    )
+
+    if after is not None:
+        after_start_date_time, after_id = decode_cursor(after)
+        ordered_predictions = ordered_predictions.filter(
+            Q(match__start_date_time__gt=after_start_date_time)
+            | Q(match__start_date_time=after_start_date_time, id__gt=after_id)
+        )
+
+    # Fetching an extra prediction tells us whether there's another page
+    page = list(ordered_predictions[: first + 1])
+    edges = [
+        connection_type.Edge(node=prediction, cursor=encode_cursor(prediction))
+        for prediction in page[:first]
+    ]
+
+    return connection_type(
+        edges=edges,
+        page_info=graphene.relay.PageInfo(
+            start_cursor=edges[0].cursor if any(edges) else None,
+            end_cursor=edges[-1].cursor if any(edges) else None,
+            has_previous_page=after is not None,
+            has_next_page=len(page) > first,
+        ),
+    )
@@ -0,0 +1,113 @@
+"""
+Persisted GraphQL queries, which clients reference by hash instead of sending.
+
+Clients register queries automatically, per Apollo's persisted-query protocol,
+by sending the full query with its hash the first time the server doesn't
+recognise the hash.
+
+Parsing & validating documents is a significant part of the cost of small
+queries, so we keep the results for recently-used queries in memory.
+"""
+
+from typing import Optional, Tuple
+from functools import lru_cache
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from graphql import DocumentNode, GraphQLError, parse, specified_rules, validate
+from mypy_extensions import TypedDict
+import graphene
+
+from .validation import QueryCostRule
+
+
+PERSISTED_QUERY_CACHE = "persisted_queries"
+PROTOCOL_VERSION = 1
+DOCUMENT_CACHE_SIZE = 100
+
+# Error messages are part of the protocol, because clients use them to decide
+# whether to retry with the full query.
+PERSISTED_QUERY_NOT_FOUND = "PersistedQueryNotFound"
+PERSISTED_QUERY_NOT_SUPPORTED = "PersistedQueryNotSupported"
+
+PersistedQueryExtension = TypedDict(
+    "PersistedQueryExtension", {"version": int, "sha256Hash": str}
+)
+
+
+def query_hash(query: str) -> str:
+    """Return the SHA-256 hex digest that clients use to identify a query."""
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+def resolve_persisted_query(
+    query: Optional[str], persisted_query: PersistedQueryExtension
+) -> str:
+    """
+    Find the query for a persisted-query hash, registering new queries.
+
+    Params:
+    -------
+    query: Full query document, which clients only send when the server
+        doesn't recognise the hash.
+    persisted_query: The 'persistedQuery' request extension.
+
+    Returns:
+    --------
+    Full query document.
+    """
+    if persisted_query.get("version") != PROTOCOL_VERSION:
+        raise GraphQLError(PERSISTED_QUERY_NOT_SUPPORTED)
+
+    sha256_hash = persisted_query.get("sha256Hash")
+
+    if not sha256_hash:
+        raise GraphQLError(PERSISTED_QUERY_NOT_FOUND)
+
+    cache = caches[PERSISTED_QUERY_CACHE]
+
+    if not query:
+        registered_query = (
+            cache.get(sha256_hash) if settings.PERSISTED_QUERY_REGISTRATION else None
+        )
+
+        if registered_query is None:
+            raise GraphQLError(PERSISTED_QUERY_NOT_FOUND)
+
+        return registered_query
+
+    if query_hash(query) != sha256_hash:
+        raise GraphQLError("Provided sha256Hash does not match the query.")
+
+    if settings.PERSISTED_QUERY_REGISTRATION:
+        cache.set(sha256_hash, query)
+
+    return query
+
+
+@lru_cache(maxsize=DOCUMENT_CACHE_SIZE)
+def parse_and_validate(
+    schema: graphene.Schema, query: str
+) -> Tuple[DocumentNode, Tuple[GraphQLError, ...]]:
+    """
+    Parse a query and validate it against the schema, reusing recent results.
+
+    Along with the standard rules, validation limits the query's cost.
+    Raises GraphQLError for syntax errors, which aren't cached.
+
+    Params:
+    -------
+    schema: Schema to validate against.
+    query: Full query document.
+
+    Returns:
+    --------
+    Parsed document and any validation errors.
+    """
+    document = parse(query)
+    validation_errors = validate(
+        schema.graphql_schema, document, rules=[*specified_rules, QueryCostRule]
+    )
+
+    return document, tuple(validation_errors)
@@ -0,0 +1,94 @@
+"""Per-field resolver timing & DB query counts for debugging GraphQL performance."""
+
+from typing import Dict, List
+from time import perf_counter
+
+from django.db.models import QuerySet
+from mypy_extensions import TypedDict
+
+
+FieldProfile = TypedDict(
+    "FieldProfile",
+    {"path": str, "calls": int, "duration": float, "dbQueries": int},
+)
+Tracing = TypedDict(
+    "Tracing",
+    {
+        "duration": float,
+        "dbQueries": int,
+        "dbDuration": float,
+        "resolvers": List[FieldProfile],
+    },
+)
+
+SECONDS_TO_MILLISECONDS = 1000
+
+
+class ResolverProfiler:
+    """
+    Record how long each field's resolvers take and how many DB queries they make.
+
+    Use an instance as both GraphQL middleware and a Django DB execute wrapper.
+    Resolvers for fields in lists are grouped by their paths without list indices.
+    Queries that loaders make in batches happen between resolvers, so they only
+    count toward the totals.
+    """
+
+    def __init__(self):
+        self.db_query_count = 0
+        self.db_duration = 0.0
+        self._start = perf_counter()
+        self._fields: Dict[str, FieldProfile] = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        """Count a DB query and its duration."""
+        start = perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_query_count += 1
+            self.db_duration += perf_counter() - start
+
+    def resolve(self, next_resolver, root, info, **kwargs):
+        """Time a resolver call and count its DB queries."""
+        start = perf_counter()
+        start_db_query_count = self.db_query_count
+        result = next_resolver(root, info, **kwargs)
+
+        # Querysets are lazy, so we evaluate them here in order to attribute
+        # their queries to the field that returns them.
+        if isinstance(result, QuerySet):
+            len(result)
+
+        path = ".".join(key for key in info.path.as_list() if isinstance(key, str))
+        field_profile = self._fields.setdefault(
+            path, {"path": path, "calls": 0, "duration": 0.0, "dbQueries": 0}
+        )
+        field_profile["calls"] += 1
+        field_profile["duration"] += (
+            perf_counter() - start
+        ) * SECONDS_TO_MILLISECONDS
+        field_profile["dbQueries"] += self.db_query_count - start_db_query_count
+
+        return result
+
+    def tracing(self) -> Tracing:
+        """
+        Summarise the profile for a response's extensions.
+
+        Returns:
+        --------
+        Total duration & DB queries, and profiles of each field's resolvers,
+        slowest first. Durations are in milliseconds.
+        """
+        return {
+            "duration": (perf_counter() - self._start) * SECONDS_TO_MILLISECONDS,
+            "dbQueries": self.db_query_count,
+            "dbDuration": self.db_duration * SECONDS_TO_MILLISECONDS,
+            "resolvers": sorted(
+                self._fields.values(),
+                key=lambda field_profile: field_profile["duration"],
+                reverse=True,
+            ),
+        }
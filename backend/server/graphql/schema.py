@@ -1,24 +1,30 @@
 """GraphQL schema for all queries."""
 
-from typing import List
+from typing import List, Dict, Any, Optional
 
 import graphene
 from django.utils import timezone
-from django.db.models import QuerySet, Count
+from django.db.models import QuerySet, Count, F
 from mypy_extensions import TypedDict
 import pandas as pd
 import numpy as np
 
-from server.models import Prediction, Match, MLModel
+from server.cache import cache_resolver
+from server.round_state import fetch_round_state
+from server.round_predictions import ConsolidatedPrediction, fetch_round_predictions
+from server.models import Prediction, MLModel, ModelRoundMetrics
+from server.models.model_round_metrics import CUMULATIVE_METRICS
 from server.types import RoundMetrics
-from server.graphql.calculations import calculate_cumulative_metrics
 from .types import (
     SeasonType,
     PredictionType,
+    PredictionConnection,
     MLModelType,
     SeasonPerformanceChartParametersType,
     RoundPredictionType,
 )
+from .pagination import paginate_predictions, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from .optimizer import optimize_queryset
 
 
 SeasonPerformanceChartParameters = TypedDict(
@@ -27,12 +33,13 @@ SeasonPerformanceChartParameters = TypedDict(
 )
 
 RoundPredictions = TypedDict(
-    "RoundPredictions", {"round_number": int, "match_predictions": QuerySet}
+    "RoundPredictions",
+    {"round_number": int, "match_predictions": List[ConsolidatedPrediction]},
 )
 
-RoundModelMetrics = TypedDict(
-    "RoundModelMetrics",
-    {"match__round_number": int, "model_metrics": pd.DataFrame, "matches": QuerySet},
+SeasonModelMetrics = TypedDict(
+    "SeasonModelMetrics",
+    {"season": int, "model_round_metrics": List[Dict[str, Any]]},
 )
 
 
@@ -73,56 +80,43 @@ class RoundMetricsType(graphene.ObjectType):
         required=True,
     )
 
-    @staticmethod
-    def resolve_season(round_metrics: RoundMetrics, _info):
-        """Get season value from match__start_date_time."""
-        return round_metrics["match__start_date_time"].year
-
 
 def _consolidate_competition_model_metrics(model_metrics: pd.DataFrame) -> RoundMetrics:
     assert model_metrics["ml_model__used_in_competitions"].all()
 
     principal_data = (
         model_metrics.query("ml_model__is_principal == True")
-        .reset_index(drop=False)
-        .set_index("match__id")
-        # We replace previously-filled values with NaNs to make it easier to fill
-        # missing principal metrics with metrics from the other competition models.
-        # It's okay if we NaNify a legitimate 0/0.5, because the other model(s)
+        # We replace zeros with NaNs to make it easier to fill missing principal
+        # metrics with metrics from the other competition models.
+        # It's okay if we NaNify a legitimate 0, because the other model(s)
         # will just fill the NaN with the same neutral value.
         .replace(
             to_replace={
                 "cumulative_mean_absolute_error": 0,
                 "cumulative_margin_difference": 0,
                 "cumulative_bits": 0,
-                "predicted_margin": 0,
-                "predicted_win_probability": 0.5,
             },
             value={
                 "cumulative_mean_absolute_error": np.nan,
                 "cumulative_margin_difference": np.nan,
                 "cumulative_bits": np.nan,
-                "predicted_margin": np.nan,
-                "predicted_win_probability": np.nan,
             },
         )
     )
 
     non_principal_data = (
         model_metrics.query("ml_model__is_principal == False")
-        .fillna(0)
-        .replace(
-            to_replace={"predicted_win_probability": 0.5},
-            value={"predicted_win_probability": 0},
-        )
-        .select_dtypes("number")
-        .groupby("match__id")
+        .loc[:, CUMULATIVE_METRICS]
         # We can sum because each prediction type will only have one model with values,
         # and the rest of the rows will be zeros.
         .sum()
     )
 
-    consolidated_metrics = principal_data.fillna(non_principal_data).to_dict("records")
+    consolidated_metrics = (
+        principal_data.fillna(non_principal_data)
+        .drop(["ml_model__is_principal", "ml_model__used_in_competitions"], axis=1)
+        .to_dict("records")
+    )
 
     assert len(consolidated_metrics) == 1, (
         "Latest round predictions should be in the form of a single data set "
@@ -136,8 +130,47 @@ def _consolidate_competition_model_metrics(model_metrics: pd.DataFrame) -> Round
 class Query(graphene.ObjectType):
     """Base GraphQL Query type that contains all queries and their resolvers."""
 
+    # Estimates for limiting query cost (see server/graphql/validation.py)
+    field_costs = {
+        # A season's predictions from all models
+        "fetch_predictions": {"list_size": 500},
+        "fetch_paginated_predictions": {"list_size": MAX_PAGE_SIZE},
+        # These resolvers aggregate a season's worth of data
+        "fetch_season_model_metrics": {"weight": 50},
+        "fetch_latest_round_predictions": {"weight": 10},
+        "fetch_latest_round_metrics": {"weight": 10},
+    }
+
     fetch_predictions = graphene.List(
-        graphene.NonNull(PredictionType), year=graphene.Int(), required=True
+        graphene.NonNull(PredictionType),
+        year=graphene.Int(),
+        required=True,
+        deprecation_reason=(
+            "Returns all matching predictions in one response. "
+            "Use fetchPaginatedPredictions instead."
+        ),
+    )
+
+    fetch_paginated_predictions = graphene.Field(
+        PredictionConnection,
+        description="Predictions ordered by match start time, one page at a time.",
+        first=graphene.Int(
+            default_value=DEFAULT_PAGE_SIZE,
+            description=f"Number of predictions per page (max {MAX_PAGE_SIZE}).",
+        ),
+        after=graphene.String(
+            description="Cursor of the last prediction from the previous page."
+        ),
+        season=graphene.Int(description="Filter predictions by season."),
+        round_number=graphene.Int(description="Filter predictions by round."),
+        ml_model_name=graphene.String(
+            description="Filter predictions by the name of the model that made them."
+        ),
+        for_competition_only=graphene.Boolean(
+            default_value=False,
+            description="Only get predictions from ML models used in competitions.",
+        ),
+        required=True,
     )
 
     fetch_season_performance_chart_parameters = graphene.Field(
@@ -197,14 +230,53 @@ class Query(graphene.ObjectType):
     )
 
     @staticmethod
-    def resolve_fetch_predictions(_root, _info, year=None) -> QuerySet:
+    def resolve_fetch_predictions(_root, info, year=None) -> QuerySet:
         """Return all predictions from the given year or from all years."""
+        predictions = optimize_queryset(Prediction.objects.all(), info)
+
         if year is None:
-            return Prediction.objects.all()
+            return predictions
+
+        return predictions.filter(match__season=year)
+
+    @staticmethod
+    def resolve_fetch_paginated_predictions(
+        _root,
+        info,
+        first: int,
+        for_competition_only: bool,
+        after: Optional[str] = None,
+        season: Optional[int] = None,
+        round_number: Optional[int] = None,
+        ml_model_name: Optional[str] = None,
+    ) -> PredictionConnection:
+        """Return a page of predictions that match the given filters."""
+        predictions = optimize_queryset(
+            Prediction.objects.all(),
+            info,
+            path=["edges", "node"],
+            # Cursors are based on match start times
+            required_fields=["match", "match__start_date_time"],
+        )
+
+        if season is not None:
+            predictions = predictions.filter(match__season=season)
+
+        if round_number is not None:
+            predictions = predictions.filter(match__round_number=round_number)
 
-        return Prediction.objects.filter(match__start_date_time__year=year)
+        if ml_model_name is not None:
+            predictions = predictions.filter(ml_model__name=ml_model_name)
+
+        if for_competition_only:
+            predictions = predictions.filter(ml_model__used_in_competitions=True)
+
+        return paginate_predictions(
+            predictions, PredictionConnection, first=first, after=after
+        )
 
     @staticmethod
+    @cache_resolver
     def resolve_fetch_season_performance_chart_parameters(
         _root, _info
     ) -> SeasonPerformanceChartParameters:
@@ -212,94 +284,80 @@ class Query(graphene.ObjectType):
         Return parameters for labels and inputs for the performance chart.
         """
         return {
-            "available_seasons": (
-                sorted(
-                    Prediction.objects.select_related("match")
-                    .distinct("match__start_date_time__year")
-                    .values_list("match__start_date_time__year", flat=True)
+            "available_seasons": fetch_round_state()["available_seasons"],
+            "available_ml_models": list(
+                MLModel.objects.annotate(prediction_count=Count("prediction")).filter(
+                    prediction_count__gt=0
                 )
             ),
-            "available_ml_models": (
-                MLModel.objects.prefetch_related("prediction_set")
-                .annotate(prediction_count=Count("prediction"))
-                .filter(prediction_count__gt=0)
-            ),
         }
 
     @staticmethod
-    def resolve_fetch_season_model_metrics(_root, _info, season) -> QuerySet:
+    def resolve_fetch_season_years(_root, _info) -> List[int]:
+        """Return all years for which model predictions exist."""
+        return fetch_round_state()["available_seasons"]
+
+    @staticmethod
+    @cache_resolver
+    def resolve_fetch_season_model_metrics(_root, _info, season) -> SeasonModelMetrics:
         """Return all model performance metrics from the given season."""
-        return Prediction.objects.filter(
-            match__start_date_time__year=season
-        ).select_related("ml_model", "match")
+        model_round_metrics = (
+            ModelRoundMetrics.objects.filter(season=season)
+            .order_by("round_number", "ml_model__name")
+            .values(
+                "ml_model__name",
+                "ml_model__used_in_competitions",
+                *CUMULATIVE_METRICS,
+                match__round_number=F("round_number"),
+            )
+        )
+
+        return {"season": season, "model_round_metrics": list(model_round_metrics)}
 
     @staticmethod
+    @cache_resolver
     def resolve_fetch_latest_round_predictions(_root, _info) -> RoundPredictions:
         """Return predictions and model metrics for the latest available round."""
-        matches_with_predictions = Match.objects.annotate(
-            prediction_count=Count("prediction")
-        ).filter(prediction_count__gt=0)
-        max_match_with_predictions = max(
-            matches_with_predictions, key=lambda match: match.start_date_time
-        )
+        latest_round = fetch_round_state()["latest_predicted_round"]
+        assert latest_round is not None, "There are no predictions in the DB."
 
-        prediction_query = Prediction.objects.filter(
-            match__start_date_time__year=max_match_with_predictions.start_date_time.year,
-            match__round_number=max_match_with_predictions.round_number,
-            ml_model__used_in_competitions=True,
+        round_predictions = fetch_round_predictions(
+            latest_round["season"], latest_round["round_number"]
         )
 
         return {
-            "round_number": max_match_with_predictions.round_number,
-            "match_predictions": prediction_query,
+            "round_number": latest_round["round_number"],
+            "match_predictions": round_predictions["match_predictions"],
         }
 
     @staticmethod
+    @cache_resolver
     def resolve_fetch_latest_round_metrics(_root, _info) -> RoundMetrics:
         """
         Return performance metrics for competition models through the last-played round.
         """
-        matches_with_results = Match.objects.filter(
-            start_date_time__lt=timezone.now(), teammatch__score__gt=0
-        )
-        max_match_with_results = max(
-            matches_with_results, key=lambda match: match.start_date_time
-        )
+        latest_round = fetch_round_state()["latest_completed_round"]
+        assert latest_round is not None, "There are no match results in the DB."
 
-        metric_values = (
-            Prediction.objects.filter(
-                match__start_date_time__year=max_match_with_results.year,
-                ml_model__used_in_competitions=True,
-                # We don't want to include matches without results, which would impact
-                # mean-based metrics like accuracy and MAE
-                match__teammatch__score__gt=0,
-            )
-            .select_related("ml_model", "match")
-            .values(
-                "match__id",
-                "match__margin",
-                "match__winner__name",
-                "match__round_number",
-                "match__start_date_time",
-                "ml_model__is_principal",
-                "ml_model__name",
-                "ml_model__used_in_competitions",
-                "predicted_margin",
-                "predicted_winner__name",
-                "predicted_win_probability",
-                "is_correct",
-            )
+        metric_values = ModelRoundMetrics.objects.filter(
+            season=latest_round["season"],
+            round_number=latest_round["round_number"],
+            ml_model__used_in_competitions=True,
+        ).values(
+            "season",
+            "ml_model__is_principal",
+            "ml_model__used_in_competitions",
+            *CUMULATIVE_METRICS,
+            match__round_number=F("round_number"),
         )
 
-        metrics_df = calculate_cumulative_metrics(
-            metric_values, max_match_with_results.round_number
-        )
+        metrics_df = pd.DataFrame(list(metric_values))
 
         return _consolidate_competition_model_metrics(metrics_df)
 
     @staticmethod
     def resolve_fetch_ml_models(
-        _root, _info, for_competition_only: bool
+        _root, info, for_competition_only: bool
     ) -> List[MLModel]:
         """
         Return machine-learning models.
@@ -310,7 +368,7 @@ class Query(graphene.ObjectType):
             whose predictions are submitted to competitions are returned.
         """
 
-        ml_models = MLModel.objects
+        ml_models = optimize_queryset(MLModel.objects.all(), info)
 
         if for_competition_only:
             return ml_models.filter(used_in_competitions=True)
@@ -6,4 +6,4 @@ from .season import (
     SeasonPerformanceChartParametersType,
     RoundPredictionType,
 )
-from .models import PredictionType, MLModelType
+from .models import PredictionType, PredictionConnection, MLModelType
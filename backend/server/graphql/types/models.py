@@ -4,6 +4,7 @@ import graphene
 from graphene_django.types import DjangoObjectType
 
 from server.models import Team, Prediction, Match, TeamMatch, MLModel
+from ..loaders import get_loaders
 
 
 class TeamType(DjangoObjectType):
@@ -24,6 +25,19 @@ class PredictionType(DjangoObjectType):
         model = Prediction
 
 
+class PredictionConnection(graphene.relay.Connection):
+    """Page of predictions ordered by match start time."""
+
+    # The page size is already included in the cost of the connection field
+    # (see server/graphql/validation.py)
+    field_costs = {"edges": {"list_size": 1}}
+
+    class Meta:
+        """For adding the connection's node type."""
+
+        node = PredictionType
+
+
 class MatchType(DjangoObjectType):
     """GraphQL type based on the Match data model."""
 
@@ -32,6 +46,17 @@ class MatchType(DjangoObjectType):
 
         model = Match
 
+    # Model fields that custom resolvers need, so the query optimizer knows
+    # which columns to load
+    field_dependencies = {
+        "year": ["start_date_time"],
+        "home_team": [],
+        "away_team": [],
+        "predictions": [],
+    }
+    # Estimates for limiting query cost (see server/graphql/validation.py)
+    field_costs = {"teammatch_set": {"list_size": 2}}
+
     year = graphene.Int(required=True)
     home_team = graphene.Field(TeamType)
     away_team = graphene.Field(TeamType)
@@ -42,22 +67,19 @@ class MatchType(DjangoObjectType):
     )
 
     @staticmethod
-    def resolve_predictions(root, _info, ml_model_name=None):
+    def resolve_predictions(root, info, ml_model_name=None):
         """Return predictions for this match."""
-        if ml_model_name is None:
-            return root.prediction_set.all()
-
-        return root.prediction_set.filter(ml_model__name=ml_model_name)
+        return get_loaders(info).predictions_by_match.load((root.id, ml_model_name))
 
     @staticmethod
-    def resolve_home_team(root, _info):
+    def resolve_home_team(root, info):
         """Return the home team for this match."""
-        return root.teammatch_set.get(at_home=True).team
+        return get_loaders(info).team_by_match.load((root.id, True))
 
     @staticmethod
-    def resolve_away_team(root, _info):
+    def resolve_away_team(root, info):
         """Return the away team for this match."""
-        return root.teammatch_set.get(at_home=False).team
+        return get_loaders(info).team_by_match.load((root.id, False))
 
 
 class TeamMatchType(DjangoObjectType):
@@ -0,0 +1,231 @@
+"""
+Validation rules that protect the server from expensive GraphQL queries.
+
+Query cost is estimated before execution from field weights and the expected
+number of items in each list: each item costs its field's weight plus the cost of
+its selected fields, so a query's cost multiplies with its nesting.
+GraphQL types can declare a field_costs attribute to give better estimates than
+the defaults, e.g. for fields with expensive resolvers or long lists.
+"""
+
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from django.conf import settings
+from graphene.utils.str_converters import to_snake_case
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLNamedType,
+    GraphQLSchema,
+    InlineFragmentNode,
+    IntValueNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+    ValidationRule,
+    get_named_type,
+    get_nullable_type,
+    is_leaf_type,
+    is_list_type,
+)
+from graphql.language import SKIP
+from graphql.utilities import get_operation_root_type
+from mypy_extensions import TypedDict
+
+
+# Multiplier for list fields whose types don't say how long they are
+DEFAULT_LIST_SIZE = 10
+# Fields that return objects cost 1 by default, and scalar fields cost nothing
+DEFAULT_OBJECT_WEIGHT = 1
+# Argument that limits the length of a paginated list
+PAGE_SIZE_ARGUMENT = "first"
+
+FieldCost = TypedDict("FieldCost", {"weight": int, "list_size": int}, total=False)
+QueryCost = TypedDict("QueryCost", {"cost": int, "depth": int})
+
+
+def _fragments(document: DocumentNode) -> Dict[str, FragmentDefinitionNode]:
+    return {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+
+
+class _CostCalculator:
+    """Estimate the cost & depth of operations in a document."""
+
+    def __init__(
+        self, schema: GraphQLSchema, fragments: Dict[str, FragmentDefinitionNode]
+    ):
+        self.schema = schema
+        self.fragments = fragments
+
+    def operation_cost(self, operation: OperationDefinitionNode) -> QueryCost:
+        """Estimate an operation's cost and find its maximum depth."""
+        root_type = get_operation_root_type(self.schema, operation)
+        cost, depth = self._selection_set_cost(
+            root_type, operation.selection_set, frozenset()
+        )
+
+        return {"cost": cost, "depth": depth}
+
+    def _selection_set_cost(
+        self,
+        parent_type: Optional[GraphQLNamedType],
+        selection_set: Optional[SelectionSetNode],
+        fragment_names: FrozenSet[str],
+    ) -> Tuple[int, int]:
+        if parent_type is None or selection_set is None:
+            return 0, 0
+
+        total_cost = 0
+        max_depth = 0
+
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                cost, depth = self._field_cost(parent_type, selection, fragment_names)
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = (
+                    parent_type
+                    if selection.type_condition is None
+                    else self.schema.get_type(selection.type_condition.name.value)
+                )
+                cost, depth = self._selection_set_cost(
+                    fragment_type, selection.selection_set, fragment_names
+                )
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment_name = selection.name.value
+                fragment = self.fragments.get(fragment_name)
+
+                # Other rules report unknown & cyclical fragments
+                if fragment is None or fragment_name in fragment_names:
+                    continue
+
+                cost, depth = self._selection_set_cost(
+                    self.schema.get_type(fragment.type_condition.name.value),
+                    fragment.selection_set,
+                    fragment_names | {fragment_name},
+                )
+            else:
+                continue
+
+            total_cost += cost
+            max_depth = max(max_depth, depth)
+
+        return total_cost, max_depth
+
+    def _field_cost(
+        self,
+        parent_type: GraphQLNamedType,
+        field_node: FieldNode,
+        fragment_names: FrozenSet[str],
+    ) -> Tuple[int, int]:
+        field_name = field_node.name.value
+        field = getattr(parent_type, "fields", {}).get(field_name)
+
+        # Introspection is cheap, and other rules report unknown fields
+        if field_name.startswith("__") or field is None:
+            return 0, 0
+
+        field_type = get_named_type(field.type)
+        hint: FieldCost = getattr(
+            getattr(parent_type, "graphene_type", None), "field_costs", {}
+        ).get(to_snake_case(field_name), {})
+
+        sub_cost, sub_depth = self._selection_set_cost(
+            field_type, field_node.selection_set, fragment_names
+        )
+        weight = hint.get(
+            "weight", 0 if is_leaf_type(field_type) else DEFAULT_OBJECT_WEIGHT
+        )
+        list_size = self._list_size(field, field_node, hint)
+
+        return list_size * (weight + sub_cost), sub_depth + 1
+
+    @staticmethod
+    def _list_size(field, field_node: FieldNode, hint: FieldCost) -> int:
+        for argument in field_node.arguments:
+            if argument.name.value == PAGE_SIZE_ARGUMENT and isinstance(
+                argument.value, IntValueNode
+            ):
+                return int(argument.value.value)
+
+        if "list_size" in hint:
+            return hint["list_size"]
+
+        return DEFAULT_LIST_SIZE if is_list_type(get_nullable_type(field.type)) else 1
+
+
+def estimate_query_cost(
+    schema: GraphQLSchema,
+    document: DocumentNode,
+    operation_name: Optional[str] = None,
+) -> Optional[QueryCost]:
+    """
+    Estimate the cost and depth of an operation in a validated document.
+
+    Params:
+    -------
+    schema: Schema that the document was validated against.
+    document: Parsed query document.
+    operation_name: Name of the operation to execute, if the document has several.
+
+    Returns:
+    --------
+    Estimated cost & depth, or None if the document doesn't have the operation.
+    """
+    operations = [
+        definition
+        for definition in document.definitions
+        if isinstance(definition, OperationDefinitionNode)
+        and (
+            operation_name is None
+            or (definition.name is not None and definition.name.value == operation_name)
+        )
+    ]
+
+    if not any(operations):
+        return None
+
+    return _CostCalculator(schema, _fragments(document)).operation_cost(
+        operations[0]
+    )
+
+
+class QueryCostRule(ValidationRule):
+    """
+    Reject operations that are nested too deeply or whose estimated cost is too high.
+
+    Limits come from the GRAPHQL_MAX_QUERY_DEPTH and GRAPHQL_MAX_QUERY_COST settings.
+    Variables aren't available during validation, so paginated lists whose size
+    is a variable are assumed to be as long as their types' field_costs say.
+    """
+
+    def enter_operation_definition(self, node: OperationDefinitionNode, *_args):
+        """Check the operation's cost against the limits."""
+        query_cost = _CostCalculator(
+            self.context.schema, _fragments(self.context.document)
+        ).operation_cost(node)
+
+        if query_cost["depth"] > settings.GRAPHQL_MAX_QUERY_DEPTH:
+            self.report_error(
+                GraphQLError(
+                    f"Query depth of {query_cost['depth']} exceeds the maximum "
+                    f"of {settings.GRAPHQL_MAX_QUERY_DEPTH}.",
+                    node,
+                )
+            )
+
+        if query_cost["cost"] > settings.GRAPHQL_MAX_QUERY_COST:
+            self.report_error(
+                GraphQLError(
+                    f"Estimated query cost of {query_cost['cost']} exceeds "
+                    f"the maximum of {settings.GRAPHQL_MAX_QUERY_COST}.",
+                    node,
+                )
+            )
+
+        return SKIP
@@ -0,0 +1,246 @@
+"""Views for serving the GraphQL API."""
+
+from typing import Any, Dict
+from functools import update_wrapper
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponseBadRequest, HttpResponseNotAllowed
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from graphene_django.views import GraphQLView, HttpError
+from graphql import ExecutionResult, GraphQLError, OperationType, get_operation_ast
+
+from server.cache import data_version
+from server.concurrency import GRAPHQL_EXECUTOR, run_in_executor
+from server.encoders import encode_json
+from server.routers import replica_reads
+from .persisted_queries import resolve_persisted_query, parse_and_validate
+from .profiling import ResolverProfiler
+from .validation import estimate_query_cost
+
+
+class PersistedQueryView(GraphQLView):
+    """
+    GraphQL view that accepts persisted-query hashes in place of query documents.
+
+    Also reuses parsed & validated documents for repeated queries instead of
+    parsing and validating them for every request. When debugging, responses
+    include the query's estimated cost and resolver profiles in their extensions.
+
+    Successful GET responses have ETags based on the operation and the data version,
+    so clients can revalidate them and get 304 responses until the data changes.
+
+    Requests read from the replica DB, when it's configured & current.
+    """
+
+    # Whether the response can be cached, which is only known after execution
+    cacheable = False
+
+    @replica_reads()
+    def dispatch(self, request, *args, **kwargs):
+        """Respond to the request, adding conditional caching to GET requests."""
+        if request.method.lower() != "get" or (
+            self.graphiql and self.can_display_graphiql(request, {})
+        ):
+            return super().dispatch(request, *args, **kwargs)
+
+        try:
+            etag = self.get_etag(request)
+        except HttpError:
+            # Let the usual error handling respond to invalid params
+            return super().dispatch(request, *args, **kwargs)
+
+        response = get_conditional_response(request, etag=etag)
+
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+
+            if response.status_code != 200 or not self.cacheable:
+                return response
+
+        response["ETag"] = etag
+        patch_cache_control(
+            response, public=True, max_age=settings.GRAPHQL_CACHE_MAX_AGE
+        )
+
+        return response
+
+    def get_etag(self, request) -> str:
+        """
+        Identify a GET response by the requested operation and the data version.
+
+        Responses for an operation only change when the DB data does,
+        so this lets us check whether a client's copy is current without executing
+        the operation.
+        """
+        query, variables, operation_name, _ = self.get_graphql_params(request, {})
+        persisted_query = self.get_extensions(request, {}).get("persistedQuery")
+        operation_key = json.dumps(
+            [query, persisted_query, operation_name, variables, data_version()],
+            sort_keys=True,
+        )
+
+        return quote_etag(hashlib.sha256(operation_key.encode()).hexdigest())
+
+    @staticmethod
+    def get_extensions(request, data) -> Dict[str, Any]:
+        """Get the request's GraphQL extensions, which GET requests send as JSON."""
+        extensions = request.GET.get("extensions") or data.get("extensions") or {}
+
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError as err:
+                raise HttpError(
+                    HttpResponseBadRequest("Extensions are invalid JSON.")
+                ) from err
+
+        return extensions
+
+    def execute_graphql_request(  # pylint: disable=too-many-arguments
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        """Execute a GraphQL operation from a full query or a persisted-query hash."""
+        persisted_query = self.get_extensions(request, data).get("persistedQuery")
+
+        if persisted_query is not None:
+            try:
+                query = resolve_persisted_query(query, persisted_query)
+            except GraphQLError as err:
+                return ExecutionResult(errors=[err])
+
+        if not query:
+            if show_graphiql:
+                return None
+
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        try:
+            document, validation_errors = parse_and_validate(self.schema, query)
+        except GraphQLError as err:
+            return ExecutionResult(errors=[err])
+
+        if request.method.lower() == "get":
+            operation_ast = get_operation_ast(document, operation_name)
+
+            if operation_ast and operation_ast.operation != OperationType.QUERY:
+                if show_graphiql:
+                    return None
+
+                raise HttpError(
+                    HttpResponseNotAllowed(
+                        ["POST"],
+                        f"Can only perform a {operation_ast.operation.value} "
+                        "operation from a POST request.",
+                    )
+                )
+
+        if any(validation_errors):
+            return ExecutionResult(data=None, errors=list(validation_errors))
+
+        execution_kwargs = {
+            "root_value": self.get_root_value(request),
+            "variable_values": variables,
+            "operation_name": operation_name,
+            "context_value": self.get_context(request),
+        }
+
+        if not settings.DEBUG:
+            return self.schema.execute_document(
+                document, middleware=self.get_middleware(request), **execution_kwargs
+            )
+
+        profiler = ResolverProfiler()
+
+        with connection.execute_wrapper(profiler):
+            execution_result = self.schema.execute_document(
+                document,
+                # Middleware that comes first wraps resolvers most closely,
+                # so other middleware doesn't count toward resolver durations
+                middleware=[profiler, *(self.get_middleware(request) or [])],
+                **execution_kwargs,
+            )
+
+        execution_result.extensions = {
+            "cost": estimate_query_cost(
+                self.schema.graphql_schema, document, operation_name
+            ),
+            "tracing": profiler.tracing(),
+        }
+
+        return execution_result
+
+    def json_encode(self, request, d, pretty=False):
+        """Encode a response body with the configured JSON encoder."""
+        if self.pretty or pretty or request.GET.get("pretty"):
+            return super().json_encode(request, d, pretty=pretty)
+
+        encoded_body = encode_json(d)
+
+        # Batched responses get joined together as strings
+        return encoded_body.decode("utf-8") if self.batch else encoded_body
+
+    def get_response(self, request, data, show_graphiql=False):
+        """Build the JSON response body, including any extensions."""
+        query, variables, operation_name, request_id = self.get_graphql_params(
+            request, data
+        )
+        execution_result = self.execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+
+        if execution_result is None:
+            return None, 200
+
+        self.cacheable = not execution_result.errors
+        response: Dict[str, Any] = {}
+        status_code = 200
+
+        if execution_result.errors:
+            response["errors"] = [
+                self.format_error(error) for error in execution_result.errors
+            ]
+
+        # Errors without paths come from requests that couldn't be executed at all
+        if execution_result.errors and any(
+            not error.path for error in execution_result.errors
+        ):
+            status_code = 400
+        else:
+            response["data"] = execution_result.data
+
+        if execution_result.extensions:
+            response["extensions"] = execution_result.extensions
+
+        if self.batch:
+            response["id"] = request_id
+            response["status"] = status_code
+
+        return self.json_encode(request, response, pretty=show_graphiql), status_code
+
+
+class AsyncPersistedQueryView(PersistedQueryView):
+    """
+    Version of PersistedQueryView for serving via ASGI.
+
+    Executing GraphQL operations is mostly DB work, so the whole request runs
+    in the GraphQL thread pool, which keeps the event loop free for other requests.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        """Return an async view function for handling requests."""
+        sync_view = super().as_view(**initkwargs)
+
+        # Wrapping the whole view, rather than making dispatch async, keeps
+        # the class-based view API the same as the sync version's
+        async def view(request, *args, **kwargs):
+            return await run_in_executor(
+                GRAPHQL_EXECUTOR, sync_view, request, *args, **kwargs
+            )
+
+        # Keeps the view_class & view_initkwargs attributes that Django adds
+        return update_wrapper(view, sync_view)
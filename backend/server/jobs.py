@@ -0,0 +1,145 @@
+"""
+Background processing of data-ingestion jobs.
+
+The ingestion endpoints queue jobs and respond right away, then worker processes
+(see the run_workers command) claim the jobs and run them. Adding workers
+increases how many jobs can run at the same time.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, cast
+from threading import Event
+import json
+import traceback
+
+import pytz
+from dateutil import parser
+
+from server import api, tracing
+from server.encoders import encode_json
+from server.models import IngestionJob
+from server.models.ingestion_job import JobKind
+from server.types import FixtureData, MatchData
+
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+JobHandler = Callable[[Dict[str, Any], int], Any]
+
+
+def _parse_match_dates(match_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {**match, **{"date": parser.parse(match["date"]).replace(tzinfo=pytz.UTC)}}
+        for match in match_data
+    ]
+
+
+def _ingest_predictions(
+    payload: Dict[str, Any], verbose: int
+) -> List[api.PredictionValues]:
+    api.update_future_match_predictions(payload["data"])
+
+    return api.fetch_latest_round_predictions(verbose=verbose)
+
+
+def _ingest_fixtures(payload: Dict[str, Any], verbose: int) -> None:
+    fixture_data = _parse_match_dates(payload["data"])
+    upcoming_round = payload["upcoming_round"]
+
+    api.update_fixture_data(
+        cast(List[FixtureData], fixture_data), upcoming_round, verbose=verbose
+    )
+
+
+def _ingest_matches(payload: Dict[str, Any], verbose: int) -> None:
+    match_data = _parse_match_dates(payload["data"])
+
+    api.backfill_recent_match_results(
+        cast(List[MatchData], match_data), verbose=verbose
+    )
+
+
+JOB_HANDLERS: Dict[str, JobHandler] = {
+    JobKind.PREDICTIONS: _ingest_predictions,
+    JobKind.FIXTURES: _ingest_fixtures,
+    JobKind.MATCHES: _ingest_matches,
+}
+
+
+def run_job(job: IngestionJob, verbose: int = 1) -> None:
+    """
+    Ingest a claimed job's data, recording its result or error.
+
+    Params:
+    -------
+    job: Job that a worker has claimed.
+    verbose: Whether to print info messages.
+    """
+    with tracing.span(
+        f"ingest {job.kind}",
+        attributes={"job.id": job.id, "job.attempts": job.attempts},
+        parent=tracing.parse_traceparent(job.traceparent),
+    ) as span:
+        try:
+            result = JOB_HANDLERS[job.kind](job.payload, verbose)
+        except Exception as err:  # pylint: disable=broad-except
+            span.record_error(err)
+            job.fail(traceback.format_exc())
+            return None
+
+    # Results can include values that only our encoder can convert to JSON
+    job.succeed(None if result is None else json.loads(encode_json(result)))
+
+    return None
+
+
+def run_next_job(verbose: int = 1) -> Optional[IngestionJob]:
+    """
+    Claim and run the oldest waiting job.
+
+    Params:
+    -------
+    verbose: Whether to print info messages.
+
+    Returns:
+    --------
+    The job that ran, or None if there weren't any waiting.
+    """
+    job = IngestionJob.claim_next()
+
+    if job is not None:
+        run_job(job, verbose=verbose)
+
+    return job
+
+
+def work(
+    stop_event: Event,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    burst: bool = False,
+    verbose: int = 1,
+) -> None:
+    """
+    Run jobs until stopped, waiting for more whenever there aren't any.
+
+    Params:
+    -------
+    stop_event: Event that stops the worker after its current job when set.
+    poll_interval: Seconds to wait before checking for more jobs.
+    burst: Whether to stop once there aren't any more jobs.
+    verbose: Whether to print info messages.
+    """
+    while not stop_event.is_set():
+        job = run_next_job(verbose=verbose)
+
+        if job is not None:
+            if verbose == 1:
+                print(f"Job {job.id} ({job.kind}): {job.status}")
+
+            continue
+
+        if burst:
+            return None
+
+        stop_event.wait(poll_interval)
+
+    return None
@@ -0,0 +1,85 @@
+"""Django command for exporting a filtered snapshot of the DB to Parquet files."""
+
+from django.core.management.base import BaseCommand
+
+from server.management.commands.seed_db import parse_year_range
+from server.routers import replica_reads
+from server.snapshot import export_snapshot, DEFAULT_SNAPSHOT_DIR
+
+
+class Command(BaseCommand):
+    """Django class for implementing the snapshot export as a CLI command."""
+
+    help = (
+        "Export teams, matches, team-matches, ML models, and predictions "
+        "to compressed Parquet files for loading into another DB."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Add arguments to the export_snapshot django command.
+
+        Adds the following arguments:
+        --directory: Where to save the Parquet files.
+        --year_range: Year range of form yyyy-yyyy. These will be the only seasons
+            whose matches and predictions are exported. Final year in range
+            is excluded per Python's `range` function.
+        --ml_models: Comma-separated names of ML models whose predictions
+            are exported.
+
+        Params:
+        -------
+        parser: Built-in parser from the Django BaseCommand class.
+        """
+        parser.add_argument(
+            "--directory",
+            type=str,
+            default=DEFAULT_SNAPSHOT_DIR,
+            help="Directory in which to save the snapshot's Parquet files.",
+        )
+
+        parser.add_argument(
+            "--year_range",
+            type=str,
+            help=(
+                "Specify a range of seasons (inclusive start, exclusive end, "
+                "per Python's `range`) to export. Format is yyyy-yyyy."
+            ),
+        )
+
+        parser.add_argument(
+            "--ml_models",
+            type=str,
+            help="Comma-separated names of ML models whose predictions to export.",
+        )
+
+    @replica_reads()
+    def handle(self, *_args, **kwargs) -> None:
+        """
+        Export a filtered snapshot of DB data.
+
+        Params:
+        -------
+        directory: Where to save the Parquet files.
+        year_range: Range of seasons to export. Exports all seasons if omitted.
+        ml_models: Names of ML models to export. Exports all models if omitted.
+        """
+        verbose = kwargs.get("verbosity", 1)
+        seasons = (
+            None
+            if kwargs.get("year_range") is None
+            else list(range(*parse_year_range(kwargs["year_range"])))
+        )
+        ml_model_names = (
+            None if kwargs.get("ml_models") is None else kwargs["ml_models"].split(",")
+        )
+
+        row_counts = export_snapshot(
+            directory=kwargs.get("directory") or DEFAULT_SNAPSHOT_DIR,
+            seasons=seasons,
+            ml_model_names=ml_model_names,
+        )
+
+        if verbose >= 1:
+            for table_name, row_count in row_counts.items():
+                print(f"Exported {row_count} rows from {table_name}")
@@ -0,0 +1,60 @@
+"""Django command for loading a snapshot of Parquet files into the DB."""
+
+from django.core.management.base import BaseCommand
+
+from server.snapshot import import_snapshot, DEFAULT_SNAPSHOT_DIR
+
+
+class Command(BaseCommand):
+    """Django class for implementing the snapshot import as a CLI command."""
+
+    help = "Load a snapshot created by export_snapshot into the DB."
+
+    def add_arguments(self, parser):
+        """
+        Add arguments to the import_snapshot django command.
+
+        Adds the following arguments:
+        --directory: Where the snapshot's Parquet files are saved.
+        --replace: Delete all existing teams, matches, team-matches, ML models,
+            and predictions before loading the snapshot.
+
+        Params:
+        -------
+        parser: Built-in parser from the Django BaseCommand class.
+        """
+        parser.add_argument(
+            "--directory",
+            type=str,
+            default=DEFAULT_SNAPSHOT_DIR,
+            help="Directory that contains the snapshot's Parquet files.",
+        )
+
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help=(
+                "Delete all existing teams, matches, team-matches, ML models, "
+                "and predictions before loading the snapshot."
+            ),
+        )
+
+    def handle(self, *_args, **kwargs) -> None:
+        """
+        Load snapshot data into the DB.
+
+        Params:
+        -------
+        directory: Where the snapshot's Parquet files are saved.
+        replace: Whether to delete existing records before loading the snapshot.
+        """
+        verbose = kwargs.get("verbosity", 1)
+
+        row_counts = import_snapshot(
+            directory=kwargs.get("directory") or DEFAULT_SNAPSHOT_DIR,
+            replace=kwargs.get("replace", False),
+        )
+
+        if verbose >= 1:
+            for table_name, row_count in row_counts.items():
+                print(f"Imported {row_count} rows into {table_name}")
@@ -0,0 +1,106 @@
+"""Django command for running background workers that process ingestion jobs."""
+
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from server.jobs import DEFAULT_POLL_INTERVAL, work
+
+
+def _run_worker(stop_event, poll_interval: float, burst: bool, verbose: int) -> None:
+    # Workers finish their current job before stopping, so interrupted jobs
+    # don't have to wait for the timeout before another worker can retry them
+    def stop(_signal_number, _frame):
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    try:
+        work(stop_event, poll_interval=poll_interval, burst=burst, verbose=verbose)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    """Django command that runs worker processes for queued ingestion jobs."""
+
+    help = """
+    Run worker processes that claim and run queued data-ingestion jobs.
+    Each process runs one job at a time, so more processes ingest more data at once.
+    """
+
+    def add_arguments(self, parser):
+        """
+        Add arguments to the run_workers django command.
+
+        Adds the following arguments:
+        --processes: Number of worker processes.
+        --poll_interval: Seconds that idle workers wait before checking for jobs.
+        --burst: Stop once there aren't any more jobs, instead of waiting for more.
+
+        Params:
+        -------
+        parser: Built-in parser from the Django BaseCommand class.
+        """
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Number of worker processes.",
+        )
+        parser.add_argument(
+            "--poll_interval",
+            type=float,
+            default=DEFAULT_POLL_INTERVAL,
+            help="Seconds that idle workers wait before checking for jobs again.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Stop once there aren't any more jobs.",
+        )
+
+    def handle(self, *_args, **kwargs) -> None:
+        """
+        Run worker processes until they're stopped.
+
+        Params:
+        -------
+        processes: Number of worker processes.
+        poll_interval: Seconds that idle workers wait before checking for jobs.
+        burst: Whether to stop once there aren't any more jobs.
+        """
+        process_count = kwargs["processes"]
+        assert process_count > 0, "There must be at least one worker process."
+
+        verbose = min(kwargs.get("verbosity", 1), 1)
+        # Forking gives workers the parent's Django setup
+        context = multiprocessing.get_context("fork")
+        stop_event = context.Event()
+        worker_args = (stop_event, kwargs["poll_interval"], kwargs["burst"], verbose)
+
+        # Forked processes can't share the parent's DB connections
+        connections.close_all()
+
+        workers = [
+            context.Process(
+                target=_run_worker, args=worker_args, name=f"worker-{worker_idx}"
+            )
+            for worker_idx in range(process_count)
+        ]
+
+        for worker in workers:
+            worker.start()
+
+        if verbose == 1:
+            print(f"Started {process_count} worker processes.")
+
+        # Stopping the command stops the workers the same way
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signal_number, lambda *_: stop_event.set())
+
+        for worker in workers:
+            worker.join()
@@ -2,16 +2,180 @@
 
 from typing import Tuple, List, cast, Optional, Dict, Any, Union
 from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import time
 
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from django.db.models import F, Q, FilteredRelation
 from django.conf import settings
+from django.utils import timezone
 import requests
-
-from server.models import Match, TeamMatch, MLModel, Prediction
+import pandas as pd
+import numpy as np
+
+from server.models import (
+    Match,
+    TeamMatch,
+    MLModel,
+    Prediction,
+    Team,
+    ModelRoundMetrics,
+)
+from server.models.match import GAME_LENGTH_HRS
+from server.cache import bumps_data_version
 from server.types import MatchData, MLModelInfo, CleanPredictionData
 
 YEAR_RANGE = "2014-2020"
+# Number of seasons to request from the tipping service at the same time
+# when running in bulk mode. Each request can be slow, because it may require
+# generating predictions, so we don't want to overwhelm the service either.
+MAX_FETCH_WORKERS = 4
+BULK_BATCH_SIZE = 1000
+VENUE_MAX_LENGTH = Match._meta.get_field(  # pylint: disable=protected-access
+    "venue"
+).max_length
+THROUGHPUT_STAGES = [
+    "Fetch",
+    "Validate",
+    "Load matches",
+    "Load predictions",
+]
+
+
+def parse_year_range(year_range: str) -> Tuple[int, int]:
+    """
+    Parse a year range argument for management commands.
+
+    Params:
+    -------
+    year_range: Year range of form yyyy-yyyy.
+
+    Returns:
+    --------
+    Min (inclusive) and max (exclusive) years.
+    """
+    year_range_limits = year_range.split("-")
+
+    assert len(year_range_limits) == 2 and all(
+        len(year) == 4 for year in year_range_limits
+    ), (
+        "Years argument must be of form 'yyyy-yyyy' where each 'y' is an integer. "
+        f"{year_range} is invalid."
+    )
+
+    return cast(Tuple[int, int], tuple(int(year) for year in year_range_limits))
+
+
+def _clean_match_data(match_data: pd.DataFrame) -> pd.DataFrame:
+    if match_data.empty:
+        return match_data
+
+    clean_match_data = match_data.assign(
+        start_date_time=lambda df: pd.to_datetime(df["date"], utc=True),
+        round_number=lambda df: df["round_number"].astype(int),
+        home_score=lambda df: df["home_score"].fillna(0).astype(int),
+        away_score=lambda df: df["away_score"].fillna(0).astype(int),
+    )
+
+    long_venues = clean_match_data["venue"].str.len() > VENUE_MAX_LENGTH
+    assert not long_venues.any(), (
+        f"Some venue names are longer than {VENUE_MAX_LENGTH} characters:\n"
+        f"{clean_match_data.loc[long_venues, 'venue']}"
+    )
+
+    assert (
+        clean_match_data["round_number"] > 0
+    ).all(), "All round numbers must be positive."
+
+    assert (
+        (clean_match_data.loc[:, ["home_score", "away_score"]] >= 0).all().all()
+    ), "All scores must be non-negative."
+
+    duplicate_matches = clean_match_data.duplicated(
+        ["start_date_time", "venue"], keep=False
+    )
+    assert not duplicate_matches.any(), (
+        "Match data should have unique start_date_time/venue combinations, "
+        "but received duplicates:\n"
+        f"{clean_match_data[duplicate_matches]}"
+    )
+
+    return clean_match_data
+
+
+def _calculate_bulk_match_results(match_data: pd.DataFrame) -> pd.DataFrame:
+    # Mirrors the logic in Match._save_result, but for all matches at once.
+    has_been_played = (
+        match_data["start_date_time"] + timedelta(hours=GAME_LENGTH_HRS)
+    ) < timezone.now()
+    score_diff = match_data["home_score"] - match_data["away_score"]
+
+    return match_data.assign(
+        margin=score_diff.abs().astype(object).where(has_been_played, None),
+        winner=match_data["home_team"]
+        .where(score_diff > 0, match_data["away_team"])
+        .where(has_been_played & (score_diff != 0), None),
+    )
+
+
+def _clean_prediction_data(prediction_data: pd.DataFrame) -> pd.DataFrame:
+    if prediction_data.empty:
+        return prediction_data
+
+    # Mirrors the logic in Prediction._calculate_predictions,
+    # but for all predictions at once.
+    def get_numeric(col: str) -> pd.Series:
+        return pd.to_numeric(prediction_data.get(col, np.nan), errors="coerce")
+
+    home_margin = get_numeric("home_predicted_margin")
+    away_margin = get_numeric("away_predicted_margin")
+    home_proba = get_numeric("home_predicted_win_probability")
+    away_proba = get_numeric("away_predicted_win_probability")
+
+    has_margin = home_margin.notna() & away_margin.notna()
+    has_proba = home_proba.notna() & away_proba.notna()
+
+    assert (has_margin ^ has_proba).all(), (
+        "Each prediction must have a predicted margin or predicted win probability, "
+        "but not both:\n"
+        f"{prediction_data[~(has_margin ^ has_proba)]}"
+    )
+
+    home_result = home_margin.where(has_margin, home_proba)
+    away_result = away_margin.where(has_margin, away_proba)
+
+    assert (home_result != away_result).all(), (
+        "Home and away predictions are equal, which is basically impossible, "
+        "so figure out what's going on:\n"
+        f"{prediction_data[home_result == away_result]}"
+    )
+
+    same_predicted_result = ((home_margin > 0) & (away_margin > 0)) | (
+        (home_margin < 0) & (away_margin < 0)
+    )
+    predicted_margin = ((home_margin - away_margin).abs()).where(
+        same_predicted_result, (home_margin.abs() + away_margin.abs()) / 2
+    )
+    predicted_win_probability = (
+        (1 - np.minimum(home_proba, away_proba)) + np.maximum(home_proba, away_proba)
+    ) / 2
+
+    return prediction_data.assign(
+        round_number=lambda df: df["round_number"].astype(int),
+        predicted_winner=np.where(
+            home_result > away_result,
+            prediction_data["home_team"],
+            prediction_data["away_team"],
+        ),
+        # Converting to object columns lets us replace NaNs with None,
+        # which Django saves as NULL.
+        predicted_margin=predicted_margin.astype(object).where(has_margin, None),
+        predicted_win_probability=predicted_win_probability.astype(object).where(
+            has_proba, None
+        ),
+    )
 
 
 class DataImporter:
@@ -152,6 +316,8 @@ class Command(BaseCommand):
         self.verbose: int = verbose
         self.ml_model: Optional[str] = None
         self.year_range: str = YEAR_RANGE
+        self.bulk = False
+        self.stage_throughput: Dict[str, List[float]] = {}
 
     def add_arguments(self, parser):
         """
@@ -163,6 +329,9 @@ class Command(BaseCommand):
         --year_range: Year range of form yyyy-yyyy. These will be the only seasons
             for which predictions are seeded. Final year in range is excluded
             per Python's `range` function.
+        --bulk: Fetch seasons concurrently and save records in large batches
+            with one transaction per season, which is much faster than the default
+            record-by-record seeding.
 
         Params:
         -------
@@ -187,6 +356,15 @@ class Command(BaseCommand):
             ),
         )
 
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help=(
+                "Fetch seasons concurrently and save records in batches, "
+                "with one transaction per season."
+            ),
+        )
+
     def handle(self, *_args, **kwargs) -> None:
         """
         Seed the DB with all necessary match and prediction data.
@@ -197,10 +375,12 @@ class Command(BaseCommand):
             Uses all available ml_models if omitted.
         year_range: Range of years for which to generate data. Uses `2014-2020`
             if omitted.
+        bulk: Whether to fetch and save data in bulk.
         """
         self.year_range = kwargs.get("year_range") or self.year_range
         self.verbose = kwargs.get("verbose") or self.verbose
         self.ml_model = kwargs.get("ml_model") or self.ml_model
+        self.bulk = kwargs.get("bulk") or self.bulk
 
         if self.verbose == 1:
             ml_model_msg = (
@@ -208,11 +388,15 @@ class Command(BaseCommand):
             )
             print(f"\nSeeding DB{ml_model_msg}...\n")
 
-        self._create_db_records()
+        if self.bulk:
+            self._bulk_create_db_records()
+        else:
+            self._create_db_records()
 
         if self.verbose == 1:
             print("\n...DB seeded!\n")
 
+    @bumps_data_version
     def _create_db_records(self) -> None:
         with transaction.atomic():
             self._create_ml_models()
@@ -224,6 +408,9 @@ class Command(BaseCommand):
 
             self._make_predictions()
 
+            for season in range(*self._year_range):
+                ModelRoundMetrics.recalculate(season)
+
     def _create_ml_models(self) -> List[MLModel]:
         ml_models = [
             self._get_or_create_ml_model(ml_model)
@@ -269,6 +456,233 @@ class Command(BaseCommand):
         if self.verbose == 1:
             print("\nPredictions saved!")
 
+    @bumps_data_version
+    def _bulk_create_db_records(self) -> None:
+        self.stage_throughput = {stage: [0, 0.0] for stage in THROUGHPUT_STAGES}
+
+        with transaction.atomic():
+            self._create_ml_models()
+
+        seasons = list(range(*self._year_range))
+
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(
+            max_workers=min(MAX_FETCH_WORKERS, len(seasons))
+        ) as executor:
+            season_data = list(executor.map(self._fetch_season_data, seasons))
+        self._record_throughput(
+            "Fetch",
+            sum(len(matches) + len(preds) for matches, preds in season_data),
+            started_at,
+        )
+
+        for season, (match_data, prediction_data) in zip(seasons, season_data):
+            started_at = time.perf_counter()
+            clean_match_data = _clean_match_data(match_data)
+            clean_prediction_data = _clean_prediction_data(prediction_data)
+            self._record_throughput(
+                "Validate", len(match_data) + len(prediction_data), started_at
+            )
+
+            with transaction.atomic():
+                self._bulk_create_matches(season, clean_match_data)
+                self._bulk_update_or_create_predictions(season, clean_prediction_data)
+                ModelRoundMetrics.recalculate(season)
+
+            if self.verbose == 1:
+                print(f"Season {season} saved!")
+
+        self._print_throughput()
+
+    def _fetch_season_data(self, season: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        # We assume that if we're only adding an MLModel, then we're not doing
+        # a full seed
+        match_data = (
+            []
+            if self.ml_model is not None
+            else self.data_importer.fetch_matches(
+                start_date=f"{season}-01-01",
+                end_date=f"{season}-12-31",
+                fetch_data=self.fetch_data,
+            )
+        )
+        prediction_data = pd.DataFrame(
+            self.data_importer.fetch_match_predictions(
+                f"{season}-{season + 1}", ml_models=[self.ml_model], train_models=True
+            )
+        )
+
+        return (
+            pd.DataFrame(match_data),
+            (
+                prediction_data
+                if prediction_data.empty
+                else prediction_data.query("year == @season")
+            ),
+        )
+
+    def _bulk_create_matches(self, season: int, match_data: pd.DataFrame) -> None:
+        if match_data.empty:
+            return None
+
+        started_at = time.perf_counter()
+
+        team_names = set(match_data["home_team"]) | set(match_data["away_team"])
+        Team.objects.bulk_create(
+            [Team(name=team_name) for team_name in team_names],
+            ignore_conflicts=True,
+        )
+        team_ids = dict(
+            Team.objects.filter(name__in=team_names).values_list("name", "id")
+        )
+
+        existing_matches = set(
+            Match.objects.filter(season=season).values_list(
+                "start_date_time", "venue"
+            )
+        )
+        new_match_data = _calculate_bulk_match_results(
+            match_data[
+                [
+                    (start_date_time, venue) not in existing_matches
+                    for start_date_time, venue in zip(
+                        match_data["start_date_time"], match_data["venue"]
+                    )
+                ]
+            ]
+        )
+
+        matches = Match.objects.bulk_create(
+            [
+                Match(
+                    start_date_time=match_datum["start_date_time"].to_pydatetime(),
+                    # bulk_create doesn't call save, so we have to set this ourselves
+                    season=match_datum["start_date_time"].year,
+                    round_number=match_datum["round_number"],
+                    venue=match_datum["venue"],
+                    margin=match_datum["margin"],
+                    winner_id=team_ids.get(match_datum["winner"]),
+                )
+                for match_datum in new_match_data.to_dict("records")
+            ],
+            batch_size=BULK_BATCH_SIZE,
+        )
+
+        TeamMatch.objects.bulk_create(
+            [
+                TeamMatch(
+                    match=match,
+                    team_id=team_ids[match_datum[f"{team_type}_team"]],
+                    at_home=(team_type == "home"),
+                    score=match_datum[f"{team_type}_score"],
+                )
+                for match, match_datum in zip(
+                    matches, new_match_data.to_dict("records")
+                )
+                for team_type in ("home", "away")
+            ],
+            batch_size=BULK_BATCH_SIZE,
+        )
+
+        self._record_throughput("Load matches", len(matches) * 3, started_at)
+
+        return None
+
+    def _bulk_update_or_create_predictions(
+        self, season: int, prediction_data: pd.DataFrame
+    ) -> None:
+        if prediction_data.empty:
+            return None
+
+        started_at = time.perf_counter()
+
+        season_matches = pd.DataFrame(
+            Match.objects.filter(season=season)
+            .annotate(
+                home_team_match=FilteredRelation(
+                    "teammatch", condition=Q(teammatch__at_home=True)
+                ),
+                away_team_match=FilteredRelation(
+                    "teammatch", condition=Q(teammatch__at_home=False)
+                ),
+            )
+            .values(
+                "round_number",
+                match_id=F("id"),
+                home_team=F("home_team_match__team__name"),
+                away_team=F("away_team_match__team__name"),
+            )
+        )
+
+        assert not season_matches.empty, (
+            f"No matches exist for season {season}. Try seeding the DB with "
+            "match data, then adding predictions again."
+        )
+
+        ml_model_ids = dict(MLModel.objects.values_list("name", "id"))
+        team_ids = dict(Team.objects.values_list("name", "id"))
+
+        match_key = ["round_number", "home_team", "away_team"]
+        matched_predictions = prediction_data.merge(
+            season_matches, on=match_key, how="left", validate="many_to_one"
+        )
+
+        unmatched_predictions = matched_predictions["match_id"].isna()
+        assert not unmatched_predictions.any(), (
+            "Prediction data should have yielded a unique match, "
+            "but some predictions didn't match any match records:\n"
+            f"{matched_predictions.loc[unmatched_predictions, match_key]}"
+        )
+
+        unknown_ml_models = set(matched_predictions["ml_model"]) - set(ml_model_ids)
+        assert not any(
+            unknown_ml_models
+        ), f"Predictions are for ML models that don't exist: {unknown_ml_models}"
+
+        predictions = [
+            Prediction(
+                match_id=int(pred["match_id"]),
+                ml_model_id=ml_model_ids[pred["ml_model"]],
+                predicted_winner_id=team_ids[pred["predicted_winner"]],
+                predicted_margin=pred["predicted_margin"],
+                predicted_win_probability=pred["predicted_win_probability"],
+            )
+            for pred in matched_predictions.to_dict("records")
+        ]
+
+        Prediction.bulk_update_or_create(predictions, batch_size=BULK_BATCH_SIZE)
+        Prediction.update_correctness_for_matches(
+            list(
+                Match.objects.filter(
+                    id__in=matched_predictions["match_id"].unique().tolist(),
+                    margin__isnull=False,
+                ).values_list("id", flat=True)
+            )
+        )
+
+        self._record_throughput("Load predictions", len(predictions), started_at)
+
+        return None
+
+    def _record_throughput(self, stage: str, row_count: int, started_at: float):
+        self.stage_throughput[stage][0] += row_count
+        self.stage_throughput[stage][1] += time.perf_counter() - started_at
+
+    def _print_throughput(self):
+        if self.verbose != 1:
+            return None
+
+        print("\nThroughput by stage:")
+
+        for stage, (row_count, duration) in self.stage_throughput.items():
+            rows_per_second = row_count / duration if duration > 0 else 0
+            print(
+                f"    {stage}: {int(row_count)} rows in {duration:.2f}s "
+                f"({rows_per_second:.0f} rows/s)"
+            )
+
+        return None
+
     @staticmethod
     def _get_or_create_ml_model(ml_model: MLModelInfo) -> MLModel:
         ml_model_record, _created = MLModel.objects.get_or_create(name=ml_model["name"])
@@ -278,17 +692,4 @@ class Command(BaseCommand):
 
     @property
     def _year_range(self) -> Tuple[int, int]:
-        year_range_limits = self.year_range.split("-")
-
-        assert len(year_range_limits) == 2 and all(
-            [len(year) == 4 for year in year_range_limits]
-        ), (
-            "Years argument must be of form 'yyyy-yyyy' where each 'y' is an integer. "
-            f"{self.year_range} is invalid."
-        )
-
-        year_ints = cast(
-            Tuple[int, int], tuple([int(year) for year in year_range_limits])
-        )
-
-        return year_ints
+        return parse_year_range(self.year_range)
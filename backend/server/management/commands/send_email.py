@@ -1,20 +1,22 @@
 """Django command for sending predictions via email."""
 
 import os
-from datetime import datetime
-from typing import List, Union
+from typing import Dict, List, Tuple, Union
 
 from django.core.management.base import BaseCommand
 from django.template.loader import get_template
-from django.utils import timezone
 import sendgrid
 from sendgrid.helpers.mail import Mail
 
-from server.models import Match
 from server.models.ml_model import PredictionType
+from server.round_predictions import (
+    ConsolidatedPrediction,
+    ModelPrediction,
+    fetch_round_predictions,
+)
+from server.round_state import fetch_round_state
+from server.routers import replica_reads
 
-JAN = 1
-FIRST = 1
 EMAIL_FROM = "tipresias@tipresias.com"
 PREDICTION_HEADERS = [
     "Date",
@@ -35,30 +37,46 @@ class Command(BaseCommand):
     (either the upcoming round or most recently-played round).
     """
 
+    @replica_reads()
     def handle(self, *_args, **_kwargs):
         """Run 'send_email' command."""
-        right_now = timezone.localtime()
-        future_matches = Match.objects.filter(start_date_time__gt=right_now)
+        upcoming_match = fetch_round_state()["next_match"]
 
-        if future_matches.count() == 0:
+        if upcoming_match is None:
             return None
 
-        upcoming_match = future_matches.earliest("start_date_time")
-        upcoming_match_year = upcoming_match.start_date_time.year
-        upcoming_round = upcoming_match.round_number
+        upcoming_round = upcoming_match["round_number"]
+        round_predictions = fetch_round_predictions(
+            upcoming_match["season"], upcoming_round
+        )
 
-        upcoming_matches = Match.objects.filter(
-            start_date_time__gt=timezone.make_aware(
-                datetime(upcoming_match_year, JAN, FIRST)
-            ),
-            round_number=upcoming_round,
-        ).prefetch_related("teammatch_set", "prediction_set")
+        model_predictions: Dict[Tuple[int, str], ModelPrediction] = {
+            (
+                prediction["match__id"],
+                prediction["ml_model__prediction_type"],
+            ): prediction
+            for prediction in round_predictions["model_predictions"]
+        }
+        non_principal_predictions: Dict[int, ModelPrediction] = {
+            prediction["match__id"]: prediction
+            for prediction in round_predictions["model_predictions"]
+            if not prediction["ml_model__is_principal"]
+        }
 
         prediction_rows = [
-            self.__map_prediction_to_row(match)
-            for match in sorted(
-                upcoming_matches, key=lambda match: match.start_date_time
+            self.__map_prediction_to_row(
+                match_prediction,
+                margin_prediction=model_predictions[
+                    (match_prediction["match__id"], PredictionType.MARGIN)
+                ],
+                probability_prediction=model_predictions[
+                    (match_prediction["match__id"], PredictionType.WIN_PROBABILITY)
+                ],
+                secondary_prediction=non_principal_predictions[
+                    match_prediction["match__id"]
+                ],
             )
+            for match_prediction in round_predictions["match_predictions"]
         ]
 
         self.__send_tips_email(prediction_rows, upcoming_round)
@@ -66,44 +84,39 @@ class Command(BaseCommand):
         return None
 
     @staticmethod
-    def __map_prediction_to_row(match: Match) -> List[Union[str, int]]:
-        home_team = match.teammatch_set.get(at_home=True).team.name
-        away_team = match.teammatch_set.get(at_home=False).team.name
-
-        match_predictions = match.prediction_set.filter(
-            ml_model__used_in_competitions=True
-        )
-
-        margin_prediction = match_predictions.get(
-            ml_model__prediction_type=PredictionType.MARGIN,
-        )
-        probability_prediction = match_predictions.get(
-            ml_model__prediction_type=PredictionType.WIN_PROBABILITY,
-        )
-
-        principal_predicted_winner = match_predictions.get(
-            ml_model__is_principal=True
-        ).predicted_winner.name
-        secondary_predicted_winner = match_predictions.get(
-            ml_model__is_principal=False
-        ).predicted_winner.name
-
+    def __map_prediction_to_row(
+        match_prediction: ConsolidatedPrediction,
+        margin_prediction: ModelPrediction,
+        probability_prediction: ModelPrediction,
+        secondary_prediction: ModelPrediction,
+    ) -> List[Union[str, int]]:
+        # We display each model's own predictions rather than the consolidated ones,
+        # so the probability can be for the team that the principal model didn't pick
         different_winner_label = (
             ""
-            if principal_predicted_winner == secondary_predicted_winner
-            else secondary_predicted_winner
+            if match_prediction["predictions_agree"]
+            else secondary_prediction["predicted_winner__name"]
         )
 
-        display_predicted_margin = round(margin_prediction.predicted_margin, 2)
+        predicted_margin = margin_prediction["predicted_margin"]
+        predicted_win_probability = probability_prediction["predicted_win_probability"]
+
+        # Each competition model's prediction should have a value for its type,
+        # but we leave the cell blank rather than fail the whole email if not
+        display_predicted_margin = (
+            "" if predicted_margin is None else str(round(predicted_margin, 2))
+        )
         display_predicted_win_probability = (
-            str(round(probability_prediction.predicted_win_probability * 100, 2)) + "%"
+            ""
+            if predicted_win_probability is None
+            else str(round(predicted_win_probability * 100, 2)) + "%"
         )
 
         return [
-            str(match.start_date_time),
-            home_team,
-            away_team,
-            principal_predicted_winner,
+            str(match_prediction["match__start_date_time"]),
+            match_prediction["home_team__name"],
+            match_prediction["away_team__name"],
+            match_prediction["predicted_winner__name"],
             display_predicted_margin,
             display_predicted_win_probability,
             different_winner_label,
@@ -0,0 +1,333 @@
+"""Django middleware for the server app."""
+
+from typing import Callable, Dict, Optional
+import asyncio
+import gzip
+import json
+import logging
+import re
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.crypto import constant_time_compare
+
+from server import tracing
+from server.profiling import RequestProfile, profile_thread
+
+# Brotli is optional, because it needs a compiled extension
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Moderate levels suit dynamic responses: higher levels cost much more CPU
+# for slightly smaller bodies
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+
+ACCEPTS_ENCODING_REGEX = re.compile(
+    r"(?:^|,)\s*(?P<encoding>[\w*-]+)\s*(?:;\s*q\s*=\s*(?P<quality>[\d.]+))?"
+)
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+
+profiling_logger = logging.getLogger("server.profiling")
+
+
+def _compress_gzip(content: bytes) -> bytes:
+    # A fixed mtime makes the same content compress to the same bytes
+    return gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _compress_brotli(content: bytes) -> bytes:
+    return brotli.compress(content, quality=BROTLI_QUALITY)
+
+
+COMPRESSORS: Dict[str, Callable[[bytes], bytes]] = {"gzip": _compress_gzip}
+
+if brotli is not None:
+    # Brotli comes first, because it makes smaller bodies than gzip at similar speeds
+    COMPRESSORS = {"br": _compress_brotli, **COMPRESSORS}
+
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    encodings: Dict[str, float] = {}
+
+    for match in ACCEPTS_ENCODING_REGEX.finditer(accept_encoding):
+        try:
+            quality = float(match.group("quality") or 1)
+        except ValueError:
+            quality = 0
+
+        encodings[match.group("encoding").lower()] = quality
+
+    return encodings
+
+
+def _choose_encoding(accept_encoding: str) -> Optional[str]:
+    accepted_encodings = _accepted_encodings(accept_encoding)
+    wildcard_quality = accepted_encodings.get("*", 0)
+    qualities = {
+        encoding: accepted_encodings.get(encoding, wildcard_quality)
+        for encoding in COMPRESSORS
+    }
+    encoding, quality = max(
+        qualities.items(),
+        # Ties go to the encoding that comes first
+        key=lambda encoding_quality: encoding_quality[1],
+    )
+
+    return encoding if quality > 0 else None
+
+
+class CompressionMiddleware:
+    """
+    Compress response bodies with brotli or gzip, per the Accept-Encoding header.
+
+    Compressing small bodies doesn't save enough bytes to be worth the CPU time,
+    so bodies must be at least COMPRESSION_MIN_SIZE bytes. Streaming responses
+    (e.g. static files, which whitenoise compresses ahead of time) are left as is.
+    """
+
+    # Supports both, so ASGI requests don't have to go through a sync thread
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+        if asyncio.iscoroutinefunction(get_response):
+            # Marks this middleware as async for Django's handler,
+            # the same way that Django's MiddlewareMixin does.
+            # pylint: disable=protected-access
+            self._is_coroutine = asyncio.coroutines._is_coroutine  # type: ignore
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """Compress the response if the client accepts it."""
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """Compress the response from an async handler if the client accepts it."""
+        return self.process_response(request, await self.get_response(request))
+
+    @staticmethod
+    def process_response(request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        """Compress the response body if it's big enough and the client accepts it."""
+        if (
+            response.streaming
+            or response.has_header("Content-Encoding")
+            or len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = _choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+
+        if encoding is None:
+            return response
+
+        compressed_content = COMPRESSORS[encoding](response.content)
+
+        if len(compressed_content) >= len(response.content):
+            return response
+
+        response.content = compressed_content
+        response["Content-Length"] = str(len(compressed_content))
+        response["Content-Encoding"] = encoding
+
+        # The compressed body isn't byte-for-byte identical to the original,
+        # so strong ETags would be wrong
+        if response.has_header("ETag"):
+            response["ETag"] = re.sub(r'^"', 'W/"', response["ETag"])
+
+        return response
+
+
+class TracingMiddleware:
+    """
+    Time each request as a span, continuing the trace from its traceparent header.
+
+    The span is named after the URL pattern that handled the request,
+    so requests to the same view get grouped together.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+        if asyncio.iscoroutinefunction(get_response):
+            # pylint: disable=protected-access
+            self._is_coroutine = asyncio.coroutines._is_coroutine  # type: ignore
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """Handle the request in a span."""
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        with self._span(request) as span:
+            response = self.get_response(request)
+            self._finish_span(span, request, response)
+
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """Handle the request to an async handler in a span."""
+        with self._span(request) as span:
+            response = await self.get_response(request)
+            self._finish_span(span, request, response)
+
+        return response
+
+    @staticmethod
+    def _span(request: HttpRequest):
+        return tracing.span(
+            f"{request.method} {request.path}",
+            kind="server",
+            attributes={"http.method": request.method, "http.target": request.path},
+            parent=tracing.parse_traceparent(request.headers.get("traceparent")),
+        )
+
+    @staticmethod
+    def _finish_span(
+        span: tracing.Span, request: HttpRequest, response: HttpResponse
+    ) -> None:
+        resolver_match = getattr(request, "resolver_match", None)
+
+        if resolver_match is not None:
+            route = "/" + resolver_match.route.lstrip("^").rstrip("$")
+            span.name = f"{request.method} {route}"
+            span.set_attribute("http.route", route)
+
+        span.set_attribute("http.status_code", response.status_code)
+
+        if response.status_code >= 500:
+            span.status = "error"
+
+
+def _should_profile(request: HttpRequest) -> bool:
+    if settings.REQUEST_PROFILING:
+        return True
+
+    profile_header = request.META.get(PROFILE_HEADER)
+
+    if profile_header is None:
+        return False
+
+    # Profiles reveal details about our queries, so outside of development,
+    # clients have to know the token to ask for them
+    if settings.DEBUG:
+        return True
+
+    return bool(settings.REQUEST_PROFILING_TOKEN) and constant_time_compare(
+        profile_header, settings.REQUEST_PROFILING_TOKEN
+    )
+
+
+def _server_timing(profile: RequestProfile, response_size: Optional[int]) -> str:
+    timings = profile.timings()
+    repeated_shape_count = len(profile.repeated_query_shapes())
+    db_description = f"{profile.query_count} queries" + (
+        f" ({repeated_shape_count} repeated)" if repeated_shape_count else ""
+    )
+    metrics = [
+        f"total;dur={timings['total']:.1f}",
+        f'db;dur={timings["db"]:.1f};desc="{db_description}"',
+        f"pandas;dur={timings['pandas']:.1f}",
+        f"graphql;dur={timings['graphql']:.1f}",
+        f"python;dur={timings['python']:.1f}",
+    ]
+
+    if response_size is not None:
+        metrics.append(f'size;desc="{response_size} bytes"')
+
+    return ", ".join(metrics)
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests and report where their time went.
+
+    Profiled responses get a Server-Timing header with the time spent
+    on DB queries, pandas, GraphQL execution, and other Python code,
+    along with the query count and the response size. Requests that take at least
+    SLOW_REQUEST_THRESHOLD milliseconds get logged with their slowest query shapes,
+    and requests that repeat query shapes get logged as possible N+1 patterns.
+
+    Every request gets profiled when REQUEST_PROFILING is on. Otherwise,
+    only requests with an X-Profile header do, and only if DEBUG is on
+    or the header's value is REQUEST_PROFILING_TOKEN. This needs to be
+    the first middleware, so the profile includes the others' work.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+        if asyncio.iscoroutinefunction(get_response):
+            # pylint: disable=protected-access
+            self._is_coroutine = asyncio.coroutines._is_coroutine  # type: ignore
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """Profile the request if it's enabled."""
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+
+        if not _should_profile(request):
+            return self.get_response(request)
+
+        with RequestProfile().activate() as profile, profile_thread():
+            response = self.get_response(request)
+
+        return self._report(request, response, profile)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """Profile the request to an async handler if it's enabled."""
+        if not _should_profile(request):
+            return await self.get_response(request)
+
+        # DB work happens in thread pools, which profile themselves
+        # (see server/concurrency.py)
+        with RequestProfile().activate() as profile:
+            response = await self.get_response(request)
+
+        return self._report(request, response, profile)
+
+    @staticmethod
+    def _report(
+        request: HttpRequest, response: HttpResponse, profile: RequestProfile
+    ) -> HttpResponse:
+        response_size = None if response.streaming else len(response.content)
+        response["Server-Timing"] = _server_timing(profile, response_size)
+
+        is_slow = profile.timings()["total"] >= settings.SLOW_REQUEST_THRESHOLD
+        has_repeated_queries = any(profile.repeated_query_shapes())
+
+        if not is_slow and not has_repeated_queries:
+            return response
+
+        log_message = json.dumps(
+            {
+                "event": "slow_request" if is_slow else "repeated_queries",
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "responseSize": response_size,
+                **profile.summary(),
+            }
+        )
+
+        if is_slow:
+            profiling_logger.warning(log_message)
+        else:
+            profiling_logger.info(log_message)
+
+        return response
@@ -0,0 +1,54 @@
+# Generated by Django 3.1.4 on 2026-10-19 07:36
+
+from django.db import migrations, models
+from django.db.models.functions import ExtractYear
+
+
+def set_match_seasons(apps, _schema_editor):
+    Match = apps.get_model("server", "Match")
+    Match.objects.update(season=ExtractYear("start_date_time"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0013_auto_20201023_0712'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='season',
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(set_match_seasons, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='match',
+            name='season',
+            field=models.PositiveSmallIntegerField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['season', 'round_number', 'start_date_time'], name='match_season_round_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='teammatch',
+            index=models.Index(fields=['match', 'at_home', 'team', 'score'], name='teammatch_match_at_home_idx'),
+        ),
+        # Keep the most-recent prediction for each match/model,
+        # because duplicates would prevent us from adding the unique constraint.
+        migrations.RunSQL(
+            """
+            DELETE FROM server_prediction AS prediction
+            USING server_prediction AS newer_prediction
+            WHERE prediction.match_id = newer_prediction.match_id
+                AND prediction.ml_model_id = newer_prediction.ml_model_id
+                AND prediction.id < newer_prediction.id
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='prediction',
+            constraint=models.UniqueConstraint(fields=('match', 'ml_model'), name='unique_match_and_ml_model'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.1.4 on 2026-10-19 07:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0014_auto_20261019_0736'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModelRoundMetrics',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('season', models.PositiveSmallIntegerField()),
+                ('round_number', models.PositiveSmallIntegerField()),
+                ('cumulative_correct_count', models.PositiveIntegerField(default=0)),
+                ('cumulative_accuracy', models.FloatField(default=0)),
+                ('cumulative_mean_absolute_error', models.FloatField(default=0)),
+                ('cumulative_margin_difference', models.FloatField(default=0)),
+                ('cumulative_bits', models.FloatField(default=0)),
+                ('ml_model', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='server.mlmodel')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='modelroundmetrics',
+            constraint=models.UniqueConstraint(fields=('season', 'round_number', 'ml_model'), name='unique_season_round_number_and_ml_model'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.1.4 on 2026-10-19 09:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0015_auto_20261019_0741'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE SEQUENCE server_data_version",
+            reverse_sql="DROP SEQUENCE server_data_version",
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.1.4 on 2026-10-19 10:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0016_auto_20261019_0912'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['start_date_time'], name='match_start_date_time_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.1.4 on 2026-10-19 11:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0017_auto_20261019_1010'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('predictions', 'Predictions'), ('fixtures', 'Fixtures'), ('matches', 'Matches')], max_length=20)),
+                ('payload', models.JSONField()),
+                ('content_hash', models.CharField(max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='ingestionjob',
+            index=models.Index(fields=['status', 'created_at'], name='ingestion_job_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='ingestionjob',
+            constraint=models.UniqueConstraint(condition=models.Q(status__in=['pending', 'running']), fields=('content_hash',), name='unique_active_content_hash'),
+        ),
+    ]
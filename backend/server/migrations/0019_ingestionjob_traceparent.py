@@ -0,0 +1,18 @@
+# Generated by Django 3.1.4 on 2026-10-19 09:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0018_auto_20261019_1110'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestionjob',
+            name='traceparent',
+            field=models.CharField(blank=True, default='', max_length=55),
+        ),
+    ]
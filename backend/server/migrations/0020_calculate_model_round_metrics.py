@@ -0,0 +1,43 @@
+from django.db import migrations
+
+from server.graphql.calculations import cumulative_metrics_query
+from server.models.model_round_metrics import CUMULATIVE_METRICS
+
+
+# Metrics used to be calculated the first time they were requested, but now they're
+# only calculated when results get saved, so we need to fill in existing seasons.
+def calculate_model_round_metrics(apps, _schema_editor):
+    Match = apps.get_model("server", "Match")
+    Prediction = apps.get_model("server", "Prediction")
+    ModelRoundMetrics = apps.get_model("server", "ModelRoundMetrics")
+
+    ModelRoundMetrics.objects.all().delete()
+
+    for season in Match.objects.values_list("season", flat=True).distinct():
+        round_metrics = cumulative_metrics_query(
+            Prediction.objects.filter(
+                match__season=season, match__margin__isnull=False
+            )
+        )
+        ModelRoundMetrics.objects.bulk_create(
+            [
+                ModelRoundMetrics(
+                    season=season,
+                    round_number=metrics["match__round_number"],
+                    ml_model_id=metrics["ml_model_id"],
+                    **{metric: metrics[metric] for metric in CUMULATIVE_METRICS},
+                )
+                for metrics in round_metrics
+            ]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('server', '0019_ingestionjob_traceparent'),
+    ]
+
+    operations = [
+        migrations.RunPython(calculate_model_round_metrics, migrations.RunPython.noop),
+    ]
@@ -5,3 +5,5 @@ from .ml_model import MLModel
 from .prediction import Prediction
 from .team_match import TeamMatch
 from .team import Team
+from .model_round_metrics import ModelRoundMetrics
+from .ingestion_job import IngestionJob
@@ -0,0 +1,206 @@
+"""Data model for queued data-ingestion jobs."""
+
+from typing import Any, Dict, Optional, Tuple
+from datetime import timedelta
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class JobKind(models.TextChoices):
+    """Enum for the types of data that jobs ingest, named after their endpoints."""
+
+    # Django derives the same labels from the names, and leaving them out
+    # lets mypy see the members as strings
+    PREDICTIONS = "predictions"
+    FIXTURES = "fixtures"
+    MATCHES = "matches"
+
+
+class JobStatus(models.TextChoices):
+    """Enum for the stages of a job's lifecycle."""
+
+    PENDING = "pending", _("Pending")
+    RUNNING = "running", _("Running")
+    SUCCEEDED = "succeeded", _("Succeeded")
+    FAILED = "failed", _("Failed")
+
+
+ACTIVE_STATUSES = [JobStatus.PENDING, JobStatus.RUNNING]
+
+
+def payload_hash(kind: str, payload: Dict[str, Any]) -> str:
+    """Return a hash that's the same for identical payloads of the same kind."""
+    content = json.dumps([kind, payload], sort_keys=True, separators=(",", ":"))
+
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class IngestionJob(models.Model):
+    """
+    Data model for a request to ingest data that workers process in the background.
+
+    Workers claim pending jobs with SELECT ... FOR UPDATE SKIP LOCKED,
+    so each job runs once, however many workers there are. Posting a payload
+    that's identical to one that's queued, running, or recently succeeded
+    returns the existing job, so retried requests don't process the same data again.
+
+    Attributes:
+    -----------
+    kind: Type of data to ingest.
+    payload: Request body with the data.
+    content_hash: Hash of the kind & payload for finding duplicate jobs.
+    status: Stage of the job's lifecycle.
+    attempts: Number of times that workers have started the job.
+    result: JSON data returned by the job, if any.
+    error: Traceback from the job's last failure.
+    created_at: When the job was queued.
+    started_at: When a worker last started the job.
+    finished_at: When the job succeeded or failed for the last time.
+    traceparent: Trace context of the request that queued the job,
+        so the job's span joins the same trace.
+    """
+
+    class Meta:
+        """Meta class for including more-advanced attributes & validations."""
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_hash"],
+                condition=Q(status__in=ACTIVE_STATUSES),
+                name="unique_active_content_hash",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["status", "created_at"], name="ingestion_job_status_idx"
+            )
+        ]
+
+    kind = models.CharField(max_length=20, choices=JobKind.choices)
+    payload = models.JSONField()
+    content_hash = models.CharField(max_length=64)
+    status = models.CharField(
+        max_length=20, choices=JobStatus.choices, default=JobStatus.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    traceparent = models.CharField(max_length=55, blank=True, default="")
+
+    @classmethod
+    def enqueue(
+        cls, kind: str, payload: Dict[str, Any], traceparent: str = ""
+    ) -> Tuple["IngestionJob", bool]:
+        """
+        Queue a job, unless there's a duplicate that's active or recently succeeded.
+
+        Params:
+        -------
+        kind: Type of data to ingest.
+        payload: Request body with the data.
+        traceparent: Trace context of the request that queued the job.
+
+        Returns:
+        --------
+        The new or existing job, and whether it's new.
+        """
+        content_hash = payload_hash(kind, payload)
+        deduplication_start_time = timezone.now() - timedelta(
+            seconds=settings.INGESTION_JOB_DEDUPLICATION_WINDOW
+        )
+        duplicate_jobs = cls.objects.filter(content_hash=content_hash)
+        existing_job = (
+            duplicate_jobs.filter(
+                Q(status__in=ACTIVE_STATUSES)
+                | Q(
+                    status=JobStatus.SUCCEEDED,
+                    finished_at__gte=deduplication_start_time,
+                )
+            )
+            .order_by("-created_at")
+            .first()
+        )
+
+        if existing_job is not None:
+            return existing_job, False
+
+        try:
+            with transaction.atomic():
+                return (
+                    cls.objects.create(
+                        kind=kind,
+                        payload=payload,
+                        content_hash=content_hash,
+                        traceparent=traceparent,
+                    ),
+                    True,
+                )
+        # Another request queued the same payload after we checked
+        except IntegrityError:
+            return duplicate_jobs.get(status__in=ACTIVE_STATUSES), False
+
+    @classmethod
+    def claim_next(cls) -> Optional["IngestionJob"]:
+        """
+        Start the oldest job that's waiting to run, skipping jobs that are locked.
+
+        Running jobs that have taken longer than INGESTION_JOB_TIMEOUT are assumed
+        to belong to workers that died, so they can be claimed again.
+
+        Returns:
+        --------
+        The claimed job, or None if there aren't any waiting.
+        """
+        right_now = timezone.now()
+        stale_start_time = right_now - timedelta(
+            seconds=settings.INGESTION_JOB_TIMEOUT
+        )
+
+        with transaction.atomic():
+            job = (
+                cls.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=JobStatus.PENDING)
+                    | Q(status=JobStatus.RUNNING, started_at__lt=stale_start_time)
+                )
+                .order_by("created_at")
+                .first()
+            )
+
+            if job is None:
+                return None
+
+            job.status = JobStatus.RUNNING
+            job.attempts += 1
+            job.started_at = right_now
+            job.save(update_fields=["status", "attempts", "started_at"])
+
+        return job
+
+    def succeed(self, result: Any = None) -> None:
+        """Record the job's result."""
+        self.status = JobStatus.SUCCEEDED
+        self.result = result
+        self.error = ""
+        self.finished_at = timezone.now()
+        self.save(update_fields=["status", "result", "error", "finished_at"])
+
+    def fail(self, error: str) -> None:
+        """Record the job's error, queueing it again if it has attempts left."""
+        self.status = (
+            JobStatus.PENDING
+            if self.attempts < settings.INGESTION_JOB_MAX_ATTEMPTS
+            else JobStatus.FAILED
+        )
+        self.error = error
+        self.finished_at = timezone.now()
+        self.save(update_fields=["status", "error", "finished_at"])
@@ -19,6 +19,21 @@ from .team import Team
 # Rough estimate, but exactitude isn't necessary here
 GAME_LENGTH_HRS = 3
 WEEK_IN_DAYS = 7
+RESULTS_KEY_COLS = ["year", "round_number", "home_team", "away_team"]
+PENDING_RESULTS_COLS = [
+    "id",
+    "start_date_time",
+    "round_number",
+    "venue",
+    "year",
+    "home_team",
+    "home_team_id",
+    "home_team_match_id",
+    "away_team",
+    "away_team_id",
+    "away_team_match_id",
+    "results_key",
+]
 
 
 def validate_is_utc(start_date_time: datetime) -> None:
@@ -29,6 +44,15 @@ def validate_is_utc(start_date_time: datetime) -> None:
     raise ValidationError(_("%(start_date_time)s is not set to the UTC"))
 
 
+def _hash_results_key(data_frame: pd.DataFrame) -> pd.Series:
+    # Hashing the composite key lets us join results data to match records
+    # on a single integer column instead of four mixed-type ones.
+    return pd.util.hash_pandas_object(
+        data_frame.loc[:, RESULTS_KEY_COLS].astype({"year": int, "round_number": int}),
+        index=False,
+    )
+
+
 class Match(models.Model):
     """Data model for AFL matches."""
 
@@ -39,6 +63,9 @@ class Match(models.Model):
     margin = models.IntegerField(
         null=True, blank=True, validators=[MinValueValidator(0)]
     )
+    # Denormalised from start_date_time, because most queries filter by season
+    # and round, and they can't use an index on the timestamp to do it.
+    season = models.PositiveSmallIntegerField(editable=False)
 
     class Meta:
         """Meta class for including more-advanced attributes & validations."""
@@ -49,6 +76,24 @@ class Match(models.Model):
                 name="unique_start_date_time_and_venue",
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["season", "round_number", "start_date_time"],
+                name="match_season_round_idx",
+            ),
+            # For finding the latest/next match relative to the current time
+            models.Index(fields=["start_date_time"], name="match_start_date_time_idx"),
+        ]
+
+    def save(self, *args, **kwargs):  # pylint: disable=signature-differs
+        """Keep the season in sync with the start_date_time before saving."""
+        self.season = self.start_date_time.year
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "start_date_time" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "season"}
+
+        super().save(*args, **kwargs)
 
     @classmethod
     def get_or_create_from_raw_data(
@@ -124,19 +169,197 @@ class Match(models.Model):
         """
         Fill in match results data for all matches that have been played.
 
+        Rather than updating one match at a time, we join the results data
+        to all played matches without results on a hash of their year, round number,
+        and team names, then save scores, winners, margins, and prediction correctness
+        with a fixed number of bulk queries. Cumulative model metrics are recalculated
+        from the earliest round with new results.
+
         Params:
         -------
         match_results: Raw match results data.
         """
-        for match in cls.played_without_results():
-            match_result = match_results.query(
-                "year == @match.year & "
-                "round_number == @match.round_number & "
-                "home_team == @match.team(at_home=True).name & "
-                "away_team == @match.team(at_home=False).name"
+        # Importing here to avoid circular imports, because both models
+        # have foreign keys to Match
+        from .team_match import TeamMatch  # pylint: disable=import-outside-toplevel
+        from .prediction import Prediction  # pylint: disable=import-outside-toplevel
+        from .model_round_metrics import (  # pylint: disable=import-outside-toplevel
+            ModelRoundMetrics,
+        )
+
+        pending_matches = cls._pending_results_data()
+
+        if pending_matches.empty or match_results.empty:
+            cls._validate_results_presence(pending_matches)
+            return None
+
+        reconciled_matches = cls._reconcile_results(pending_matches, match_results)
+        cls._validate_results_presence(reconciled_matches)
+
+        played_matches = reconciled_matches.dropna(
+            subset=["home_score", "away_score"]
+        ).astype({"home_score": int, "away_score": int, "margin": int})
+
+        if played_matches.empty:
+            return None
+
+        assert (played_matches.loc[:, ["home_score", "away_score"]] >= 0).all().all(), (
+            "Match results should have non-negative scores, but received:\n"
+            f"{played_matches}"
+        )
+
+        team_matches = [
+            TeamMatch(id=team_match_id, score=score)
+            for team_match_id, score in zip(
+                pd.concat(
+                    [
+                        played_matches["home_team_match_id"],
+                        played_matches["away_team_match_id"],
+                    ]
+                ),
+                pd.concat([played_matches["home_score"], played_matches["away_score"]]),
+            )
+        ]
+        matches = [
+            cls(id=match_id, winner_id=winner_id, margin=margin)
+            for match_id, winner_id, margin in zip(
+                played_matches["id"],
+                played_matches["winner_id"],
+                played_matches["margin"],
             )
+        ]
 
-            match.update_result(match_result)
+        with transaction.atomic():
+            TeamMatch.objects.bulk_update(team_matches, ["score"])
+            cls.objects.bulk_update(matches, ["winner", "margin"])
+            Prediction.update_correctness_for_matches(
+                [int(match_id) for match_id in played_matches["id"]]
+            )
+
+            # Cumulative metrics for rounds before the earliest new results
+            # are still valid, so we only recalculate from there onward.
+            for season, round_number in (
+                played_matches.groupby("year")["round_number"].min().items()
+            ):
+                ModelRoundMetrics.recalculate(int(season), int(round_number))
+
+        return None
+
+    @classmethod
+    def _pending_results_data(cls) -> pd.DataFrame:
+        team_match_values = (
+            cls.objects.filter(id__in=cls.played_without_results().values("id"))
+            .values(
+                "id",
+                "start_date_time",
+                "round_number",
+                "venue",
+                "teammatch__id",
+                "teammatch__at_home",
+                "teammatch__team_id",
+                "teammatch__team__name",
+            )
+            .order_by("start_date_time", "id")
+        )
+
+        team_matches = pd.DataFrame(list(team_match_values))
+
+        if team_matches.empty:
+            return pd.DataFrame(columns=PENDING_RESULTS_COLS)
+
+        home_team_matches = team_matches.query("teammatch__at_home == True").set_index(
+            "id"
+        )
+        away_team_matches = team_matches.query("teammatch__at_home == False").set_index(
+            "id"
+        )
+
+        return (
+            home_team_matches.loc[:, ["start_date_time", "round_number", "venue"]]
+            .assign(
+                year=lambda df: pd.to_datetime(df["start_date_time"], utc=True).dt.year,
+                home_team=home_team_matches["teammatch__team__name"],
+                home_team_id=home_team_matches["teammatch__team_id"],
+                home_team_match_id=home_team_matches["teammatch__id"],
+                away_team=away_team_matches["teammatch__team__name"],
+                away_team_id=away_team_matches["teammatch__team_id"],
+                away_team_match_id=away_team_matches["teammatch__id"],
+            )
+            .reset_index()
+            .assign(results_key=_hash_results_key)
+            .loc[:, PENDING_RESULTS_COLS]
+        )
+
+    @staticmethod
+    def _reconcile_results(
+        pending_matches: pd.DataFrame, match_results: pd.DataFrame
+    ) -> pd.DataFrame:
+        results = match_results.assign(results_key=_hash_results_key).loc[
+            :, ["results_key", "home_score", "away_score"]
+        ]
+        relevant_results = results[
+            results["results_key"].isin(pending_matches["results_key"])
+        ]
+        duplicate_results = relevant_results[
+            relevant_results["results_key"].duplicated(keep=False)
+        ]
+
+        assert duplicate_results.empty, (
+            "Filtering match results by year, round_number and team name "
+            "should result in a single row per match, but instead the following "
+            "were returned:\n"
+            f"{match_results.loc[duplicate_results.index, :]}"
+        )
+
+        return pending_matches.merge(
+            relevant_results, on="results_key", how="left"
+        ).assign(
+            margin=lambda df: (df["home_score"] - df["away_score"]).abs(),
+            winner_id=lambda df: df["home_team_id"]
+            .where(df["home_score"] > df["away_score"], df["away_team_id"])
+            .astype(object)
+            .mask(df["home_score"] == df["away_score"], None),
+        )
+
+    @staticmethod
+    def _validate_results_presence(reconciled_matches: pd.DataFrame):
+        if "home_score" in reconciled_matches.columns:
+            missing_results = reconciled_matches[
+                reconciled_matches["home_score"].isna()
+            ]
+        else:
+            missing_results = reconciled_matches
+
+        if missing_results.empty:
+            return None
+
+        # AFLTables usually updates match results a few days after the round
+        # is finished. Allowing for the occasional delay, we accept matches without
+        # results data for a week before raising an error.
+        one_week_ago = timezone.localtime() - timedelta(days=WEEK_IN_DAYS)
+        is_recent = (
+            pd.to_datetime(missing_results["start_date_time"], utc=True) > one_week_ago
+        )
+
+        for _, match in missing_results[is_recent].iterrows():
+            warn(
+                f"Unable to update the match between {match['home_team']} "
+                f"and {match['away_team']} from round {match['round_number']}. "
+                "This is likely due to AFLTables not having updated the match results "
+                "yet."
+            )
+
+        overdue_results = missing_results.loc[
+            ~is_recent,
+            ["start_date_time", "round_number", "venue", "home_team", "away_team"],
+        ]
+
+        assert overdue_results.empty, (
+            "Didn't find any match data rows that matched match records:\n"
+            f"{overdue_results}"
+        )
+
+        return None
 
     def update_result(self, match_result: pd.DataFrame):
         """
@@ -0,0 +1,116 @@
+"""Data model for cumulative performance metrics of ML models per round."""
+
+from django.db import models, transaction
+
+from .ml_model import MLModel
+from .prediction import Prediction
+
+
+CUMULATIVE_METRICS = [
+    "cumulative_correct_count",
+    "cumulative_accuracy",
+    "cumulative_mean_absolute_error",
+    "cumulative_margin_difference",
+    "cumulative_bits",
+]
+
+
+class ModelRoundMetrics(models.Model):
+    """
+    Cumulative performance metrics for an ML model through a given round of a season.
+
+    Calculating cumulative metrics requires all predictions for the season
+    up to the given round, but they only change when match results or predictions
+    are saved, so we calculate them once in the DB and save them here.
+    Functions that save match results or predictions for played matches recalculate
+    the metrics once per batch of records, from the earliest round that changed.
+
+    Attributes:
+    -----------
+    season: Year of the season.
+    round_number: Round of the season through which metrics are calculated.
+    ml_model: Model that made the predictions.
+    cumulative_correct_count: Number of correct tips.
+    cumulative_accuracy: Mean of correct tips.
+    cumulative_mean_absolute_error: Mean absolute difference between
+        predicted and actual margins.
+    cumulative_margin_difference: Sum of absolute differences between
+        predicted and actual margins.
+    cumulative_bits: Sum of bits per predicted win probability.
+    """
+
+    class Meta:
+        """Meta class for including more-advanced attributes & validations."""
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["season", "round_number", "ml_model"],
+                name="unique_season_round_number_and_ml_model",
+            )
+        ]
+
+    updated_at = models.DateTimeField(auto_now=True, null=False, blank=False)
+    season = models.PositiveSmallIntegerField()
+    round_number = models.PositiveSmallIntegerField()
+    ml_model = models.ForeignKey(MLModel, on_delete=models.CASCADE)
+    cumulative_correct_count = models.PositiveIntegerField(default=0)
+    cumulative_accuracy = models.FloatField(default=0)
+    cumulative_mean_absolute_error = models.FloatField(default=0)
+    cumulative_margin_difference = models.FloatField(default=0)
+    cumulative_bits = models.FloatField(default=0)
+
+    @classmethod
+    def invalidate(cls, season: int, round_number: int = 1) -> None:
+        """
+        Delete metrics that depend on the given round's matches & predictions.
+
+        Params:
+        -------
+        season: Year of the season.
+        round_number: Earliest round whose metrics are out of date.
+        """
+        cls.objects.filter(season=season, round_number__gte=round_number).delete()
+
+    @classmethod
+    def recalculate(cls, season: int, round_number: int = 1) -> None:
+        """
+        Recalculate metrics for the given round and all subsequent rounds.
+
+        Params:
+        -------
+        season: Year of the season.
+        round_number: Earliest round to recalculate. Metrics for earlier rounds
+            are left as they are.
+        """
+        # Importing here to avoid circular imports, because the graphql package
+        # imports models for its resolvers
+        from server.graphql.calculations import (  # pylint: disable=import-outside-toplevel
+            cumulative_metrics_query,
+        )
+
+        # Window functions are calculated after filtering, so we need predictions
+        # from earlier rounds, and we filter out their metrics afterwards.
+        round_metrics = cumulative_metrics_query(
+            Prediction.objects.filter(match__season=season)
+            # We don't want to include matches without results, which would impact
+            # mean-based metrics like accuracy and MAE
+            .filter(match__margin__isnull=False)
+        )
+
+        with transaction.atomic():
+            cls.invalidate(season, round_number)
+            cls.objects.bulk_create(
+                [
+                    cls(
+                        season=season,
+                        round_number=metrics["match__round_number"],
+                        ml_model_id=metrics["ml_model_id"],
+                        **{metric: metrics[metric] for metric in CUMULATIVE_METRICS},
+                    )
+                    for metrics in round_metrics
+                    if metrics["match__round_number"] >= round_number
+                ],
+                # Concurrent ingestion jobs can recalculate the same rounds
+                # at the same time.
+                ignore_conflicts=True,
+            )
@@ -1,13 +1,14 @@
 """Data model for ML predictions for AFL matches."""
 
-from typing import Tuple, Optional, cast, Literal, Union
+from typing import Tuple, Optional, cast, Literal, Union, List
 
-from django.db import models, transaction
+from django.db import models, transaction, connection
 from django.core.validators import MinValueValidator
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 import numpy as np
+from psycopg2.extras import execute_values
 from mypy_extensions import TypedDict
 
 from server.types import CleanPredictionData
@@ -37,6 +38,15 @@ class Prediction(models.Model):
     predicted_win_probability = models.FloatField(blank=True, null=True)
     is_correct = models.BooleanField(null=True, blank=True)
 
+    class Meta:
+        """Meta class for including more-advanced attributes & validations."""
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=["match", "ml_model"], name="unique_match_and_ml_model"
+            )
+        ]
+
     @classmethod
     def update_or_create_from_raw_data(
         cls, prediction_data: CleanPredictionData, future_only=False
@@ -186,7 +196,7 @@ class Prediction(models.Model):
         cls, prediction_data: CleanPredictionData, future_only
     ) -> Optional[MatchingAttributes]:
         matches = Match.objects.filter(
-            start_date_time__year=prediction_data["year"],
+            season=prediction_data["year"],
             round_number=prediction_data["round_number"],
             teammatch__team__name__in=[
                 prediction_data["home_team"],
@@ -243,6 +253,104 @@ class Prediction(models.Model):
                 )
             )
 
+    @classmethod
+    def bulk_update_or_create(
+        cls, predictions: List["Prediction"], batch_size: int = 1000
+    ) -> None:
+        """
+        Save many predictions, updating any that already exist for the same match/model.
+
+        This uses the unique (match, ml_model) constraint to upsert predictions
+        with INSERT ... ON CONFLICT, so we don't have to look up existing
+        records first. Like bulk_create, this skips model validation and doesn't
+        update is_correct, so call update_correctness_for_matches afterwards.
+
+        Params:
+        -------
+        predictions: Unsaved prediction records.
+        batch_size: Maximum number of predictions to save per query.
+        """
+        if not any(predictions):
+            return None
+
+        prediction_table = cls._meta.db_table  # pylint: disable=protected-access
+        prediction_values = [
+            (
+                prediction.match_id,
+                prediction.ml_model_id,
+                prediction.predicted_winner_id,
+                prediction.predicted_margin,
+                prediction.predicted_win_probability,
+            )
+            for prediction in predictions
+        ]
+
+        with connection.cursor() as cursor:
+            execute_values(
+                cursor.cursor,
+                f"""
+                INSERT INTO {prediction_table} (
+                    match_id,
+                    ml_model_id,
+                    predicted_winner_id,
+                    predicted_margin,
+                    predicted_win_probability,
+                    created_at,
+                    updated_at
+                )
+                VALUES %s
+                ON CONFLICT (match_id, ml_model_id) DO UPDATE
+                SET
+                    predicted_winner_id = EXCLUDED.predicted_winner_id,
+                    predicted_margin = EXCLUDED.predicted_margin,
+                    predicted_win_probability = EXCLUDED.predicted_win_probability,
+                    updated_at = EXCLUDED.updated_at
+                """,
+                prediction_values,
+                template="(%s, %s, %s, %s, %s, NOW(), NOW())",
+                page_size=batch_size,
+            )
+
+        return None
+
+    @classmethod
+    def update_correctness_for_matches(cls, match_ids: List[int]) -> None:
+        """
+        Update the correct attribute for all predictions for the given matches.
+
+        This is a bulk version of update_correctness that assumes the matches
+        have already been updated with their results. As with individual predictions,
+        draws count as correct tips.
+
+        Params:
+        -------
+        match_ids: IDs of match records that have results.
+        """
+        if not match_ids:
+            return None
+
+        prediction_table = cls._meta.db_table  # pylint: disable=protected-access
+        match_table = Match._meta.db_table  # pylint: disable=protected-access
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {prediction_table} AS prediction
+                SET
+                    is_correct = (
+                        played_match.margin = 0
+                        OR prediction.predicted_winner_id = played_match.winner_id
+                    ),
+                    updated_at = NOW()
+                FROM {match_table} AS played_match
+                WHERE prediction.match_id = played_match.id
+                    AND played_match.id = ANY(%s)
+                """,
+                [match_ids],
+            )
+
+        return None
+
     def update_correctness(self):
         """Update the correct attribute based on associated team_match scores."""
         self.is_correct = self._calculate_whether_correct()
@@ -24,6 +24,18 @@ class TeamMatch(models.Model):
     at_home = models.BooleanField()
     score = models.PositiveSmallIntegerField(default=0)
 
+    class Meta:
+        """Meta class for including more-advanced attributes & validations."""
+
+        indexes = [
+            # Including team and score lets queries for home/away teams and their
+            # scores read everything they need from the index.
+            models.Index(
+                fields=["match", "at_home", "team", "score"],
+                name="teammatch_match_at_home_idx",
+            )
+        ]
+
     @classmethod
     def get_or_create_from_raw_data(
         cls: Type[T], match: Match, match_data: Union[FixtureData, MatchData]
@@ -0,0 +1,275 @@
+"""
+Per-request profiles of where the time goes, for debugging slow responses.
+
+A profile records each DB query exactly, grouping queries by their shapes
+(SQL with literals & parameter lists collapsed), so repeated shapes point
+to N+1 patterns. Time spent in pandas and GraphQL execution is estimated
+by sampling the stacks of the request's threads, because tracing every call
+would slow requests down enough to distort the results.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Set
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from threading import Event, Lock, Thread, get_ident
+from time import perf_counter
+import re
+import sys
+
+from django.conf import settings
+from django.db import connections
+from mypy_extensions import TypedDict
+
+
+QueryShapeProfile = TypedDict(
+    "QueryShapeProfile", {"sql": str, "count": int, "duration": float}
+)
+
+SECONDS_TO_MILLISECONDS = 1000
+# Samples go to the category of the innermost frame from one of these modules,
+# and DB time comes from the query timings instead
+SAMPLE_CATEGORY_MODULES = {
+    "sql": ("django.db.backends", "psycopg2"),
+    "pandas": ("pandas", "numpy"),
+    "graphql": ("graphql", "graphene", "graphene_django"),
+}
+
+QUOTED_STRING_REGEX = re.compile(r"'(?:[^']|'')*'")
+NUMBER_REGEX = re.compile(r"\b\d+(?:\.\d+)?\b")
+PARAMETER_LIST_REGEX = re.compile(r"\(\s*(?:(?:%s|\?)\s*,\s*)+(?:%s|\?)\s*\)")
+WHITESPACE_REGEX = re.compile(r"\s+")
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+def query_shape(sql: str) -> str:
+    """
+    Reduce a SQL query to its shape, so queries that differ only in values match.
+
+    Params:
+    -------
+    sql: SQL query.
+
+    Returns:
+    --------
+    The query with literals replaced by '?' and parameter lists by '(...)'.
+    """
+    shape = QUOTED_STRING_REGEX.sub("?", sql)
+    shape = NUMBER_REGEX.sub("?", shape)
+    shape = PARAMETER_LIST_REGEX.sub("(...)", shape)
+
+    return WHITESPACE_REGEX.sub(" ", shape).strip()
+
+
+def _sample_category(frame) -> Optional[str]:
+    while frame is not None:
+        module_name = frame.f_globals.get("__name__", "")
+
+        for category, module_prefixes in SAMPLE_CATEGORY_MODULES.items():
+            if any(
+                module_name == prefix or module_name.startswith(prefix + ".")
+                for prefix in module_prefixes
+            ):
+                return category
+
+        frame = frame.f_back
+
+    return None
+
+
+class _StackSampler(Thread):
+    def __init__(self, profile: "RequestProfile", interval: float):
+        super().__init__(name="request-profile-sampler", daemon=True)
+        self.profile = profile
+        self.interval = interval
+        self._stopped = Event()
+
+    def run(self):
+        last_sample = perf_counter()
+
+        while not self._stopped.wait(self.interval):
+            now = perf_counter()
+            elapsed = now - last_sample
+            last_sample = now
+            frames = sys._current_frames()  # pylint: disable=protected-access
+
+            for thread_id in self.profile.thread_ids():
+                category = _sample_category(frames.get(thread_id))
+
+                if category is not None:
+                    self.profile.add_sample(category, elapsed)
+
+    def stop(self):
+        """Stop sampling and wait for the last sample to finish."""
+        self._stopped.set()
+        self.join()
+
+
+class RequestProfile:
+    """
+    Record DB queries and sample stacks for one request.
+
+    Attributes:
+    -----------
+    duration: Seconds that the request took, once the profile is finished.
+    query_count: Number of DB queries.
+    query_duration: Seconds spent running DB queries.
+    sampled_durations: Estimated seconds spent in each sample category.
+    """
+
+    def __init__(self):
+        self.duration = 0.0
+        self.query_count = 0
+        self.query_duration = 0.0
+        self.sampled_durations: Dict[str, float] = {
+            category: 0.0 for category in SAMPLE_CATEGORY_MODULES
+        }
+        self._query_shapes: Dict[str, QueryShapeProfile] = {}
+        self._thread_ids: Set[int] = set()
+        self._lock = Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        """Time a DB query and add it to its shape's totals."""
+        start = perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = perf_counter() - start
+            shape = query_shape(sql)
+
+            with self._lock:
+                self.query_count += 1
+                self.query_duration += duration
+                shape_profile = self._query_shapes.setdefault(
+                    shape, {"sql": shape, "count": 0, "duration": 0.0}
+                )
+                shape_profile["count"] += 1
+                shape_profile["duration"] += duration * SECONDS_TO_MILLISECONDS
+
+    @contextmanager
+    def activate(self) -> Iterator["RequestProfile"]:
+        """Make this the current profile and sample stacks until the block exits."""
+        token = _current_profile.set(self)
+        sampler = _StackSampler(self, settings.REQUEST_PROFILING_SAMPLE_INTERVAL)
+        start = perf_counter()
+        sampler.start()
+
+        try:
+            yield self
+        finally:
+            sampler.stop()
+            self.duration = perf_counter() - start
+            _current_profile.reset(token)
+
+    def thread_ids(self) -> List[int]:
+        """IDs of the threads currently doing work for the request."""
+        with self._lock:
+            return list(self._thread_ids)
+
+    def add_thread(self, thread_id: int) -> None:
+        """Start sampling a thread's stack."""
+        with self._lock:
+            self._thread_ids.add(thread_id)
+
+    def remove_thread(self, thread_id: int) -> None:
+        """Stop sampling a thread's stack."""
+        with self._lock:
+            self._thread_ids.discard(thread_id)
+
+    def add_sample(self, category: str, duration: float) -> None:
+        """Add a sampled duration to a category."""
+        with self._lock:
+            self.sampled_durations[category] += duration
+
+    def query_shapes(self) -> List[QueryShapeProfile]:
+        """Profiles of each query shape, slowest first. Durations are in ms."""
+        return sorted(
+            self._query_shapes.values(),
+            key=lambda shape_profile: shape_profile["duration"],
+            reverse=True,
+        )
+
+    def repeated_query_shapes(self) -> List[QueryShapeProfile]:
+        """Query shapes that ran often enough to suggest an N+1 pattern."""
+        return [
+            shape_profile
+            for shape_profile in self.query_shapes()
+            if shape_profile["count"] >= settings.N_PLUS_ONE_QUERY_THRESHOLD
+        ]
+
+    def timings(self) -> Dict[str, float]:
+        """
+        Break down the request's duration.
+
+        Returns:
+        --------
+        Milliseconds in total, running DB queries, and (estimated) in pandas,
+        GraphQL execution, and the rest of the Python code.
+        """
+        total = self.duration * SECONDS_TO_MILLISECONDS
+        db_duration = self.query_duration * SECONDS_TO_MILLISECONDS
+        pandas_duration = self.sampled_durations["pandas"] * SECONDS_TO_MILLISECONDS
+        graphql_duration = self.sampled_durations["graphql"] * SECONDS_TO_MILLISECONDS
+
+        return {
+            "total": total,
+            "db": db_duration,
+            "pandas": pandas_duration,
+            "graphql": graphql_duration,
+            "python": max(
+                total - db_duration - pandas_duration - graphql_duration, 0.0
+            ),
+        }
+
+    def summary(self, max_query_shapes: int = 5) -> Dict[str, Any]:
+        """
+        Summarise the profile for logging.
+
+        Params:
+        -------
+        max_query_shapes: Number of the slowest query shapes to include.
+
+        Returns:
+        --------
+        Timings in ms, query count, and the slowest & repeated query shapes.
+        """
+        return {
+            "timings": {
+                name: round(duration, 3) for name, duration in self.timings().items()
+            },
+            "queryCount": self.query_count,
+            "queryShapes": self.query_shapes()[:max_query_shapes],
+            "repeatedQueryShapes": self.repeated_query_shapes(),
+        }
+
+
+@contextmanager
+def profile_thread() -> Iterator[None]:
+    """
+    Profile work in the current thread for the current request, if it has a profile.
+
+    Execute wrappers only apply to the thread's own DB connections, so threads
+    that do work for a profiled request (e.g. in the async views' thread pools)
+    need to enter this as well.
+    """
+    profile = _current_profile.get()
+
+    if profile is None:
+        yield
+        return
+
+    thread_id = get_ident()
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(profile))
+
+        profile.add_thread(thread_id)
+
+        try:
+            yield
+        finally:
+            profile.remove_thread(thread_id)
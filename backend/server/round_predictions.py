@@ -0,0 +1,197 @@
+"""
+Cached read model of the competition models' predictions for a round.
+
+The official Tipresias predictions combine the principal model's predicted winners
+with the other competition models' predicted values, and the email, the GraphQL API
+and the tipping service all need them for the same round. We fetch a round's
+predictions with one query, consolidate them with vectorised DataFrame operations,
+and cache the results until the DB data changes.
+"""
+
+from typing import List, Optional
+from datetime import datetime
+
+from django.core.cache import caches
+from django.db.models import OuterRef, Subquery
+import numpy as np
+import pandas as pd
+from mypy_extensions import TypedDict
+
+from server.cache import RESOLVER_CACHE, versioned_key
+from server.models import Prediction, TeamMatch
+
+
+ModelPrediction = TypedDict(
+    "ModelPrediction",
+    {
+        "match__id": int,
+        "ml_model__is_principal": bool,
+        "ml_model__prediction_type": str,
+        "predicted_winner__name": str,
+        "predicted_margin": Optional[float],
+        "predicted_win_probability": Optional[float],
+    },
+)
+
+ConsolidatedPrediction = TypedDict(
+    "ConsolidatedPrediction",
+    {
+        "match__id": int,
+        "match__start_date_time": datetime,
+        "home_team__name": str,
+        "away_team__name": str,
+        "predicted_winner__name": str,
+        "predicted_margin": Optional[float],
+        "predicted_win_probability": Optional[float],
+        "is_correct": Optional[bool],
+        "predictions_agree": bool,
+    },
+)
+
+RoundPredictions = TypedDict(
+    "RoundPredictions",
+    {
+        "match_predictions": List[ConsolidatedPrediction],
+        "model_predictions": List[ModelPrediction],
+    },
+)
+
+CACHE_KEY = "round_predictions"
+
+PREDICTED_VALUES = ["predicted_margin", "predicted_win_probability"]
+
+# The value that each prediction type would have for the other team
+_INVERSIONS = {
+    "predicted_margin": lambda values: values * -1,
+    "predicted_win_probability": lambda values: 1 - values,
+}
+
+
+def _team_name(at_home: bool) -> Subquery:
+    return Subquery(
+        TeamMatch.objects.filter(match=OuterRef("match"), at_home=at_home).values(
+            "team__name"
+        )[:1]
+    )
+
+
+def _query_predictions(season: int, round_number: int) -> pd.DataFrame:
+    prediction_values = (
+        Prediction.objects.filter(
+            match__season=season,
+            match__round_number=round_number,
+            ml_model__used_in_competitions=True,
+        )
+        .order_by("match__start_date_time", "match__id", "-ml_model__is_principal")
+        .values(
+            "match__id",
+            "match__start_date_time",
+            "ml_model__is_principal",
+            "ml_model__prediction_type",
+            "predicted_winner__name",
+            "predicted_margin",
+            "predicted_win_probability",
+            "is_correct",
+            home_team__name=_team_name(True),
+            away_team__name=_team_name(False),
+        )
+    )
+
+    return pd.DataFrame(list(prediction_values))
+
+
+def _consolidate_predictions(predictions: pd.DataFrame) -> pd.DataFrame:
+    principal_predictions = predictions.query(
+        "ml_model__is_principal == True"
+    ).set_index("match__id")
+    non_principal_predictions = (
+        predictions.query("ml_model__is_principal == False")
+        .set_index("match__id")
+        .reindex(principal_predictions.index)
+    )
+
+    assert non_principal_predictions.index.is_unique, (
+        "Expected one non-principal competition model per match, "
+        "but found predictions from more than one."
+    )
+
+    predictions_agree = (
+        principal_predictions["predicted_winner__name"]
+        == non_principal_predictions["predicted_winner__name"]
+    )
+
+    # Non-principal predictions fill in the principal model's missing prediction
+    # types, so when the models disagree, we invert their values to make them
+    # predictions for the principal model's predicted winner.
+    filler_values = pd.DataFrame(
+        {
+            column: np.where(
+                predictions_agree,
+                non_principal_predictions[column].fillna(0),
+                invert_values(non_principal_predictions[column].fillna(0)),
+            )
+            for column, invert_values in _INVERSIONS.items()
+        },
+        index=principal_predictions.index,
+    )
+
+    return (
+        principal_predictions.fillna(filler_values)
+        .assign(predictions_agree=predictions_agree)
+        .drop(["ml_model__is_principal", "ml_model__prediction_type"], axis=1)
+        .reset_index()
+    )
+
+
+def _records(data_frame: pd.DataFrame) -> list:
+    return data_frame.astype(object).replace({np.nan: None}).to_dict("records")
+
+
+def _build_round_predictions(season: int, round_number: int) -> RoundPredictions:
+    predictions = _query_predictions(season, round_number)
+
+    if predictions.empty:
+        return {"match_predictions": [], "model_predictions": []}
+
+    model_predictions = predictions.loc[
+        :,
+        [
+            "match__id",
+            "ml_model__is_principal",
+            "ml_model__prediction_type",
+            "predicted_winner__name",
+            *PREDICTED_VALUES,
+        ],
+    ]
+
+    return {
+        "match_predictions": _records(_consolidate_predictions(predictions)),
+        "model_predictions": _records(model_predictions),
+    }
+
+
+def fetch_round_predictions(season: int, round_number: int) -> RoundPredictions:
+    """
+    Return the competition models' predictions for a round, building them if needed.
+
+    Params:
+    -------
+    season: Season of the round.
+    round_number: Round number within the season.
+
+    Returns:
+    --------
+    match_predictions: One consolidated prediction per match, ordered by start time:
+        the principal model's predicted winner, with any missing predicted values
+        filled in from the other competition models.
+    model_predictions: Each competition model's raw predictions, ordered by match.
+    """
+    cache = caches[RESOLVER_CACHE]
+    key = versioned_key(f"{CACHE_KEY}:{season}:{round_number}")
+    round_predictions = cache.get(key)
+
+    if round_predictions is None:
+        round_predictions = _build_round_predictions(season, round_number)
+        cache.set(key, round_predictions)
+
+    return round_predictions
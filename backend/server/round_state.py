@@ -0,0 +1,148 @@
+"""
+Cached state of the season's rounds relative to the current time.
+
+Many requests need to know which round is current, but the answer only changes
+when the DB data changes or the next match starts, so we calculate all
+of it with one query and cache it until then.
+"""
+
+from typing import List, Optional
+from datetime import datetime
+
+from django.core.cache import caches
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from mypy_extensions import TypedDict
+
+from server.cache import RESOLVER_CACHE, versioned_key
+from server.models import Match, TeamMatch, Prediction
+from server.routers import read_alias
+
+
+SeasonRound = TypedDict("SeasonRound", {"season": int, "round_number": int})
+NextMatch = TypedDict(
+    "NextMatch",
+    {"season": int, "round_number": int, "start_date_time": datetime},
+)
+RoundState = TypedDict(
+    "RoundState",
+    {
+        "latest_predicted_round": Optional[SeasonRound],
+        "latest_played_round": Optional[SeasonRound],
+        "latest_completed_round": Optional[SeasonRound],
+        "next_match": Optional[NextMatch],
+        "available_seasons": List[int],
+    },
+)
+
+CACHE_KEY = "round_state"
+
+# pylint: disable=protected-access
+_MATCH_TABLE = Match._meta.db_table
+_TEAM_MATCH_TABLE = TeamMatch._meta.db_table
+_PREDICTION_TABLE = Prediction._meta.db_table
+# pylint: enable=protected-access
+
+_HAS_PREDICTIONS = (
+    f"EXISTS (SELECT 1 FROM {_PREDICTION_TABLE} AS prediction "
+    "WHERE prediction.match_id = match.id)"
+)
+_HAS_SCORES = (
+    f"EXISTS (SELECT 1 FROM {_TEAM_MATCH_TABLE} AS team_match "
+    "WHERE team_match.match_id = match.id AND team_match.score > 0)"
+)
+_SEASON_ROUND = "json_build_object('season', season, 'round_number', round_number)"
+
+# Each subquery reads one end of the match start_date_time index,
+# so the whole state costs one round trip.
+ROUND_STATE_SQL = f"""
+    SELECT
+        (
+            SELECT {_SEASON_ROUND} FROM {_MATCH_TABLE} AS match
+            WHERE {_HAS_PREDICTIONS}
+            ORDER BY start_date_time DESC LIMIT 1
+        ),
+        (
+            SELECT {_SEASON_ROUND} FROM {_MATCH_TABLE} AS match
+            WHERE start_date_time < %(now)s
+            ORDER BY start_date_time DESC LIMIT 1
+        ),
+        (
+            SELECT {_SEASON_ROUND} FROM {_MATCH_TABLE} AS match
+            WHERE start_date_time < %(now)s AND {_HAS_SCORES}
+            ORDER BY start_date_time DESC LIMIT 1
+        ),
+        (
+            SELECT json_build_object(
+                'season', season,
+                'round_number', round_number,
+                'start_date_time', start_date_time
+            )
+            FROM {_MATCH_TABLE} AS match
+            WHERE start_date_time > %(now)s
+            ORDER BY start_date_time ASC LIMIT 1
+        ),
+        (
+            SELECT COALESCE(array_agg(DISTINCT season ORDER BY season), '{{}}')
+            FROM {_MATCH_TABLE} AS match
+            WHERE {_HAS_PREDICTIONS}
+        )
+"""
+
+
+def _query_round_state(right_now: datetime) -> RoundState:
+    with connections[read_alias()].cursor() as cursor:
+        cursor.execute(ROUND_STATE_SQL, {"now": right_now})
+        (
+            latest_predicted_round,
+            latest_played_round,
+            latest_completed_round,
+            next_match,
+            available_seasons,
+        ) = cursor.fetchone()
+
+    if next_match is not None:
+        next_match["start_date_time"] = parse_datetime(next_match["start_date_time"])
+
+    return {
+        "latest_predicted_round": latest_predicted_round,
+        "latest_played_round": latest_played_round,
+        "latest_completed_round": latest_completed_round,
+        "next_match": next_match,
+        "available_seasons": available_seasons,
+    }
+
+
+def fetch_round_state() -> RoundState:
+    """
+    Return the current round state, calculating it if it isn't cached.
+
+    Returns:
+    --------
+    latest_predicted_round: Season & round of the latest match with predictions.
+    latest_played_round: Season & round of the latest match that has started.
+    latest_completed_round: Season & round of the latest match with results.
+    next_match: Season, round & start time of the next match to be played.
+    available_seasons: All seasons with predictions.
+    """
+    cache = caches[RESOLVER_CACHE]
+    key = versioned_key(CACHE_KEY)
+    round_state = cache.get(key)
+
+    if round_state is not None:
+        return round_state
+
+    right_now = timezone.now()
+    round_state = _query_round_state(right_now)
+    next_match = round_state["next_match"]
+    # The played & completed rounds can change when the next match starts,
+    # even if no data does.
+    timeout = (
+        None
+        if next_match is None
+        else (next_match["start_date_time"] - right_now).total_seconds()
+    )
+    cache.set(key, round_state, timeout)
+
+    return round_state
@@ -0,0 +1,246 @@
+"""
+Routing of read-only DB work to a replica of the primary DB.
+
+Code that runs inside replica_reads() (GraphQL requests and read-only
+management commands) reads from settings.REPLICA_DATABASE, when it's configured,
+so dashboard queries don't compete with data ingestion on the primary.
+Writes always go to the primary. Reads fall back to the primary when:
+
+- the code has written data, so it can read its own writes (the routing stays
+  pinned to the primary until replica_reads() exits);
+- the code is in a transaction on the primary;
+- the replica hasn't replayed the primary's WAL as of the data version
+  that the code reads (see server/cache.py), so cached results never mix
+  an old version's data with a new version's key;
+- the replica lags by more than DATABASE_REPLICA_MAX_LAG seconds,
+  or can't be reached.
+"""
+
+from typing import Iterator, NamedTuple, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+import logging
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+
+# Only standbys have a replay position, so this also works when the replica alias
+# points at a primary (e.g. in tests)
+REPLICA_STATUS_SQL = """
+    SELECT
+        pg_wal_lsn_diff(
+            CASE
+                WHEN pg_is_in_recovery() THEN pg_last_wal_replay_lsn()
+                ELSE pg_current_wal_lsn()
+            END,
+            '0/0'
+        )::bigint,
+        CASE
+            WHEN NOT pg_is_in_recovery() THEN 0
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaStatus(NamedTuple):
+    """
+    How far the replica has caught up with the primary when last checked.
+
+    Attributes:
+    -----------
+    checked_at: Monotonic time of the check.
+    wal_position: Byte position in the primary's WAL that the replica has replayed.
+        None if the replica couldn't be reached.
+    lag: Seconds since the replica replayed a transaction, or 0 if it's replayed
+        everything that it's received. None if unknown.
+    """
+
+    checked_at: float
+    wal_position: Optional[int]
+    lag: Optional[float]
+
+
+class _ReadRouting:
+    def __init__(self):
+        # Chosen on the first read, so all reads see data from the same DB
+        self.alias: Optional[str] = None
+        # WAL position that the replica must have replayed for reads to use it
+        self.min_wal_position = 0
+
+
+_read_routing: ContextVar[Optional[_ReadRouting]] = ContextVar(
+    "read_routing", default=None
+)
+_replica_status: Optional[ReplicaStatus] = None
+_replica_status_lock = Lock()
+
+
+def _replica_is_configured() -> bool:
+    return settings.REPLICA_DATABASE in connections.databases
+
+
+def _check_replica() -> ReplicaStatus:
+    try:
+        with connections[settings.REPLICA_DATABASE].cursor() as cursor:
+            cursor.execute(REPLICA_STATUS_SQL)
+            wal_position, lag = cursor.fetchone()
+    except DatabaseError as err:
+        logger.warning("Reading from the primary DB, because of replica error: %s", err)
+        wal_position, lag = None, None
+
+    return ReplicaStatus(
+        checked_at=time.monotonic(),
+        wal_position=wal_position,
+        lag=None if lag is None else float(lag),
+    )
+
+
+def replica_status(refresh: bool = False) -> ReplicaStatus:
+    """
+    Get the replica's status, checking it at most every few seconds.
+
+    Params:
+    -------
+    refresh: Whether to check the replica even if the last check is recent.
+
+    Returns:
+    --------
+    The replica's status.
+    """
+    global _replica_status  # pylint: disable=global-statement
+
+    with _replica_status_lock:
+        if (
+            refresh
+            or _replica_status is None
+            or time.monotonic() - _replica_status.checked_at
+            >= settings.DATABASE_REPLICA_LAG_CHECK_INTERVAL
+        ):
+            _replica_status = _check_replica()
+
+        return _replica_status
+
+
+def _has_replayed(status: ReplicaStatus, wal_position: int) -> bool:
+    return status.wal_position is not None and status.wal_position >= wal_position
+
+
+def _replica_is_current(min_wal_position: int) -> bool:
+    status = replica_status()
+
+    # Replicas only move forward, so a recent check can be out of date,
+    # but never too optimistic
+    if not _has_replayed(status, min_wal_position):
+        status = replica_status(refresh=True)
+
+    return (
+        _has_replayed(status, min_wal_position)
+        and status.lag is not None
+        and status.lag <= settings.DATABASE_REPLICA_MAX_LAG
+    )
+
+
+def _read_alias(routing: _ReadRouting) -> str:
+    if routing.alias is None:
+        routing.alias = (
+            settings.REPLICA_DATABASE
+            if _replica_is_configured()
+            and _replica_is_current(routing.min_wal_position)
+            else DEFAULT_DB_ALIAS
+        )
+
+    return routing.alias
+
+
+@contextmanager
+def replica_reads() -> Iterator[None]:
+    """Read from the replica, if it's configured & current, within the context."""
+    token = _read_routing.set(_ReadRouting())
+
+    try:
+        yield
+    finally:
+        _read_routing.reset(token)
+
+
+def require_wal_position(wal_position: int) -> None:
+    """
+    Only read from the replica once it has replayed the primary's WAL this far.
+
+    Params:
+    -------
+    wal_position: Byte position in the primary's WAL.
+    """
+    routing = _read_routing.get()
+
+    if routing is None or wal_position <= routing.min_wal_position:
+        return None
+
+    routing.min_wal_position = wal_position
+
+    if routing.alias == settings.REPLICA_DATABASE and not _replica_is_current(
+        wal_position
+    ):
+        routing.alias = DEFAULT_DB_ALIAS
+
+    return None
+
+
+def read_alias() -> str:
+    """Return the alias of the DB for reading, for code that uses raw SQL."""
+    routing = _read_routing.get()
+
+    if routing is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+
+    return _read_alias(routing)
+
+
+class ReplicaRouter:
+    """
+    DB router that sends reads within replica_reads() to the replica.
+
+    The replica gets its schema from the primary via replication,
+    so migrations only run on the primary.
+    """
+
+    @staticmethod
+    def db_for_read(_model, **_hints) -> str:
+        """Choose the DB for reading model records."""
+        return read_alias()
+
+    @staticmethod
+    def db_for_write(_model, **_hints) -> str:
+        """Write to the primary, pinning reads to it for read-your-writes."""
+        routing = _read_routing.get()
+
+        if routing is not None:
+            routing.alias = DEFAULT_DB_ALIAS
+
+        return DEFAULT_DB_ALIAS
+
+    @staticmethod
+    def allow_relation(obj1, obj2, **_hints) -> Optional[bool]:
+        """Allow relations between records from the primary & the replica."""
+        replicated_aliases = {DEFAULT_DB_ALIAS, settings.REPLICA_DATABASE}
+        # Django's own routing reads records' DBs from _state too
+        record_aliases = {
+            obj1._state.db,  # pylint: disable=protected-access
+            obj2._state.db,  # pylint: disable=protected-access
+        }
+
+        if record_aliases <= replicated_aliases:
+            return True
+
+        return None
+
+    @staticmethod
+    def allow_migrate(db, _app_label, **_hints) -> Optional[bool]:
+        """Only run migrations on the primary."""
+        return False if db == settings.REPLICA_DATABASE else None
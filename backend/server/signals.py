@@ -0,0 +1,23 @@
+"""
+Signal receivers for keeping derived data in sync with the records it's based on.
+
+Team-matches and predictions are saved in batches, so the functions that save them
+increment the data version and recalculate model metrics once per batch instead.
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from server.cache import bump_data_version
+from server.models import Match, MLModel, Team
+
+
+@receiver(post_save, sender=Team)
+@receiver(post_delete, sender=Team)
+@receiver(post_save, sender=MLModel)
+@receiver(post_delete, sender=MLModel)
+@receiver(post_save, sender=Match)
+@receiver(post_delete, sender=Match)
+def invalidate_cached_resolvers(**_kwargs):
+    """Increment the data version to invalidate cached GraphQL results."""
+    bump_data_version()
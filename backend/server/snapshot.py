@@ -0,0 +1,282 @@
+"""
+Functions for exporting and importing portable snapshots of DB data.
+
+Snapshots are directories of compressed Parquet files, one per data table,
+that can be loaded into an empty DB without access to the tipping service
+or the production DB.
+"""
+
+from typing import Dict, List, Optional, Sequence, Type, Iterator, Tuple, Any
+import os
+import io
+
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.db.models import QuerySet
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from server.models import Team, MLModel, Match, TeamMatch, Prediction, ModelRoundMetrics
+from server.cache import bumps_data_version
+from server.routers import read_alias
+
+# Ordered so that every table comes after the tables its foreign keys refer to,
+# which lets us load them one at a time without deferring constraints.
+SNAPSHOT_MODELS: List[Type[models.Model]] = [
+    Team,
+    MLModel,
+    Match,
+    TeamMatch,
+    Prediction,
+]
+DEFAULT_SNAPSHOT_DIR = os.path.join(settings.BASE_DIR, "server/fixtures/snapshot")
+CHUNK_SIZE = 5000
+COMPRESSION = "zstd"
+
+ARROW_TYPES = {
+    "AutoField": pa.int64(),
+    "BigAutoField": pa.int64(),
+    "ForeignKey": pa.int64(),
+    "IntegerField": pa.int64(),
+    "PositiveSmallIntegerField": pa.int64(),
+    "FloatField": pa.float64(),
+    "BooleanField": pa.bool_(),
+    "CharField": pa.string(),
+    "TextField": pa.string(),
+    "DateTimeField": pa.timestamp("us", tz="UTC"),
+}
+
+
+def _concrete_fields(model: Type[models.Model]) -> List[models.Field]:
+    return list(model._meta.concrete_fields)  # pylint: disable=protected-access
+
+
+def _arrow_schema(model: Type[models.Model]) -> pa.Schema:
+    return pa.schema(
+        [
+            pa.field(field.column, ARROW_TYPES[field.get_internal_type()])
+            for field in _concrete_fields(model)
+        ]
+    )
+
+
+def _snapshot_filepath(directory: str, model: Type[models.Model]) -> str:
+    model_name = model._meta.model_name  # pylint: disable=protected-access
+    return os.path.join(directory, f"{model_name}.parquet")
+
+
+def snapshot_querysets(
+    seasons: Optional[Sequence[int]] = None,
+    ml_model_names: Optional[Sequence[str]] = None,
+) -> Dict[Type[models.Model], QuerySet]:
+    """
+    Build querysets for all records that belong in a snapshot.
+
+    Related records are included by following foreign keys from the filtered
+    matches and predictions, so the snapshot can be loaded into an empty DB.
+
+    Params:
+    -------
+    seasons: Years of matches (and their predictions) to include. Includes all
+        seasons if omitted.
+    ml_model_names: Names of ML models whose predictions to include. Includes
+        all models if omitted.
+
+    Returns:
+    --------
+    Querysets for each snapshot model.
+    """
+    matches = (
+        Match.objects.all()
+        if seasons is None
+        else Match.objects.filter(season__in=seasons)
+    )
+    ml_models = (
+        MLModel.objects.all()
+        if ml_model_names is None
+        else MLModel.objects.filter(name__in=ml_model_names)
+    )
+    team_matches = TeamMatch.objects.filter(match__in=matches)
+    predictions = Prediction.objects.filter(match__in=matches, ml_model__in=ml_models)
+    # Match winners and predicted winners are always one of the teams
+    # playing in the match, so we don't need to check those associations.
+    teams = Team.objects.filter(id__in=team_matches.values("team_id"))
+
+    return {
+        Team: teams,
+        MLModel: ml_models,
+        Match: matches,
+        TeamMatch: team_matches,
+        Prediction: predictions,
+    }
+
+
+def _chunk_rows(
+    rows: Iterator[Tuple[Any, ...]], chunk_size: int
+) -> Iterator[List[Tuple[Any, ...]]]:
+    chunk: List[Tuple[Any, ...]] = []
+
+    for row in rows:
+        chunk.append(row)
+
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+
+    if any(chunk):
+        yield chunk
+
+
+def _export_queryset(queryset: QuerySet, filepath: str) -> int:
+    model = queryset.model
+    fields = _concrete_fields(model)
+    schema = _arrow_schema(model)
+    # Using iterator with Postgres streams rows with a server-side cursor,
+    # so we never hold a whole table in memory.
+    rows = (
+        queryset.order_by("id")
+        .values_list(*[field.attname for field in fields])
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    row_count = 0
+
+    with pq.ParquetWriter(filepath, schema, compression=COMPRESSION) as writer:
+        for chunk in _chunk_rows(rows, CHUNK_SIZE):
+            columns = list(zip(*chunk))
+            writer.write_table(
+                pa.Table.from_arrays(
+                    [
+                        pa.array(column, type=schema.field(idx).type)
+                        for idx, column in enumerate(columns)
+                    ],
+                    schema=schema,
+                )
+            )
+            row_count += len(chunk)
+
+    return row_count
+
+
+def export_snapshot(
+    directory: str = DEFAULT_SNAPSHOT_DIR,
+    seasons: Optional[Sequence[int]] = None,
+    ml_model_names: Optional[Sequence[str]] = None,
+) -> Dict[str, int]:
+    """
+    Export a filtered subset of DB records to Parquet files.
+
+    Params:
+    -------
+    directory: Where to save the Parquet files.
+    seasons: Years of matches (and their predictions) to include. Includes all
+        seasons if omitted.
+    ml_model_names: Names of ML models whose predictions to include. Includes
+        all models if omitted.
+
+    Returns:
+    --------
+    Number of exported records per table.
+    """
+    os.makedirs(directory, exist_ok=True)
+    querysets = snapshot_querysets(seasons=seasons, ml_model_names=ml_model_names)
+
+    # Exporting inside a transaction gives us a consistent view of the data
+    # across tables, and server-side cursors require one anyway.
+    with transaction.atomic(using=read_alias()):
+        return {
+            model._meta.db_table: _export_queryset(  # pylint: disable=protected-access
+                querysets[model], _snapshot_filepath(directory, model)
+            )
+            for model in SNAPSHOT_MODELS
+        }
+
+
+def _copy_parquet_file(cursor, model: Type[models.Model], filepath: str) -> int:
+    table_name = model._meta.db_table  # pylint: disable=protected-access
+    model_columns = {field.column for field in _concrete_fields(model)}
+    parquet_file = pq.ParquetFile(filepath)
+    columns = parquet_file.schema_arrow.names
+
+    assert set(columns) == model_columns, (
+        f"Columns in {filepath} ({sorted(columns)}) don't match the columns "
+        f"of {table_name} ({sorted(model_columns)}). The snapshot might be "
+        "from an older version of the DB schema."
+    )
+
+    copy_sql = f"COPY {table_name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    row_count = 0
+
+    for batch in parquet_file.iter_batches(batch_size=CHUNK_SIZE):
+        csv_buffer = io.BytesIO()
+        pa_csv.write_csv(
+            batch, csv_buffer, write_options=pa_csv.WriteOptions(include_header=False)
+        )
+        csv_buffer.seek(0)
+        cursor.copy_expert(copy_sql, csv_buffer)
+        row_count += batch.num_rows
+
+    return row_count
+
+
+@bumps_data_version
+def import_snapshot(
+    directory: str = DEFAULT_SNAPSHOT_DIR, replace: bool = False
+) -> Dict[str, int]:
+    """
+    Load a snapshot's Parquet files into the DB with Postgres COPY.
+
+    Params:
+    -------
+    directory: Where the Parquet files are saved.
+    replace: Whether to delete all existing records from the snapshot's tables
+        before loading. Otherwise, the tables must be empty.
+
+    Returns:
+    --------
+    Number of imported records per table.
+    """
+    table_names = [
+        model._meta.db_table  # pylint: disable=protected-access
+        for model in SNAPSHOT_MODELS
+    ]
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if replace:
+            # Django creates foreign keys as deferrable constraints, and Postgres
+            # won't truncate tables with pending constraint checks.
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            cursor.execute(
+                f"TRUNCATE {', '.join(table_names)} RESTART IDENTITY CASCADE"
+            )
+        else:
+            populated_tables = [
+                model._meta.db_table  # pylint: disable=protected-access
+                for model in SNAPSHOT_MODELS
+                if model.objects.exists()
+            ]
+            assert not any(populated_tables), (
+                "Snapshots can only be imported into empty tables, but the following "
+                f"tables have records: {populated_tables}. "
+                "Use replace=True to delete existing records first."
+            )
+
+        row_counts = {
+            model._meta.db_table: _copy_parquet_file(  # pylint: disable=protected-access
+                cursor, model, _snapshot_filepath(directory, model)
+            )
+            for model in SNAPSHOT_MODELS
+        }
+
+        # COPY bypasses ID sequences, so we have to move them past the imported IDs
+        # to avoid conflicts when creating new records.
+        for sql in connection.ops.sequence_reset_sql(no_style(), SNAPSHOT_MODELS):
+            cursor.execute(sql)
+
+        # Model metrics are derived from the other tables, so we calculate them
+        # instead of including them in snapshots
+        for season in Match.objects.values_list("season", flat=True).distinct():
+            ModelRoundMetrics.recalculate(season)
+
+    return row_counts
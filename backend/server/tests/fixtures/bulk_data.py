@@ -0,0 +1,268 @@
+"""Functions for bulk-creating large synthetic histories of DB records."""
+
+from typing import Dict, List, Type
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+import numpy as np
+
+from server.cache import bumps_data_version
+from server.models import Match, MLModel, ModelRoundMetrics, Prediction, Team, TeamMatch
+from server.models.ml_model import PredictionType
+from .factories import MLModelFactory, MatchFactory, TYPICAL_N_MATCHES_PER_ROUND
+
+
+# Recent regular seasons have had 23 rounds
+N_ROUNDS_PER_SEASON = 23
+BULK_BATCH_SIZE = 1000
+HOURS_BETWEEN_MATCHES = 3
+ONE_WEEK = timedelta(weeks=1)
+
+
+def _db_table(model: Type[models.Model]) -> str:
+    return model._meta.db_table  # pylint: disable=protected-access
+
+
+def _create_ml_models(n_ml_models: int) -> List[MLModel]:
+    # Alternating prediction types means that the first two models
+    # can be the competition models (one of each type)
+    return MLModel.objects.bulk_create(
+        [
+            MLModelFactory.build(
+                name=f"model_{model_idx}",
+                is_principal=model_idx == 0,
+                used_in_competitions=model_idx < 2,
+                prediction_type=(
+                    PredictionType.MARGIN
+                    if model_idx % 2 == 0
+                    else PredictionType.WIN_PROBABILITY
+                ),
+            )
+            for model_idx in range(n_ml_models)
+        ]
+    )
+
+
+def _match_start_times(
+    season: int, n_rounds: int, n_matches_per_round: int
+) -> List[List[datetime]]:
+    # The current season is half played, so we have both past & future matches.
+    # Rounds are usually a week apart, but we squeeze them together when needed
+    # to keep every match in the season's year, because that's what its season is.
+    if season == timezone.now().year:
+        right_now = timezone.now()
+        n_past_rounds = n_rounds // 2
+        year_start = datetime(season, 1, 1, tzinfo=timezone.utc)
+        year_end = datetime(season + 1, 1, 1, tzinfo=timezone.utc)
+        round_interval = min(
+            ONE_WEEK,
+            (right_now - year_start) / (n_past_rounds + 1),
+            (year_end - right_now) / (n_rounds - n_past_rounds + 1),
+        )
+        season_start = right_now - round_interval * n_past_rounds
+    else:
+        round_interval = ONE_WEEK
+        season_start = datetime(season, 3, 15, tzinfo=timezone.utc)
+
+    match_interval = min(
+        timedelta(hours=HOURS_BETWEEN_MATCHES), round_interval / n_matches_per_round
+    )
+
+    return [
+        [
+            season_start + round_interval * round_idx + match_interval * match_idx
+            for match_idx in range(n_matches_per_round)
+        ]
+        for round_idx in range(n_rounds)
+    ]
+
+
+def _build_season_matches(
+    season: int, n_rounds: int, n_matches_per_round: int, random: np.random.Generator
+) -> List[Match]:
+    return [
+        MatchFactory.build(
+            start_date_time=start_date_time,
+            round_number=round_idx + 1,
+            # bulk_create doesn't call save, so we have to set this ourselves
+            season=season,
+            venue=settings.VENUES[random.integers(len(settings.VENUES))],
+        )
+        for round_idx, round_start_times in enumerate(
+            _match_start_times(season, n_rounds, n_matches_per_round)
+        )
+        for start_date_time in round_start_times
+    ]
+
+
+def _build_team_matches(
+    matches: List[Match],
+    n_matches_per_round: int,
+    teams: List[Team],
+    random: np.random.Generator,
+) -> List[TeamMatch]:
+    team_matches = []
+
+    for round_start_idx in range(0, len(matches), n_matches_per_round):
+        round_end_idx = round_start_idx + n_matches_per_round
+        round_matches = matches[round_start_idx:round_end_idx]
+        round_teams = [teams[team_idx] for team_idx in random.permutation(len(teams))]
+
+        for match_idx, match in enumerate(round_matches):
+            has_been_played = match.start_date_time < timezone.now()
+            home_team, away_team = round_teams[2 * match_idx : 2 * match_idx + 2]
+            home_score, away_score = (
+                (int(random.integers(50, 150)), int(random.integers(50, 150)))
+                if has_been_played
+                else (0, 0)
+            )
+
+            team_matches.extend(
+                [
+                    TeamMatch(
+                        match=match, team=home_team, at_home=True, score=home_score
+                    ),
+                    TeamMatch(
+                        match=match, team=away_team, at_home=False, score=away_score
+                    ),
+                ]
+            )
+
+            # Mirrors the logic in Match._save_result
+            if has_been_played:
+                match.margin = abs(home_score - away_score)
+                match.winner = (
+                    None
+                    if home_score == away_score
+                    else home_team
+                    if home_score > away_score
+                    else away_team
+                )
+
+    return team_matches
+
+
+def _build_predictions(
+    team_matches: List[TeamMatch],
+    ml_models: List[MLModel],
+    random: np.random.Generator,
+) -> List[Prediction]:
+    predictions = []
+
+    for home_team_match, away_team_match in zip(
+        team_matches[::2], team_matches[1::2]
+    ):
+        match = home_team_match.match
+        has_been_played = match.start_date_time < timezone.now()
+
+        for ml_model in ml_models:
+            predicted_winner = random.choice(
+                [home_team_match.team, away_team_match.team]
+            )
+            predicts_margin = ml_model.prediction_type == PredictionType.MARGIN
+
+            predictions.append(
+                Prediction(
+                    match=match,
+                    ml_model=ml_model,
+                    predicted_winner=predicted_winner,
+                    predicted_margin=(
+                        float(random.uniform(1, 50)) if predicts_margin else None
+                    ),
+                    predicted_win_probability=(
+                        None if predicts_margin else float(random.uniform(0.5, 1))
+                    ),
+                    # Draws count as correct
+                    is_correct=(
+                        match.winner in (None, predicted_winner)
+                        if has_been_played
+                        else None
+                    ),
+                )
+            )
+
+    return predictions
+
+
+@bumps_data_version
+def create_synthetic_history(
+    n_seasons: int,
+    n_ml_models: int,
+    n_rounds: int = N_ROUNDS_PER_SEASON,
+    n_matches_per_round: int = TYPICAL_N_MATCHES_PER_ROUND,
+    seed: int = 42,
+) -> Dict[str, int]:
+    """
+    Bulk-insert seasons of matches with predictions from every ML model.
+
+    Seasons end with the current one, which is half played,
+    so there are predictions for past & future matches.
+    Inserting records in bulk is much faster than creating them one at a time
+    with the factories, which makes it practical to generate years of data.
+
+    Params:
+    -------
+    n_seasons: Number of seasons of matches.
+    n_ml_models: Number of ML models that predict every match.
+    n_rounds: Number of rounds per season.
+    n_matches_per_round: Number of matches per round. Each team plays once
+        per round, so there can't be more than half as many matches as teams.
+    seed: Seed for the random number generator, so histories are repeatable.
+
+    Returns:
+    --------
+    Number of created records per table.
+    """
+    assert n_matches_per_round * 2 <= len(settings.TEAM_NAMES), (
+        f"{len(settings.TEAM_NAMES)} teams can't play {n_matches_per_round} "
+        "matches per round."
+    )
+
+    random = np.random.default_rng(seed)
+    current_season = timezone.now().year
+    seasons = range(current_season - n_seasons + 1, current_season + 1)
+    record_counts = {
+        _db_table(model): 0 for model in [MLModel, Match, TeamMatch, Prediction]
+    }
+
+    Team.objects.bulk_create(
+        [Team(name=team_name) for team_name in settings.TEAM_NAMES],
+        ignore_conflicts=True,
+    )
+    teams = list(Team.objects.filter(name__in=settings.TEAM_NAMES).order_by("name"))
+
+    with transaction.atomic():
+        ml_models = _create_ml_models(n_ml_models)
+        record_counts[_db_table(MLModel)] = len(ml_models)
+
+    for season in seasons:
+        with transaction.atomic():
+            matches = _build_season_matches(
+                season, n_rounds, n_matches_per_round, random
+            )
+            team_matches = _build_team_matches(
+                matches, n_matches_per_round, teams, random
+            )
+            Match.objects.bulk_create(matches, batch_size=BULK_BATCH_SIZE)
+
+            # Matches didn't have IDs yet when we built their team matches
+            for team_match in team_matches:
+                team_match.match_id = team_match.match.id
+
+            TeamMatch.objects.bulk_create(team_matches, batch_size=BULK_BATCH_SIZE)
+            predictions = Prediction.objects.bulk_create(
+                _build_predictions(team_matches, ml_models, random),
+                batch_size=BULK_BATCH_SIZE,
+            )
+            ModelRoundMetrics.recalculate(season)
+
+        for model, records in [
+            (Match, matches),
+            (TeamMatch, team_matches),
+            (Prediction, predictions),
+        ]:
+            record_counts[_db_table(model)] += len(records)
+
+    return record_counts
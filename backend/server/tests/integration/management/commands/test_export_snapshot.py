@@ -0,0 +1,87 @@
+# pylint: disable=missing-docstring
+import os
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.test import TestCase
+import pyarrow.parquet as pq
+
+from server.models import Match, MLModel, Prediction, Team, TeamMatch
+from server.tests.fixtures.factories import FullMatchFactory, MLModelFactory
+
+YEARS = (2015, 2016, 2017)
+N_MATCHES_PER_YEAR = 3
+
+
+class TestExportSnapshot(TestCase):
+    def setUp(self):
+        self.ml_models = [MLModelFactory(name="tipresias"), MLModelFactory()]
+
+        for year in YEARS:
+            for _ in range(N_MATCHES_PER_YEAR):
+                FullMatchFactory(
+                    with_predictions=True,
+                    year=year,
+                    prediction__ml_model=self.ml_models[0],
+                    prediction_two__ml_model=self.ml_models[1],
+                )
+
+    def test_handle(self):
+        with TemporaryDirectory() as directory:
+            call_command("export_snapshot", directory=directory, verbosity=0)
+
+            # It exports all records from each table
+            for model in [Team, MLModel, Match, TeamMatch, Prediction]:
+                model_name = model._meta.model_name  # pylint: disable=protected-access
+                filepath = os.path.join(directory, f"{model_name}.parquet")
+                self.assertEqual(
+                    pq.read_metadata(filepath).num_rows, model.objects.count()
+                )
+
+        with self.subTest("with year_range and ml_models filters"):
+            with TemporaryDirectory() as directory:
+                call_command(
+                    "export_snapshot",
+                    directory=directory,
+                    year_range=f"{YEARS[0]}-{YEARS[2]}",
+                    ml_models="tipresias",
+                    verbosity=0,
+                )
+
+                def read_table(name):
+                    return pq.read_table(
+                        os.path.join(directory, f"{name}.parquet")
+                    ).to_pandas()
+
+                matches = read_table("match")
+                predictions = read_table("prediction")
+                team_matches = read_table("teammatch")
+                teams = read_table("team")
+
+                # It only exports matches from the given seasons
+                self.assertEqual(len(matches), N_MATCHES_PER_YEAR * 2)
+                self.assertEqual(
+                    set(matches["start_date_time"].dt.year), set(YEARS[:2])
+                )
+                # It only exports predictions from the given models and seasons
+                self.assertEqual(len(predictions), N_MATCHES_PER_YEAR * 2)
+                self.assertEqual(
+                    set(predictions["ml_model_id"]), {self.ml_models[0].id}
+                )
+                self.assertEqual(len(read_table("mlmodel")), 1)
+                # It exports records that the filtered records depend on
+                self.assertEqual(set(team_matches["match_id"]), set(matches["id"]))
+                self.assertLessEqual(set(team_matches["team_id"]), set(teams["id"]))
+                self.assertLessEqual(
+                    set(predictions["predicted_winner_id"]), set(teams["id"])
+                )
+
+        with self.subTest("with an invalid year_range"):
+            with TemporaryDirectory() as directory:
+                with self.assertRaises(AssertionError):
+                    call_command(
+                        "export_snapshot",
+                        directory=directory,
+                        year_range="2015",
+                        verbosity=0,
+                    )
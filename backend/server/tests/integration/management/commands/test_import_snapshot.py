@@ -0,0 +1,59 @@
+# pylint: disable=missing-docstring
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from server.models import Match, MLModel, ModelRoundMetrics, Prediction, Team, TeamMatch
+from server.tests.fixtures.factories import FullMatchFactory, MLModelFactory
+
+N_MATCHES = 5
+SNAPSHOT_MODELS = [Team, MLModel, Match, TeamMatch, Prediction]
+
+
+class TestImportSnapshot(TestCase):
+    def setUp(self):
+        ml_models = [MLModelFactory(), MLModelFactory()]
+
+        for _ in range(N_MATCHES):
+            FullMatchFactory(
+                with_predictions=True,
+                prediction__ml_model=ml_models[0],
+                prediction_two__ml_model=ml_models[1],
+            )
+
+    def test_handle(self):
+        original_records = {
+            model: list(model.objects.order_by("id").values())
+            for model in SNAPSHOT_MODELS
+        }
+
+        with TemporaryDirectory() as directory:
+            call_command("export_snapshot", directory=directory, verbosity=0)
+
+            with self.subTest("when the DB already has records"):
+                with self.assertRaisesRegex(AssertionError, "empty tables"):
+                    call_command("import_snapshot", directory=directory, verbosity=0)
+
+            call_command(
+                "import_snapshot", directory=directory, replace=True, verbosity=0
+            )
+
+        # It loads all records with the same values
+        for model in SNAPSHOT_MODELS:
+            self.assertEqual(
+                list(model.objects.order_by("id").values()), original_records[model]
+            )
+
+        # It calculates model metrics for the imported results
+        self.assertEqual(
+            ModelRoundMetrics.objects.count(),
+            Prediction.objects.filter(match__margin__isnull=False)
+            .values("match__season", "match__round_number", "ml_model")
+            .distinct()
+            .count(),
+        )
+
+        # It resets ID sequences, so new records don't conflict with imported ones
+        FullMatchFactory()
+        self.assertEqual(Match.objects.count(), N_MATCHES + 1)
@@ -0,0 +1,36 @@
+# pylint: disable=missing-docstring
+from django.core.management import call_command
+from django.test import TransactionTestCase
+
+from server.models import IngestionJob
+from server.models.ingestion_job import JobKind, JobStatus
+
+
+N_JOBS = 4
+
+
+# Worker processes use their own DB connections, so they need committed data
+class TestRunWorkers(TransactionTestCase):
+    def setUp(self):
+        self.jobs = [
+            IngestionJob.enqueue(JobKind.MATCHES, {"data": [], "batch": batch})[0]
+            for batch in range(N_JOBS)
+        ]
+        # A payload without data makes the job raise an error
+        self.failing_job, _ = IngestionJob.enqueue(JobKind.PREDICTIONS, {})
+
+    def test_handle(self):
+        with self.settings(INGESTION_JOB_MAX_ATTEMPTS=2):
+            call_command("run_workers", processes=2, burst=True, verbosity=0)
+
+        # It runs each job once
+        for job in self.jobs:
+            job.refresh_from_db()
+            self.assertEqual(job.status, JobStatus.SUCCEEDED)
+            self.assertEqual(job.attempts, 1)
+
+        # It retries failing jobs until they run out of attempts
+        self.failing_job.refresh_from_db()
+        self.assertEqual(self.failing_job.status, JobStatus.FAILED)
+        self.assertEqual(self.failing_job.attempts, 2)
+        self.assertIn("KeyError", self.failing_job.error)
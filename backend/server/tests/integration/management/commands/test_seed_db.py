@@ -79,6 +79,49 @@ class TestSeedDb(TestCase):
         self.assertEqual(Prediction.objects.count(), expected_match_count)
         self.assertEqual(TeamMatch.objects.filter(score=0).count(), 0)
 
+    def test_handle_bulk(self):
+        self.seed_command.handle(
+            year_range=f"{self.years[0]}-{self.years[1]}", bulk=True
+        )
+
+        self.assertGreater(Team.objects.count(), 0)
+        self.assertEqual(MLModel.objects.count(), 1)
+
+        expected_match_count = len(
+            self.match_results_data_frame.query(
+                "year >= @self.years[0] & year < @self.years[1]"
+            )
+        )
+        self.assertEqual(Match.objects.count(), expected_match_count)
+        self.assertEqual(
+            TeamMatch.objects.count(),
+            expected_match_count * 2,
+        )
+        self.assertEqual(Prediction.objects.count(), expected_match_count)
+        self.assertEqual(TeamMatch.objects.filter(score=0).count(), 0)
+        # It saves match results
+        self.assertEqual(Match.objects.filter(margin__isnull=True).count(), 0)
+        # It calculates whether predictions are correct
+        self.assertEqual(Prediction.objects.filter(is_correct__isnull=True).count(), 0)
+
+        for prediction in Prediction.objects.select_related(
+            "match", "predicted_winner"
+        ):
+            self.assertEqual(
+                prediction.is_correct,
+                prediction.match.is_draw
+                or prediction.predicted_winner == prediction.match.winner,
+            )
+
+        with self.subTest("when records already exist"):
+            self.seed_command.handle(
+                year_range=f"{self.years[0]}-{self.years[1]}", bulk=True
+            )
+
+            # It doesn't create duplicate records
+            self.assertEqual(Match.objects.count(), expected_match_count)
+            self.assertEqual(Prediction.objects.count(), expected_match_count)
+
     def test_handle_errors(self):
         with self.subTest(
             "with invalid year_range argument due to it being a single year"
@@ -0,0 +1,103 @@
+# pylint: disable=missing-docstring,protected-access
+
+from django.db import connection, transaction
+from django.test import TestCase
+
+from server.models import Match, TeamMatch, Prediction
+from server.tests.fixtures import factories
+
+
+YEAR_RANGE = (2015, 2020)
+ROUND_COUNT = 4
+YEAR = 2019
+ROUND_NUMBER = 1
+
+
+class TestQueryPlans(TestCase):
+    def setUp(self):
+        ml_models = [
+            factories.MLModelFactory(name="test_estimator", used_in_competitions=True),
+            factories.MLModelFactory(name="other_estimator"),
+        ]
+        self.matches = [
+            factories.FullMatchFactory(
+                with_predictions=True,
+                year=year,
+                round_number=round_number,
+                prediction__ml_model=ml_models[0],
+                prediction_two__ml_model=ml_models[1],
+            )
+            for year in range(*YEAR_RANGE)
+            for round_number in range(1, ROUND_COUNT + 1)
+        ]
+        self.match = Match.objects.get(season=YEAR, round_number=ROUND_NUMBER)
+
+        # Statistics left over from other tests' data can make the planner
+        # think that the tables are empty
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def _explain(self, query_set) -> str:
+        # Test tables are too small for Postgres to bother with indexes,
+        # so we discourage sequential scans to see whether an index is available.
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            return query_set.explain()
+
+    def test_season_filters(self):
+        season_round_queries = {
+            "season model metrics": Prediction.objects.filter(
+                match__season=YEAR
+            ).select_related("ml_model", "match"),
+            "latest round predictions": Prediction.objects.filter(
+                ml_model__used_in_competitions=True,
+                match__season=YEAR,
+                match__round_number=ROUND_NUMBER,
+            ),
+            "prediction matching attributes": Match.objects.filter(
+                season=YEAR,
+                round_number=ROUND_NUMBER,
+                teammatch__team__name__in=self.match.teammatch_set.values_list(
+                    "team__name", flat=True
+                ),
+            ),
+            "season": Prediction.objects.filter(match__season=YEAR).distinct(
+                "match__season"
+            ),
+        }
+
+        for query_name, query_set in season_round_queries.items():
+            with self.subTest(query_name):
+                self.assertIn("match_season_round_idx", self._explain(query_set))
+
+    def test_prediction_upsert(self):
+        prediction = self.match.prediction_set.first()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                EXPLAIN INSERT INTO {Prediction._meta.db_table} (
+                    match_id, ml_model_id, predicted_winner_id, created_at, updated_at
+                )
+                VALUES (%s, %s, %s, NOW(), NOW())
+                ON CONFLICT (match_id, ml_model_id) DO NOTHING
+                """,
+                [
+                    prediction.match_id,
+                    prediction.ml_model_id,
+                    prediction.predicted_winner_id,
+                ],
+            )
+            query_plan = "\n".join(row[0] for row in cursor.fetchall())
+
+        self.assertIn("Conflict Arbiter Indexes: unique_match_and_ml_model", query_plan)
+
+    def test_team_match_filters(self):
+        self.assertIn(
+            "teammatch_match_at_home_idx",
+            self._explain(
+                TeamMatch.objects.filter(match=self.match, at_home=True).values(
+                    "team_id", "score"
+                )
+            ),
+        )
@@ -0,0 +1,166 @@
+# pylint: disable=missing-docstring
+
+# These tests need a hot standby of the test DB's Postgres server. The docker-compose
+# files run one as the db_replica service and point DATABASE_REPLICA_HOST at it.
+# Outside of Docker, start one with, for example:
+#   pg_basebackup -h localhost -U postgres -D /tmp/replica -R -X stream
+#   pg_ctl -D /tmp/replica -o "-p 5433" start
+# then run them with DATABASE_REPLICA_HOST=localhost DATABASE_REPLICA_PORT=5433.
+# The standby replicates the test DB that the test runner creates on the primary.
+
+from contextlib import contextmanager
+from unittest import skipUnless
+import json
+import os
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from server.models import MLModel
+from server.routers import replica_reads, replica_status
+from server.tests.fixtures import factories
+
+
+REPLICA_HOST = os.getenv("DATABASE_REPLICA_HOST")
+REPLICA_PORT = int(os.getenv("DATABASE_REPLICA_PORT", "5432"))
+REPLICATION_TIMEOUT = 10
+QUERY = "query { fetchMlModels { name } }"
+
+
+@skipUnless(REPLICA_HOST, "Needs a hot standby at DATABASE_REPLICA_HOST.")
+@override_settings(DATABASE_REPLICA_LAG_CHECK_INTERVAL=0, DATABASE_REPLICA_MAX_LAG=60)
+class TestReplicaRouting(TransactionTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        connections.databases[settings.REPLICA_DATABASE] = {
+            **connections[DEFAULT_DB_ALIAS].settings_dict,
+            "HOST": REPLICA_HOST,
+            "PORT": REPLICA_PORT,
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[settings.REPLICA_DATABASE].close()
+        del connections[settings.REPLICA_DATABASE]
+        del connections.databases[settings.REPLICA_DATABASE]
+
+        super().tearDownClass()
+
+    def setUp(self):
+        self.ml_model = factories.MLModelFactory(name="replicated_model")
+        self.replica = connections[settings.REPLICA_DATABASE]
+
+        self._wait_for_replica()
+
+    def _wait_for_replica(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_wal_lsn_diff(pg_current_wal_flush_lsn(), '0/0')::bigint"
+            )
+            wal_position = cursor.fetchone()[0]
+
+        deadline = time.monotonic() + REPLICATION_TIMEOUT
+
+        while (replica_status(refresh=True).wal_position or 0) < wal_position:
+            self.assertLess(time.monotonic(), deadline, "The replica isn't replaying.")
+            time.sleep(0.05)
+
+    @contextmanager
+    def _paused_replay(self):
+        with self.replica.cursor() as cursor:
+            cursor.execute("SELECT pg_wal_replay_pause()")
+
+            try:
+                yield
+            finally:
+                cursor.execute("SELECT pg_wal_replay_resume()")
+
+    def _query_ml_model_names(self):
+        response = self.client.get(
+            "/graphql", {"query": QUERY}, HTTP_ACCEPT="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        return {
+            ml_model["name"]
+            for ml_model in json.loads(response.content)["data"]["fetchMlModels"]
+        }
+
+    def _query_count(self, queries):
+        return sum("server_mlmodel" in query["sql"] for query in queries)
+
+    def test_graphql_reads(self):
+        with CaptureQueriesContext(self.replica) as replica_queries:
+            ml_model_names = self._query_ml_model_names()
+
+        # It reads from the replica
+        self.assertEqual(ml_model_names, {self.ml_model.name})
+        self.assertGreater(self._query_count(replica_queries), 0)
+
+        with self.subTest("when the replica hasn't replayed the latest data"):
+            with self._paused_replay():
+                factories.MLModelFactory(name="new_model")
+
+                with CaptureQueriesContext(self.replica) as replica_queries:
+                    ml_model_names = self._query_ml_model_names()
+
+            # It reads the latest data from the primary
+            self.assertEqual(ml_model_names, {self.ml_model.name, "new_model"})
+            self.assertEqual(self._query_count(replica_queries), 0)
+
+    def test_replica_lag(self):
+        with self._paused_replay():
+            factories.MLModelFactory(name="new_model")
+            # Make sure that the replica has received the WAL that it isn't replaying
+            time.sleep(0.5)
+
+            with replica_reads():
+                new_model_is_readable = MLModel.objects.filter(
+                    name="new_model"
+                ).exists()
+
+            # It reads slightly stale data from the replica
+            self.assertFalse(new_model_is_readable)
+
+            with self.subTest("when the replica lags more than the max lag"):
+                with self.settings(DATABASE_REPLICA_MAX_LAG=0):
+                    with replica_reads():
+                        new_model_is_readable = MLModel.objects.filter(
+                            name="new_model"
+                        ).exists()
+
+                # It reads from the primary
+                self.assertTrue(new_model_is_readable)
+
+    def test_read_your_writes(self):
+        with self._paused_replay():
+            with replica_reads():
+                with CaptureQueriesContext(self.replica) as replica_queries:
+                    self.assertEqual(MLModel.objects.count(), 1)
+
+                    MLModel.objects.create(name="new_model")
+
+                    # It reads its own writes from the primary
+                    self.assertEqual(MLModel.objects.count(), 2)
+
+        self.assertEqual(self._query_count(replica_queries), 1)
+
+    def test_unavailable_replica(self):
+        self.replica.close()
+        replica_port = self.replica.settings_dict["PORT"]
+        # Nothing listens on port 1
+        self.replica.settings_dict["PORT"] = 1
+
+        try:
+            with replica_reads():
+                ml_model_count = MLModel.objects.count()
+        finally:
+            self.replica.settings_dict["PORT"] = replica_port
+
+        # It reads from the primary
+        self.assertEqual(ml_model_count, 1)
@@ -5,6 +5,7 @@ from django.urls import reverse
 import pandas as pd
 
 from server.tests.fixtures import data_factories, factories
+from server.jobs import run_next_job
 from server.models import Prediction, MLModel
 
 
@@ -34,9 +35,11 @@ class TestUrls(TestCase):
 
         self.assertEqual(Prediction.objects.count(), 0)
 
-        self.client.post(
+        response = self.client.post(
             reverse("predictions"), content_type="application/json", data=predictions
         )
+        run_next_job(verbose=0)
 
+        self.assertEqual(response.status_code, 202)
         # It creates predictions
         self.assertEqual(Prediction.objects.count(), N_MATCHES)
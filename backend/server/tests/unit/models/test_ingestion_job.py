@@ -0,0 +1,99 @@
+# pylint: disable=missing-docstring
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from freezegun import freeze_time
+
+from server.models import IngestionJob
+from server.models.ingestion_job import JobKind, JobStatus
+
+
+PAYLOAD = {"data": [{"home_team": "Richmond", "away_team": "Carlton"}]}
+
+
+class TestIngestionJob(TestCase):
+    def test_enqueue(self):
+        job, created = IngestionJob.enqueue(JobKind.MATCHES, PAYLOAD)
+
+        self.assertTrue(created)
+        self.assertEqual(job.status, JobStatus.PENDING)
+
+        with self.subTest("with the same payload as an active job"):
+            duplicate_job, created = IngestionJob.enqueue(JobKind.MATCHES, PAYLOAD)
+
+            self.assertFalse(created)
+            self.assertEqual(duplicate_job, job)
+
+        with self.subTest("with the same payload as a different kind of job"):
+            _, created = IngestionJob.enqueue(JobKind.FIXTURES, PAYLOAD)
+
+            self.assertTrue(created)
+
+        with self.subTest("with the same payload as a recently succeeded job"):
+            job.succeed()
+            duplicate_job, created = IngestionJob.enqueue(JobKind.MATCHES, PAYLOAD)
+
+            self.assertFalse(created)
+            self.assertEqual(duplicate_job, job)
+
+        with self.subTest("after the deduplication window"):
+            with self.settings(INGESTION_JOB_DEDUPLICATION_WINDOW=60):
+                with freeze_time(timezone.now() + timedelta(minutes=2)):
+                    new_job, created = IngestionJob.enqueue(JobKind.MATCHES, PAYLOAD)
+
+            self.assertTrue(created)
+            self.assertNotEqual(new_job, job)
+
+        with self.subTest("with the same payload as a failed job"):
+            IngestionJob.objects.filter(kind=JobKind.MATCHES).update(
+                status=JobStatus.FAILED
+            )
+
+            _, created = IngestionJob.enqueue(JobKind.MATCHES, PAYLOAD)
+
+            self.assertTrue(created)
+
+    def test_claim_next(self):
+        self.assertIsNone(IngestionJob.claim_next())
+
+        first_job, _ = IngestionJob.enqueue(JobKind.MATCHES, {"data": []})
+        second_job, _ = IngestionJob.enqueue(JobKind.MATCHES, PAYLOAD)
+
+        claimed_job = IngestionJob.claim_next()
+
+        # It claims the oldest pending job
+        self.assertEqual(claimed_job, first_job)
+        self.assertEqual(claimed_job.status, JobStatus.RUNNING)
+        self.assertEqual(claimed_job.attempts, 1)
+        self.assertEqual(IngestionJob.claim_next(), second_job)
+
+        with self.subTest("when there are only running jobs"):
+            self.assertIsNone(IngestionJob.claim_next())
+
+        with self.subTest("when a running job has timed out"):
+            stale_time = timezone.now() + timedelta(seconds=10)
+
+            with self.settings(INGESTION_JOB_TIMEOUT=5):
+                with freeze_time(stale_time):
+                    reclaimed_job = IngestionJob.claim_next()
+
+            self.assertEqual(reclaimed_job, first_job)
+            self.assertEqual(reclaimed_job.attempts, 2)
+
+    def test_fail(self):
+        IngestionJob.enqueue(JobKind.MATCHES, PAYLOAD)
+
+        with self.settings(INGESTION_JOB_MAX_ATTEMPTS=2):
+            job = IngestionJob.claim_next()
+            job.fail("Traceback")
+
+            # It queues the job again while it has attempts left
+            self.assertEqual(job.status, JobStatus.PENDING)
+            self.assertEqual(job.error, "Traceback")
+
+            job = IngestionJob.claim_next()
+            job.fail("Traceback")
+
+            self.assertEqual(job.status, JobStatus.FAILED)
+            self.assertIsNone(IngestionJob.claim_next())
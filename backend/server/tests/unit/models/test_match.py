@@ -1,6 +1,5 @@
 # pylint: disable=missing-docstring
 from copy import copy
-from unittest.mock import patch, call
 from datetime import datetime, timedelta
 
 from django.test import TestCase
@@ -9,7 +8,7 @@ from django.db.utils import DataError
 from django.core.exceptions import ValidationError
 import pandas as pd
 
-from server.models import Match, Team
+from server.models import Match, Team, ModelRoundMetrics
 from server.tests.fixtures import data_factories
 from server.tests.fixtures.factories import FullMatchFactory
 
@@ -109,13 +108,12 @@ class TestMatch(TestCase):
             played_resultless.start_date_time, earliest_date_time_without_results
         )
 
-    @patch("server.models.match.Match.update_result")
-    def test_update_results(self, mock_update_result):
+    def test_update_results(self):
         match_results = data_factories.fake_match_results_data()
-        calls = []
 
         for _idx, match_result in match_results.iterrows():
             FullMatchFactory(
+                with_predictions=True,
                 home_team_match__score=0,
                 away_team_match__score=0,
                 start_date_time=match_result["date"],
@@ -124,11 +122,89 @@ class TestMatch(TestCase):
                 away_team_match__team__name=match_result["away_team"],
                 venue=match_result["venue"],
             )
-            calls.append(call(match_result))
 
-        Match.update_results(match_results)
+        # 1 select for pending matches, 3 bulk updates, plus the savepoint
+        # and its release for the wrapping transaction, then 3 queries and another
+        # savepoint to recalculate the season's cumulative model metrics
+        with self.assertNumQueries(11):
+            Match.update_results(match_results)
+
+        self.assertEqual(Match.played_without_results().count(), 0)
+        self.assertTrue(
+            ModelRoundMetrics.objects.filter(
+                season__in=match_results["year"].unique().tolist()
+            ).exists()
+        )
+
+        for match in Match.objects.filter(
+            start_date_time__in=match_results["date"]
+        ).prefetch_related("teammatch_set__team", "prediction_set"):
+            match_result = match_results.query(
+                "year == @match.year & round_number == @match.round_number & "
+                "home_team == @match.team(at_home=True).name"
+            ).iloc[0, :]
+
+            # It updates match scores
+            self.assertEqual(
+                match.teammatch_set.get(at_home=True).score,
+                match_result["home_score"],
+            )
+            self.assertEqual(
+                match.teammatch_set.get(at_home=False).score,
+                match_result["away_score"],
+            )
+            # It updates match winner and margin
+            self.assertEqual(
+                match.margin,
+                abs(match_result["home_score"] - match_result["away_score"]),
+            )
+            self.assertEqual(
+                match.winner,
+                match._calculate_winner(),  # pylint: disable=protected-access
+            )
+            # It updates prediction correctness
+            for prediction in match.prediction_set.all():
+                self.assertEqual(
+                    prediction.is_correct,
+                    match.is_draw or prediction.predicted_winner == match.winner,
+                )
+
+        with self.subTest("with duplicate results rows"):
+            match = FullMatchFactory(
+                home_team_match__score=0,
+                away_team_match__score=0,
+                start_date_time=timezone.now() - timedelta(days=1),
+            )
+            match_result = match_results.iloc[:1, :].assign(
+                year=match.year,
+                round_number=match.round_number,
+                home_team=match.team(at_home=True).name,
+                away_team=match.team(at_home=False).name,
+            )
+
+            with self.assertRaisesRegex(AssertionError, "a single row per match"):
+                Match.update_results(pd.concat([match_result, match_result]))
+
+        with self.subTest("without results for a recent match"):
+            with self.assertWarnsRegex(UserWarning, "Unable to update the match"):
+                Match.update_results(match_results)
+
+            # It doesn't update match scores
+            self.assertEqual(
+                sum(match.teammatch_set.values_list("score", flat=True)), 0
+            )
+
+        with self.subTest("without results for a match played over a week ago"):
+            FullMatchFactory(
+                home_team_match__score=0,
+                away_team_match__score=0,
+                start_date_time=timezone.now() - timedelta(days=8),
+            )
 
-        self.assertEqual(mock_update_result.call_count, len(match_results))
+            with self.assertRaisesRegex(
+                AssertionError, "Didn't find any match data rows"
+            ):
+                Match.update_results(match_results)
 
     def test_update_result(self):
         with self.subTest("When the match hasn't been played yet"):
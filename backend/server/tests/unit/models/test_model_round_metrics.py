@@ -0,0 +1,112 @@
+# pylint: disable=missing-docstring
+from datetime import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+import pandas as pd
+
+from server.models import ModelRoundMetrics, Match, Prediction
+from server.graphql.calculations import cumulative_metrics_query
+from server.models.model_round_metrics import CUMULATIVE_METRICS
+from server.tests.fixtures.factories import FullMatchFactory, MLModelFactory
+
+
+YEAR = 2018
+ROUND_COUNT = 4
+MATCH_COUNT = 2
+
+
+class TestModelRoundMetrics(TestCase):
+    def setUp(self):
+        ml_models = [
+            MLModelFactory(name="predictanator"),
+            MLModelFactory(name="accurate_af"),
+        ]
+
+        for round_n in range(ROUND_COUNT):
+            for match_n in range(MATCH_COUNT):
+                FullMatchFactory(
+                    with_predictions=True,
+                    year=YEAR,
+                    round_number=(round_n + 1),
+                    start_date_time=timezone.make_aware(
+                        datetime(YEAR, 6, (round_n * 7) + 1, match_n * 5)
+                    ),
+                    prediction__ml_model=ml_models[0],
+                    prediction_two__ml_model=ml_models[1],
+                )
+
+    def test_recalculate(self):
+        ModelRoundMetrics.recalculate(YEAR)
+
+        expected_metrics = pd.DataFrame(
+            list(
+                cumulative_metrics_query(
+                    Prediction.objects.filter(
+                        match__season=YEAR, match__margin__isnull=False
+                    )
+                )
+            )
+        ).set_index(["match__round_number", "ml_model__name"])
+        model_metrics = ModelRoundMetrics.objects.filter(season=YEAR)
+
+        self.assertEqual(model_metrics.count(), len(expected_metrics))
+
+        for metrics in model_metrics.select_related("ml_model"):
+            expected_round_metrics = expected_metrics.loc[
+                (metrics.round_number, metrics.ml_model.name), CUMULATIVE_METRICS
+            ]
+
+            for metric in CUMULATIVE_METRICS:
+                self.assertAlmostEqual(
+                    getattr(metrics, metric), expected_round_metrics[metric]
+                )
+
+        with self.subTest("from a later round"):
+            earlier_metric_ids = set(
+                ModelRoundMetrics.objects.filter(round_number__lt=3).values_list(
+                    "id", flat=True
+                )
+            )
+            Prediction.objects.filter(
+                match__season=YEAR, match__round_number=3
+            ).update(is_correct=False)
+
+            ModelRoundMetrics.recalculate(YEAR, 3)
+
+            self.assertEqual(
+                ModelRoundMetrics.objects.filter(season=YEAR)
+                .values("round_number")
+                .distinct()
+                .count(),
+                ROUND_COUNT,
+            )
+            # Metrics for rounds before the given one aren't recalculated
+            self.assertEqual(
+                set(
+                    ModelRoundMetrics.objects.filter(round_number__lt=3).values_list(
+                        "id", flat=True
+                    )
+                ),
+                earlier_metric_ids,
+            )
+            self.assertEqual(
+                ModelRoundMetrics.objects.get(
+                    round_number=3, ml_model__name="predictanator"
+                ).cumulative_correct_count,
+                ModelRoundMetrics.objects.get(
+                    round_number=2, ml_model__name="predictanator"
+                ).cumulative_correct_count,
+            )
+
+        with self.subTest("when results are removed from the latest round"):
+            Match.objects.filter(season=YEAR, round_number=ROUND_COUNT).update(
+                margin=None
+            )
+            ModelRoundMetrics.recalculate(YEAR, ROUND_COUNT)
+
+            self.assertEqual(
+                ModelRoundMetrics.objects.filter(season=YEAR).latest("round_number")
+                .round_number,
+                ROUND_COUNT - 1,
+            )
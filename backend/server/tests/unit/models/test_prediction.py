@@ -242,25 +242,17 @@ class TestPrediction(TestCase):
 
             self.assertTrue(prediction.is_correct)
 
+        # Predictions are unique per match & model, so we update the same record
+        # for the following cases
         with self.subTest("when lower-scoring team is predicted winner"):
-            prediction = Prediction(
-                match=self.match,
-                ml_model=self.ml_model,
-                predicted_winner=self.away_team,
-                predicted_margin=50,
-            )
+            prediction.predicted_winner = self.away_team
             prediction.update_correctness()
 
             self.assertFalse(prediction.is_correct)
 
         with self.subTest("when match is a draw"):
             self.match.teammatch_set.update(score=100)
-            prediction = Prediction(
-                match=self.match,
-                ml_model=self.ml_model,
-                predicted_winner=self.away_team,
-                predicted_margin=50,
-            )
+            prediction.predicted_winner = self.away_team
             prediction.update_correctness()
 
             self.assertTrue(prediction.is_correct)
@@ -0,0 +1,141 @@
+# pylint: disable=missing-docstring
+
+from unittest.mock import patch
+import asyncio
+import json
+import time
+from urllib.parse import urlencode
+
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from django.urls import path, re_path
+import pandas as pd
+
+from server import views
+from server.graphql.views import AsyncPersistedQueryView
+from server.jobs import run_next_job
+from server.models import IngestionJob, Prediction
+from server.tests.fixtures import data_factories, factories
+
+
+N_MATCHES = 3
+SLOW_INGESTION_SECONDS = 1
+QUERY = "query { fetchMlModels { name } }"
+
+urlpatterns = [
+    re_path("^graphql", AsyncPersistedQueryView.as_view()),
+    path("predictions", views.async_predictions),
+    path("matches", views.async_matches),
+]
+
+
+def _slowly(func):
+    def slow_func(*args, **kwargs):
+        time.sleep(SLOW_INGESTION_SECONDS)
+        return func(*args, **kwargs)
+
+    return slow_func
+
+
+# DB work runs in other threads, so it needs committed data
+@override_settings(ROOT_URLCONF=__name__)
+class TestAsyncViews(TransactionTestCase):
+    def setUp(self):
+        self.client = AsyncClient()
+        self.ml_model = factories.MLModelFactory(
+            name="test_estimator", is_principal=True, used_in_competitions=True
+        )
+        self.matches = [
+            factories.FullMatchFactory(future=True, round_number=5)
+            for _ in range(N_MATCHES)
+        ]
+        prediction_data = pd.concat(
+            [
+                data_factories.fake_prediction_data(
+                    match_data=match, ml_model_name=self.ml_model.name
+                )
+                for match in self.matches
+            ]
+        )
+        self.prediction_body = {"data": prediction_data.to_dict("records")}
+
+    def _post_predictions(self):
+        return self.client.post(
+            "/predictions",
+            data=self.prediction_body,
+            content_type="application/json",
+        )
+
+    def _get_graphql(self):
+        # Django 3.1's AsyncClient doesn't put GET data into the query string
+        return self.client.get(
+            f"/graphql?{urlencode({'query': QUERY})}", HTTP_ACCEPT="application/json"
+        )
+
+    def test_predictions(self):
+        response = asyncio.run(self._post_predictions())
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(json.loads(response.content)["status"], "pending")
+
+        run_next_job(verbose=0)
+
+        self.assertEqual(Prediction.objects.count(), N_MATCHES)
+
+        with self.subTest("GET request"):
+            response = asyncio.run(self.client.get("/matches"))
+
+            self.assertEqual(response.status_code, 405)
+
+        with self.subTest("with the wrong token"):
+            with self.settings(API_TOKEN="token", ENVIRONMENT="production"):
+                response = asyncio.run(
+                    self.client.post(
+                        "/predictions",
+                        data=self.prediction_body,
+                        content_type="application/json",
+                        HTTP_AUTHORIZATION="Bearer not_token",
+                    )
+                )
+
+            self.assertEqual(response.status_code, 401)
+
+    def test_graphql(self):
+        response = asyncio.run(self._get_graphql())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            json.loads(response.content)["data"]["fetchMlModels"],
+            [{"name": self.ml_model.name}],
+        )
+
+    def test_profiling(self):
+        with self.settings(REQUEST_PROFILING=True):
+            response = asyncio.run(self._get_graphql())
+
+        # It counts DB queries from the thread pool
+        self.assertRegex(
+            response["Server-Timing"], r'db;dur=[\d.]+;desc="[1-9]\d* queries'
+        )
+
+    def test_slow_ingestion(self):
+        async def time_request(request):
+            await request
+            return time.monotonic()
+
+        async def ingest_and_read():
+            return await asyncio.gather(
+                time_request(self._post_predictions()),
+                time_request(self._get_graphql()),
+            )
+
+        slow_enqueue = _slowly(IngestionJob.enqueue)
+
+        with patch.object(IngestionJob, "enqueue", slow_enqueue):
+            start_time = time.monotonic()
+            ingestion_end_time, graphql_end_time = asyncio.run(ingest_and_read())
+
+        # GraphQL requests don't wait for ingestion to finish
+        self.assertLess(graphql_end_time - start_time, SLOW_INGESTION_SECONDS)
+        self.assertGreaterEqual(
+            ingestion_end_time - start_time, SLOW_INGESTION_SECONDS
+        )
@@ -0,0 +1,121 @@
+# pylint: disable=missing-docstring
+
+from datetime import datetime
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from graphene.test import Client
+
+from server.cache import (
+    RESOLVER_CACHE,
+    InstrumentedLocMemCache,
+    data_version,
+    bump_data_version,
+)
+from server.graphql import schema
+from server.models import ModelRoundMetrics, Prediction
+from server.tests.fixtures.factories import FullMatchFactory, MLModelFactory
+
+
+YEAR = 2018
+ROUND_COUNT = 2
+MAX_ENTRIES = 2
+
+SEASON_MODEL_METRICS_QUERY = """
+    query($season: Int) {
+        fetchSeasonModelMetrics(season: $season) {
+            roundModelMetrics(roundNumber: -1) {
+                modelMetrics(mlModelName: "predictanator") { cumulativeCorrectCount }
+            }
+        }
+    }
+"""
+
+
+def _correct_count(executed):
+    return executed["data"]["fetchSeasonModelMetrics"]["roundModelMetrics"][0][
+        "modelMetrics"
+    ][0]["cumulativeCorrectCount"]
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        RESOLVER_CACHE: {
+            "BACKEND": "server.cache.InstrumentedLocMemCache",
+            "LOCATION": "test-graphql",
+            "TIMEOUT": None,
+            "OPTIONS": {"MAX_ENTRIES": MAX_ENTRIES, "CULL_FREQUENCY": MAX_ENTRIES},
+        },
+    }
+)
+class TestCache(TestCase):
+    def setUp(self):
+        self.client = Client(schema)
+        self.cache = caches[RESOLVER_CACHE]
+        self.cache.clear()
+
+        ml_model = MLModelFactory(name="predictanator")
+
+        for round_number in range(1, ROUND_COUNT + 1):
+            FullMatchFactory(
+                with_predictions=True,
+                year=YEAR,
+                round_number=round_number,
+                start_date_time=timezone.make_aware(datetime(YEAR, 6, round_number * 7)),
+                prediction__ml_model=ml_model,
+                prediction_two__ml_model=MLModelFactory(),
+            )
+
+        ModelRoundMetrics.recalculate(YEAR)
+
+    def _execute(self, season=YEAR):
+        return self.client.execute(
+            SEASON_MODEL_METRICS_QUERY, variables={"season": season}
+        )
+
+    def test_cache_resolver(self):
+        self.assertIsInstance(self.cache, InstrumentedLocMemCache)
+
+        uncached_result = self._execute()
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+        with self.subTest("with the same variables and data version"):
+            # Only the data version query
+            with self.assertNumQueries(1):
+                cached_result = self._execute()
+
+            self.assertEqual(cached_result, uncached_result)
+            self.assertEqual(self.cache.stats()["hits"], 1)
+
+        with self.subTest("with different variables"):
+            self._execute(season=YEAR - 1)
+            self.assertEqual(self.cache.stats()["misses"], 2)
+
+        with self.subTest("after saving records"):
+            prediction = Prediction.objects.filter(
+                match__season=YEAR, ml_model__name="predictanator"
+            ).first()
+            prediction.is_correct = not prediction.is_correct
+            prediction.save()
+            # Functions that save predictions do this once per batch
+            ModelRoundMetrics.recalculate(YEAR)
+            bump_data_version()
+
+            updated_result = self._execute()
+
+            self.assertEqual(self.cache.stats()["misses"], 3)
+            self.assertEqual(
+                abs(_correct_count(updated_result) - _correct_count(uncached_result)),
+                1,
+            )
+
+        with self.subTest("when the cache is full"):
+            self.assertLessEqual(self.cache.stats()["entries"], MAX_ENTRIES)
+
+    def test_bump_data_version(self):
+        current_version = data_version()
+        bump_data_version()
+
+        self.assertGreater(data_version(), current_version)
@@ -0,0 +1,170 @@
+# pylint: disable=missing-docstring
+from datetime import datetime
+from collections import defaultdict
+import math
+
+from django.test import TestCase
+from django.utils import timezone
+import pandas as pd
+
+from server.models import Prediction, TeamMatch
+from server.models.ml_model import PredictionType
+from server.models.model_round_metrics import CUMULATIVE_METRICS
+from server.graphql.calculations import (
+    cumulative_metrics_query,
+    group_metrics_by_round,
+    MIN_LOG_VAL,
+)
+from server.tests.fixtures.factories import FullMatchFactory, MLModelFactory
+
+
+YEAR = 2018
+ROUND_COUNT = 4
+MATCH_COUNT = 3
+MODEL_NAMES = ["predictanator", "accurate_af", "probably_right"]
+
+
+def _bits(prediction):
+    win_probability = prediction.predicted_win_probability
+
+    if win_probability is None:
+        return 0
+
+    if prediction.match.margin == 0:
+        return 1 + 0.5 * math.log2(
+            max(win_probability * (1 - win_probability), MIN_LOG_VAL)
+        )
+
+    if prediction.predicted_winner_id == prediction.match.winner_id:
+        return 1 + math.log2(win_probability)
+
+    return 1 + math.log2(1 - win_probability)
+
+
+def _expected_metrics(predictions):
+    # Calculates the metrics one prediction at a time, in match order,
+    # to check the window functions against
+    totals = defaultdict(lambda: defaultdict(float))
+    metrics = {}
+
+    for prediction in sorted(
+        predictions, key=lambda pred: (pred.match.start_date_time, pred.match_id)
+    ):
+        model_totals = totals[prediction.ml_model.name]
+        model_totals["count"] += 1
+        model_totals["correct"] += int(prediction.is_correct)
+        model_totals["bits"] += _bits(prediction)
+
+        if prediction.predicted_margin is not None:
+            margin = prediction.match.margin
+            predicted_margin = prediction.predicted_margin
+            model_totals["margin_count"] += 1
+            model_totals["margin_difference"] += (
+                abs(margin - predicted_margin)
+                if prediction.is_correct
+                else margin + predicted_margin
+            )
+
+        metrics[(prediction.match.round_number, prediction.ml_model.name)] = {
+            "cumulative_correct_count": model_totals["correct"],
+            "cumulative_accuracy": model_totals["correct"] / model_totals["count"],
+            "cumulative_mean_absolute_error": (
+                round(
+                    model_totals["margin_difference"] / model_totals["margin_count"], 2
+                )
+                if model_totals["margin_count"]
+                else 0
+            ),
+            "cumulative_margin_difference": model_totals["margin_difference"],
+            "cumulative_bits": model_totals["bits"],
+        }
+
+    return (
+        pd.DataFrame.from_dict(metrics, orient="index")
+        .rename_axis(["match__round_number", "ml_model__name"])
+        .sort_index()
+        .loc[:, CUMULATIVE_METRICS]
+    )
+
+
+class TestCalculations(TestCase):
+    def setUp(self):
+        self.ml_models = [
+            MLModelFactory(
+                name=model_name,
+                prediction_type=(
+                    PredictionType.WIN_PROBABILITY
+                    if model_name == "probably_right"
+                    else PredictionType.MARGIN
+                ),
+            )
+            for model_name in MODEL_NAMES
+        ]
+
+        for round_n in range(ROUND_COUNT):
+            for match_n in range(MATCH_COUNT):
+                FullMatchFactory(
+                    with_predictions=True,
+                    year=YEAR,
+                    round_number=(round_n + 1),
+                    start_date_time=timezone.make_aware(
+                        datetime(YEAR, 6, (round_n * 7) + 1, match_n * 5)
+                    ),
+                    prediction__ml_model=self.ml_models[round_n % 2],
+                    prediction_two__ml_model=self.ml_models[2],
+                )
+
+        # Draws are a special case for some metrics
+        draw = TeamMatch.objects.filter(match__round_number=2).first().match
+        draw.teammatch_set.update(score=50)
+        draw._save_result()  # pylint: disable=protected-access
+        Prediction.update_correctness_for_matches([draw.id])
+
+        self.prediction_query_set = Prediction.objects.filter(
+            match__season=YEAR, match__margin__isnull=False
+        )
+
+    def test_cumulative_metrics_query(self):
+        expected_metrics = _expected_metrics(
+            self.prediction_query_set.select_related("match", "ml_model")
+        )
+
+        with self.assertNumQueries(1):
+            metrics = (
+                pd.DataFrame(list(cumulative_metrics_query(self.prediction_query_set)))
+                .set_index(["match__round_number", "ml_model__name"])
+                .loc[:, CUMULATIVE_METRICS]
+            )
+
+        pd.testing.assert_frame_equal(
+            metrics, expected_metrics, check_dtype=False, check_exact=False
+        )
+
+        with self.subTest("when a model didn't make predictions in some rounds"):
+            self.assertEqual(
+                set(metrics.loc[(slice(None), "predictanator"), :].index),
+                {(1, "predictanator"), (3, "predictanator")},
+            )
+
+    def test_group_metrics_by_round(self):
+        model_metrics = list(cumulative_metrics_query(self.prediction_query_set))
+
+        round_metrics = group_metrics_by_round(model_metrics)
+
+        self.assertEqual(
+            [round_data["match__round_number"] for round_data in round_metrics],
+            list(range(1, ROUND_COUNT + 1)),
+        )
+
+        for round_data in round_metrics:
+            self.assertEqual(len(round_data["model_metrics"]), 2)
+
+        with self.subTest("with a round_number filter"):
+            self.assertEqual(
+                group_metrics_by_round(model_metrics, 2), round_metrics[1:2]
+            )
+
+        with self.subTest("with a round_number of -1"):
+            self.assertEqual(
+                group_metrics_by_round(model_metrics, -1), round_metrics[-1:]
+            )
@@ -0,0 +1,74 @@
+# pylint: disable=missing-docstring
+
+import json
+
+from django.test import Client, TestCase
+
+from server.cache import bump_data_version
+from server.tests.fixtures.factories import MLModelFactory
+
+
+QUERY = """
+    query($forCompetitionOnly: Boolean) {
+        fetchMlModels(forCompetitionOnly: $forCompetitionOnly) { name }
+    }
+"""
+
+
+class TestConditionalGet(TestCase):
+    def setUp(self):
+        self.client = Client()
+        MLModelFactory(used_in_competitions=True)
+
+    def _get(self, etag=None, query=QUERY, **variables):
+        headers = {} if etag is None else {"HTTP_IF_NONE_MATCH": etag}
+
+        return self.client.get(
+            "/graphql",
+            {"query": query, "variables": json.dumps(variables)},
+            HTTP_ACCEPT="application/json",
+            **headers,
+        )
+
+    def test_etag(self):
+        response = self._get()
+        etag = response["ETag"]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("public", response["Cache-Control"])
+
+        with self.subTest("when the data hasn't changed"):
+            # Only the data version query
+            with self.assertNumQueries(1):
+                response = self._get(etag=etag)
+
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response["ETag"], etag)
+            self.assertEqual(response.content, b"")
+
+        with self.subTest("with different variables"):
+            response = self._get(etag=etag, forCompetitionOnly=True)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response["ETag"], etag)
+
+        with self.subTest("after the data changes"):
+            bump_data_version()
+            response = self._get(etag=etag)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response["ETag"], etag)
+
+        with self.subTest("with errors"):
+            response = self._get(query="query { fetchMlModels { notAField } }")
+
+            self.assertEqual(response.status_code, 400)
+            self.assertFalse(response.has_header("ETag"))
+
+        with self.subTest("with a POST request"):
+            response = self.client.post(
+                "/graphql", {"query": QUERY}, content_type="application/json"
+            )
+
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.has_header("ETag"))
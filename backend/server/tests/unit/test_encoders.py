@@ -0,0 +1,82 @@
+# pylint: disable=missing-docstring
+
+from datetime import date, datetime
+from decimal import Decimal
+import json
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+import numpy as np
+
+from server.encoders import (
+    OrjsonResponseEncoder,
+    StandardJSONResponseEncoder,
+    encode_json,
+)
+
+
+DATA = {
+    "decimal": Decimal("1.5"),
+    "date": date(2020, 3, 19),
+    "datetime": timezone.make_aware(datetime(2020, 3, 19, 19, 40, 0, 123456)),
+    "numpy_float": np.float64(0.25),
+    "numpy_int": np.int64(7),
+    "numpy_bool": np.bool_(True),
+    "numpy_array": np.array([1.5, 2.5]),
+    "values": [{"name": "Tipresias", "margin": 12}],
+}
+EXPECTED_DATA = {
+    "decimal": 1.5,
+    "date": "2020-03-19",
+    "datetime": "2020-03-19T19:40:00.123456+00:00",
+    "numpy_float": 0.25,
+    "numpy_int": 7,
+    "numpy_bool": True,
+    "numpy_array": [1.5, 2.5],
+    "values": [{"name": "Tipresias", "margin": 12}],
+}
+
+
+class TestEncoders(TestCase):
+    def test_encode(self):
+        for encoder_class in [StandardJSONResponseEncoder, OrjsonResponseEncoder]:
+            with self.subTest(encoder_class.__name__):
+                encoded_data = encoder_class().encode(DATA)
+
+                self.assertIsInstance(encoded_data, bytes)
+                self.assertEqual(json.loads(encoded_data), EXPECTED_DATA)
+
+        with self.subTest("with non-finite numbers"):
+            non_finite_data = {
+                "nan": float("nan"),
+                "values": [{"margin": float("inf")}, (-float("inf"), 1.5)],
+                "numpy_float": np.float32("nan"),
+                "numpy_array": np.array([np.nan, 2.5]),
+            }
+            expected_non_finite_data = {
+                "nan": None,
+                "values": [{"margin": None}, [None, 1.5]],
+                "numpy_float": None,
+                "numpy_array": [None, 2.5],
+            }
+
+            for encoder_class in [StandardJSONResponseEncoder, OrjsonResponseEncoder]:
+                encoded_data = encoder_class().encode(non_finite_data)
+
+                # It encodes them as null, because JSON has no NaN or Infinity
+                self.assertEqual(
+                    json.loads(encoded_data, parse_constant=self.fail),
+                    expected_non_finite_data,
+                )
+
+        with self.subTest("with an unsupported type"):
+            with self.assertRaises(TypeError):
+                OrjsonResponseEncoder().encode({"set": {1, 2}})
+
+    def test_encode_json(self):
+        for encoder_class in [StandardJSONResponseEncoder, OrjsonResponseEncoder]:
+            encoder_path = f"server.encoders.{encoder_class.__name__}"
+
+            with self.subTest(encoder_path):
+                with override_settings(JSON_RESPONSE_ENCODER=encoder_path):
+                    self.assertEqual(json.loads(encode_json(DATA)), EXPECTED_DATA)
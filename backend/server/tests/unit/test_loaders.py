@@ -0,0 +1,181 @@
+# pylint: disable=missing-docstring
+
+from datetime import datetime
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from graphene.test import Client
+import graphene
+
+from server.graphql import schema
+from server.graphql.execution import Schema
+from server.graphql.loaders import DataLoader, Deferred
+from server.models import ModelRoundMetrics
+from server.tests.fixtures.factories import FullMatchFactory, MLModelFactory
+
+
+YEAR = 2018
+ROUND_COUNT = 3
+MATCH_COUNT = 2
+
+
+def _table_query_count(queries, table_name):
+    return len(
+        [query for query in queries if f'FROM "{table_name}"' in query["sql"]]
+    )
+
+
+class PositiveSquareLoader(DataLoader):
+    def batch_load(self, keys):
+        return {key: key ** 2 for key in keys if key > 0}
+
+
+def _resolve_square(root, info):
+    return info.context.square_loader.load(root)
+
+
+class SquareType(graphene.ObjectType):
+    value = graphene.Int(required=True, resolver=_resolve_square)
+
+
+class ErrorQuery(graphene.ObjectType):
+    squares = graphene.List(SquareType, keys=graphene.List(graphene.Int))
+    required_square = graphene.Field(SquareType, required=True, key=graphene.Int())
+
+    @staticmethod
+    def resolve_squares(_root, info, keys):
+        info.context.square_loader = PositiveSquareLoader()
+        return keys
+
+    @staticmethod
+    def resolve_required_square(_root, info, key):
+        info.context.square_loader = PositiveSquareLoader()
+        return key
+
+
+class TestLoaders(TestCase):
+    def setUp(self):
+        self.client = Client(schema)
+        self.ml_models = [MLModelFactory(), MLModelFactory()]
+
+        for round_number in range(1, ROUND_COUNT + 1):
+            for match_number in range(MATCH_COUNT):
+                FullMatchFactory(
+                    with_predictions=True,
+                    year=YEAR,
+                    round_number=round_number,
+                    start_date_time=timezone.make_aware(
+                        datetime(YEAR, 6, round_number * 7, match_number * 5)
+                    ),
+                    prediction__ml_model=self.ml_models[0],
+                    prediction_two__ml_model=self.ml_models[1],
+                )
+
+        ModelRoundMetrics.recalculate(YEAR)
+
+    def test_match_associations(self):
+        ml_model_name = self.ml_models[0].name
+
+        with CaptureQueriesContext(connection) as context:
+            executed = self.client.execute(
+                """
+                query($year: Int, $mlModelName: String) {
+                    fetchPredictions(year: $year) {
+                        match {
+                            homeTeam { name }
+                            awayTeam { name }
+                            predictions(mlModelName: $mlModelName) {
+                                mlModel { name }
+                            }
+                        }
+                    }
+                }
+                """,
+                variables={"year": YEAR, "mlModelName": ml_model_name},
+            )
+
+        self.assertNotIn("errors", executed)
+
+        predictions = executed["data"]["fetchPredictions"]
+        self.assertEqual(len(predictions), ROUND_COUNT * MATCH_COUNT * 2)
+
+        for prediction in predictions:
+            match = prediction["match"]
+            self.assertNotEqual(match["homeTeam"]["name"], match["awayTeam"]["name"])
+            self.assertEqual(
+                match["predictions"], [{"mlModel": {"name": ml_model_name}}]
+            )
+
+        with self.subTest("batches team-match queries"):
+            self.assertEqual(
+                _table_query_count(context.captured_queries, "server_teammatch"), 1
+            )
+
+        with self.subTest("batches prediction queries"):
+            # One for the root field and one for the matches' predictions
+            self.assertEqual(
+                _table_query_count(context.captured_queries, "server_prediction"), 2
+            )
+
+    def test_ml_models_by_name(self):
+        query = """
+            query($season: Int) {
+                fetchSeasonModelMetrics(season: $season) {
+                    roundModelMetrics {
+                        modelMetrics { mlModel { name } }
+                    }
+                }
+            }
+        """
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.execute(query, variables={"season": YEAR})
+
+        # Model metrics for every round share one ML model query
+        self.assertEqual(
+            _table_query_count(context.captured_queries, "server_mlmodel"), 1
+        )
+
+    def test_load(self):
+        class SquareLoader(DataLoader):
+            batches = []
+
+            def batch_load(self, keys):
+                self.batches.append(keys)
+                return {key: key ** 2 for key in keys if key > 0}
+
+        loader = SquareLoader()
+        deferred_values = [loader.load(key) for key in [1, 2, 2, -1]]
+
+        for deferred in deferred_values:
+            self.assertIsInstance(deferred, Deferred)
+
+        loader.dispatch()
+
+        self.assertEqual(SquareLoader.batches, [[1, 2, -1]])
+        self.assertEqual(
+            [deferred.value for deferred in deferred_values], [1, 4, 4, None]
+        )
+
+        with self.subTest("with a loaded key"):
+            self.assertEqual(loader.load(2), 4)
+            self.assertFalse(loader.has_queued_keys)
+
+    def test_deferred_errors(self):
+        error_schema = Schema(query=ErrorQuery)
+
+        executed = error_schema.execute("query { squares(keys: [2, -1]) { value } }")
+
+        # A null value for a non-null field nullifies the nearest nullable parent,
+        # like errors in fields that aren't deferred
+        self.assertEqual(executed.data, {"squares": [{"value": 4}, None]})
+        self.assertEqual(len(executed.errors), 1)
+        self.assertEqual(executed.errors[0].path, ["squares", 1, "value"])
+
+        with self.subTest("without any nullable parents"):
+            executed = error_schema.execute("query { requiredSquare(key: -1) { value } }")
+
+            self.assertIsNone(executed.data)
+            self.assertEqual(executed.errors[0].path, ["requiredSquare", "value"])
@@ -0,0 +1,272 @@
+# pylint: disable=missing-docstring
+
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import time
+from unittest import skipIf
+
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+import numpy as np
+import pandas as pd
+
+from server.jobs import run_next_job
+from server.middleware import CompressionMiddleware, ProfilingMiddleware, brotli
+from server.models import IngestionJob, Team
+from server.profiling import query_shape
+from server.tests.fixtures.factories import TeamFactory
+
+
+MIN_SIZE = 100
+CONTENT = b'{"data":{"fetchMlModels":[' + b'{"name":"tipresias"},' * 20 + b"]}}"
+N_TEAMS = 6
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+SPAN_ID = "00f067aa0ba902b7"
+PANDAS_SECONDS = 0.1
+
+
+@override_settings(COMPRESSION_MIN_SIZE=MIN_SIZE)
+class TestCompressionMiddleware(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def _call(self, accept_encoding, content=CONTENT, **headers):
+        def get_response(_request):
+            response = HttpResponse(content, content_type="application/json")
+
+            for header, value in headers.items():
+                response[header] = value
+
+            return response
+
+        request = self.factory.get("/graphql", HTTP_ACCEPT_ENCODING=accept_encoding)
+
+        return CompressionMiddleware(get_response)(request)
+
+    def test_gzip(self):
+        response = self._call("gzip, deflate", ETag='"abc"')
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), CONTENT)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(response["ETag"], 'W/"abc"')
+
+        with self.subTest("when the client doesn't accept compression"):
+            for accept_encoding in ["", "identity", "gzip;q=0, br;q=0"]:
+                response = self._call(accept_encoding)
+
+                self.assertFalse(response.has_header("Content-Encoding"))
+                self.assertEqual(response.content, CONTENT)
+                self.assertEqual(response["Vary"], "Accept-Encoding")
+
+        with self.subTest("with a small body"):
+            response = self._call("gzip", content=CONTENT[: MIN_SIZE - 1])
+
+            self.assertFalse(response.has_header("Content-Encoding"))
+
+        with self.subTest("with an encoded body"):
+            response = self._call("gzip", **{"Content-Encoding": "identity"})
+
+            self.assertEqual(response["Content-Encoding"], "identity")
+            self.assertEqual(response.content, CONTENT)
+
+        with self.subTest("with an async handler"):
+
+            async def get_response(_request):
+                return HttpResponse(CONTENT, content_type="application/json")
+
+            middleware = CompressionMiddleware(get_response)
+            request = self.factory.get("/graphql", HTTP_ACCEPT_ENCODING="gzip")
+
+            self.assertTrue(asyncio.iscoroutinefunction(middleware))
+
+            response = asyncio.run(middleware(request))
+
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            self.assertEqual(gzip.decompress(response.content), CONTENT)
+
+    @skipIf(brotli is None, "brotli isn't installed")
+    def test_brotli(self):
+        response = self._call("gzip, deflate, br")
+
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content), CONTENT)
+
+        with self.subTest("when the client prefers gzip"):
+            response = self._call("gzip;q=1.0, br;q=0.5")
+
+            self.assertEqual(response["Content-Encoding"], "gzip")
+
+
+def _get_team_names(_request):
+    # Fetching teams one at a time makes an N+1 pattern
+    team_names = [
+        Team.objects.get(id=team_id).name
+        for team_id in Team.objects.values_list("id", flat=True)
+    ]
+
+    return HttpResponse(json.dumps(team_names), content_type="application/json")
+
+
+def _crunch_numbers(_request):
+    start = time.perf_counter()
+    data_frame = pd.DataFrame(np.random.rand(1000, 10))
+
+    while time.perf_counter() - start < PANDAS_SECONDS:
+        data_frame.rolling(5).mean()
+
+    return HttpResponse(CONTENT, content_type="application/json")
+
+
+@override_settings(
+    REQUEST_PROFILING=False,
+    REQUEST_PROFILING_TOKEN="token",
+    N_PLUS_ONE_QUERY_THRESHOLD=N_TEAMS,
+    DEBUG=False,
+)
+class TestProfilingMiddleware(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+        for _ in range(N_TEAMS):
+            TeamFactory()
+
+    @staticmethod
+    def _server_timing(response):
+        metrics = {}
+
+        for metric in response["Server-Timing"].split(", "):
+            name, *params = metric.split(";")
+            metrics[name] = dict(param.split("=", 1) for param in params)
+
+        return metrics
+
+    def test_profiling(self):
+        request = self.factory.get("/teams", HTTP_X_PROFILE="token")
+
+        with self.assertLogs("server.profiling", level="INFO") as logs:
+            response = ProfilingMiddleware(_get_team_names)(request)
+
+        server_timing = self._server_timing(response)
+
+        # It counts DB queries
+        self.assertEqual(
+            server_timing["db"]["desc"], f'"{N_TEAMS + 1} queries (1 repeated)"'
+        )
+        self.assertEqual(
+            server_timing["size"]["desc"], f'"{len(response.content)} bytes"'
+        )
+        self.assertGreater(float(server_timing["total"]["dur"]), 0)
+
+        # It logs repeated query shapes
+        log_data = json.loads(logs.records[0].getMessage())
+        self.assertEqual(log_data["event"], "repeated_queries")
+        self.assertEqual(log_data["queryCount"], N_TEAMS + 1)
+        self.assertEqual(log_data["repeatedQueryShapes"][0]["count"], N_TEAMS)
+
+        with self.subTest("with a slow request"):
+            request = self.factory.get("/numbers", HTTP_X_PROFILE="token")
+
+            with self.assertLogs("server.profiling", level="WARNING") as logs:
+                with self.settings(SLOW_REQUEST_THRESHOLD=PANDAS_SECONDS * 500):
+                    response = ProfilingMiddleware(_crunch_numbers)(request)
+
+            # It estimates pandas time
+            server_timing = self._server_timing(response)
+            self.assertGreater(
+                float(server_timing["pandas"]["dur"]), PANDAS_SECONDS * 500
+            )
+            log_data = json.loads(logs.records[0].getMessage())
+            self.assertEqual(log_data["event"], "slow_request")
+
+        with self.subTest("with the wrong token"):
+            request = self.factory.get("/teams", HTTP_X_PROFILE="not_token")
+            response = ProfilingMiddleware(_get_team_names)(request)
+
+            self.assertFalse(response.has_header("Server-Timing"))
+
+            with self.subTest("and debugging is on"):
+                with self.settings(DEBUG=True):
+                    response = ProfilingMiddleware(_get_team_names)(request)
+
+                self.assertTrue(response.has_header("Server-Timing"))
+
+        with self.subTest("when profiling every request"):
+            request = self.factory.get("/teams")
+
+            with self.settings(REQUEST_PROFILING=True):
+                response = ProfilingMiddleware(_get_team_names)(request)
+
+            self.assertTrue(response.has_header("Server-Timing"))
+
+        with self.subTest("without the header"):
+            response = ProfilingMiddleware(_get_team_names)(self.factory.get("/teams"))
+
+            self.assertFalse(response.has_header("Server-Timing"))
+
+    def test_query_shape(self):
+        self.assertEqual(
+            query_shape(
+                """SELECT "name" FROM "server_team"
+                WHERE "id" IN (%s, %s, %s) AND "name" = 'Richmond' LIMIT 21"""
+            ),
+            'SELECT "name" FROM "server_team" '
+            'WHERE "id" IN (...) AND "name" = ? LIMIT ?',
+        )
+
+
+class TestTracingMiddleware(TestCase):
+    def setUp(self):
+        self.client = Client()
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.jsonl_path = os.path.join(temp_dir.name, "spans.jsonl")
+
+    def _exported_spans(self):
+        with open(self.jsonl_path, encoding="utf-8") as jsonl_file:
+            return {span["name"]: span for span in map(json.loads, jsonl_file)}
+
+    def test_tracing(self):
+        with self.settings(TRACING_JSONL_PATH=self.jsonl_path):
+            response = self.client.post(
+                "/predictions",
+                {"data": []},
+                content_type="application/json",
+                HTTP_TRACEPARENT=f"00-{TRACE_ID}-{SPAN_ID}-01",
+            )
+            request_span = self._exported_spans()["POST /predictions"]
+
+            # It continues the trace from the request
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(request_span["traceId"], TRACE_ID)
+            self.assertEqual(request_span["parentSpanId"], SPAN_ID)
+            self.assertEqual(request_span["kind"], "server")
+            self.assertEqual(request_span["attributes"]["http.status_code"], 202)
+
+            # It continues the trace in the queued job
+            job = IngestionJob.objects.get()
+            self.assertEqual(
+                job.traceparent, f"00-{TRACE_ID}-{request_span['spanId']}-01"
+            )
+
+            run_next_job(verbose=0)
+
+            job_span = self._exported_spans()["ingest predictions"]
+            self.assertEqual(job_span["traceId"], TRACE_ID)
+            self.assertEqual(job_span["parentSpanId"], request_span["spanId"])
+
+        with self.subTest("without a traceparent header"):
+            os.remove(self.jsonl_path)
+
+            with self.settings(TRACING_JSONL_PATH=self.jsonl_path):
+                self.client.get(f"/jobs/{job.id}")
+
+            request_span = self._exported_spans()["GET /jobs/<int:job_id>"]
+
+            # It starts a new trace
+            self.assertNotEqual(request_span["traceId"], TRACE_ID)
+            self.assertIsNone(request_span["parentSpanId"])
@@ -0,0 +1,97 @@
+# pylint: disable=missing-docstring
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from graphene.test import Client
+
+from server.graphql import schema
+from server.tests.fixtures.factories import FullMatchFactory, MLModelFactory
+
+
+YEAR = 2018
+MATCH_COUNT = 4
+
+
+class TestOptimizer(TestCase):
+    def setUp(self):
+        self.client = Client(schema)
+        ml_models = [MLModelFactory(), MLModelFactory()]
+
+        for round_number in range(1, MATCH_COUNT + 1):
+            FullMatchFactory(
+                with_predictions=True,
+                year=YEAR,
+                round_number=round_number,
+                prediction__ml_model=ml_models[0],
+                prediction_two__ml_model=ml_models[1],
+            )
+
+    def _execute(self, query, **variables):
+        with CaptureQueriesContext(connection) as context:
+            executed = self.client.execute(query, variables=variables)
+
+        self.assertNotIn("errors", executed)
+
+        return executed["data"], [query["sql"] for query in context.captured_queries]
+
+    def test_fetch_predictions(self):
+        data, queries = self._execute(
+            """
+            query($year: Int) {
+                fetchPredictions(year: $year) {
+                    predictedMargin
+                    mlModel { name }
+                    ...MatchFields
+                }
+            }
+
+            fragment MatchFields on PredictionType {
+                match {
+                    year
+                    teammatchSet { score, team { name } }
+                }
+            }
+            """,
+            year=YEAR,
+        )
+
+        self.assertEqual(len(data["fetchPredictions"]), MATCH_COUNT * 2)
+
+        for prediction in data["fetchPredictions"]:
+            self.assertEqual(prediction["match"]["year"], YEAR)
+            self.assertEqual(len(prediction["match"]["teammatchSet"]), 2)
+
+        # Predictions with joined matches & models, then team-matches with teams
+        self.assertEqual(len(queries), 2)
+
+        prediction_query, team_match_query = queries
+
+        with self.subTest("selects only the required columns"):
+            self.assertIn('"server_prediction"."predicted_margin"', prediction_query)
+            self.assertIn('"server_match"."start_date_time"', prediction_query)
+            self.assertIn('"server_mlmodel"."name"', prediction_query)
+            self.assertNotIn("predicted_win_probability", prediction_query)
+            self.assertNotIn('"server_match"."venue"', prediction_query)
+            self.assertNotIn('"server_mlmodel"."description"', prediction_query)
+
+        with self.subTest("prefetches reverse relations"):
+            self.assertIn('"server_teammatch"."score"', team_match_query)
+            self.assertIn('"server_team"."name"', team_match_query)
+            self.assertNotIn('"server_teammatch"."at_home"', team_match_query)
+
+    def test_fetch_paginated_predictions(self):
+        data, queries = self._execute(
+            """
+            query {
+                fetchPaginatedPredictions(first: 3) {
+                    edges { cursor, node { isCorrect } }
+                }
+            }
+            """
+        )
+
+        self.assertEqual(len(data["fetchPaginatedPredictions"]["edges"]), 3)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"server_match"."start_date_time"', queries[0])
+        self.assertNotIn('"server_match"."venue"', queries[0])
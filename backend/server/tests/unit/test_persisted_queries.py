@@ -0,0 +1,102 @@
+# pylint: disable=missing-docstring
+
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import Client, TestCase, override_settings
+
+from server.graphql import persisted_queries
+from server.graphql.persisted_queries import (
+    PERSISTED_QUERY_CACHE,
+    PERSISTED_QUERY_NOT_FOUND,
+    parse_and_validate,
+    query_hash,
+)
+from server.tests.fixtures.factories import MLModelFactory
+
+
+QUERY = "query { fetchMlModels { name } }"
+
+
+class TestPersistedQueries(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.ml_model = MLModelFactory()
+        caches[PERSISTED_QUERY_CACHE].clear()
+
+    def _post(self, query=None, sha256_hash=None):
+        data = {} if query is None else {"query": query}
+
+        if sha256_hash is not None:
+            data["extensions"] = {
+                "persistedQuery": {"version": 1, "sha256Hash": sha256_hash}
+            }
+
+        return self.client.post("/graphql", data, content_type="application/json")
+
+    def test_automatic_registration(self):
+        sha256_hash = query_hash(QUERY)
+
+        with self.subTest("with an unregistered hash"):
+            response = self._post(sha256_hash=sha256_hash)
+
+            self.assertEqual(
+                response.json()["errors"][0]["message"], PERSISTED_QUERY_NOT_FOUND
+            )
+
+        with self.subTest("with the full query"):
+            response = self._post(query=QUERY, sha256_hash=sha256_hash)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                response.json()["data"]["fetchMlModels"], [{"name": self.ml_model.name}]
+            )
+
+        with self.subTest("with a registered hash"):
+            response = self._post(sha256_hash=sha256_hash)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                response.json()["data"]["fetchMlModels"], [{"name": self.ml_model.name}]
+            )
+
+        with self.subTest("with a hash that doesn't match the query"):
+            response = self._post(query=QUERY, sha256_hash=query_hash("query { a }"))
+
+            self.assertIn("does not match", response.json()["errors"][0]["message"])
+
+        with self.subTest("when registration is disabled"):
+            caches[PERSISTED_QUERY_CACHE].clear()
+
+            with override_settings(PERSISTED_QUERY_REGISTRATION=False):
+                self.assertEqual(
+                    self._post(query=QUERY, sha256_hash=sha256_hash).status_code, 200
+                )
+                response = self._post(sha256_hash=sha256_hash)
+
+            self.assertEqual(
+                response.json()["errors"][0]["message"], PERSISTED_QUERY_NOT_FOUND
+            )
+
+    def test_document_cache(self):
+        parse_and_validate.cache_clear()
+
+        with patch.object(
+            persisted_queries, "parse", wraps=persisted_queries.parse
+        ) as mock_parse:
+            for _ in range(3):
+                response = self._post(query=QUERY)
+                self.assertEqual(response.status_code, 200)
+
+        mock_parse.assert_called_once()
+
+        with self.subTest("with an invalid query"):
+            with patch.object(
+                persisted_queries, "parse", wraps=persisted_queries.parse
+            ) as mock_parse:
+                for _ in range(2):
+                    response = self._post(query="query { notAField }")
+                    self.assertEqual(response.status_code, 400)
+
+            # It caches validation errors too
+            mock_parse.assert_called_once()
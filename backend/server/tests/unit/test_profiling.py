@@ -0,0 +1,61 @@
+# pylint: disable=missing-docstring
+
+from django.test import Client, TestCase, override_settings
+
+from server.tests.fixtures.factories import FullMatchFactory, MLModelFactory
+
+
+MATCH_COUNT = 3
+QUERY = """
+    query {
+        fetchPredictions {
+            predictedMargin
+            match { teammatchSet { score } }
+        }
+    }
+"""
+
+
+class TestResolverProfiler(TestCase):
+    def setUp(self):
+        self.client = Client()
+        ml_models = [MLModelFactory(), MLModelFactory()]
+
+        for _ in range(MATCH_COUNT):
+            FullMatchFactory(
+                with_predictions=True,
+                prediction__ml_model=ml_models[0],
+                prediction_two__ml_model=ml_models[1],
+            )
+
+    def _post(self):
+        return self.client.post(
+            "/graphql", {"query": QUERY}, content_type="application/json"
+        ).json()
+
+    def test_extensions(self):
+        with self.subTest("when debugging is disabled"):
+            self.assertNotIn("extensions", self._post())
+
+        with override_settings(DEBUG=True):
+            response = self._post()
+
+        self.assertEqual(len(response["data"]["fetchPredictions"]), MATCH_COUNT * 2)
+
+        extensions = response["extensions"]
+        self.assertGreater(extensions["cost"]["cost"], 0)
+        self.assertEqual(extensions["cost"]["depth"], 4)
+
+        tracing = extensions["tracing"]
+        resolvers = {resolver["path"]: resolver for resolver in tracing["resolvers"]}
+
+        self.assertGreater(tracing["duration"], 0)
+        # Predictions with matches, then prefetched team-matches
+        self.assertEqual(tracing["dbQueries"], 2)
+        self.assertEqual(resolvers["fetchPredictions"]["dbQueries"], 2)
+        self.assertEqual(resolvers["fetchPredictions"]["calls"], 1)
+
+        team_matches = resolvers["fetchPredictions.match.teammatchSet"]
+        self.assertEqual(team_matches["calls"], MATCH_COUNT * 2)
+        # Already prefetched
+        self.assertEqual(team_matches["dbQueries"], 0)
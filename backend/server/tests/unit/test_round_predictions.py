@@ -0,0 +1,159 @@
+# pylint: disable=missing-docstring
+
+from datetime import timedelta
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from server.cache import RESOLVER_CACHE, bump_data_version
+from server.models import Prediction
+from server.models.ml_model import PredictionType
+from server.round_predictions import fetch_round_predictions
+from server.tests.fixtures.factories import FullMatchFactory, MLModelFactory
+
+
+MATCH_COUNT = 3
+RESOLVER_CACHE_SETTINGS = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    RESOLVER_CACHE: {
+        "BACKEND": "server.cache.InstrumentedLocMemCache",
+        "LOCATION": "test-round-predictions",
+        "TIMEOUT": None,
+    },
+}
+
+
+class TestRoundPredictions(TestCase):
+    def setUp(self):
+        self.principal_model = MLModelFactory(
+            is_principal=True,
+            used_in_competitions=True,
+            prediction_type=PredictionType.MARGIN,
+        )
+        self.probability_model = MLModelFactory(
+            used_in_competitions=True, prediction_type=PredictionType.WIN_PROBABILITY
+        )
+        start_date_time = timezone.now() - timedelta(days=7)
+
+        self.matches = [
+            FullMatchFactory(
+                with_predictions=True,
+                year=start_date_time.year,
+                round_number=5,
+                start_date_time=start_date_time + timedelta(hours=match_idx),
+                # Matches need winners, or forcing predictions to be correct
+                # or incorrect could pick the same team
+                home_team_match__score=100,
+                away_team_match__score=80,
+                prediction__ml_model=self.principal_model,
+                prediction__force_correct=True,
+                prediction_two__ml_model=self.probability_model,
+                # The models disagree on the first match only
+                prediction_two__force_correct=match_idx > 0,
+                prediction_two__force_incorrect=match_idx == 0,
+            )
+            for match_idx in range(MATCH_COUNT)
+        ]
+        # Predictions from non-competition models get ignored
+        FullMatchFactory(
+            with_predictions=True,
+            year=start_date_time.year,
+            round_number=5,
+            prediction__ml_model=MLModelFactory(),
+            prediction_two__ml_model=MLModelFactory(),
+        )
+
+    def test_fetch_round_predictions(self):
+        season = self.matches[0].season
+
+        # One query for the data version and one for the predictions
+        with self.assertNumQueries(2):
+            round_predictions = fetch_round_predictions(season, 5)
+
+        match_predictions = round_predictions["match_predictions"]
+        self.assertEqual(
+            [prediction["match__id"] for prediction in match_predictions],
+            [match.id for match in self.matches],
+        )
+        self.assertEqual(len(round_predictions["model_predictions"]), MATCH_COUNT * 2)
+
+        for match, match_prediction in zip(self.matches, match_predictions):
+            principal_prediction = match.prediction_set.get(
+                ml_model=self.principal_model
+            )
+            probability_prediction = match.prediction_set.get(
+                ml_model=self.probability_model
+            )
+            models_agree = (
+                principal_prediction.predicted_winner
+                == probability_prediction.predicted_winner
+            )
+
+            with self.subTest(match=match):
+                self.assertEqual(
+                    match_prediction["home_team__name"],
+                    match.teammatch_set.get(at_home=True).team.name,
+                )
+                self.assertEqual(
+                    match_prediction["away_team__name"],
+                    match.teammatch_set.get(at_home=False).team.name,
+                )
+                self.assertEqual(
+                    match_prediction["predicted_winner__name"],
+                    principal_prediction.predicted_winner.name,
+                )
+                self.assertAlmostEqual(
+                    match_prediction["predicted_margin"],
+                    principal_prediction.predicted_margin,
+                )
+                self.assertEqual(match_prediction["predictions_agree"], models_agree)
+                self.assertTrue(match_prediction["is_correct"])
+
+                # The other model's predictions are inverted when they disagree,
+                # so they're always for the principal model's predicted winner
+                self.assertAlmostEqual(
+                    match_prediction["predicted_win_probability"],
+                    probability_prediction.predicted_win_probability
+                    if models_agree
+                    else 1 - probability_prediction.predicted_win_probability,
+                )
+
+        self.assertFalse(match_predictions[0]["predictions_agree"])
+
+        with self.subTest("without any predictions"):
+            Prediction.objects.all().delete()
+
+            self.assertEqual(
+                fetch_round_predictions(season, 5),
+                {"match_predictions": [], "model_predictions": []},
+            )
+
+    @override_settings(CACHES=RESOLVER_CACHE_SETTINGS)
+    def test_caching(self):
+        cache = caches[RESOLVER_CACHE]
+        cache.clear()
+        season = self.matches[0].season
+        round_predictions = fetch_round_predictions(season, 5)
+
+        with self.subTest("with the same data version"):
+            # Only the data version query
+            with self.assertNumQueries(1):
+                self.assertEqual(fetch_round_predictions(season, 5), round_predictions)
+
+        with self.subTest("for a different round"):
+            self.assertEqual(
+                fetch_round_predictions(season, 6),
+                {"match_predictions": [], "model_predictions": []},
+            )
+
+        with self.subTest("after saving records"):
+            self.matches[0].prediction_set.all().delete()
+            # Functions that save predictions do this once per batch
+            bump_data_version()
+
+            self.assertEqual(
+                len(fetch_round_predictions(season, 5)["match_predictions"]),
+                MATCH_COUNT - 1,
+            )
+            self.assertEqual(cache.stats()["misses"], 3)
@@ -0,0 +1,126 @@
+# pylint: disable=missing-docstring
+
+from datetime import timedelta
+
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from freezegun import freeze_time
+
+from server.cache import RESOLVER_CACHE, bump_data_version
+from server.models import Match, Prediction, TeamMatch
+from server.round_state import fetch_round_state
+from server.tests.fixtures.factories import FullMatchFactory, MLModelFactory
+
+
+RESOLVER_CACHE_SETTINGS = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    RESOLVER_CACHE: {
+        "BACKEND": "server.cache.InstrumentedLocMemCache",
+        "LOCATION": "test-round-state",
+        "TIMEOUT": None,
+    },
+}
+
+
+class TestRoundState(TestCase):
+    def setUp(self):
+        self.right_now = timezone.now().replace(microsecond=0)
+        ml_models = {
+            "prediction__ml_model": MLModelFactory(),
+            "prediction_two__ml_model": MLModelFactory(),
+        }
+
+        self.completed_match = FullMatchFactory(
+            with_predictions=True,
+            round_number=1,
+            start_date_time=self.right_now - timedelta(days=14),
+            **ml_models,
+        )
+        # Still being played, so there are no scores yet
+        self.played_match = FullMatchFactory(
+            round_number=2, start_date_time=self.right_now - timedelta(hours=1)
+        )
+        TeamMatch.objects.filter(match=self.played_match).update(score=0)
+        self.next_match = FullMatchFactory(
+            with_predictions=True,
+            round_number=3,
+            start_date_time=self.right_now + timedelta(days=7),
+            **ml_models,
+        )
+
+    def test_fetch_round_state(self):
+        # One query for the data version and one for the state
+        with self.assertNumQueries(2):
+            round_state = fetch_round_state()
+
+        self.assertEqual(
+            round_state["latest_predicted_round"],
+            {"season": self.next_match.season, "round_number": 3},
+        )
+        self.assertEqual(
+            round_state["latest_played_round"],
+            {"season": self.played_match.season, "round_number": 2},
+        )
+        self.assertEqual(
+            round_state["latest_completed_round"],
+            {"season": self.completed_match.season, "round_number": 1},
+        )
+        self.assertEqual(
+            round_state["next_match"],
+            {
+                "season": self.next_match.season,
+                "round_number": 3,
+                "start_date_time": self.next_match.start_date_time,
+            },
+        )
+        self.assertEqual(
+            round_state["available_seasons"],
+            sorted({self.completed_match.season, self.next_match.season}),
+        )
+
+        with self.subTest("without any matches"):
+            Prediction.objects.all().delete()
+            TeamMatch.objects.all().delete()
+            Match.objects.all().delete()
+
+            self.assertEqual(
+                fetch_round_state(),
+                {
+                    "latest_predicted_round": None,
+                    "latest_played_round": None,
+                    "latest_completed_round": None,
+                    "next_match": None,
+                    "available_seasons": [],
+                },
+            )
+
+    @override_settings(CACHES=RESOLVER_CACHE_SETTINGS)
+    def test_caching(self):
+        cache = caches[RESOLVER_CACHE]
+        cache.clear()
+
+        with freeze_time(self.right_now):
+            round_state = fetch_round_state()
+
+            with self.subTest("with the same data version"):
+                # Only the data version query
+                with self.assertNumQueries(1):
+                    self.assertEqual(fetch_round_state(), round_state)
+
+            with self.subTest("after saving records"):
+                self.next_match.prediction_set.all().delete()
+                # Functions that save predictions do this once per batch
+                bump_data_version()
+
+                self.assertEqual(
+                    fetch_round_state()["latest_predicted_round"]["round_number"], 1
+                )
+                self.assertEqual(cache.stats()["misses"], 2)
+
+        with self.subTest("after the next match starts"):
+            with freeze_time(self.next_match.start_date_time + timedelta(minutes=1)):
+                self.assertEqual(
+                    fetch_round_state()["latest_played_round"]["round_number"], 3
+                )
+                self.assertEqual(cache.stats()["misses"], 3)
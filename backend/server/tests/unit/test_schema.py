@@ -11,7 +11,7 @@ from freezegun import freeze_time
 
 from server.graphql import schema
 from server.tests.fixtures.factories import FullMatchFactory, MLModelFactory
-from server.models import Match, MLModel, Prediction, TeamMatch
+from server.models import Match, MLModel, ModelRoundMetrics, Prediction, TeamMatch
 from server.models.ml_model import PredictionType
 
 
@@ -104,6 +104,73 @@ class TestSchema(TestCase):
                 executed["data"]["fetchPredictions"], expected_predictions
             )
 
+    def test_fetch_paginated_predictions(self):
+        query = """
+            query(
+                $first: Int, $after: String, $season: Int, $mlModelName: String
+            ) {
+                fetchPaginatedPredictions(
+                    first: $first, after: $after, season: $season,
+                    mlModelName: $mlModelName
+                ) {
+                    edges { node { id } }
+                    pageInfo { hasNextPage, endCursor }
+                }
+            }
+        """
+        page_size = 10
+
+        def fetch_all_pages(**variables):
+            prediction_ids = []
+            after = None
+
+            while True:
+                executed = self.client.execute(
+                    query,
+                    variables={"first": page_size, "after": after, **variables},
+                )
+                connection = executed["data"]["fetchPaginatedPredictions"]
+                prediction_ids.extend(
+                    int(edge["node"]["id"]) for edge in connection["edges"]
+                )
+                self.assertLessEqual(len(connection["edges"]), page_size)
+
+                if not connection["pageInfo"]["hasNextPage"]:
+                    return prediction_ids
+
+                after = connection["pageInfo"]["endCursor"]
+
+        self.assertEqual(
+            fetch_all_pages(),
+            list(
+                Prediction.objects.order_by("match__start_date_time", "id").values_list(
+                    "id", flat=True
+                )
+            ),
+        )
+
+        with self.subTest("with filters"):
+            self.assertEqual(
+                fetch_all_pages(season=2015, mlModelName=MODEL_NAMES[0]),
+                list(
+                    Prediction.objects.filter(
+                        match__season=2015, ml_model__name=MODEL_NAMES[0]
+                    )
+                    .order_by("match__start_date_time", "id")
+                    .values_list("id", flat=True)
+                ),
+            )
+
+        with self.subTest("with too many predictions per page"):
+            executed = self.client.execute(query, variables={"first": 10000})
+
+            self.assertIn("first must be between", executed["errors"][0]["message"])
+
+        with self.subTest("with an invalid cursor"):
+            executed = self.client.execute(query, variables={"after": "nope"})
+
+            self.assertIn("Invalid cursor", executed["errors"][0]["message"])
+
     def test_fetch_season_performance_chart_parameters(self):
         expected_years = list({match.start_date_time.year for match in self.matches})
 
@@ -159,6 +226,7 @@ class TestSchema(TestCase):
             prediction__ml_model=ml_models[0],
             prediction_two__ml_model=ml_models[1],
         )
+        ModelRoundMetrics.recalculate(year)
 
         executed = self.client.execute(
             """
@@ -416,6 +484,8 @@ class TestSchema(TestCase):
                     prediction_two__force_correct=True,
                 )
 
+        ModelRoundMetrics.recalculate(YEAR)
+
         query = """
             query($mlModelName: String) {
                 fetchSeasonModelMetrics(season: 2017) {
@@ -488,6 +558,7 @@ class TestSchema(TestCase):
                 Match.objects.filter(start_date_time__gte=fake_datetime).update(
                     winner=None, margin=None
                 )
+                ModelRoundMetrics.recalculate(YEAR)
 
                 past_executed = self.client.execute(
                     query, variables={"mlModelName": "predictanator"}
@@ -571,6 +642,8 @@ class TestSchema(TestCase):
                     prediction_two__force_correct=True,
                 )
 
+        ModelRoundMetrics.recalculate(YEAR)
+
         query = """
             query {
                 fetchLatestRoundMetrics {
@@ -0,0 +1,119 @@
+# pylint: disable=missing-docstring
+
+from django.test import Client, TestCase, override_settings
+from graphql import parse, specified_rules, validate
+
+from server.graphql import schema
+from server.graphql.persisted_queries import parse_and_validate
+from server.graphql.types.season import MAX_ROUNDS_PER_SEASON
+from server.graphql.validation import (
+    DEFAULT_LIST_SIZE,
+    QueryCostRule,
+    estimate_query_cost,
+)
+
+
+SEASON_METRICS_FIELDS = """
+    roundModelMetrics {
+        modelMetrics { mlModel { name } }
+    }
+"""
+SEASON_METRICS_COST = 50 + MAX_ROUNDS_PER_SEASON * (1 + DEFAULT_LIST_SIZE * (1 + 1))
+
+
+class TestQueryCostRule(TestCase):
+    def _validate(self, query):
+        return validate(
+            schema.graphql_schema, parse(query), rules=[*specified_rules, QueryCostRule]
+        )
+
+    def test_estimate_query_cost(self):
+        query = f"""
+            query {{
+                fetchSeasonModelMetrics(season: 2019) {{
+                    season, {SEASON_METRICS_FIELDS}
+                }}
+            }}
+        """
+
+        self.assertEqual(
+            estimate_query_cost(schema.graphql_schema, parse(query)),
+            {"cost": SEASON_METRICS_COST, "depth": 5},
+        )
+
+        with self.subTest("with aliases & fragments"):
+            query = f"""
+                query {{
+                    a: fetchSeasonModelMetrics(season: 2019) {{ ...SeasonFields }}
+                    b: fetchSeasonModelMetrics(season: 2018) {{ ...SeasonFields }}
+                }}
+
+                fragment SeasonFields on SeasonType {{ {SEASON_METRICS_FIELDS} }}
+            """
+
+            self.assertEqual(
+                estimate_query_cost(schema.graphql_schema, parse(query))["cost"],
+                SEASON_METRICS_COST * 2,
+            )
+
+        with self.subTest("with a page size"):
+            query = """
+                query {
+                    fetchPaginatedPredictions(first: 3) {
+                        edges { node { mlModel { name } } }
+                    }
+                }
+            """
+
+            self.assertEqual(
+                estimate_query_cost(schema.graphql_schema, parse(query)),
+                # Each edge, node & ML model costs 1
+                {"cost": 3 * (1 + 1 + 1 + 1), "depth": 5},
+            )
+
+    @override_settings(GRAPHQL_MAX_QUERY_COST=SEASON_METRICS_COST * 2)
+    def test_max_cost(self):
+        seasons = [
+            f"season{season}: fetchSeasonModelMetrics(season: {season}) "
+            f"{{ {SEASON_METRICS_FIELDS} }}"
+            for season in range(2017, 2020)
+        ]
+
+        self.assertEqual(self._validate(f"query {{ {' '.join(seasons[:2])} }}"), [])
+
+        errors = self._validate(f"query {{ {' '.join(seasons)} }}")
+
+        self.assertEqual(len(errors), 1)
+        self.assertIn("exceeds the maximum", errors[0].message)
+
+    @override_settings(GRAPHQL_MAX_QUERY_DEPTH=4)
+    def test_max_depth(self):
+        self.assertEqual(self._validate("query { fetchMlModels { name } }"), [])
+
+        errors = self._validate(
+            f"query {{ fetchSeasonModelMetrics {{ {SEASON_METRICS_FIELDS} }} }}"
+        )
+
+        self.assertEqual(len(errors), 1)
+        self.assertIn("depth of 5", errors[0].message)
+
+        with self.subTest("with introspection"):
+            introspection_query = (
+                "query { __schema { types { fields { type { ofType { name } } } } } }"
+            )
+
+            self.assertEqual(self._validate(introspection_query), [])
+
+    @override_settings(GRAPHQL_MAX_QUERY_DEPTH=4)
+    def test_graphql_view(self):
+        parse_and_validate.cache_clear()
+
+        query = f"query {{ fetchSeasonModelMetrics {{ {SEASON_METRICS_FIELDS} }} }}"
+        response = Client().post(
+            "/graphql", {"query": query}, content_type="application/json"
+        )
+
+        parse_and_validate.cache_clear()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("depth of 5", response.json()["errors"][0]["message"])
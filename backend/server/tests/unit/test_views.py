@@ -9,7 +9,8 @@ import numpy as np
 from freezegun import freeze_time
 
 from server.tests.fixtures import data_factories, factories
-from server.models import Prediction, Match, TeamMatch
+from server.models import IngestionJob, Prediction, Match, TeamMatch
+from server.jobs import run_next_job
 from server import views
 
 N_MATCHES = 9
@@ -41,6 +42,15 @@ class TestViews(TestCase):
 
         self.views = views
 
+    def _run_queued_job(self, response):
+        run_next_job(verbose=0)
+
+        job_id = json.loads(response.content)["id"]
+        request = self.factory.get(f"/jobs/{job_id}")
+        request.headers = {"Authorization": "Bearer token"}
+
+        return json.loads(views.job_status(request, job_id).content)
+
     def test_predictions(self):
         prediction_data = pd.concat(
             [
@@ -86,12 +96,20 @@ class TestViews(TestCase):
                 request.headers = {"Authorization": "Bearer token"}
                 response = views.predictions(request)
 
-                # It creates predictions
+                # It queues a job instead of creating predictions right away
+                self.assertEqual(Prediction.objects.count(), 0)
+                self.assertEqual(response.status_code, 202)
+                job_response = json.loads(response.content)
+                self.assertEqual(job_response["status"], "pending")
+                self.assertEqual(response["Location"], f"/jobs/{job_response['id']}")
+
+                job_response = self._run_queued_job(response)
+
+                # The job creates predictions
                 self.assertEqual(Prediction.objects.count(), N_MATCHES)
-                # It returns success response
-                self.assertEqual(response.status_code, 200)
-                # It returns the created predictions
-                prediction_response = json.loads(response.content)
+                self.assertEqual(job_response["status"], "succeeded")
+                # The job's result is the created predictions
+                prediction_response = job_response["result"]
                 self.assertEqual(len(prediction_response), N_MATCHES)
                 for pred in prediction_response:
                     self.assertEqual(
@@ -103,6 +121,19 @@ class TestViews(TestCase):
                         set(pred.keys()),
                     )
 
+            with self.subTest("when the same data is posted again"):
+                response = views.predictions(request)
+
+                # It returns the earlier job instead of queueing another one
+                self.assertEqual(response.status_code, 202)
+                self.assertEqual(json.loads(response.content)["id"], job_response["id"])
+                self.assertEqual(IngestionJob.objects.count(), 1)
+
+        # Reposting after the deduplication window queues a new job
+        deduplication_settings = self.settings(INGESTION_JOB_DEDUPLICATION_WINDOW=0)
+        deduplication_settings.enable()
+        self.addCleanup(deduplication_settings.disable)
+
         with self.subTest("with existing prediction records"):
             original_predicted_margins = list(
                 Prediction.objects.all().values_list("predicted_margin", flat=True)
@@ -119,6 +150,7 @@ class TestViews(TestCase):
             self.assertNotEqual(original_predicted_margins, new_predicted_margins)
 
             response = views.predictions(request)
+            job_response = self._run_queued_job(response)
 
             # It doesn't create any new predictions
             self.assertEqual(Prediction.objects.count(), N_MATCHES)
@@ -128,9 +160,10 @@ class TestViews(TestCase):
             )
             self.assertEqual(original_predicted_margins, posted_predicted_margins)
             # It returns a success response
-            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(job_response["status"], "succeeded")
             # It returns the updated predictions
-            prediction_response = json.loads(response.content)
+            prediction_response = job_response["result"]
             self.assertEqual(len(prediction_response), N_MATCHES)
 
             for pred in prediction_response:
@@ -178,6 +211,7 @@ class TestViews(TestCase):
                     )
 
                     response = views.predictions(request)
+                    self._run_queued_job(response)
 
                     # It doesn't update predictions for played matches
                     played_match_prediction = min(
@@ -213,7 +247,7 @@ class TestViews(TestCase):
                 "/fixtures", content_type="application/json", data=fixtures
             )
 
-            response = views.fixtures(request, verbose=0)
+            response = views.fixtures(request)
 
             # It doesn't create fixtures
             self.assertEqual(Match.objects.count(), N_MATCHES)
@@ -227,7 +261,7 @@ class TestViews(TestCase):
         with self.settings(API_TOKEN="token", ENVIRONMENT="production"):
             with self.subTest("when Authorization header doesn't match app token"):
                 request.headers = {"Authorization": "Bearer not_token"}
-                response = views.fixtures(request, verbose=0)
+                response = views.fixtures(request)
 
                 # It doesn't create fixtures
                 self.assertEqual(Match.objects.count(), N_MATCHES)
@@ -236,7 +270,8 @@ class TestViews(TestCase):
 
             with self.subTest("when Authorization header does match app token"):
                 request.headers = {"Authorization": "Bearer token"}
-                response = views.fixtures(request, verbose=0)
+                response = views.fixtures(request)
+                job_response = self._run_queued_job(response)
 
                 # It creates a future match per row of fixture data
                 self.assertEqual(
@@ -244,7 +279,8 @@ class TestViews(TestCase):
                     len(fixture_data) + N_MATCHES,
                 )
                 # It returns success response
-                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.status_code, 202)
+                self.assertEqual(job_response["status"], "succeeded")
 
     def test_matches(self):
         match_results_data = [
@@ -274,7 +310,7 @@ class TestViews(TestCase):
                 "/matches", content_type="application/json", data=matches
             )
 
-            response = views.matches(request, verbose=0)
+            response = views.matches(request)
 
             # It update match scores
             self.assertEqual(Match.objects.filter(teammatch__score__gt=0).count(), 0)
@@ -288,7 +324,7 @@ class TestViews(TestCase):
         with self.settings(API_TOKEN="token", ENVIRONMENT="production"):
             with self.subTest("when Authorization header doesn't match app token"):
                 request.headers = {"Authorization": "Bearer not_token"}
-                response = views.matches(request, verbose=0)
+                response = views.matches(request)
 
                 # It doesn't update match scores
                 self.assertEqual(
@@ -299,7 +335,8 @@ class TestViews(TestCase):
 
             with self.subTest("when Authorization header does match app token"):
                 request.headers = {"Authorization": "Bearer token"}
-                response = views.matches(request, verbose=0)
+                response = views.matches(request)
+                job_response = self._run_queued_job(response)
 
                 # It updates match scores
                 self.assertEqual(
@@ -309,4 +346,5 @@ class TestViews(TestCase):
                     ).count(),
                 )
                 # It returns success response
-                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.status_code, 202)
+                self.assertEqual(job_response["status"], "succeeded")
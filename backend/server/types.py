@@ -78,18 +78,8 @@ MLModelInfo = TypedDict(
 RoundMetrics = TypedDict(
     "RoundMetrics",
     {
-        "match__start_date_time": datetime,
+        "season": int,
         "match__round_number": int,
-        "ml_model__name": str,
-        "predicted_margin": float,
-        "predicted_win_probability": float,
-        "predicted_winner__name": str,
-        "ml_model__is_principal": bool,
-        "ml_model__used_in_competitions": bool,
-        "match__winner__name": str,
-        "match__margin": int,
-        "absolute_margin_diff": float,
-        "bits": float,
         "cumulative_correct_count": int,
         "cumulative_accuracy": float,
         "cumulative_mean_absolute_error": float,
@@ -1,20 +1,29 @@
-"""View methods for rendering HTTP responses."""
+"""
+View methods for rendering HTTP responses.
 
-from typing import cast, List
+The data-ingestion views queue jobs for background workers (see server/jobs.py)
+and respond with 202 and the job's status, which clients can check at /jobs/<id>.
+Each view has an async version for serving via ASGI, which runs the DB work
+in the ingestion thread pool.
+"""
+
+from typing import Any, Dict, Optional
 import json
-import pytz
-from dateutil import parser
 
 from django.http import HttpRequest, HttpResponse
 from django.conf import settings
 
-from server import api
-from server.types import FixtureData, MatchData
+from server import tracing
+from server.concurrency import INGESTION_EXECUTOR, run_in_executor
+from server.encoders import encode_json
+from server.models import IngestionJob
+from server.models.ingestion_job import JobKind
 
 
-def predictions(request: HttpRequest, verbose=1):
-    """Handle POST request to /predictions with prediction data in the body."""
-    if request.method != "POST":
+def _check_request(
+    request: HttpRequest, method: str = "POST"
+) -> Optional[HttpResponse]:
+    if request.method != method:
         return HttpResponse(status=405)
 
     authorization = request.headers.get("Authorization")
@@ -24,65 +33,98 @@ def predictions(request: HttpRequest, verbose=1):
     ):
         return HttpResponse(status=401)
 
-    body = json.loads(request.body)
-    prediction_data = body["data"]
+    return None
+
+
+def _job_response(job: IngestionJob, status: int = 200) -> HttpResponse:
+    job_data: Dict[str, Any] = {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+    response = HttpResponse(
+        content=encode_json(job_data), content_type="application/json", status=status
+    )
+    response["Location"] = f"/jobs/{job.id}"
+
+    return response
+
 
-    api.update_future_match_predictions(prediction_data)
-    prediction_records = list(api.fetch_latest_round_predictions(verbose=verbose))
+def _queue_job(request: HttpRequest, kind: str) -> HttpResponse:
+    error_response = _check_request(request)
 
-    return HttpResponse(
-        content=json.dumps(prediction_records),
-        content_type="application/json",
-        status=200,
+    if error_response is not None:
+        return error_response
+
+    job, _ = IngestionJob.enqueue(
+        kind,
+        json.loads(request.body),
+        traceparent=tracing.trace_headers().get("traceparent", ""),
     )
 
+    return _job_response(job, status=202)
 
-def fixtures(request: HttpRequest, verbose=1):
-    """Handle POST request to /fixtures with fixture data in the body."""
-    if request.method != "POST":
-        return HttpResponse(status=405)
 
-    authorization = request.headers.get("Authorization")
-    if (
-        settings.ENVIRONMENT == "production"
-        and authorization != f"Bearer {settings.API_TOKEN}"
-    ):
-        return HttpResponse(status=401)
+def _fetch_job(request: HttpRequest, job_id: int) -> HttpResponse:
+    error_response = _check_request(request, method="GET")
 
-    body = json.loads(request.body)
-    fixture_data = [
-        {**match, **{"date": parser.parse(match["date"]).replace(tzinfo=pytz.UTC)}}
-        for match in body["data"]
-    ]
-    upcoming_round = body["upcoming_round"]
+    if error_response is not None:
+        return error_response
 
-    api.update_fixture_data(
-        cast(List[FixtureData], fixture_data), upcoming_round, verbose=verbose
-    )
+    job = IngestionJob.objects.filter(id=job_id).first()
 
-    return HttpResponse("Success", content_type="application/json", status=200)
+    if job is None:
+        return HttpResponse(status=404)
+
+    return _job_response(job)
+
+
+def predictions(request: HttpRequest):
+    """Handle POST request to /predictions with prediction data in the body."""
+    return _queue_job(request, JobKind.PREDICTIONS)
 
 
-def matches(request: HttpRequest, verbose=1):
+def fixtures(request: HttpRequest):
+    """Handle POST request to /fixtures with fixture data in the body."""
+    return _queue_job(request, JobKind.FIXTURES)
+
+
+def matches(request: HttpRequest):
     """Handle POST request to /matches with match data in the body."""
-    if request.method != "POST":
-        return HttpResponse(status=405)
+    return _queue_job(request, JobKind.MATCHES)
 
-    authorization = request.headers.get("Authorization")
-    if (
-        settings.ENVIRONMENT == "production"
-        and authorization != f"Bearer {settings.API_TOKEN}"
-    ):
-        return HttpResponse(status=401)
 
-    body = json.loads(request.body)
-    match_data = [
-        {**match, **{"date": parser.parse(match["date"]).replace(tzinfo=pytz.UTC)}}
-        for match in body["data"]
-    ]
+def job_status(request: HttpRequest, job_id: int):
+    """Handle GET request to /jobs/<id> for the status of an ingestion job."""
+    return _fetch_job(request, job_id)
+
+
+async def async_predictions(request: HttpRequest):
+    """Handle POST request to /predictions without blocking the event loop."""
+    return await run_in_executor(
+        INGESTION_EXECUTOR, _queue_job, request, JobKind.PREDICTIONS
+    )
+
 
-    api.backfill_recent_match_results(
-        cast(List[MatchData], match_data), verbose=verbose
+async def async_fixtures(request: HttpRequest):
+    """Handle POST request to /fixtures without blocking the event loop."""
+    return await run_in_executor(
+        INGESTION_EXECUTOR, _queue_job, request, JobKind.FIXTURES
     )
 
-    return HttpResponse("Success", content_type="application/json", status=200)
+
+async def async_matches(request: HttpRequest):
+    """Handle POST request to /matches without blocking the event loop."""
+    return await run_in_executor(
+        INGESTION_EXECUTOR, _queue_job, request, JobKind.MATCHES
+    )
+
+
+async def async_job_status(request: HttpRequest, job_id: int):
+    """Handle GET request to /jobs/<id> without blocking the event loop."""
+    return await run_in_executor(INGESTION_EXECUTOR, _fetch_job, request, job_id)
@@ -0,0 +1,7 @@
+#!/bin/bash
+
+set -euo pipefail
+
+# Lets the db_replica service stream changes from the primary.
+# The Postgres image only runs this when it initialises a new database.
+echo "host replication all all trust" >> "${PGDATA}/pg_hba.conf"
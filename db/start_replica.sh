@@ -0,0 +1,19 @@
+#!/bin/bash
+
+set -euo pipefail
+
+PRIMARY_HOST="${1:-db}"
+
+# Clone the primary into a hot standby the first time the container starts
+if [ ! -s "${PGDATA}/PG_VERSION" ]; then
+  until pg_basebackup -h "${PRIMARY_HOST}" -U postgres -D "${PGDATA}" -R -X stream
+  do
+    echo "Waiting for ${PRIMARY_HOST} to accept replication connections..."
+    rm -rf "${PGDATA:?}"/*
+    sleep 1
+  done
+
+  chmod 700 "${PGDATA}"
+fi
+
+exec postgres -D "${PGDATA}"
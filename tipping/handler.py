@@ -3,7 +3,9 @@
 """Serverless functions for fetching and updating application data."""
 
 from typing import List, Union, TypedDict, cast
+import functools
 import json
+import logging
 import os
 import sys
 
@@ -18,11 +20,15 @@ from tipping import api
 from tipping import settings
 from tipping.types import CleanPredictionData, MatchData, MLModelInfo
 from tipping.helpers import convert_to_dict
+from tipping.db.metrics import track_queries
 
 
 rollbar_token = os.getenv("ROLLBAR_TOKEN", "missing_api_key")
 rollbar.init(rollbar_token, settings.ENVIRONMENT)
 
+# Lambda only shows warnings by default, but we want query metrics in the logs
+logging.getLogger("tipping.db.metrics").setLevel(logging.INFO)
+
 
 class Response(TypedDict):
     """Response dict for AWS Lambda functions."""
@@ -39,6 +45,15 @@ def _response(
     return {"statusCode": status_code, "body": json.dumps({"data": data})}
 
 
+def _log_faunadb_queries(handler):
+    @functools.wraps(handler)
+    def logged_handler(*args, **kwargs):
+        with track_queries(label=handler.__name__):
+            return handler(*args, **kwargs)
+
+    return logged_handler
+
+
 def _request_is_authorized(http_request) -> bool:
     auth_token = http_request.headers.get("Authorization")
 
@@ -49,6 +64,7 @@ def _request_is_authorized(http_request) -> bool:
 
 
 @rollbar.lambda_function
+@_log_faunadb_queries
 def update_fixture_data(_event, _context, verbose=1):
     """
     Fetch fixture data and send upcoming match data to the main app.
@@ -61,6 +77,7 @@ def update_fixture_data(_event, _context, verbose=1):
 
 
 @rollbar.lambda_function
+@_log_faunadb_queries
 def update_match_predictions(_event, _context, verbose=1):
     """
     Fetch predictions from ML models and send them to the main app.
@@ -73,6 +90,7 @@ def update_match_predictions(_event, _context, verbose=1):
 
 
 @rollbar.lambda_function
+@_log_faunadb_queries
 def update_matches(_event, _context, verbose=1):
     """
     Fetch match data and send them to the main app.
@@ -85,6 +103,7 @@ def update_matches(_event, _context, verbose=1):
 
 
 @rollbar.lambda_function
+@_log_faunadb_queries
 def update_match_results(_event, _context, verbose=1):
     """
     Fetch match data and send them to the main app.
@@ -0,0 +1,271 @@
+# pylint: disable=wrong-import-position
+"""
+Script for benchmarking the tipping pipeline against local stand-ins for its services.
+
+Runs each tipping.api function that updates data with HTTP stubs in place of
+the data-science service, the main Tipresias app, FaunaDB (an in-memory emulator
+of its GraphQL API), Splash, and the Monash tipping site. Every stub waits for
+an injected latency before responding, so we can see how much time the pipeline
+spends waiting on each service. For each function, it reports the wall time
+along with the number of requests & bytes transferred per service
+and the number of each FaunaDB operation sent.
+
+Run with `python3 tests/benchmarks/benchmark_pipeline.py --latency 20`
+from the src directory.
+"""
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from contextlib import ExitStack
+from unittest.mock import patch
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+PROJECT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
+
+if PROJECT_PATH not in sys.path:
+    sys.path.insert(0, PROJECT_PATH)
+
+# The stubs replace these services, but settings require them
+os.environ.setdefault("TIPRESIAS_APP", "http://localhost:8000")
+os.environ.setdefault("DATA_SCIENCE_SERVICE", "http://localhost:8008")
+
+from tipping import api, settings
+from tipping.db import faunadb
+from tipping.db.metrics import track_queries
+from tipping.tipping import FootyTipsSubmitter, MonashSubmitter
+from tests.helpers.faunadb_emulator import FaunadbEmulator
+from tests.helpers.service_stubs import (
+    DataScienceService,
+    FaunadbService,
+    MonashService,
+    SplashService,
+    StubService,
+    TipresiasAppService,
+    fake_current_season,
+    fake_ml_models,
+    seed_faunadb,
+)
+
+
+BYTES_PER_KB = 1024
+FAKE_CREDENTIALS = {
+    "MONASH_USERNAME": "benchmark",
+    "MONASH_PASSWORD": "benchmark",
+    "FOOTY_TIPS_USERNAME": "benchmark",
+    "FOOTY_TIPS_PASSWORD": "benchmark",
+}
+
+
+class Benchmark(NamedTuple):
+    """
+    Pipeline function to time, with an optional setup step that isn't timed.
+
+    Attributes:
+    -----------
+    name: Name for identifying results.
+    run: Function that runs the pipeline.
+    setup: Function that gets the services' data ready before each run.
+    """
+
+    name: str
+    run: Callable[[], Any]
+    setup: Optional[Callable[[], Any]] = None
+
+
+def _benchmarks(
+    emulator: FaunadbEmulator, services: List[StubService], splash_url: str
+) -> List[Benchmark]:
+    footy_tips_submitter = FootyTipsSubmitter(verbose=0)
+    footy_tips_submitter.splash_host = splash_url
+    tips_submitters = [MonashSubmitter(verbose=0), footy_tips_submitter]
+
+    def update_match_predictions():
+        api.update_match_predictions(tips_submitters=tips_submitters, verbose=0)
+
+    # We build each benchmark's starting data once, then restore it before each run,
+    # so every run does the same work
+    seeded_records = emulator.snapshot()
+    api.update_fixture_data(verbose=0)
+    fixture_records = emulator.snapshot()
+    update_match_predictions()
+    prediction_records = emulator.snapshot()
+
+    for service in services:
+        service.reset_metrics()
+
+    return [
+        Benchmark(
+            name="update_fixture_data",
+            run=lambda: api.update_fixture_data(verbose=0),
+            setup=lambda: emulator.restore(seeded_records),
+        ),
+        Benchmark(
+            name="update_match_predictions",
+            run=update_match_predictions,
+            setup=lambda: emulator.restore(fixture_records),
+        ),
+        Benchmark(
+            name="update_match_predictions (existing predictions)",
+            run=update_match_predictions,
+            setup=lambda: emulator.restore(prediction_records),
+        ),
+        Benchmark(name="update_matches", run=lambda: api.update_matches(verbose=0)),
+        Benchmark(
+            name="update_match_results",
+            run=lambda: api.update_match_results(verbose=0),
+        ),
+    ]
+
+
+def _time_benchmark(
+    benchmark: Benchmark, services: List[StubService], n_runs: int
+) -> Dict[str, Any]:
+    durations = []
+
+    for _ in range(n_runs):
+        if benchmark.setup is not None:
+            benchmark.setup()
+
+        for service in services:
+            service.reset_metrics()
+
+        with track_queries() as report:
+            start_time = time.perf_counter()
+            benchmark.run()
+            durations.append(time.perf_counter() - start_time)
+
+    # Each run does the same work, so the last run's traffic is representative
+    return {
+        "min_seconds": min(durations),
+        "median_seconds": float(np.median(durations)),
+        "max_seconds": max(durations),
+        "services": {
+            service.name: vars(service.metrics)
+            for service in services
+            if service.metrics.request_count > 0
+        },
+        "faunadb_operations": {
+            operation_name: metrics.count
+            for operation_name, metrics in report.operations.items()
+        },
+    }
+
+
+def _print_results(results: Dict[str, Dict[str, Any]]) -> None:
+    for name, result in results.items():
+        print(
+            f"{name}: {result['median_seconds'] * 1000:.1f}ms "
+            f"(min {result['min_seconds'] * 1000:.1f}ms, "
+            f"max {result['max_seconds'] * 1000:.1f}ms)"
+        )
+
+        for service_name, metrics in result["services"].items():
+            print(
+                f"    {service_name:<15}{metrics['request_count']:>6} requests"
+                f"{metrics['request_bytes'] / BYTES_PER_KB:>10.1f} kB sent"
+                f"{metrics['response_bytes'] / BYTES_PER_KB:>10.1f} kB received"
+            )
+
+        for operation_name, count in sorted(
+            result["faunadb_operations"].items(), key=lambda item: -item[1]
+        ):
+            print(f"        {operation_name:<30}{count:>6}")
+
+
+def _parse_service_latencies(service_latencies: List[str]) -> Dict[str, float]:
+    latencies = {}
+
+    for service_latency in service_latencies:
+        service_name, milliseconds = service_latency.split("=")
+        latencies[service_name] = float(milliseconds) / 1000
+
+    return latencies
+
+
+def main():
+    """Time the tipping pipeline's functions with stubbed services."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=20,
+        help="Milliseconds that each service takes to respond",
+    )
+    parser.add_argument(
+        "--service_latency",
+        action="append",
+        default=[],
+        help="Latency for one service as <name>=<milliseconds>, e.g. faunadb=50",
+    )
+    parser.add_argument(
+        "--ml_models", type=int, default=4, help="Number of ML models that predict"
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Times to run each")
+    args = parser.parse_args()
+
+    ml_models = fake_ml_models(args.ml_models)
+    fixtures, match_data = fake_current_season()
+    emulator = FaunadbEmulator()
+    services: List[StubService] = [
+        DataScienceService(fixtures, match_data, ml_models),
+        TipresiasAppService(
+            {
+                ml_model["name"]: ml_model["prediction_type"]
+                for ml_model in ml_models
+                if ml_model["used_in_competitions"]
+            }
+        ),
+        FaunadbService(emulator),
+        SplashService(),
+        MonashService(fixtures),
+    ]
+    service_urls = {}
+
+    with ExitStack() as stack:
+        for service in services:
+            stack.enter_context(service)
+            service_urls[service.name] = service.url
+
+        stack.enter_context(patch.dict(os.environ, FAKE_CREDENTIALS))
+        stack.enter_context(
+            patch.object(settings, "DATA_SCIENCE_SERVICE", service_urls["data_science"])
+        )
+        stack.enter_context(
+            patch.object(settings, "TIPRESIAS_APP", service_urls["tipresias_app"])
+        )
+        stack.enter_context(
+            patch.object(faunadb, "FAUNADB_DOMAIN", service_urls["faunadb"])
+        )
+        stack.enter_context(
+            patch(
+                "tipping.tipping.MONASH_TIPS_URL",
+                service_urls["monash"] + "/~footy/tips.shtml",
+            )
+        )
+        # The pipeline warns about data quirks, which aren't relevant here
+        stack.enter_context(warnings.catch_warnings())
+        warnings.simplefilter("ignore")
+
+        seed_faunadb(emulator, fixtures, ml_models)
+        benchmarks = _benchmarks(emulator, services, service_urls["splash"])
+
+        latencies = _parse_service_latencies(args.service_latency)
+
+        for service in services:
+            service.latency = latencies.get(service.name, args.latency / 1000)
+
+        results = {
+            benchmark.name: _time_benchmark(benchmark, services, args.runs)
+            for benchmark in benchmarks
+        }
+
+    _print_results(results)
+
+
+if __name__ == "__main__":
+    main()
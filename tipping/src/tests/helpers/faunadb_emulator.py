@@ -0,0 +1,487 @@
+"""In-memory emulator of FaunaDB's GraphQL API for the tipping service's schema."""
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, cast
+from copy import deepcopy
+from datetime import datetime, timezone
+from threading import Lock
+import os
+import time
+
+from graphql import (
+    GraphQLError,
+    GraphQLObjectType,
+    ListTypeNode,
+    NonNullTypeNode,
+    ObjectTypeDefinitionNode,
+    build_schema,
+    graphql_sync,
+    parse,
+    print_ast,
+)
+
+from tipping import settings
+
+
+SCHEMA_FILEPATH = os.path.join(settings.SRC_DIR, "tipping/db/schema.gql")
+# FaunaDB returns pages of 50 records unless queries set _size
+DEFAULT_PAGE_SIZE = 50
+# FaunaDB IDs are 18-digit numeric strings
+FIRST_ID = 280000000000000000
+
+Record = Dict[str, Any]
+
+
+class _Field(NamedTuple):
+    name: str
+    # Type as written in the schema (e.g. '[TeamMatch!]')
+    sdl_type: str
+    type_name: str
+    is_list: bool
+    is_required: bool
+    is_unique: bool
+
+
+def _parse_field(field_node) -> _Field:
+    type_node = field_node.type
+    is_required = isinstance(type_node, NonNullTypeNode)
+    inner_type_node = type_node.type if is_required else type_node
+    is_list = isinstance(inner_type_node, ListTypeNode)
+
+    while not hasattr(inner_type_node, "name"):
+        inner_type_node = inner_type_node.type
+
+    return _Field(
+        name=field_node.name.value,
+        sdl_type=print_ast(type_node),
+        type_name=inner_type_node.name.value,
+        is_list=is_list,
+        is_required=is_required,
+        is_unique=any(
+            directive.name.value == "unique" for directive in field_node.directives
+        ),
+    )
+
+
+def _serialize_time(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _parse_time(value: Any) -> datetime:
+    # Like FaunaDB, we only accept UTC times with the 'Z' suffix
+    if not isinstance(value, str) or not value.endswith("Z"):
+        raise GraphQLError(f"Time must be an ISO-8601 UTC string, but got {value}.")
+
+    return datetime.fromisoformat(value[:-1]).replace(tzinfo=timezone.utc)
+
+
+def _capitalize(name: str) -> str:
+    return name[0].upper() + name[1:]
+
+
+class FaunadbEmulator:
+    """
+    In-memory emulator of FaunaDB's GraphQL API.
+
+    Extends the imported schema the way that FaunaDB does: collection types
+    get _id & _ts fields, relation lists & list queries return pages of records,
+    and there are findXByID queries and createX, updateX & deleteX mutations
+    for each type. User-defined queries that don't have resolvers filter records
+    by their arguments, like FaunaDB's generated indexes.
+    This covers what the tipping service needs, not all of FaunaDB's features.
+    """
+
+    def __init__(self, schema_filepath: str = SCHEMA_FILEPATH):
+        """
+        Params:
+        -------
+        schema_filepath: Path to the GraphQL schema to import.
+        """
+        with open(schema_filepath, "r", encoding="utf-8") as schema_file:
+            document = parse(schema_file.read())
+
+        type_definitions = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, ObjectTypeDefinitionNode)
+        }
+        query_definition = type_definitions.pop("Query")
+
+        self._fields: Dict[str, List[_Field]] = {
+            type_name: [_parse_field(field) for field in definition.fields]
+            for type_name, definition in type_definitions.items()
+        }
+        self._queries = {
+            field.name.value: (
+                _parse_field(field),
+                [argument.name.value for argument in field.arguments],
+            )
+            for field in query_definition.fields
+        }
+        self._sdl_arguments = {
+            field.name.value: ", ".join(
+                print_ast(argument) for argument in field.arguments
+            )
+            for field in query_definition.fields
+        }
+
+        self.schema = build_schema(self._sdl())
+        self._add_resolvers()
+
+        self._lock = Lock()
+        self._records: Dict[str, Dict[str, Record]] = {}
+        self._next_id = FIRST_ID
+        self.reset()
+
+    def reset(self) -> None:
+        """Delete all records."""
+        with self._lock:
+            self._records = {type_name: {} for type_name in self._fields}
+
+    def snapshot(self) -> Dict[str, Dict[str, Record]]:
+        """Copy all records, so they can be restored later."""
+        with self._lock:
+            return deepcopy(self._records)
+
+    def restore(self, snapshot: Dict[str, Dict[str, Record]]) -> None:
+        """Replace all records with the ones from a snapshot."""
+        with self._lock:
+            self._records = deepcopy(snapshot)
+
+    def count(self, type_name: str) -> int:
+        """Return the number of records of the given type."""
+        return len(self._records[type_name])
+
+    def execute(
+        self, query: str, variables: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute a GraphQL query.
+
+        Params:
+        -------
+        query: GraphQL query string.
+        variables: Values of the query's variables.
+
+        Returns:
+        --------
+        GraphQL response body, with 'errors' if there are any.
+        """
+        with self._lock:
+            result = graphql_sync(self.schema, query, variable_values=variables)
+
+        response: Dict[str, Any] = {"data": result.data}
+
+        if result.errors:
+            response["errors"] = [error.formatted for error in result.errors]
+
+        return response
+
+    def _is_reference(self, field: _Field) -> bool:
+        return field.type_name in self._fields
+
+    def _back_reference(self, type_name: str, field: _Field) -> str:
+        back_references = [
+            other_field.name
+            for other_field in self._fields[field.type_name]
+            if other_field.type_name == type_name and not other_field.is_list
+        ]
+
+        assert len(back_references) == 1, (
+            f"Expected {field.type_name} to have one field that refers to "
+            f"{type_name}, but found {back_references}."
+        )
+
+        return back_references[0]
+
+    def _sdl(self) -> str:
+        definitions = ["scalar Time", "scalar Long"]
+
+        for type_name, fields in self._fields.items():
+            object_fields = ["_id: ID!", "_ts: Long!"]
+            input_fields = []
+
+            for field in fields:
+                if not self._is_reference(field):
+                    object_fields.append(f"{field.name}: {field.sdl_type}")
+                    input_fields.append(f"{field.name}: {field.sdl_type}")
+                    continue
+
+                relation_name = f"{type_name}{_capitalize(field.name)}Relation"
+                input_fields.append(f"{field.name}: {relation_name}")
+
+                if field.is_list:
+                    object_fields.append(
+                        f"{field.name}(_size: Int, _cursor: String): "
+                        f"{field.type_name}Page!"
+                    )
+                    definitions.append(
+                        f"input {relation_name} {{ create: [{field.type_name}Input] "
+                        "connect: [ID] disconnect: [ID] }"
+                    )
+                else:
+                    object_fields.append(f"{field.name}: {field.type_name}")
+                    definitions.append(
+                        f"input {relation_name} {{ create: {field.type_name}Input "
+                        "connect: ID disconnect: Boolean }"
+                    )
+
+            definitions.extend(
+                [
+                    f"type {type_name} {{ {' '.join(object_fields)} }}",
+                    f"input {type_name}Input {{ {' '.join(input_fields)} }}",
+                    f"type {type_name}Page {{ data: [{type_name}]! "
+                    "after: String before: String }",
+                ]
+            )
+
+        query_fields = [
+            f"find{type_name}ByID(id: ID!): {type_name}" for type_name in self._fields
+        ]
+
+        for query_name, (field, _) in self._queries.items():
+            arguments = self._sdl_arguments[query_name]
+
+            if field.is_list:
+                page_arguments = ", ".join(
+                    filter(None, [arguments, "_size: Int, _cursor: String"])
+                )
+                query_fields.append(
+                    f"{query_name}({page_arguments}): {field.type_name}Page!"
+                )
+            else:
+                query_fields.append(
+                    f"{query_name}({arguments}): {field.type_name}"
+                    if arguments
+                    else f"{query_name}: {field.type_name}"
+                )
+
+        mutation_fields = [
+            mutation_field
+            for type_name in self._fields
+            for mutation_field in [
+                f"create{type_name}(data: {type_name}Input!): {type_name}!",
+                f"update{type_name}(id: ID!, data: {type_name}Input!): {type_name}",
+                f"delete{type_name}(id: ID!): {type_name}",
+            ]
+        ]
+
+        definitions.extend(
+            [
+                f"type Query {{ {' '.join(query_fields)} }}",
+                f"type Mutation {{ {' '.join(mutation_fields)} }}",
+            ]
+        )
+
+        return "\n".join(definitions)
+
+    def _add_resolvers(self) -> None:
+        # build_schema gives custom scalars default methods, so we replace them
+        # on the instance (mypy doesn't allow assigning to methods)
+        time_type: Any = self.schema.type_map["Time"]
+        time_type.serialize = _serialize_time
+        time_type.parse_value = _parse_time
+        time_type.parse_literal = lambda node, _variables=None: _parse_time(
+            node.value
+        )
+
+        for type_name, fields in self._fields.items():
+            object_fields = cast(
+                GraphQLObjectType, self.schema.type_map[type_name]
+            ).fields
+
+            for field in fields:
+                if self._is_reference(field):
+                    object_fields[field.name].resolve = (
+                        self._relation_list_resolver(type_name, field)
+                        if field.is_list
+                        else self._reference_resolver(field)
+                    )
+
+        assert self.schema.query_type is not None
+        assert self.schema.mutation_type is not None
+        query_fields = self.schema.query_type.fields
+        mutation_fields = self.schema.mutation_type.fields
+
+        for type_name in self._fields:
+            query_fields[f"find{type_name}ByID"].resolve = self._find_resolver(
+                type_name
+            )
+
+            for action, resolve in self._mutation_resolvers(type_name).items():
+                mutation_fields[f"{action}{type_name}"].resolve = resolve
+
+        for query_name, (field, argument_names) in self._queries.items():
+            query_fields[query_name].resolve = self._index_resolver(
+                field, argument_names
+            )
+
+    def _find_resolver(self, type_name: str) -> Callable:
+        def resolve(_root, _info, **kwargs):
+            return self._records[type_name].get(kwargs["id"])
+
+        return resolve
+
+    def _mutation_resolvers(self, type_name: str) -> Dict[str, Callable]:
+        def create(_root, _info, data):
+            return self._create(type_name, data)
+
+        def update(_root, _info, data, **kwargs):
+            return self._update(type_name, kwargs["id"], data)
+
+        def delete(_root, _info, **kwargs):
+            return self._records[type_name].pop(kwargs["id"], None)
+
+        return {"create": create, "update": update, "delete": delete}
+
+    def _reference_resolver(self, field: _Field) -> Callable:
+        def resolve(record, _info):
+            reference_id = record.get(field.name)
+
+            if reference_id is None:
+                return None
+
+            return self._records[field.type_name].get(reference_id)
+
+        return resolve
+
+    def _relation_list_resolver(self, type_name: str, field: _Field) -> Callable:
+        back_reference = self._back_reference(type_name, field)
+
+        def resolve(record, _info, _size=DEFAULT_PAGE_SIZE, _cursor=None):
+            related_records = [
+                related_record
+                for related_record in self._records[field.type_name].values()
+                if related_record.get(back_reference) == record["_id"]
+            ]
+
+            return self._page(related_records, _size, _cursor)
+
+        return resolve
+
+    def _index_resolver(self, field: _Field, argument_names: List[str]) -> Callable:
+        def resolve(_root, _info, _size=DEFAULT_PAGE_SIZE, _cursor=None, **terms):
+            matching_records = [
+                record
+                for record in self._records[field.type_name].values()
+                if all(
+                    record.get(name) == terms.get(name) for name in argument_names
+                )
+            ]
+
+            if field.is_list:
+                return self._page(matching_records, _size, _cursor)
+
+            return matching_records[0] if matching_records else None
+
+        return resolve
+
+    @staticmethod
+    def _page(records: List[Record], size: int, cursor: Optional[str]) -> Record:
+        # FaunaDB cursors are opaque, so we just use the offset
+        start = int(cursor or 0)
+        end = start + size
+
+        return {
+            "data": records[start:end],
+            "after": str(end) if end < len(records) else None,
+            "before": str(max(start - size, 0)) if start > 0 else None,
+        }
+
+    def _create(self, type_name: str, data: Dict[str, Any]) -> Record:
+        record: Record = {"_id": str(self._next_id)}
+        self._next_id += 1
+
+        self._write(type_name, record, data, is_new=True)
+        self._records[type_name][record["_id"]] = record
+        self._write_relation_lists(type_name, record, data)
+
+        return record
+
+    def _update(self, type_name: str, record_id: str, data: Dict[str, Any]) -> Record:
+        record = self._records[type_name].get(record_id)
+
+        if record is None:
+            raise GraphQLError(f"Instance '{record_id}' not found.")
+
+        self._write(type_name, record, data, is_new=False)
+        self._write_relation_lists(type_name, record, data)
+
+        return record
+
+    def _write(
+        self, type_name: str, record: Record, data: Dict[str, Any], is_new: bool
+    ) -> None:
+        for field in self._fields[type_name]:
+            if field.is_list and self._is_reference(field):
+                continue
+
+            value = (
+                self._reference_id(field, data[field.name])
+                if self._is_reference(field) and field.name in data
+                else data.get(field.name, None if is_new else record.get(field.name))
+            )
+
+            if field.is_required and value is None:
+                raise GraphQLError(
+                    f"Field '{field.name}' of '{type_name}' can't be null."
+                )
+
+            if field.is_unique and any(
+                other_record.get(field.name) == value
+                and other_record["_id"] != record["_id"]
+                for other_record in self._records[type_name].values()
+            ):
+                raise GraphQLError("Instance is not unique.")
+
+            record[field.name] = value
+
+        record["_ts"] = int(time.time() * 1e6)
+
+    def _reference_id(self, field: _Field, relation: Optional[Record]) -> Optional[str]:
+        if relation is None or relation.get("disconnect"):
+            return None
+
+        if relation.get("create") is not None:
+            return self._create(field.type_name, relation["create"])["_id"]
+
+        reference_id = relation.get("connect")
+
+        if reference_id is not None and reference_id not in self._records[
+            field.type_name
+        ]:
+            raise GraphQLError(f"Instance '{reference_id}' not found.")
+
+        return reference_id
+
+    def _write_relation_lists(
+        self, type_name: str, record: Record, data: Dict[str, Any]
+    ) -> None:
+        for field in self._fields[type_name]:
+            relation = data.get(field.name)
+
+            if not (field.is_list and self._is_reference(field)) or relation is None:
+                continue
+
+            back_reference = self._back_reference(type_name, field)
+
+            for related_data in relation.get("create") or []:
+                self._create(
+                    field.type_name,
+                    {**related_data, back_reference: {"connect": record["_id"]}},
+                )
+
+            parent_ids = {
+                related_id: record["_id"]
+                for related_id in relation.get("connect") or []
+            }
+            parent_ids.update(
+                {related_id: None for related_id in relation.get("disconnect") or []}
+            )
+
+            for related_id, parent_id in parent_ids.items():
+                related_record = self._records[field.type_name].get(related_id)
+
+                if related_record is None:
+                    raise GraphQLError(f"Instance '{related_id}' not found.")
+
+                related_record[back_reference] = parent_id
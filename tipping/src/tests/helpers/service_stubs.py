@@ -0,0 +1,622 @@
+"""HTTP stand-ins for the services that the tipping pipeline talks to."""
+
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from urllib.parse import parse_qsl, urlsplit
+import html
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import simplejson
+
+from tests.fixtures import data_factories
+from tipping import settings
+from tipping.helpers import convert_to_dict
+from .faunadb_emulator import FaunadbEmulator
+
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+ONE_WEEK = timedelta(weeks=1)
+HOURS_BETWEEN_MATCHES = 3
+POINTS_PER_GOAL = 6
+CREATE_TEAM = """
+    mutation($name: String!) {
+        createTeam(data: { name: $name }) { _id }
+    }
+"""
+CREATE_ML_MODEL = """
+    mutation(
+        $name: String!
+        $isPrincipal: Boolean!
+        $usedInCompetitions: Boolean!
+        $predictionType: String!
+    ) {
+        createMLModel(data: {
+            name: $name,
+            isPrincipal: $isPrincipal,
+            usedInCompetitions: $usedInCompetitions,
+            predictionType: $predictionType
+        }) { _id }
+    }
+"""
+
+
+class ServiceMetrics:
+    """
+    Traffic that a stub service has received.
+
+    Attributes:
+    -----------
+    request_count: Number of requests.
+    request_bytes: Bytes of request paths (including query strings) & bodies.
+    response_bytes: Bytes of response bodies.
+    """
+
+    def __init__(self):
+        self.request_count = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+
+def _json_response(data: Any, status: int = 200, headers=None) -> Response:
+    # Like the real services, we send missing values as null rather than NaN
+    body = simplejson.dumps(data, ignore_nan=True, default=str).encode("utf-8")
+
+    return status, {"Content-Type": "application/json", **(headers or {})}, body
+
+
+def _html_response(content: str) -> Response:
+    body = f"<html><body>{content}</body></html>".encode("utf-8")
+
+    return 200, {"Content-Type": "text/html"}, body
+
+
+class StubService:
+    """
+    HTTP server that runs in a background thread and imitates an external service.
+
+    Each request waits for the injected latency before getting its response,
+    and gets recorded in the service's metrics.
+    """
+
+    name = "service"
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Params:
+        -------
+        latency: Seconds to wait before responding to each request.
+        """
+        self.latency = latency
+        self.metrics = ServiceMetrics()
+        self.url = ""
+        self._metrics_lock = Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *_args):
+        self.stop()
+
+    def start(self) -> None:
+        """Start listening on a free local port."""
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+        Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        """Stop listening."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def reset_metrics(self) -> None:
+        """Forget about past requests."""
+        with self._metrics_lock:
+            self.metrics = ServiceMetrics()
+
+    def respond(
+        self, method: str, path: str, params: Dict[str, str], body: bytes
+    ) -> Response:
+        """
+        Respond to a request.
+
+        Params:
+        -------
+        method: HTTP method.
+        path: URL path without the query string.
+        params: Query-string parameters.
+        body: Request body.
+
+        Returns:
+        --------
+        Status code, headers & body of the response.
+        """
+        raise NotImplementedError
+
+    def _record(self, request_bytes: int, response_bytes: int) -> None:
+        with self._metrics_lock:
+            self.metrics.request_count += 1
+            self.metrics.request_bytes += request_bytes
+            self.metrics.response_bytes += response_bytes
+
+    def _handler_class(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Pass requests to the service, recording their sizes."""
+
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                """Respond to a GET request."""
+                self._handle("GET")
+
+            def do_POST(self):  # pylint: disable=invalid-name
+                """Respond to a POST request."""
+                self._handle("POST")
+
+            def log_message(self, *_args):  # pylint: disable=arguments-differ
+                pass
+
+            def _handle(self, method: str):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                url = urlsplit(self.path)
+
+                time.sleep(service.latency)
+
+                status, headers, response_body = service.respond(
+                    method, url.path, dict(parse_qsl(url.query)), body
+                )
+
+                self.send_response(status)
+
+                for key, value in headers.items():
+                    self.send_header(key, value)
+
+                self.send_header("Content-Length", str(len(response_body)))
+                self.end_headers()
+                self.wfile.write(response_body)
+
+                service._record(  # pylint: disable=protected-access
+                    len(self.path) + len(body), len(response_body)
+                )
+
+        return Handler
+
+
+class FaunadbService(StubService):
+    """FaunaDB's GraphQL & schema-import endpoints, backed by an emulator."""
+
+    name = "faunadb"
+
+    def __init__(self, emulator: Optional[FaunadbEmulator] = None, latency=0.0):
+        """
+        Params:
+        -------
+        emulator: In-memory FaunaDB.
+        latency: Seconds to wait before responding to each request.
+        """
+        super().__init__(latency=latency)
+        self.emulator = emulator or FaunadbEmulator()
+
+    def respond(self, method, path, params, body):
+        if method == "POST" and path == "/graphql":
+            request = json.loads(body)
+
+            return _json_response(
+                self.emulator.execute(request["query"], request.get("variables"))
+            )
+
+        if method == "POST" and path == "/import":
+            if params.get("mode") == "override":
+                self.emulator.reset()
+
+            return 200, {"Content-Type": "text/plain"}, b"Schema imported"
+
+        return _json_response({"errors": [{"message": "Not found"}]}, status=404)
+
+
+def fake_current_season(
+    played_round_share: float = 0.5,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Generate fixture & match data for the current season.
+
+    Rounds are usually a week apart, but get squeezed together when needed
+    to keep every match in the current year.
+
+    Params:
+    -------
+    played_round_share: Share of rounds that have been played.
+
+    Returns:
+    --------
+    Fixture data for all matches and match data for played matches.
+    """
+    right_now = datetime.now(tz=timezone.utc)
+    fixtures = data_factories.fake_fixture_data(
+        seasons=(right_now.year, right_now.year + 1)
+    ).sort_values(["round_number", "date"])
+    n_rounds = fixtures["round_number"].max()
+    n_played_rounds = max(1, int(n_rounds * played_round_share))
+    n_future_rounds = n_rounds - n_played_rounds
+
+    year_start = datetime(right_now.year, 1, 1, tzinfo=timezone.utc)
+    year_end = datetime(right_now.year + 1, 1, 1, tzinfo=timezone.utc)
+    round_interval = min(
+        ONE_WEEK,
+        (right_now - year_start) / (n_played_rounds + 1),
+        (year_end - right_now) / (n_future_rounds + 1),
+    )
+    next_round_start = right_now + round_interval / 2
+    match_interval = min(
+        timedelta(hours=HOURS_BETWEEN_MATCHES),
+        round_interval / fixtures.groupby("round_number").size().max() / 2,
+    )
+
+    fixtures = fixtures.assign(
+        date=next_round_start
+        + (fixtures["round_number"] - n_played_rounds - 1) * round_interval
+        + fixtures.groupby("round_number").cumcount() * match_interval
+    ).reset_index(drop=True)
+
+    played_matches = fixtures.query("date < @right_now")
+    random = np.random.default_rng(len(played_matches))
+    goals = random.integers(5, 20, size=(len(played_matches), 2))
+    behinds = random.integers(5, 15, size=(len(played_matches), 2))
+    scores = goals * POINTS_PER_GOAL + behinds
+
+    match_data = played_matches.assign(
+        home_goals=goals[:, 0],
+        home_behinds=behinds[:, 0],
+        home_score=scores[:, 0],
+        away_goals=goals[:, 1],
+        away_behinds=behinds[:, 1],
+        away_score=scores[:, 1],
+        margin=scores[:, 0] - scores[:, 1],
+    )
+
+    return fixtures, match_data
+
+
+def fake_ml_models(n_ml_models: int) -> List[Dict[str, Any]]:
+    """
+    Generate ML model info like the data-science service's.
+
+    Alternating prediction types means that the first two models
+    can be the competition models (one of each type).
+
+    Params:
+    -------
+    n_ml_models: Number of models to generate.
+
+    Returns:
+    --------
+    List of ML model info dicts.
+    """
+    return [
+        {
+            "name": f"model_{model_idx}",
+            "prediction_type": "margin" if model_idx % 2 == 0 else "win_probability",
+            "is_principal": model_idx == 0,
+            "used_in_competitions": model_idx < 2,
+        }
+        for model_idx in range(n_ml_models)
+    ]
+
+
+def seed_faunadb(
+    emulator: FaunadbEmulator, fixtures: pd.DataFrame, ml_models: List[Dict[str, Any]]
+) -> None:
+    """
+    Create the teams & ML models that the tipping pipeline expects to exist.
+
+    Params:
+    -------
+    emulator: FaunaDB emulator to create records in.
+    fixtures: Fixture data, for including any historical team names.
+    ml_models: ML model info dicts.
+    """
+    team_names = set(settings.TEAM_NAMES) | set(fixtures["home_team"]) | set(
+        fixtures["away_team"]
+    )
+
+    for team_name in sorted(team_names):
+        emulator.execute(CREATE_TEAM, {"name": team_name})
+
+    # We skip MLModel's validations, which only allow one competition model,
+    # because the main app has one for each prediction type
+    for ml_model in ml_models:
+        emulator.execute(
+            CREATE_ML_MODEL,
+            {
+                "name": ml_model["name"],
+                "isPrincipal": ml_model["is_principal"],
+                "usedInCompetitions": ml_model["used_in_competitions"],
+                "predictionType": ml_model["prediction_type"],
+            },
+        )
+
+
+class DataScienceService(StubService):
+    """Data-science service endpoints that serve fake data for the current season."""
+
+    name = "data_science"
+
+    def __init__(
+        self,
+        fixtures: pd.DataFrame,
+        match_data: pd.DataFrame,
+        ml_models: List[Dict[str, Any]],
+        latency: float = 0.0,
+    ):
+        """
+        Params:
+        -------
+        fixtures: Fixture data for all matches.
+        match_data: Results data for played matches.
+        ml_models: Name & prediction type of each ML model.
+        latency: Seconds to wait before responding to each request.
+        """
+        super().__init__(latency=latency)
+        self.fixtures = fixtures
+        self.match_data = match_data
+        self.ml_models = ml_models
+
+    def respond(self, method, path, params, body):
+        routes = {
+            "/fixtures": self._fixtures,
+            "/predictions": self._predictions,
+            "/matches": self._matches,
+            "/match_results": self._match_results,
+            "/ml_models": self._ml_models,
+        }
+
+        if method != "GET" or path not in routes:
+            return _json_response({"error": "Not found"}, status=404)
+
+        return _json_response({"data": routes[path](params)})
+
+    @staticmethod
+    def _filter_dates(data_frame: pd.DataFrame, params: Dict[str, str]):
+        start_date = pd.Timestamp(params["start_date"], tz="UTC")
+        end_date = pd.Timestamp(params["end_date"], tz="UTC") + timedelta(days=1)
+
+        return data_frame[
+            (data_frame["date"] >= start_date) & (data_frame["date"] < end_date)
+        ]
+
+    def _fixtures(self, params):
+        return convert_to_dict(self._filter_dates(self.fixtures, params))
+
+    def _matches(self, params):
+        return convert_to_dict(self._filter_dates(self.match_data, params))
+
+    def _match_results(self, params):
+        return convert_to_dict(
+            data_factories.fake_match_results_data(
+                match_results=self.match_data,
+                round_number=int(params["round_number"]),
+            )
+        )
+
+    def _ml_models(self, _params):
+        return self.ml_models
+
+    def _predictions(self, params):
+        min_year, max_year = (int(year) for year in params["year_range"].split("-"))
+        fixtures = self.fixtures[
+            (self.fixtures["year"] >= min_year) & (self.fixtures["year"] < max_year)
+        ]
+
+        if "round_number" in params:
+            fixtures = fixtures[
+                fixtures["round_number"] == int(params["round_number"])
+            ]
+
+        ml_model_names = (
+            params["ml_models"].split(",") if "ml_models" in params else None
+        )
+
+        return convert_to_dict(
+            pd.concat(
+                [
+                    data_factories.fake_prediction_data(
+                        fixtures=fixtures,
+                        ml_model_name=ml_model["name"],
+                        predict_margin=ml_model["prediction_type"] == "margin",
+                    )
+                    for ml_model in self.ml_models
+                    if ml_model_names is None or ml_model["name"] in ml_model_names
+                ]
+            )
+        )
+
+
+class TipresiasAppService(StubService):
+    """
+    Main app's data-ingestion endpoints.
+
+    Each post queues a job that has already succeeded, and posted predictions
+    from competition models come back as the job's result.
+    """
+
+    name = "tipresias_app"
+
+    def __init__(self, competition_ml_models: Dict[str, str], latency=0.0):
+        """
+        Params:
+        -------
+        competition_ml_models: Prediction type of each competition ML model by name.
+        latency: Seconds to wait before responding to each request.
+        """
+        super().__init__(latency=latency)
+        self.competition_ml_models = competition_ml_models
+        self._job_results: List[Any] = []
+        self._jobs_lock = Lock()
+
+    def respond(self, method, path, params, body):
+        if method == "POST" and path in ("/fixtures", "/matches", "/predictions"):
+            data = json.loads(body)["data"]
+            result = (
+                self._competition_predictions(data) if path == "/predictions" else None
+            )
+
+            with self._jobs_lock:
+                self._job_results.append(result)
+                job_id = len(self._job_results)
+
+            return _json_response(
+                {"id": job_id, "status": "pending"},
+                status=202,
+                headers={"Location": f"/jobs/{job_id}"},
+            )
+
+        if method == "GET" and path.startswith("/jobs/"):
+            job_id = int(path.split("/")[-1])
+
+            return _json_response(
+                {
+                    "id": job_id,
+                    "status": "succeeded",
+                    "result": self._job_results[job_id - 1],
+                    "error": "",
+                }
+            )
+
+        return _json_response({"error": "Not found"}, status=404)
+
+    def _competition_predictions(self, prediction_data: List[Dict[str, Any]]):
+        predictions = []
+
+        for prediction in prediction_data:
+            prediction_type = self.competition_ml_models.get(prediction["ml_model"])
+
+            if prediction_type is None:
+                continue
+
+            home_result = prediction[f"home_predicted_{prediction_type}"]
+            away_result = prediction[f"away_predicted_{prediction_type}"]
+            predicted_result = (
+                abs(home_result - away_result)
+                if prediction_type == "margin"
+                else max(home_result, away_result)
+            )
+
+            predictions.append(
+                {
+                    "predicted_winner__name": prediction[
+                        "home_team" if home_result > away_result else "away_team"
+                    ],
+                    "predicted_margin": (
+                        predicted_result if prediction_type == "margin" else None
+                    ),
+                    "predicted_win_probability": (
+                        None if prediction_type == "margin" else predicted_result
+                    ),
+                }
+            )
+
+        return predictions
+
+
+class SplashService(StubService):
+    """Splash's script-execution endpoint, which submits tips to footytips.com.au."""
+
+    name = "splash"
+
+    def respond(self, method, path, params, body):
+        if method == "POST" and path == "/execute":
+            return _json_response({"status": "ok"})
+
+        return _json_response({"error": "Not found"}, status=404)
+
+
+class MonashService(StubService):
+    """
+    Monash footy-tipping site, with its login & tipping forms.
+
+    The tipping form has a row for each match in the upcoming round,
+    with radio inputs for picking the winner and a text input for the margin
+    or win probability.
+    """
+
+    name = "monash"
+
+    DEFAULT_VALUES = {"normal": "0", "info": "0.5"}
+
+    def __init__(self, fixtures: pd.DataFrame, latency: float = 0.0):
+        """
+        Params:
+        -------
+        fixtures: Fixture data for all matches.
+        latency: Seconds to wait before responding to each request.
+        """
+        super().__init__(latency=latency)
+        self.fixtures = fixtures
+
+    def respond(self, method, path, params, body):
+        if method == "GET":
+            return _html_response(
+                '<form action="/login" method="post">'
+                '<input type="text" name="name" />'
+                '<input type="password" name="passwd" />'
+                '<select name="comp">'
+                '<option value="normal">normal</option>'
+                '<option value="info">info</option>'
+                "</select>"
+                '<input type="submit" value="Login" />'
+                "</form>"
+            )
+
+        if method == "POST" and path == "/login":
+            competition = dict(parse_qsl(body.decode("utf-8")))["comp"]
+
+            return _html_response(self._tipping_form(competition))
+
+        if method == "POST" and path == "/tips":
+            return _html_response("<p>Tips submitted</p>")
+
+        return _html_response("<p>Not found</p>")
+
+    def _tipping_form(self, competition: str) -> str:
+        future_matches = self.fixtures[
+            self.fixtures["date"] > datetime.now(tz=timezone.utc)
+        ]
+        round_matches = future_matches[
+            future_matches["round_number"] == future_matches["round_number"].min()
+        ]
+        default_value = self.DEFAULT_VALUES[competition]
+
+        rows = [
+            "<tr><th>Home</th><th>Away</th><th>Prediction</th></tr>",
+            *[
+                "<tr>"
+                + "".join(
+                    f"<td><label>{html.escape(team)}"
+                    f'<input type="radio" name="tip{match_idx}" '
+                    f'value="{html.escape(team)}" /></label></td>'
+                    for team in (match["home_team"], match["away_team"])
+                )
+                + f'<td><input type="text" name="prediction{match_idx}" '
+                f'value="{default_value}" /></td>'
+                "</tr>"
+                for match_idx, (_, match) in enumerate(round_matches.iterrows())
+            ],
+        ]
+
+        return (
+            f'<form action="/tips" method="post"><table>{"".join(rows)}</table>'
+            '<input type="submit" value="Submit" /></form>'
+        )
@@ -1,9 +1,13 @@
 # pylint: disable=missing-docstring
 
 from unittest import TestCase
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 
-from tipping.db.faunadb import FaunadbClient
+from aiohttp import ClientResponseError
+from gql.transport.exceptions import TransportServerError
+
+from tipping.db.faunadb import FaunadbClient, GraphQLError, MAX_RETRIES
+from tipping.db.metrics import track_queries
 
 
 class TestFaunaDBClient(TestCase):
@@ -49,3 +53,59 @@ class TestFaunaDBClient(TestCase):
 
             with self.assertRaisesRegex(Exception, r"Oops"):
                 self.client.graphql(query)
+
+    @patch("tipping.db.faunadb.time.sleep")
+    @patch("tipping.db.faunadb.Client.execute")
+    def test_graphql_metrics(self, mock_execute, _mock_sleep):
+        mock_execute.return_value = {"createTeam": {"name": "NewTeam"}}
+        query = """
+            mutation {
+                createTeam(data: { name: "NewTeam" }) { name }
+            }
+        """
+
+        with track_queries() as report:
+            self.client.graphql(query)
+            self.client.graphql("query FetchTeams { allTeams { data { name } } }")
+
+        # It records each query under its operation name
+        self.assertEqual(report.count(), 2)
+        self.assertEqual(report.count("createTeam"), 1)
+        self.assertEqual(report.count("FetchTeams"), 1)
+        self.assertGreater(report.operations["createTeam"].request_bytes, 0)
+        self.assertGreater(report.operations["createTeam"].response_bytes, 0)
+
+        with self.subTest("when the server is temporarily unavailable"):
+            server_error = TransportServerError()
+            server_error.__cause__ = ClientResponseError(MagicMock(), (), status=503)
+            mock_execute.side_effect = [server_error, {"createTeam": {}}]
+
+            with track_queries() as report:
+                self.client.graphql(query)
+
+            # It retries the query
+            self.assertEqual(report.count(), 1)
+            self.assertEqual(report.retry_count, 1)
+            self.assertEqual(report.error_count, 0)
+
+            with self.subTest("and it never becomes available"):
+                mock_execute.side_effect = server_error
+
+                with track_queries() as report:
+                    with self.assertRaises(GraphQLError):
+                        self.client.graphql(query)
+
+                # It gives up after the maximum retries
+                self.assertEqual(report.retry_count, MAX_RETRIES)
+                self.assertEqual(report.error_count, 1)
+
+        with self.subTest("when the query is invalid"):
+            mock_execute.side_effect = [{"errors": [{"message": "Oops"}]}]
+
+            with track_queries() as report:
+                with self.assertRaises(GraphQLError):
+                    self.client.graphql(query)
+
+            # It doesn't retry
+            self.assertEqual(report.retry_count, 0)
+            self.assertEqual(report.error_count, 1)
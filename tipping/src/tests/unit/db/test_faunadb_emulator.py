@@ -0,0 +1,146 @@
+# pylint: disable=missing-docstring
+
+from unittest import TestCase
+from unittest.mock import patch
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+from tests.helpers.faunadb_emulator import DEFAULT_PAGE_SIZE
+from tests.helpers.service_stubs import FaunadbService
+from tipping.db.faunadb import FaunadbClient, GraphQLError
+from tipping.models import Match, MLModel, Prediction, Team, TeamMatch
+
+
+class TestFaunadbEmulator(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.service = FaunadbService()
+        cls.service.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.stop()
+
+    def setUp(self):
+        self.service.emulator.reset()
+        self.service.reset_metrics()
+
+        domain_patcher = patch("tipping.db.faunadb.FAUNADB_DOMAIN", self.service.url)
+        domain_patcher.start()
+        self.addCleanup(domain_patcher.stop)
+
+        self.home_team = Team(name="Richmond").create()
+        self.away_team = Team(name="Carlton").create()
+        self.ml_model = MLModel(
+            name="test_estimator",
+            is_principal=True,
+            used_in_competitions=True,
+            prediction_type="margin",
+        ).create()
+
+    def _create_match(self, start_date_time=None, round_number=1):
+        match = Match(
+            start_date_time=(
+                start_date_time
+                or datetime.now(tz=timezone.utc).replace(microsecond=0)
+                + timedelta(days=1)
+            ),
+            season=datetime.now().year,
+            round_number=round_number,
+            venue="MCG",
+        ).create()
+
+        for team, at_home in [(self.home_team, True), (self.away_team, False)]:
+            TeamMatch(team=team, match=match, at_home=at_home, score=0).create()
+
+        return match
+
+    def test_records(self):
+        match = self._create_match()
+
+        # It finds records by their indexed fields
+        self.assertEqual(Team.find_by(name="Richmond").id, self.home_team.id)
+        self.assertEqual(
+            MLModel.find_by_name(name="test_estimator").name, "test_estimator"
+        )
+
+        # It resolves references & relations
+        season_matches = Match.filter_by_season()
+        self.assertEqual(season_matches.count(), 1)
+        self.assertEqual(season_matches[0].id, match.id)
+        self.assertEqual(season_matches[0].start_date_time, match.start_date_time)
+        self.assertEqual(
+            {team_match.team.name for team_match in season_matches[0].team_matches},
+            {"Richmond", "Carlton"},
+        )
+
+        # It goes through HTTP
+        self.assertGreater(self.service.metrics.request_count, 0)
+        self.assertGreater(self.service.metrics.response_bytes, 0)
+
+        with self.subTest("with a duplicate unique field"):
+            with self.assertRaisesRegex(GraphQLError, "not unique"):
+                Team(name="Richmond").create()
+
+        with self.subTest("with a time that isn't in UTC"):
+            with self.assertRaisesRegex(GraphQLError, "UTC"):
+                FaunadbClient().graphql(
+                    """
+                    mutation {
+                        createMatch(data: {
+                            startDateTime: "2020-03-01T08:00:00+10:00",
+                            season: 2020,
+                            roundNumber: 1,
+                            venue: "MCG"
+                        }) { _id }
+                    }
+                    """
+                )
+
+        with self.subTest("with more records than fit on one page"):
+            start_date_time = datetime(datetime.now().year, 1, 1, tzinfo=timezone.utc)
+
+            for match_idx in range(DEFAULT_PAGE_SIZE):
+                Match(
+                    start_date_time=start_date_time + timedelta(hours=match_idx),
+                    season=start_date_time.year,
+                    round_number=1,
+                    venue="MCG",
+                ).create()
+
+            # Like FaunaDB, it only returns the first page
+            self.assertEqual(Match.filter_by_season().count(), DEFAULT_PAGE_SIZE)
+
+    def test_predictions(self):
+        match = self._create_match()
+        prediction_data = pd.Series(
+            {
+                "home_team": "Richmond",
+                "away_team": "Carlton",
+                "year": match.season,
+                "round_number": match.round_number,
+                "ml_model": self.ml_model.name,
+                "home_predicted_margin": 5.0,
+                "away_predicted_margin": -5.0,
+                "home_predicted_win_probability": None,
+                "away_predicted_win_probability": None,
+            }
+        )
+
+        prediction = Prediction.update_or_create_from_raw_data(prediction_data)
+
+        # It creates the prediction
+        self.assertEqual(self.service.emulator.count("Prediction"), 1)
+        self.assertEqual(prediction.predicted_winner.name, "Richmond")
+
+        with self.subTest("when the match already has a prediction"):
+            prediction_data["away_predicted_margin"] = 10.0
+
+            Prediction.update_or_create_from_raw_data(prediction_data)
+
+            # It updates the existing prediction
+            saved_predictions = Match.filter_by_season()[0].predictions
+            self.assertEqual(len(saved_predictions), 1)
+            self.assertEqual(saved_predictions[0].predicted_winner.name, "Carlton")
+            self.assertEqual(saved_predictions[0].predicted_margin, 5.0)
@@ -0,0 +1,70 @@
+# pylint: disable=missing-docstring
+
+from unittest import TestCase
+import json
+
+from tipping.db.metrics import (
+    LATENCY_BUCKETS_MS,
+    QueryBudgetExceeded,
+    record_query,
+    track_queries,
+)
+
+
+class TestMetrics(TestCase):
+    def test_track_queries(self):
+        with track_queries() as outer_report:
+            record_query("createTeam", 5, request_bytes=100, response_bytes=50)
+
+            with track_queries() as inner_report:
+                record_query("createTeam", 40)
+                record_query("findTeamByName", 10_000, error=True)
+
+        record_query("createTeam", 5)
+
+        # It records queries for all active reports
+        self.assertEqual(outer_report.query_count, 3)
+        self.assertEqual(inner_report.query_count, 2)
+        self.assertEqual(outer_report.count("createTeam"), 2)
+        self.assertEqual(outer_report.error_count, 1)
+
+        # It buckets latencies
+        create_team = outer_report.operations["createTeam"].to_dict()
+        self.assertEqual(create_team["histogram"]["le_10ms"], 1)
+        self.assertEqual(create_team["histogram"]["le_50ms"], 1)
+        self.assertEqual(create_team["request_bytes"], 100)
+        self.assertEqual(create_team["mean_ms"], 22.5)
+        find_team = outer_report.operations["findTeamByName"].to_dict()
+        self.assertEqual(find_team["histogram"][f"gt_{LATENCY_BUCKETS_MS[-1]}ms"], 1)
+
+        # It doesn't add operations that weren't sent
+        self.assertEqual(outer_report.count("createMatch"), 0)
+        self.assertNotIn("createMatch", outer_report.operations)
+
+        with self.subTest("with a label"):
+            with self.assertLogs("tipping.db.metrics", level="INFO") as logs:
+                with track_queries(label="update_fixture_data"):
+                    record_query("createTeam", 5)
+
+            # It logs the report as JSON
+            log_data = json.loads(logs.records[0].getMessage())
+            self.assertEqual(log_data["label"], "update_fixture_data")
+            self.assertEqual(log_data["query_count"], 1)
+            self.assertIn("createTeam", log_data["operations"])
+
+    def test_assert_query_budget(self):
+        with track_queries() as report:
+            for _ in range(3):
+                record_query("createTeam", 5)
+
+            record_query("findTeamByName", 5)
+
+        report.assert_query_budget(4)
+        report.assert_query_budget(3, operation_name="createTeam")
+
+        with self.subTest("when over budget"):
+            with self.assertRaisesRegex(QueryBudgetExceeded, "createTeam: 3"):
+                report.assert_query_budget(3)
+
+            with self.assertRaisesRegex(QueryBudgetExceeded, "at most 2 createTeam"):
+                report.assert_query_budget(2, operation_name="createTeam")
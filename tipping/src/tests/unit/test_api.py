@@ -3,14 +3,18 @@
 from unittest import TestCase
 from unittest.mock import patch, MagicMock
 from datetime import datetime, date
+import math
 import pytz
 
 import numpy as np
+import pandas as pd
 from freezegun import freeze_time
 from candystore import CandyStore
 
 from tests.fixtures import data_factories
+from tests.fixtures.factories import MatchFactory
 from tipping import api
+from tipping.models.match import _MatchRecordCollection
 from tipping.tipping import FootyTipsSubmitter
 
 
@@ -27,6 +31,12 @@ TIP_SEASON_RANGE = (min(MATCH_SEASON_RANGE), max(MATCH_SEASON_RANGE) + 1)
 TIP_DATES = [
     datetime(season, 1, 1, tzinfo=pytz.UTC) for season in range(*TIP_SEASON_RANGE)
 ]
+PREDICTION_COLUMNS = [
+    "home_predicted_margin",
+    "away_predicted_margin",
+    "home_predicted_win_probability",
+    "away_predicted_win_probability",
+]
 
 
 class TestApi(TestCase):
@@ -96,6 +106,38 @@ class TestApi(TestCase):
             self.assertIn("createMatch", graphql_queries)
             self.assertIn("createTeamMatch", graphql_queries)
 
+    @patch("tipping.models.base_model.FaunadbClient.graphql")
+    @patch("tipping.api.Match.filter_by_season")
+    def test_update_faunadb_fixture_data_with_saved_matches(
+        self, mock_filter_by_season, mock_graphql
+    ):
+        with freeze_time(datetime(2020, 5, 1, tzinfo=pytz.UTC)):
+            right_now = datetime.now(tz=pytz.UTC)
+            this_year = right_now.year
+            fixture = data_factories.fake_fixture_data(
+                seasons=(this_year, this_year + 1)
+            )
+            upcoming_round = int(
+                fixture.query("date > @right_now")["round_number"].min()
+            )
+            future_matches = fixture.query(
+                "round_number == @upcoming_round & date > @right_now"
+            )
+
+            saved_match = MatchFactory.build(
+                add_id=True, season=this_year, round_number=upcoming_round
+            )
+            mock_filter_by_season.return_value = _MatchRecordCollection(
+                records=[saved_match]
+            )
+
+            self.api._update_faunadb_fixture_data(  # pylint: disable=protected-access
+                future_matches, upcoming_round, verbose=0
+            )
+
+            # It doesn't save matches for a round that's already in FaunaDB
+            mock_graphql.assert_not_called()
+
     @patch("tipping.api.data_export")
     @patch("tipping.api.data_import")
     def test_update_matches(self, mock_data_import, mock_data_export):
@@ -200,6 +242,45 @@ class TestApi(TestCase):
                 # It submits tips to all competitions
                 self.assertEqual(mock_submitter.submit_tips.call_count, 2)
 
+    @patch("tipping.api.Prediction.update_or_create_from_raw_data")
+    def test_update_faunadb_predictions(self, mock_update_or_create_from_raw_data):
+        fixtures = data_factories.fake_fixture_data(seasons=CURRENT_YEAR_RANGE)
+        # Each model predicts either margins or win probabilities,
+        # so combining their predictions leaves the other columns as NaN
+        predictions = pd.concat(
+            [
+                data_factories.fake_prediction_data(
+                    fixtures=fixtures,
+                    ml_model_name=ml_model_name,
+                    predict_margin=predict_margin,
+                    pivot_home_away=True,
+                )
+                for ml_model_name, predict_margin in [
+                    ("margin_estimator", True),
+                    ("proba_estimator", False),
+                ]
+            ]
+        ).astype({column: float for column in PREDICTION_COLUMNS})
+
+        self.api._update_faunadb_predictions(  # pylint: disable=protected-access
+            predictions
+        )
+
+        self.assertEqual(
+            mock_update_or_create_from_raw_data.call_count, len(predictions)
+        )
+
+        # It replaces NaN with None, because FaunaDB doesn't accept NaN as a Float
+        for call_args in mock_update_or_create_from_raw_data.call_args_list:
+            prediction_values = call_args.args[0][PREDICTION_COLUMNS]
+            self.assertTrue(prediction_values.notna().any())
+            self.assertFalse(
+                any(
+                    isinstance(value, float) and math.isnan(value)
+                    for value in prediction_values
+                )
+            )
+
     @patch("tipping.api.data_import")
     def test_fetch_match_predictions(self, mock_data_import):
         fixtures = data_factories.fake_fixture_data(seasons=CURRENT_YEAR_RANGE)
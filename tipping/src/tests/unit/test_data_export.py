@@ -1,8 +1,7 @@
 # pylint: disable=missing-docstring
 
 from unittest import TestCase
-from unittest.mock import patch, MagicMock
-import json
+from unittest.mock import patch, MagicMock, ANY
 
 import numpy as np
 import pandas as pd
@@ -12,6 +11,33 @@ from tipping import data_export, settings
 
 
 N_MATCHES = 5
+JOB_URL = settings.TIPRESIAS_APP + "/jobs/1"
+# Requests continue the trace in the main app
+TRACE_HEADERS = {"traceparent": ANY}
+
+
+def _mock_job_requests(mock_requests, result=None, statuses=("succeeded",)):
+    mock_response = MagicMock()
+    mock_response.status_code = 202
+    mock_response.headers = {"Location": "/jobs/1"}
+    mock_requests.post = MagicMock(return_value=mock_response)
+
+    job_responses = []
+
+    for status in statuses:
+        job_response = MagicMock()
+        job_response.status_code = 200
+        job_response.json.return_value = {
+            "id": 1,
+            "status": status,
+            "result": result,
+            "error": "Traceback: everything broke" if status == "failed" else "",
+        }
+        job_responses.append(job_response)
+
+    mock_requests.get = MagicMock(side_effect=job_responses)
+
+    return mock_response
 
 
 class TestDataExport(TestCase):
@@ -20,12 +46,7 @@ class TestDataExport(TestCase):
 
     @patch("tipping.data_export.requests")
     def test_update_fixture_data(self, mock_requests):
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.headers = {}
-        mock_response.text = "Stuff happened"
-
-        mock_requests.post = MagicMock(return_value=mock_response)
+        mock_response = _mock_job_requests(mock_requests)
 
         url = settings.TIPRESIAS_APP + "/fixtures"
         fake_fixture = data_factories.fake_fixture_data()
@@ -37,8 +58,15 @@ class TestDataExport(TestCase):
         mock_requests.post.assert_called_with(
             url,
             json={"upcoming_round": upcoming_round, "data": fixture_response},
-            headers={},
+            headers=TRACE_HEADERS,
+        )
+        # It waits for the queued job
+        mock_requests.get.assert_called_with(
+            JOB_URL, headers=TRACE_HEADERS, timeout=data_export.JOB_REQUEST_TIMEOUT
         )
+        # It sends the trace's IDs
+        traceparent = mock_requests.post.call_args.kwargs["headers"]["traceparent"]
+        self.assertRegex(traceparent, r"^00-[0-9a-f]{32}-[0-9a-f]{16}-01$")
 
         with self.subTest("when the status code isn't 2xx"):
             mock_response.status_code = 400
@@ -46,11 +74,9 @@ class TestDataExport(TestCase):
             with self.assertRaisesRegex(Exception, "Bad response"):
                 self.data_export.update_fixture_data(fake_fixture, upcoming_round)
 
+    @patch("tipping.data_export.time.sleep")
     @patch("tipping.data_export.requests")
-    def test_update_match_predictions(self, mock_requests):
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.headers = {}
+    def test_update_match_predictions(self, mock_requests, mock_sleep):
         response_data = [
             {
                 "predicted_winner__name": "Some Team",
@@ -60,9 +86,11 @@ class TestDataExport(TestCase):
                 "predicted_win_probability": 0.876,
             }
         ]
-        mock_response.text = json.dumps(response_data)
-
-        mock_requests.post = MagicMock(return_value=mock_response)
+        _mock_job_requests(
+            mock_requests,
+            result=response_data,
+            statuses=("pending", "running", "succeeded"),
+        )
 
         url = settings.TIPRESIAS_APP + "/predictions"
         fake_predictions = pd.concat(
@@ -73,13 +101,25 @@ class TestDataExport(TestCase):
         # It posts the data
         prediction_data = fake_predictions.to_dict("records")
         mock_requests.post.assert_called_with(
-            url, json={"data": prediction_data}, headers={}
+            url, json={"data": prediction_data}, headers=TRACE_HEADERS
         )
 
+        # It polls the job until it's done
+        self.assertEqual(mock_requests.get.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
         # It returns the created/updated predictions records
         self.assertTrue((prediction_records == pd.DataFrame(response_data)).all().all())
 
+        with self.subTest("when the job fails"):
+            _mock_job_requests(mock_requests, statuses=("running", "failed"))
+
+            with self.assertRaisesRegex(
+                data_export.IngestionJobError, "everything broke"
+            ):
+                self.data_export.update_match_predictions(fake_predictions)
+
         with self.subTest("when the status code isn't 2xx"):
+            mock_response = _mock_job_requests(mock_requests)
             mock_response.status_code = 400
 
             with self.assertRaisesRegex(Exception, "Bad response"):
@@ -87,12 +127,7 @@ class TestDataExport(TestCase):
 
     @patch("tipping.data_export.requests")
     def test_update_matches(self, mock_requests):
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.headers = {}
-        mock_response.text = "Stuff happened"
-
-        mock_requests.post = MagicMock(return_value=mock_response)
+        mock_response = _mock_job_requests(mock_requests)
 
         url = settings.TIPRESIAS_APP + "/matches"
         fake_matches = data_factories.fake_match_data()
@@ -101,7 +136,7 @@ class TestDataExport(TestCase):
         # It posts the data
         matches_response = fake_matches.astype({"date": str}).to_dict("records")
         mock_requests.post.assert_called_with(
-            url, json={"data": matches_response}, headers={}
+            url, json={"data": matches_response}, headers=TRACE_HEADERS
         )
 
         with self.subTest("when the status code isn't 2xx"):
@@ -112,12 +147,7 @@ class TestDataExport(TestCase):
 
     @patch("tipping.data_export.requests")
     def test_update_match_results(self, mock_requests):
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.headers = {}
-        mock_response.text = "Stuff happened"
-
-        mock_requests.post = MagicMock(return_value=mock_response)
+        mock_response = _mock_job_requests(mock_requests)
 
         url = settings.TIPRESIAS_APP + "/matches"
         fake_match_results = data_factories.fake_match_results_data()
@@ -128,7 +158,7 @@ class TestDataExport(TestCase):
             "records"
         )
         mock_requests.post.assert_called_with(
-            url, json={"data": match_results_response}, headers={}
+            url, json={"data": match_results_response}, headers=TRACE_HEADERS
         )
 
         with self.subTest("when the status code isn't 2xx"):
@@ -0,0 +1,98 @@
+# pylint: disable=missing-docstring
+
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+from contextlib import ExitStack
+import warnings
+
+from tests.helpers.faunadb_emulator import FaunadbEmulator
+from tests.helpers.service_stubs import (
+    DataScienceService,
+    FaunadbService,
+    TipresiasAppService,
+    fake_current_season,
+    fake_ml_models,
+    seed_faunadb,
+)
+from tipping import api, settings
+from tipping.db import faunadb
+from tipping.db.metrics import track_queries
+
+
+# These budgets reflect how many queries the pipeline sends now: the models query
+# FaunaDB once per record, so the per-match budgets should come down as queries
+# get batched
+FIXTURE_QUERIES_PER_MATCH = 6
+PREDICTION_QUERIES_PER_PREDICTION = 6
+
+
+class TestQueryBudgets(TestCase):
+    """Limit how many FaunaDB queries each pipeline function sends for one round."""
+
+    def setUp(self):
+        self.ml_models = fake_ml_models(2)
+        self.fixtures, match_data = fake_current_season()
+        self.emulator = FaunadbEmulator()
+        seed_faunadb(self.emulator, self.fixtures, self.ml_models)
+
+        services = [
+            DataScienceService(self.fixtures, match_data, self.ml_models),
+            TipresiasAppService(
+                {
+                    ml_model["name"]: ml_model["prediction_type"]
+                    for ml_model in self.ml_models
+                    if ml_model["used_in_competitions"]
+                }
+            ),
+            FaunadbService(self.emulator),
+        ]
+
+        for service in services:
+            service.start()
+            self.addCleanup(service.stop)
+
+        data_science_service, tipresias_app_service, faunadb_service = services
+        contexts = ExitStack()
+        self.addCleanup(contexts.close)
+
+        for context in [
+            patch.object(settings, "DATA_SCIENCE_SERVICE", data_science_service.url),
+            patch.object(settings, "TIPRESIAS_APP", tipresias_app_service.url),
+            patch.object(faunadb, "FAUNADB_DOMAIN", faunadb_service.url),
+            warnings.catch_warnings(),
+        ]:
+            contexts.enter_context(context)
+
+        warnings.simplefilter("ignore")
+
+    def test_update_fixture_data(self):
+        with track_queries() as report:
+            api.update_fixture_data(verbose=0)
+
+        n_matches = self.emulator.count("Match")
+        self.assertGreater(n_matches, 0)
+        # One extra query to check for existing matches
+        report.assert_query_budget(n_matches * FIXTURE_QUERIES_PER_MATCH + 1)
+
+        with self.subTest("when the round's matches already exist"):
+            with track_queries() as report:
+                api.update_fixture_data(verbose=0)
+
+            report.assert_query_budget(1)
+
+    def test_update_match_predictions(self):
+        api.update_fixture_data(verbose=0)
+
+        with track_queries() as report:
+            api.update_match_predictions(tips_submitters=[MagicMock()], verbose=0)
+
+        n_predictions = self.emulator.count("Prediction")
+        self.assertGreater(n_predictions, 0)
+        report.assert_query_budget(n_predictions * PREDICTION_QUERIES_PER_PREDICTION)
+
+    def test_update_matches(self):
+        with track_queries() as report:
+            api.update_matches(verbose=0)
+
+        # Past matches only go to the main app
+        report.assert_query_budget(0)
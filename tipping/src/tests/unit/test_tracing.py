@@ -0,0 +1,131 @@
+# pylint: disable=missing-docstring
+
+from unittest import TestCase
+from unittest.mock import patch
+import json
+import os
+import tempfile
+
+from tipping import settings, tracing
+
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+SPAN_ID = "00f067aa0ba902b7"
+
+
+class TestTracing(TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.jsonl_path = os.path.join(temp_dir.name, "spans.jsonl")
+
+        patcher = patch.object(settings, "TRACING_JSONL_PATH", self.jsonl_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _exported_spans(self):
+        with open(self.jsonl_path, encoding="utf-8") as jsonl_file:
+            return [json.loads(line) for line in jsonl_file]
+
+    def test_span(self):
+        @tracing.traced("fetch_data")
+        def fetch_data():
+            return tracing.trace_headers()
+
+        with tracing.span("update_match_predictions") as root_span:
+            headers = fetch_data()
+
+            # It doesn't export spans until the outermost one ends
+            self.assertFalse(os.path.exists(self.jsonl_path))
+
+        self.assertIsNone(tracing.current_span())
+
+        child_span, exported_root_span = self._exported_spans()
+
+        # It exports spans with their trace & parent IDs
+        self.assertEqual(exported_root_span["name"], "update_match_predictions")
+        self.assertEqual(exported_root_span["parentSpanId"], None)
+        self.assertEqual(exported_root_span["status"]["code"], "ok")
+        self.assertEqual(child_span["name"], "fetch_data")
+        self.assertEqual(child_span["traceId"], root_span.context.trace_id)
+        self.assertEqual(child_span["parentSpanId"], root_span.context.span_id)
+        self.assertGreaterEqual(child_span["durationMs"], 0)
+
+        # It propagates the current span
+        self.assertEqual(
+            headers["traceparent"],
+            f"00-{child_span['traceId']}-{child_span['spanId']}-01",
+        )
+
+        with self.subTest("with an error"):
+            os.remove(self.jsonl_path)
+
+            with self.assertRaises(ValueError):
+                with tracing.span("update_matches"):
+                    raise ValueError("Oops")
+
+            exported_span = self._exported_spans()[0]
+            self.assertEqual(exported_span["status"]["code"], "error")
+            self.assertEqual(exported_span["status"]["message"], "ValueError: Oops")
+
+        with self.subTest("with a parent from another service"):
+            os.remove(self.jsonl_path)
+            parent = tracing.parse_traceparent(f"00-{TRACE_ID}-{SPAN_ID}-01")
+
+            with tracing.span("handle_request", kind="server", parent=parent):
+                pass
+
+            exported_span = self._exported_spans()[0]
+            self.assertEqual(exported_span["traceId"], TRACE_ID)
+            self.assertEqual(exported_span["parentSpanId"], SPAN_ID)
+
+            with self.subTest("that isn't sampled"):
+                os.remove(self.jsonl_path)
+                parent = tracing.parse_traceparent(f"00-{TRACE_ID}-{SPAN_ID}-00")
+
+                with tracing.span("handle_request", parent=parent):
+                    traceparent = tracing.trace_headers()["traceparent"]
+
+                # It propagates the flag without exporting spans
+                self.assertTrue(traceparent.endswith("-00"))
+                self.assertFalse(os.path.exists(self.jsonl_path))
+
+    @patch("tipping.tracing.requests.post")
+    def test_otlp_export(self, mock_post):
+        with patch.object(settings, "TRACING_OTLP_ENDPOINT", "http://collector:4318"):
+            with tracing.span("update_matches", attributes={"rows": 5}):
+                pass
+
+        mock_post.assert_called_once()
+        self.assertEqual(mock_post.call_args.args[0], "http://collector:4318/v1/traces")
+
+        resource_spans = mock_post.call_args.kwargs["json"]["resourceSpans"][0]
+        self.assertEqual(
+            resource_spans["resource"]["attributes"][0]["value"]["stringValue"],
+            "tipping",
+        )
+        otlp_span = resource_spans["scopeSpans"][0]["spans"][0]
+        self.assertEqual(otlp_span["name"], "update_matches")
+        self.assertEqual(
+            otlp_span["attributes"], [{"key": "rows", "value": {"intValue": "5"}}]
+        )
+
+        with self.subTest("when the collector is down"):
+            mock_post.side_effect = ConnectionError
+
+            with patch.object(
+                settings, "TRACING_OTLP_ENDPOINT", "http://collector:4318"
+            ):
+                # It doesn't raise an error
+                with self.assertLogs(level="ERROR"):
+                    with tracing.span("update_matches"):
+                        pass
+
+    def test_parse_traceparent(self):
+        self.assertEqual(
+            tracing.parse_traceparent(f"00-{TRACE_ID}-{SPAN_ID}-01"),
+            tracing.SpanContext(trace_id=TRACE_ID, span_id=SPAN_ID, sampled=True),
+        )
+
+        for invalid_traceparent in [None, "", "00-123-456-01", f"01-{TRACE_ID}"]:
+            self.assertIsNone(tracing.parse_traceparent(invalid_traceparent))
@@ -4,9 +4,10 @@ from typing import Optional, List
 from datetime import datetime, timezone
 from warnings import warn
 
+import numpy as np
 import pandas as pd
 
-from tipping import data_import, data_export
+from tipping import data_import, data_export, tracing
 from tipping.helpers import pivot_team_matches_to_matches
 from tipping.tipping import MonashSubmitter, FootyTipsSubmitter
 from tipping.models import Match, TeamMatch, Prediction
@@ -54,6 +55,7 @@ def _select_matches_from_current_round(
     return fixture_for_current_round
 
 
+@tracing.traced("fetch_current_round_fixture")
 def _fetch_current_round_fixture(verbose, after=True) -> Optional[pd.DataFrame]:
     right_now = datetime.now(tz=timezone.utc)
     beginning_of_today = right_now.replace(hour=0, minute=0, second=0, microsecond=0)
@@ -80,13 +82,14 @@ def _fetch_current_round_fixture(verbose, after=True) -> Optional[pd.DataFrame]:
     return matches_from_current_round
 
 
+@tracing.traced("update_faunadb_fixture_data")
 def _update_faunadb_fixture_data(
     fixture_data: pd.DataFrame, current_round: int, verbose: int = 1
 ):
     right_now = datetime.now(tz=timezone.utc)
     season_matches = Match.filter_by_season(season=right_now.year)
 
-    saved_match_count = season_matches.filter(round=current_round).count()
+    saved_match_count = season_matches.filter(round_number=current_round).count()
 
     if saved_match_count > 0:
         if verbose == 1:
@@ -143,6 +146,7 @@ def _update_faunadb_fixture_data(
     return None
 
 
+@tracing.traced("update_fixture_data")
 def update_fixture_data(verbose: int = 1) -> None:
     """
     Fetch fixture data and send upcoming match data to the main app.
@@ -161,17 +165,23 @@ def update_fixture_data(verbose: int = 1) -> None:
     current_round = matches_from_current_round["round_number"].drop_duplicates().iloc[0]
     future_matches = matches_from_current_round.query("date > @right_now")
 
-    data_export.update_fixture_data(future_matches, current_round)
+    with tracing.span("send_fixture_data"):
+        data_export.update_fixture_data(future_matches, current_round)
+
     _update_faunadb_fixture_data(future_matches, current_round, verbose=verbose)
 
     return None
 
 
+@tracing.traced("update_faunadb_predictions")
 def _update_faunadb_predictions(predictions: pd.DataFrame):
-    for _, pred in predictions.iterrows():
+    # Each model predicts either margins or win probabilities, so the other type
+    # is missing, and Prediction expects None rather than NaN for missing values
+    for _, pred in predictions.replace({np.nan: None}).iterrows():
         Prediction.update_or_create_from_raw_data(pred)
 
 
+@tracing.traced("update_match_predictions")
 def update_match_predictions(tips_submitters=None, verbose=1) -> None:
     """Fetch predictions from ML models and send them to the main app.
 
@@ -191,16 +201,24 @@ def update_match_predictions(tips_submitters=None, verbose=1) -> None:
     if verbose == 1:
         print("Fetching predictions for round " f"{current_round}, {current_season}...")
 
-    prediction_data = data_import.fetch_prediction_data(
-        f"{current_season}-{current_season + 1}",
-        round_number=current_round,
-    )
+    with tracing.span(
+        "fetch_prediction_data",
+        attributes={"season": int(current_season), "round_number": int(current_round)},
+    ):
+        prediction_data = data_import.fetch_prediction_data(
+            f"{current_season}-{current_season + 1}",
+            round_number=current_round,
+        )
 
     if verbose == 1:
         print("Predictions received!")
 
     match_predictions = pivot_team_matches_to_matches(prediction_data)
-    updated_prediction_records = data_export.update_match_predictions(match_predictions)
+
+    with tracing.span("send_predictions"):
+        updated_prediction_records = data_export.update_match_predictions(
+            match_predictions
+        )
 
     _update_faunadb_predictions(match_predictions)
 
@@ -222,11 +240,15 @@ def update_match_predictions(tips_submitters=None, verbose=1) -> None:
     ]
 
     for submitter in tips_submitters:
-        submitter.submit_tips(updated_prediction_records)
+        with tracing.span(
+            "submit_tips", attributes={"submitter": type(submitter).__name__}
+        ):
+            submitter.submit_tips(updated_prediction_records)
 
     return None
 
 
+@tracing.traced("update_matches")
 def update_matches(verbose=1) -> None:
     """
     Fetch match data and send them to the main app.
@@ -253,6 +275,7 @@ def update_matches(verbose=1) -> None:
         print("Match data sent!")
 
 
+@tracing.traced("update_match_results")
 def update_match_results(verbose=1) -> None:
     """
     Fetch minimal match results data and send them to the main app.
@@ -2,18 +2,66 @@
 
 from typing import Optional, Dict, Any, List
 from urllib.parse import urljoin
-import json
+import time
 
 import pandas as pd
 import requests
 import simplejson
 
 from tipping.helpers import convert_to_dict
-from tipping import settings
+from tipping import settings, tracing
 from tipping.types import MatchPrediction
 
 
-def _send_data(path: str, body: Optional[Dict[str, Any]] = None) -> requests.Response:
+# Seconds between requests for the status of ingestion jobs
+JOB_POLL_INTERVAL = 2
+# Lambda functions time out after 15 minutes
+JOB_TIMEOUT = 840
+# Seconds to wait for each status response, so one hanging request
+# doesn't use up the whole JOB_TIMEOUT
+JOB_REQUEST_TIMEOUT = 30
+
+
+class IngestionJobError(Exception):
+    """Raised when the main app fails to finish processing data that we sent."""
+
+
+def _check_response(response: requests.Response) -> requests.Response:
+    if 200 <= response.status_code < 300:
+        return response
+
+    raise Exception(
+        f"Bad response from application when requesting {response.url}:\n"
+        f"Status: {response.status_code}\n"
+        f"Headers: {response.headers}\n"
+        f"Body: {response.text}"
+    )
+
+
+def _wait_for_job(job_url: str, headers: Dict[str, str]) -> Dict[str, Any]:
+    deadline = time.monotonic() + JOB_TIMEOUT
+
+    while True:
+        job = _check_response(
+            requests.get(job_url, headers=headers, timeout=JOB_REQUEST_TIMEOUT)
+        ).json()
+
+        if job["status"] == "succeeded":
+            return job
+
+        if job["status"] == "failed":
+            raise IngestionJobError(f"Job {job['id']} failed:\n{job['error']}")
+
+        if time.monotonic() > deadline:
+            raise IngestionJobError(
+                f"Job {job['id']} didn't finish within {JOB_TIMEOUT} seconds. "
+                f"Check {job_url} for its status."
+            )
+
+        time.sleep(JOB_POLL_INTERVAL)
+
+
+def _send_data(path: str, body: Optional[Dict[str, Any]] = None) -> Any:
     body = body or {}
 
     # I don't feel great about this, but there isn't a good way of converting Numpy
@@ -31,17 +79,28 @@ def _send_data(path: str, body: Optional[Dict[str, Any]] = None) -> requests.Res
     )
     service_url = urljoin(app_host, path)
 
-    response = requests.post(service_url, json=stringifiable_body, headers=headers)
-
-    if 200 <= response.status_code < 300:
-        return response
-
-    raise Exception(
-        f"Bad response from application when requesting {service_url}:\n"
-        f"Status: {response.status_code}\n"
-        f"Headers: {response.headers}\n"
-        f"Body: {response.text}"
-    )
+    with tracing.span(
+        f"POST {path}",
+        kind="client",
+        attributes={"peer.service": "tipresias_app", "http.url": service_url},
+    ) as span:
+        # The app continues the trace, including in the job that processes the data
+        headers = {**headers, **tracing.trace_headers()}
+        response = _check_response(
+            requests.post(service_url, json=stringifiable_body, headers=headers)
+        )
+        span.set_attribute("http.status_code", response.status_code)
+
+        # The app queues the data for background processing, so we wait for the job
+        # to finish. Reposting the same data returns the same job.
+        assert response.status_code == 202, (
+            f"Expected {service_url} to queue a job, but it responded with "
+            f"status {response.status_code}."
+        )
+        job_url = urljoin(app_host, response.headers["Location"])
+        span.set_attribute("job.url", job_url)
+
+        return _wait_for_job(job_url, headers)["result"]
 
 
 def update_fixture_data(fixture_data: pd.DataFrame, upcoming_round: int):
@@ -70,8 +129,7 @@ def update_match_predictions(prediction_data: pd.DataFrame) -> pd.DataFrame:
         "data": convert_to_dict(prediction_data),
     }
 
-    response = _send_data("/predictions", body=body)
-    predictions: List[MatchPrediction] = json.loads(response.text)
+    predictions: List[MatchPrediction] = _send_data("/predictions", body=body)
 
     return pd.DataFrame(predictions)
 
@@ -10,7 +10,7 @@ import pandas as pd
 import requests
 from mypy_extensions import TypedDict
 
-from tipping import settings
+from tipping import settings, tracing
 from tipping.types import MLModelInfo
 
 
@@ -62,7 +62,18 @@ def _fetch_data(
         if value is not None
     }
 
-    response = requests.get(service_url, params=clean_params, headers=headers)
+    with tracing.span(
+        f"GET {path}",
+        kind="client",
+        attributes={"peer.service": "data_science", "http.url": service_url},
+    ) as span:
+        response = requests.get(
+            service_url,
+            params=clean_params,
+            headers={**headers, **tracing.trace_headers()},
+        )
+        span.set_attribute("http.status_code", response.status_code)
+        span.set_attribute("http.response_content_length", len(response.content))
 
     if 200 <= response.status_code < 300:
         return response.json().get("data")
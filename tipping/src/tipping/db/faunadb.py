@@ -3,11 +3,17 @@
 from typing import Literal, Union, Any, Dict, Optional
 import os
 import logging
+import json
+import time
 
 import requests
+from aiohttp import ClientConnectorError, ClientResponseError
 from gql import gql, Client, AIOHTTPTransport
+from gql.transport.exceptions import TransportServerError
+from graphql import DocumentNode, FieldNode, OperationDefinitionNode
 
-from tipping import settings
+from tipping import settings, tracing
+from tipping.db.metrics import record_query
 
 ImportMode = Union[Literal["merge"], Literal["override"]]
 
@@ -16,6 +22,10 @@ FAUNADB_DOMAIN = (
     if settings.ENVIRONMENT == "production"
     else "http://faunadb:8084"
 )
+MAX_RETRIES = 2
+RETRY_DELAY_SECONDS = 0.5
+# FaunaDB doesn't process requests that get these statuses, so they're safe to retry
+RETRYABLE_STATUSES = (429, 503)
 
 
 class GraphQLError(Exception):
@@ -47,12 +57,15 @@ class FaunadbClient:
         with open(schema_filepath, "rb") as f:
             schema_file = f.read()
 
-        requests.post(
-            url,
-            data=schema_file,
-            params={"mode": mode},
-            headers=self._headers,
-        )
+        with tracing.span(
+            "faunadb import_schema", kind="client", attributes={"mode": mode}
+        ):
+            requests.post(
+                url,
+                data=schema_file,
+                params={"mode": mode},
+                headers={**self._headers, **tracing.trace_headers()},
+            )
 
     def graphql(
         self, query: str, variables: Optional[Dict[str, Any]] = None
@@ -62,32 +75,115 @@ class FaunadbClient:
         Params:
         -------
         query: GraphQL query string
+        variables: Values for the query's variables
         """
+        graphql_query = gql(query)
+        operation_name = self._operation_name(graphql_query)
+
+        with tracing.span(
+            f"faunadb {operation_name}",
+            kind="client",
+            attributes={"peer.service": "faunadb", "db.operation": operation_name},
+        ) as span:
+            return self._send_query(
+                graphql_query, query, variables or {}, operation_name, span
+            )
+
+    def _send_query(
+        self,
+        graphql_query: DocumentNode,
+        query: str,
+        graphql_variables: Dict[str, Any],
+        operation_name: str,
+        span: tracing.Span,
+    ) -> Dict[str, Any]:
         transport = AIOHTTPTransport(
             url=f"{FAUNADB_DOMAIN}/graphql",
-            headers=self._headers,
+            headers={**self._headers, **tracing.trace_headers()},
         )
         graphql_client = Client(transport=transport)
 
-        graphql_query = gql(query)
-        graphql_variables = variables or {}
-
-        try:
-            result = graphql_client.execute(
-                graphql_query, variable_values=graphql_variables
+        request_bytes = len(
+            json.dumps(
+                {"query": query, "variables": graphql_variables}, default=str
+            ).encode("utf-8")
+        )
+        retries = 0
+        start_time = time.perf_counter()
+
+        def record(result=None, error=False):
+            response_bytes = (
+                0
+                if result is None
+                else len(json.dumps(result, default=str).encode("utf-8"))
+            )
+            span.set_attribute("retries", retries)
+            span.set_attribute("response_bytes", response_bytes)
+            record_query(
+                operation_name,
+                (time.perf_counter() - start_time) * 1000,
+                request_bytes=request_bytes * (retries + 1),
+                response_bytes=response_bytes,
+                retries=retries,
+                error=error,
             )
-        except Exception as err:
-            logging.error(graphql_variables)
-            raise GraphQLError(err) from err
+
+        while True:
+            try:
+                result = graphql_client.execute(
+                    graphql_query, variable_values=graphql_variables
+                )
+                break
+            except Exception as err:  # pylint: disable=broad-except
+                if self._is_retryable(err) and retries < MAX_RETRIES:
+                    time.sleep(RETRY_DELAY_SECONDS * 2 ** retries)
+                    retries += 1
+                    continue
+
+                record(error=True)
+                logging.error(graphql_variables)
+                raise GraphQLError(err) from err
 
         errors = result.get("errors", [])
 
         if any(errors):
+            record(result=result, error=True)
             logging.error(graphql_variables)
             raise GraphQLError(errors)
 
+        record(result=result)
+
         return result
 
+    @staticmethod
+    def _operation_name(graphql_query: DocumentNode) -> str:
+        # Our queries are mostly anonymous, so we fall back to the name
+        # of the first field (e.g. 'createTeam')
+        for definition in graphql_query.definitions:
+            if not isinstance(definition, OperationDefinitionNode):
+                continue
+
+            if definition.name is not None:
+                return definition.name.value
+
+            first_selection = definition.selection_set.selections[0]
+
+            if isinstance(first_selection, FieldNode):
+                return first_selection.name.value
+
+        return "unknown"
+
+    @staticmethod
+    def _is_retryable(err: Exception) -> bool:
+        if isinstance(err, ClientConnectorError):
+            return True
+
+        return (
+            isinstance(err, TransportServerError)
+            and isinstance(err.__cause__, ClientResponseError)
+            and err.__cause__.status in RETRYABLE_STATUSES
+        )
+
     @property
     def _headers(self):
         return {
@@ -0,0 +1,234 @@
+"""Module for counting & timing the queries that we send to FaunaDB."""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+import bisect
+import json
+import logging
+
+
+# Upper bounds (inclusive) of the latency histogram's buckets, with a final bucket
+# for anything slower
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+logger = logging.getLogger(__name__)
+
+_active_reports: ContextVar[Tuple["QueryReport", ...]] = ContextVar(
+    "active_reports", default=tuple()
+)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when more FaunaDB queries were sent than a budget allows."""
+
+
+class OperationMetrics:
+    """
+    Running totals for one GraphQL operation.
+
+    Attributes:
+    -----------
+    count: Number of times the operation was sent.
+    errors: Number of times the operation failed.
+    retries: Number of extra attempts after failed requests.
+    request_bytes: Bytes of the serialised queries & variables.
+    response_bytes: Bytes of the serialised results.
+    total_ms: Sum of the operations' durations, including retries.
+    max_ms: Duration of the slowest operation.
+    histogram: Count of operations in each latency bucket, with the final bucket
+        for durations above the largest value in LATENCY_BUCKETS_MS.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogram: List[int] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record(
+        self,
+        duration_ms: float,
+        request_bytes: int = 0,
+        response_bytes: int = 0,
+        retries: int = 0,
+        error: bool = False,
+    ) -> None:
+        """Add one sent operation to the totals."""
+        self.count += 1
+        self.errors += int(error)
+        self.retries += retries
+        self.request_bytes += request_bytes
+        self.response_bytes += response_bytes
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.histogram[bisect.bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert metrics to a JSON-serialisable dict."""
+        bucket_labels = [f"le_{bucket}ms" for bucket in LATENCY_BUCKETS_MS] + [
+            f"gt_{LATENCY_BUCKETS_MS[-1]}ms"
+        ]
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "retries": self.retries,
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "histogram": dict(zip(bucket_labels, self.histogram)),
+        }
+
+
+class QueryReport:
+    """
+    FaunaDB queries sent within a track_queries block, grouped by operation name.
+
+    Attributes:
+    -----------
+    operations: Metrics for each operation name.
+    """
+
+    def __init__(self):
+        self.operations: Dict[str, OperationMetrics] = defaultdict(OperationMetrics)
+
+    @property
+    def query_count(self) -> int:
+        """Total number of operations sent."""
+        return sum(metrics.count for metrics in self.operations.values())
+
+    @property
+    def error_count(self) -> int:
+        """Total number of operations that failed."""
+        return sum(metrics.errors for metrics in self.operations.values())
+
+    @property
+    def retry_count(self) -> int:
+        """Total number of retried requests."""
+        return sum(metrics.retries for metrics in self.operations.values())
+
+    def count(self, operation_name: Optional[str] = None) -> int:
+        """
+        Count operations sent.
+
+        Params:
+        -------
+        operation_name: Only count operations with this name (e.g. 'createTeam').
+
+        Returns:
+        --------
+        Number of operations.
+        """
+        if operation_name is None:
+            return self.query_count
+
+        # Avoid the defaultdict adding a row of zeros for unsent operations
+        metrics = self.operations.get(operation_name)
+
+        return 0 if metrics is None else metrics.count
+
+    def assert_query_budget(
+        self, max_queries: int, operation_name: Optional[str] = None
+    ) -> None:
+        """
+        Raise an error if more operations were sent than the budget allows.
+
+        Params:
+        -------
+        max_queries: Maximum number of operations allowed.
+        operation_name: Only count operations with this name.
+        """
+        query_count = self.count(operation_name)
+
+        if query_count > max_queries:
+            operation_label = operation_name or "FaunaDB"
+            raise QueryBudgetExceeded(
+                f"Expected at most {max_queries} {operation_label} queries, "
+                f"but {query_count} were sent:\n{self._summary()}"
+            )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the report to a JSON-serialisable dict."""
+        return {
+            "query_count": self.query_count,
+            "error_count": self.error_count,
+            "retry_count": self.retry_count,
+            "request_bytes": sum(
+                metrics.request_bytes for metrics in self.operations.values()
+            ),
+            "response_bytes": sum(
+                metrics.response_bytes for metrics in self.operations.values()
+            ),
+            "total_ms": round(
+                sum(metrics.total_ms for metrics in self.operations.values()), 3
+            ),
+            "operations": {
+                operation_name: metrics.to_dict()
+                for operation_name, metrics in sorted(self.operations.items())
+            },
+        }
+
+    def _summary(self) -> str:
+        return "\n".join(
+            f"    {operation_name}: {metrics.count}"
+            for operation_name, metrics in sorted(
+                self.operations.items(), key=lambda item: -item[1].count
+            )
+        )
+
+
+def record_query(operation_name: str, duration_ms: float, **kwargs) -> None:
+    """
+    Add a sent operation to every active report.
+
+    Params:
+    -------
+    operation_name: Name of the GraphQL operation.
+    duration_ms: How long the operation took, including any retries.
+    kwargs: Other metrics accepted by OperationMetrics.record.
+    """
+    for report in _active_reports.get():
+        report.operations[operation_name].record(duration_ms, **kwargs)
+
+
+def log_report(report: QueryReport, label: str) -> None:
+    """Emit a report as a single-line JSON log message."""
+    logger.info(
+        json.dumps({"event": "faunadb_queries", "label": label, **report.to_dict()})
+    )
+
+
+@contextmanager
+def track_queries(label: Optional[str] = None) -> Iterator[QueryReport]:
+    """
+    Record FaunaDB queries sent within the block.
+
+    Blocks can be nested, with every active report recording each query.
+    Reports only include queries sent from the block's thread.
+
+    Params:
+    -------
+    label: If given, the report gets logged with this label when the block exits.
+
+    Returns:
+    --------
+    Report that gets updated as queries are sent.
+    """
+    report = QueryReport()
+    token = _active_reports.set(_active_reports.get() + (report,))
+
+    try:
+        yield report
+    finally:
+        _active_reports.reset(token)
+
+        if label is not None:
+            log_report(report, label)
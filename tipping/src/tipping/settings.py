@@ -14,6 +14,10 @@ DATA_SCIENCE_SERVICE_TOKEN = os.getenv("DATA_SCIENCE_SERVICE_TOKEN", "")
 
 FAUNADB_KEY = os.getenv("FAUNADB_KEY", "")
 
+# Where to export trace spans (see tipping/tracing.py)
+TRACING_JSONL_PATH = os.getenv("TRACING_JSONL_PATH", "")
+TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "")
+
 TEAM_TRANSLATIONS = {
     "Tigers": "Richmond",
     "Blues": "Carlton",
@@ -30,6 +30,7 @@ THIRTY_FIRST = 31
 # so leaving it out for now.
 SUPPORTED_MONASH_COMPS = ["normal", "info"]
 
+MONASH_TIPS_URL = "http://probabilistic-footy.monash.edu/~footy/tips.shtml"
 FOOTY_TIPS_FORM_URL = "https://www.footytips.com.au/tipping/afl/"
 
 
@@ -109,7 +110,7 @@ class MonashSubmitter:
 
         # Need to revisit home page for each competition, because submitting tips
         # doesn't redirect back to it.
-        self.browser.open("http://probabilistic-footy.monash.edu/~footy/tips.shtml")
+        self.browser.open(MONASH_TIPS_URL)
         self._login(competition)
         self._submit_tipping_form(predicted_winners)
 
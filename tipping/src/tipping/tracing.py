@@ -0,0 +1,332 @@
+"""
+Lightweight tracing for following a pipeline run across services.
+
+Spans follow the W3C Trace Context format, so we can send the current span
+in a traceparent header, and the main app's spans join the same trace.
+Finished spans get written to a JSONL file (TRACING_JSONL_PATH) and/or posted
+to an OTLP/HTTP collector (TRACING_OTLP_ENDPOINT) once the outermost span ends.
+With neither set, spans only propagate to other services.
+
+The services are deployed separately and don't share code, so the main app
+has its own copy of this module (backend/server/tracing.py). Changes to spans'
+format or propagation need to go in both.
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from threading import Lock
+import json
+import logging
+import re
+import secrets
+import time
+
+import requests
+
+from tipping import settings
+
+
+SERVICE_NAME = "tipping"
+TRACEPARENT_REGEX = re.compile(
+    r"^00-(?P<trace_id>[0-9a-f]{32})-(?P<span_id>[0-9a-f]{16})-(?P<flags>[0-9a-f]{2})$"
+)
+SAMPLED_FLAG = 0x01
+# OTLP enum values
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+STATUS_CODES = {"ok": 1, "error": 2}
+OTLP_TIMEOUT = 5
+
+logger = logging.getLogger(__name__)
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_finished_spans: List["Span"] = []
+_export_lock = Lock()
+
+
+class SpanContext(NamedTuple):
+    """
+    IDs that identify a span across services.
+
+    Attributes:
+    -----------
+    trace_id: 32-character hex ID shared by all spans in the trace.
+    span_id: 16-character hex ID of the span.
+    sampled: Whether the trace's spans get exported.
+    """
+
+    trace_id: str
+    span_id: str
+    sampled: bool = True
+
+    @property
+    def traceparent(self) -> str:
+        """Value for a traceparent header."""
+        flags = SAMPLED_FLAG if self.sampled else 0
+        return f"00-{self.trace_id}-{self.span_id}-{flags:02x}"
+
+
+class Span:
+    """
+    Timed operation in a trace.
+
+    Attributes:
+    -----------
+    name: What the operation is.
+    context: The span's IDs.
+    parent_span_id: ID of the span that this one is part of, if any.
+    is_local_root: Whether the span has no parent in this process.
+    kind: 'internal', 'server' (handling a request), or 'client' (making one).
+    attributes: Details about the operation.
+    start_time: Nanoseconds since the epoch when the span started.
+    end_time: Nanoseconds since the epoch when the span ended.
+    status: 'ok' or 'error'.
+    status_message: Error message, if any.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        parent: Optional[SpanContext] = None,
+        is_local_root: bool = True,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.context = SpanContext(
+            trace_id=secrets.token_hex(16) if parent is None else parent.trace_id,
+            span_id=secrets.token_hex(8),
+            sampled=True if parent is None else parent.sampled,
+        )
+        self.parent_span_id = None if parent is None else parent.span_id
+        self.is_local_root = is_local_root
+        self.kind = kind
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_time = time.time_ns()
+        self.end_time: Optional[int] = None
+        self.status = "ok"
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Add a detail about the operation."""
+        self.attributes[key] = value
+
+    def record_error(self, err: BaseException) -> None:
+        """Mark the operation as failed."""
+        self.status = "error"
+        self.status_message = f"{type(err).__name__}: {err}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the span to a JSON-serialisable dict for the JSONL file."""
+        return {
+            "service": SERVICE_NAME,
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": self.start_time,
+            "endTimeUnixNano": self.end_time,
+            "durationMs": (
+                None
+                if self.end_time is None
+                else (self.end_time - self.start_time) / 1_000_000
+            ),
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.status_message},
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Convert the span to OTLP's JSON format."""
+        return {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "kind": SPAN_KINDS[self.kind],
+            "startTimeUnixNano": str(self.start_time),
+            "endTimeUnixNano": str(self.end_time),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {
+                "code": STATUS_CODES[self.status],
+                "message": self.status_message,
+            },
+        }
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+
+    if isinstance(value, float):
+        return {"doubleValue": value}
+
+    return {"stringValue": str(value)}
+
+
+def parse_traceparent(traceparent: Optional[str]) -> Optional[SpanContext]:
+    """
+    Read a span's IDs from a traceparent header.
+
+    Params:
+    -------
+    traceparent: Value of a traceparent header.
+
+    Returns:
+    --------
+    The span's IDs, or None if the header is missing or invalid.
+    """
+    match = TRACEPARENT_REGEX.match((traceparent or "").strip().lower())
+
+    if match is None:
+        return None
+
+    return SpanContext(
+        trace_id=match.group("trace_id"),
+        span_id=match.group("span_id"),
+        sampled=bool(int(match.group("flags"), 16) & SAMPLED_FLAG),
+    )
+
+
+def current_span() -> Optional[Span]:
+    """Return the span that's in progress, if any."""
+    return _current_span.get()
+
+
+def trace_headers() -> Dict[str, str]:
+    """Return headers that continue the current trace in another service."""
+    active_span = _current_span.get()
+
+    return (
+        {} if active_span is None else {"traceparent": active_span.context.traceparent}
+    )
+
+
+def _export_jsonl(spans: List[Span]) -> None:
+    with open(settings.TRACING_JSONL_PATH, "a", encoding="utf-8") as jsonl_file:
+        for finished_span in spans:
+            jsonl_file.write(json.dumps(finished_span.to_dict(), default=str) + "\n")
+
+
+def _export_otlp(spans: List[Span]) -> None:
+    requests.post(
+        settings.TRACING_OTLP_ENDPOINT.rstrip("/") + "/v1/traces",
+        json={
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": SERVICE_NAME},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [
+                                finished_span.to_otlp() for finished_span in spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        },
+        timeout=OTLP_TIMEOUT,
+    )
+
+
+def _export(finished_span: Span) -> None:
+    if not finished_span.context.sampled:
+        return None
+
+    if not settings.TRACING_JSONL_PATH and not settings.TRACING_OTLP_ENDPOINT:
+        return None
+
+    with _export_lock:
+        _finished_spans.append(finished_span)
+
+        # We export in batches, once per pipeline run, rather than slowing down
+        # every request
+        if not finished_span.is_local_root:
+            return None
+
+        spans = _finished_spans[:]
+        _finished_spans.clear()
+
+    try:
+        if settings.TRACING_JSONL_PATH:
+            _export_jsonl(spans)
+
+        if settings.TRACING_OTLP_ENDPOINT:
+            _export_otlp(spans)
+    # Failing to export spans shouldn't fail the pipeline
+    except Exception:  # pylint: disable=broad-except
+        logger.exception("Failed to export %s spans", len(spans))
+
+    return None
+
+
+@contextmanager
+def span(
+    name: str,
+    kind: str = "internal",
+    attributes: Optional[Dict[str, Any]] = None,
+    parent: Optional[SpanContext] = None,
+) -> Iterator[Span]:
+    """
+    Time the block as a span in the current trace, or a new one.
+
+    Params:
+    -------
+    name: What the operation is.
+    kind: 'internal', 'server' (handling a request), or 'client' (making one).
+    attributes: Details about the operation.
+    parent: IDs of a span from another service to continue. Defaults to
+        the current span.
+
+    Returns:
+    --------
+    The span, for adding attributes.
+    """
+    parent_span = _current_span.get()
+    new_span = Span(
+        name,
+        parent=parent or (None if parent_span is None else parent_span.context),
+        is_local_root=parent_span is None,
+        kind=kind,
+        attributes=attributes,
+    )
+    token = _current_span.set(new_span)
+
+    try:
+        yield new_span
+    except BaseException as err:
+        new_span.record_error(err)
+        raise
+    finally:
+        new_span.end_time = time.time_ns()
+        _current_span.reset(token)
+        _export(new_span)
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """Decorate a function to run it in a span with the given name."""
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def traced_func(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+
+        return traced_func
+
+    return decorator